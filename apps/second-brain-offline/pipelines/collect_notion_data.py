@@ -4,6 +4,7 @@ from loguru import logger
 from zenml import pipeline
 
 from steps.collect_notion_data import (
+    commit_notion_sync_state,
     extract_notion_documents,
     extract_notion_documents_metadata,
 )
@@ -12,26 +13,42 @@ from steps.infrastructure import save_documents_to_disk, upload_to_s3
 
 @pipeline
 def collect_notion_data(
-    database_ids: list[str], data_dir: Path, to_s3: bool = False
+    database_ids: list[str],
+    data_dir: Path,
+    to_s3: bool = False,
+    s3_sync: bool = False,
+    incremental: bool = False,
 ) -> None:
-    notion_data_dir = data_dir / "notion"
+    notion_data_dir = data_dir / ("notion_delta" if incremental else "notion")
     notion_data_dir.mkdir(parents=True, exist_ok=True)
+    sync_state_dir = data_dir / "notion_sync" if incremental else None
 
     invocation_ids = []
     for index, database_id in enumerate(database_ids):
         logger.info(f"Collecting pages from database '{database_id}'")
-        documents_metadata = extract_notion_documents_metadata(database_id=database_id)
+        documents_metadata = extract_notion_documents_metadata.with_options(
+            enable_cache=not incremental
+        )(database_id=database_id, sync_state_dir=sync_state_dir)
         documents_data = extract_notion_documents(documents_metadata=documents_metadata)
 
+        output_dir = notion_data_dir / f"database_{index}"
         result = save_documents_to_disk(
             documents=documents_data,
-            output_dir=notion_data_dir / f"database_{index}",
+            output_dir=output_dir,
         )
+        if incremental:
+            result = commit_notion_sync_state(
+                database_id=database_id,
+                sync_state_dir=sync_state_dir,
+                delta_dir=output_dir,
+                after=result.invocation_id,
+            )
         invocation_ids.append(result.invocation_id)
 
     if to_s3:
         upload_to_s3(
             folder_path=notion_data_dir,
-            s3_prefix="second_brain_course/notion",
+            s3_prefix=f"second_brain_course/{notion_data_dir.name}",
+            sync=s3_sync,
             after=invocation_ids,
         )
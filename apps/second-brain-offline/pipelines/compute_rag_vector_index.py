@@ -1,6 +1,9 @@
 from zenml import pipeline
 
-from second_brain_offline.application.rag import EmbeddingModelType
+from second_brain_offline.application.rag import (
+    EmbeddingModelType,
+    EmbeddingTransformMethod,
+)
 from second_brain_offline.application.rag.retrievers import RetrieverType
 from second_brain_offline.application.rag.splitters import SummarizationType
 from steps.compute_rag_vector_index import chunk_embed_load, filter_by_quality
@@ -27,6 +30,9 @@ def compute_rag_vector_index(
     processing_batch_size: int = 256,
     processing_max_workers: int = 10,
     device: str = "cpu",
+    embedding_transform_method: EmbeddingTransformMethod = "none",
+    embedding_transform_dim: int | None = None,
+    embedding_transform_dtype: str = "float32",
 ) -> None:
     """Computes and stores RAG vector index from documents in MongoDB.
 
@@ -50,6 +56,10 @@ def compute_rag_vector_index(
         processing_batch_size: Batch size for parallel processing
         processing_max_workers: Number of worker threads for parallel processing
         device: Device to run embeddings on ('cpu' or 'cuda')
+        embedding_transform_method: Transform reducing the stored embeddings
+            ("none", "matryoshka" or "pca")
+        embedding_transform_dim: Dimension of the transformed embeddings
+        embedding_transform_dtype: Precision of the transformed embeddings
 
     Returns:
         None
@@ -77,4 +87,7 @@ def compute_rag_vector_index(
         contextual_agent_max_characters=contextual_agent_max_characters,
         mock=mock,
         device=device,
+        embedding_transform_method=embedding_transform_method,
+        embedding_transform_dim=embedding_transform_dim,
+        embedding_transform_dtype=embedding_transform_dtype,
     )
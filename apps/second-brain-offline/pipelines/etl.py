@@ -3,7 +3,12 @@ from pathlib import Path
 from loguru import logger
 from zenml import pipeline
 
-from steps.etl import add_quality_score, crawl
+from steps.etl import (
+    add_quality_score,
+    crawl,
+    deduplicate,
+    remove_outdated_documents,
+)
 from steps.infrastructure import (
     ingest_to_mongodb,
     read_documents_from_disk,
@@ -17,35 +22,70 @@ def etl(
     data_dir: Path,
     load_collection_name: str,
     to_s3: bool = False,
+    s3_sync: bool = False,
     max_workers: int = 10,
+    deduplication_threshold: float = 0.8,
     quality_agent_model_id: str = "gpt-4o-mini",
     quality_agent_mock: bool = True,
+    quality_agent_use_batch_api: bool = False,
+    save_as_snapshot: bool = False,
+    incremental: bool = False,
+    rag_collection_name: str | None = None,
 ) -> None:
-    notion_data_dir = data_dir / "notion"
+    # In incremental mode, only the delta of the last incremental Notion sync is
+    # processed. Its documents replace their previous versions, matched by their
+    # stable source ID, and the deleted pages are removed from the collection.
+    notion_data_dir = data_dir / ("notion_delta" if incremental else "notion")
     logger.info(f"Reading notion data from {notion_data_dir}")
-    crawled_data_dir = data_dir / "crawled"
+    crawled_data_dir = data_dir / ("crawled_delta" if incremental else "crawled")
     logger.info(f"Saving crawled data to {crawled_data_dir}")
 
     documents = read_documents_from_disk(
         data_directory=notion_data_dir, nesting_level=1
     )
-    crawled_documents = crawl(documents=documents, max_workers=max_workers)
+    crawled_documents = crawl(
+        documents=documents,
+        max_workers=max_workers,
+        cache_dir=data_dir / "crawl_cache",
+    )
+    deduplicated_documents = deduplicate(
+        documents=crawled_documents, threshold=deduplication_threshold
+    )
     enhanced_documents = add_quality_score(
-        documents=crawled_documents,
+        documents=deduplicated_documents,
         model_id=quality_agent_model_id,
         mock=quality_agent_mock,
         max_workers=max_workers,
+        use_batch_api=quality_agent_use_batch_api,
+        batch_dir=data_dir / "batches",
     )
 
-    save_documents_to_disk(documents=enhanced_documents, output_dir=crawled_data_dir)
+    save_documents_to_disk(
+        documents=enhanced_documents,
+        output_dir=crawled_data_dir,
+        as_snapshot=save_as_snapshot,
+    )
     if to_s3:
         upload_to_s3(
             folder_path=crawled_data_dir,
             s3_prefix="second_brain_course/crawled",
+            sync=s3_sync,
             after="save_documents_to_disk",
         )
+    after = None
+    if incremental:
+        result = remove_outdated_documents(
+            documents=documents,
+            delta_dir=notion_data_dir,
+            collection_name=load_collection_name,
+            rag_collection_name=rag_collection_name,
+        )
+        after = result.invocation_id
     ingest_to_mongodb(
         models=enhanced_documents,
         collection_name=load_collection_name,
-        clear_collection=True,
+        clear_collection=not incremental,
+        upsert=incremental,
+        upsert_key="metadata.source_id",
+        after=after,
     )
@@ -2,7 +2,12 @@ from pathlib import Path
 
 from zenml import pipeline
 
-from steps.generate_dataset import create_histograms, generate_summary_dataset
+from steps.generate_dataset import (
+    compute_corpus_statistics,
+    create_histograms,
+    generate_summary_dataset,
+    write_summary_dataset,
+)
 from steps.infrastructure import (
     fetch_from_mongodb,
     push_to_huggingface,
@@ -24,14 +29,23 @@ def generate_dataset(
     min_quality_score: float = 0.3,
     augmentation_loops: int = 4,
     max_workers: int = 10,
+    use_batch_api: bool = False,
+    dataset_shard_format: str | None = "arrow",
+    create_histogram_chart: bool = False,
     data_dir: Path = Path("data/"),
 ) -> None:
     documents = fetch_from_mongodb(
         collection_name=extract_collection_name, limit=fetch_limit
     )
-    create_histograms(documents)
+    compute_corpus_statistics(
+        collection_name=extract_collection_name,
+        limit=fetch_limit,
+        output_dir=data_dir / "statistics",
+    )
+    if create_histogram_chart:
+        create_histograms(documents)
 
-    dataset = generate_summary_dataset(
+    generation_kwargs = dict(
         documents=documents,
         summarization_model=summarization_agent_model_id,
         val_split_ratio=val_split_ratio,
@@ -42,7 +56,20 @@ def generate_dataset(
         max_workers=max_workers,
         mock=summarization_agent_mock,
         summarization_max_characters=summarization_max_characters,
+        use_batch_api=use_batch_api,
+        batch_dir=data_dir / "batches",
     )
-
-    push_to_huggingface(dataset, load_dataset_id)
-    save_dataset_to_disk(dataset, output_dir=data_dir / "datasets" / load_dataset_id)
+    output_dir = data_dir / "datasets" / load_dataset_id
+    if dataset_shard_format is not None:
+        # Samples are streamed to the shards as they are generated, so the
+        # dataset is never materialized in memory.
+        dataset_dir = write_summary_dataset(
+            output_dir=output_dir,
+            shard_format=dataset_shard_format,
+            **generation_kwargs,
+        )
+        push_to_huggingface(dataset_id=load_dataset_id, dataset_dir=dataset_dir)
+    else:
+        dataset = generate_summary_dataset(**generation_kwargs)
+        save_dataset_to_disk(dataset, output_dir=output_dir)
+        push_to_huggingface(dataset_id=load_dataset_id, dataset=dataset)
@@ -3,10 +3,11 @@ from .contextual_summarization import (
     SimpleSummarizationAgent,
 )
 from .quality import HeuristicQualityAgent, QualityScoreAgent
-from .summarization import SummarizationAgent
+from .summarization import SummarizationAgent, SummaryRecord
 
 __all__ = [
     "SummarizationAgent",
+    "SummaryRecord",
     "QualityScoreAgent",
     "ContextualSummarizationAgent",
     "SimpleSummarizationAgent",
@@ -1,7 +1,5 @@
 import asyncio
-import os
 
-import psutil
 from litellm import acompletion
 from loguru import logger
 from openai import AsyncOpenAI
@@ -9,6 +7,7 @@ from pydantic import BaseModel
 from tqdm.asyncio import tqdm
 
 from second_brain_offline.config import settings
+from second_brain_offline.profiling import profile, record_llm_usage
 
 
 class ContextualDocument(BaseModel):
@@ -108,47 +107,37 @@ Please give a short succinct context of maximum {characters} characters to situa
             list[str]: List of chunks with added contextual summaries
         """
 
-        process = psutil.Process(os.getpid())
-        start_mem = process.memory_info().rss
         total_chunks = len(chunks)
         logger.debug(
-            f"Starting contextual summarization for {total_chunks} chunks with {self.max_concurrent_requests} concurrent requests. "
-            f"Initial memory usage: {start_mem // (1024 * 1024)} MB"
+            f"Starting contextual summarization for {total_chunks} chunks with {self.max_concurrent_requests} concurrent requests."
         )
 
-        documents = [
-            ContextualDocument(content=content, chunk=chunk) for chunk in chunks
-        ]
-
-        summarized_documents = await self.__process_batch(
-            documents, await_time_seconds=7
-        )
-        documents_with_summaries = [
-            doc
-            for doc in summarized_documents
-            if doc.contextual_summarization is not None
-        ]
-        documents_without_summaries = [
-            doc for doc in documents if doc.contextual_summarization is None
-        ]
+        with profile("ContextualSummarizationAgent.batch", num_items=total_chunks):
+            documents = [
+                ContextualDocument(content=content, chunk=chunk) for chunk in chunks
+            ]
 
-        # Retry failed documents with increased await time
-        if documents_without_summaries:
-            logger.info(
-                f"Retrying {len(documents_without_summaries)} failed documents with increased await time..."
+            summarized_documents = await self.__process_batch(
+                documents, await_time_seconds=7
             )
-            retry_results = await self.__process_batch(
-                documents_without_summaries, await_time_seconds=20
-            )
-            documents_with_summaries += retry_results
-
-        end_mem = process.memory_info().rss
-        memory_diff = end_mem - start_mem
-        logger.debug(
-            f"Contextual summarization completed. "
-            f"Final memory usage: {end_mem // (1024 * 1024)} MB, "
-            f"Memory difference: {memory_diff // (1024 * 1024)} MB"
-        )
+            documents_with_summaries = [
+                doc
+                for doc in summarized_documents
+                if doc.contextual_summarization is not None
+            ]
+            documents_without_summaries = [
+                doc for doc in documents if doc.contextual_summarization is None
+            ]
+
+            # Retry failed documents with increased await time
+            if documents_without_summaries:
+                logger.info(
+                    f"Retrying {len(documents_without_summaries)} failed documents with increased await time..."
+                )
+                retry_results = await self.__process_batch(
+                    documents_without_summaries, await_time_seconds=20
+                )
+                documents_with_summaries += retry_results
 
         success_count = len(documents_with_summaries)
         failed_count = total_chunks - success_count
@@ -240,6 +229,7 @@ Please give a short succinct context of maximum {characters} characters to situa
                     stream=False,
                     temperature=0,
                 )
+                record_llm_usage(response)
                 await asyncio.sleep(await_time_seconds)  # Rate limiting
 
                 if not response.choices:
@@ -348,24 +338,12 @@ highlighting the most significant insights. Answer only with the succinct contex
             list[str]: List of chunks with added contextual summaries
         """
 
-        process = psutil.Process(os.getpid())
-        start_mem = process.memory_info().rss
-        logger.debug(
-            f"Starting summarizing document."
-            f"Initial memory usage: {start_mem // (1024 * 1024)} MB"
-        )
+        logger.debug("Starting summarizing document.")
 
-        document = await self.__summarize(
-            document=ContextualDocument(content=content), await_time_seconds=20
-        )
-
-        end_mem = process.memory_info().rss
-        memory_diff = end_mem - start_mem
-        logger.debug(
-            f"Summarization completed. "
-            f"Final memory usage: {end_mem // (1024 * 1024)} MB, "
-            f"Memory difference: {memory_diff // (1024 * 1024)} MB"
-        )
+        with profile("SimpleSummarizationAgent.batch", num_items=len(chunks)):
+            document = await self.__summarize(
+                document=ContextualDocument(content=content), await_time_seconds=20
+            )
 
         contextual_chunks = []
         for chunk in chunks:
@@ -411,6 +389,7 @@ highlighting the most significant insights. Answer only with the succinct contex
                     stream=False,
                     temperature=0,
                 )
+                record_llm_usage(response)
                 await asyncio.sleep(await_time_seconds)  # Rate limiting
 
                 if not response.choices:
@@ -1,8 +1,12 @@
 import asyncio
+import functools
 import json
-import os
+import re
+import sys
+import unicodedata
+from pathlib import Path
 
-import psutil
+import numpy as np
 from litellm import acompletion
 from loguru import logger
 from pydantic import BaseModel
@@ -10,6 +14,8 @@ from tqdm.asyncio import tqdm
 
 from second_brain_offline import utils
 from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.llm import BatchClient, BatchJob, BatchRequest
+from second_brain_offline.profiling import profile, record_llm_usage
 
 
 class QualityScoreResponseFormat(BaseModel):
@@ -33,6 +39,10 @@ class QualityScoreAgent:
         model_id: The ID of the language model to use for quality evaluation.
         mock: If True, returns mock quality scores instead of using the model.
         max_concurrent_requests: Maximum number of concurrent API requests.
+        batch_client: If provided, documents are scored offline through the batch
+            client instead of one chat completion per document.
+        batch_dir: Directory where the batch files and state are persisted, used to
+            resume interrupted batch jobs.
     """
 
     SYSTEM_PROMPT_TEMPLATE = """You are an expert judge tasked with evaluating the quality of a given DOCUMENT.
@@ -61,10 +71,14 @@ DOCUMENT:
         model_id: str = "gpt-4o-mini",
         mock: bool = False,
         max_concurrent_requests: int = 10,
+        batch_client: BatchClient | None = None,
+        batch_dir: Path = Path("data/batches"),
     ) -> None:
         self.model_id = model_id
         self.mock = mock
         self.max_concurrent_requests = max_concurrent_requests
+        self.batch_client = batch_client
+        self.batch_dir = batch_dir
 
     def __call__(
         self, documents: Document | list[Document]
@@ -81,6 +95,11 @@ DOCUMENT:
         is_single_document = isinstance(documents, Document)
         docs_list = [documents] if is_single_document else documents
 
+        if self.batch_client is not None and not self.mock:
+            results = self.__get_quality_score_batch_api(docs_list)
+
+            return results[0] if is_single_document else results
+
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
@@ -101,40 +120,32 @@ DOCUMENT:
         Returns:
             list[Document]: Documents with quality scores.
         """
-        process = psutil.Process(os.getpid())
-        start_mem = process.memory_info().rss
         total_docs = len(documents)
         logger.debug(
-            f"Starting quality scoring batch with {self.max_concurrent_requests} concurrent requests. "
-            f"Current process memory usage: {start_mem // (1024 * 1024)} MB"
+            f"Starting quality scoring batch with {self.max_concurrent_requests} concurrent requests."
         )
 
-        scored_documents = await self.__process_batch(documents, await_time_seconds=7)
-        documents_with_scores = [
-            doc for doc in scored_documents if doc.content_quality_score is not None
-        ]
-        documents_without_scores = [
-            doc for doc in scored_documents if doc.content_quality_score is None
-        ]
-
-        # Retry failed documents with increased await time, as most failures are due to rate limiting.
-        if documents_without_scores:
-            logger.info(
-                f"Retrying {len(documents_without_scores)} failed documents with increased await time..."
-            )
-            retry_results = await self.__process_batch(
-                documents_without_scores, await_time_seconds=20
+        with profile("QualityScoreAgent.batch", num_items=total_docs):
+            scored_documents = await self.__process_batch(
+                documents, await_time_seconds=7
             )
+            documents_with_scores = [
+                doc for doc in scored_documents if doc.content_quality_score is not None
+            ]
+            documents_without_scores = [
+                doc for doc in scored_documents if doc.content_quality_score is None
+            ]
+
+            # Retry failed documents with increased await time, as most failures are due to rate limiting.
+            if documents_without_scores:
+                logger.info(
+                    f"Retrying {len(documents_without_scores)} failed documents with increased await time..."
+                )
+                retry_results = await self.__process_batch(
+                    documents_without_scores, await_time_seconds=20
+                )
 
-            documents_with_scores += retry_results
-
-        end_mem = process.memory_info().rss
-        memory_diff = end_mem - start_mem
-        logger.debug(
-            f"Quality scoring batch completed. "
-            f"Final process memory usage: {end_mem // (1024 * 1024)} MB, "
-            f"Memory diff: {memory_diff // (1024 * 1024)} MB"
-        )
+                documents_with_scores += retry_results
 
         success_count = len(
             [doc for doc in scored_documents if hasattr(doc, "quality_score")]
@@ -189,17 +200,7 @@ DOCUMENT:
             return document.add_quality_score(score=0.5)
 
         async def process_document() -> Document:
-            input_user_prompt = self.SYSTEM_PROMPT_TEMPLATE.format(
-                document=document.content
-            )
-            try:
-                input_user_prompt = utils.clip_tokens(
-                    input_user_prompt, max_tokens=8192, model_id=self.model_id
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Failed to clip tokens for document {document.id}: {str(e)}"
-                )
+            input_user_prompt = self.__build_prompt(document)
 
             try:
                 response = await acompletion(
@@ -209,6 +210,7 @@ DOCUMENT:
                     ],
                     stream=False,
                 )
+                record_llm_usage(response)
                 await asyncio.sleep(await_time_seconds)  # Rate limiting
 
                 if not response.choices:
@@ -239,6 +241,68 @@ DOCUMENT:
 
         return await process_document()
 
+    def __get_quality_score_batch_api(
+        self, documents: list[Document]
+    ) -> list[Document]:
+        """Score documents through the batch client and merge the scores back.
+
+        Args:
+            documents: List of documents to score.
+
+        Returns:
+            list[Document]: Documents with quality scores. Documents whose request
+                failed or couldn't be parsed are returned without a score.
+        """
+
+        assert self.batch_client is not None, "Batch client is required."
+
+        if not documents:
+            return documents
+
+        requests = [
+            BatchRequest(
+                custom_id=document.id,
+                body={
+                    "model": self.model_id,
+                    "messages": [
+                        {"role": "user", "content": self.__build_prompt(document)}
+                    ],
+                },
+            )
+            for document in documents
+        ]
+        batch_job = BatchJob(
+            client=self.batch_client, work_dir=self.batch_dir, name="quality_score"
+        )
+        answers = batch_job.run(requests)
+
+        for document in documents:
+            quality_score = self._parse_model_output(answers.get(document.id))
+            if quality_score is None:
+                logger.warning(
+                    f"Failed to parse batch output for document {document.id}"
+                )
+                continue
+
+            document.add_quality_score(score=quality_score.score)
+
+        return documents
+
+    def __build_prompt(self, document: Document) -> str:
+        input_user_prompt = self.SYSTEM_PROMPT_TEMPLATE.format(
+            document=document.content
+        )
+        try:
+            input_user_prompt = utils.clip_tokens(
+                input_user_prompt, max_tokens=8192, model_id=self.model_id
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to clip tokens for document {document.id}: {str(e)}"
+            )
+
+        return input_user_prompt
+
     def _parse_model_output(
         self, answer: str | None
     ) -> QualityScoreResponseFormat | None:
@@ -254,14 +318,70 @@ DOCUMENT:
             return None
 
 
+@functools.lru_cache(maxsize=1)
+def get_letter_table() -> np.ndarray:
+    """Get a table flagging the letters and combining marks of every Unicode code
+    point, built once (in a fraction of a second) and shared by all the agents.
+    """
+
+    return np.fromiter(
+        (
+            character.isalpha() or unicodedata.category(character).startswith("M")
+            for character in map(chr, range(sys.maxunicode + 1))
+        ),
+        dtype=bool,
+        count=sys.maxunicode + 1,
+    )
+
+
 class HeuristicQualityAgent:
-    """A rule-based agent for evaluating document quality based on simple heuristics.
+    """A rule-based agent for evaluating document quality based on cheap heuristics.
+
+    The agent computes a set of features over all the documents in one vectorized
+    pass (content length, URL and markdown link density, boilerplate and error page
+    signatures, duplicate line ratio and the Latin/Thai character mix) and combines
+    them into a heuristic score. Only the documents whose score falls within the
+    uncertain band `(low_score_threshold, high_score_threshold)` are left without a
+    quality score, so they can be escalated to the LLM-based `QualityScoreAgent`.
+
+    The absence of noise isn't enough to call a document high quality, so only the
+    documents showing a positive signal (mostly prose and a substantial length) can
+    reach `high_score_threshold`. The others are capped just below it.
 
-    This agent evaluates document quality primarily by analyzing the ratio of URL content
-    to total content length, assigning low scores to documents that are primarily
-    composed of URLs.
+    Attributes:
+        min_content_length: Documents shorter than this number of characters are
+            penalized proportionally to their length.
+        low_score_threshold: Heuristic scores at or below this value are assigned.
+        high_score_threshold: Heuristic scores at or above this value are assigned.
+        stats: Statistics about the last processed batch, such as the escalation rate
+            and the detected language distribution.
     """
 
+    BOILERPLATE_PATTERN = re.compile(
+        r"\berror 404\b|\b404\W{0,3}(error|page|not found)\b|page not found|not found on this server|access denied|403 forbidden|"
+        r"enable javascript|javascript is disabled|checking your browser|captcha|"
+        r"are you a robot|accept (all )?cookies|cookie policy|sign in to continue|"
+        r"log in to continue|subscribe to continue|this page (is|isn't) available|"
+        r"something went wrong",
+        flags=re.IGNORECASE,
+    )
+    MARKDOWN_LINK_PATTERN = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+    URL_PATTERN = re.compile(r"https?://\S+")
+    # Thai doesn't end its sentences with punctuation.
+    SENTENCE_END_PATTERN = re.compile(r"[.!?:;\u0e00-\u0e7f]$")
+
+    def __init__(
+        self,
+        min_content_length: int = 500,
+        low_score_threshold: float = 0.2,
+        high_score_threshold: float = 0.9,
+    ) -> None:
+        self.min_content_length = min_content_length
+        self.low_score_threshold = low_score_threshold
+        self.high_score_threshold = high_score_threshold
+
+        self.stats: dict = {}
+
     def __call__(
         self, documents: Document | list[Document]
     ) -> Document | list[Document]:
@@ -272,36 +392,206 @@ class HeuristicQualityAgent:
 
         Returns:
             Document | list[Document]: Processed document(s) with quality scores.
+                Documents within the uncertain band are returned without a score.
         """
         is_single_document = isinstance(documents, Document)
         docs_list = [documents] if is_single_document else documents
 
-        scored_documents = [self.__score_document(document) for document in docs_list]
+        scored_documents = self.__score_documents(docs_list)
 
         return scored_documents[0] if is_single_document else scored_documents
 
-    def __score_document(self, document: Document) -> Document:
-        """Score a single document based on URL content ratio.
+    def compute_features(self, documents: list[Document]) -> dict[str, np.ndarray]:
+        """Compute the heuristic features of all the documents.
+
+        Args:
+            documents: List of documents to compute the features for.
+
+        Returns:
+            dict[str, np.ndarray]: Mapping from feature name to an array holding the
+                feature value of every document.
+        """
+
+        lengths = np.fromiter(
+            (len(doc.content) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        child_url_lengths = np.fromiter(
+            (sum(len(url) for url in doc.child_urls) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        link_lengths = np.fromiter(
+            (self.__count_link_characters(doc.content) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        boilerplate_hits = np.fromiter(
+            (len(self.BOILERPLATE_PATTERN.findall(doc.content)) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        duplicate_line_ratios = np.fromiter(
+            (self.__duplicate_line_ratio(doc.content) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        prose_lengths = np.fromiter(
+            (self.__count_prose_characters(doc.content) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+        character_counts = np.array(
+            [self.__count_letters(doc.content) for doc in documents],
+            dtype=np.float64,
+        ).reshape(len(documents), 3)
+        letters = character_counts[:, 0]
+        latin_characters = character_counts[:, 1]
+        thai_characters = character_counts[:, 2]
+
+        safe_lengths = np.maximum(lengths, 1.0)
+        safe_script_letters = np.maximum(latin_characters + thai_characters, 1.0)
+
+        return {
+            "length": lengths,
+            "url_ratio": child_url_lengths / safe_lengths,
+            "link_density": np.minimum(link_lengths / safe_lengths, 1.0),
+            "boilerplate_hits": boilerplate_hits,
+            "duplicate_line_ratio": duplicate_line_ratios,
+            "prose_ratio": prose_lengths / safe_lengths,
+            "letter_ratio": letters / safe_lengths,
+            "thai_ratio": thai_characters / safe_script_letters,
+        }
+
+    def compute_scores(self, features: dict[str, np.ndarray]) -> np.ndarray:
+        """Combine the document features into heuristic quality scores.
+
+        Args:
+            features: Features as returned by `compute_features`.
+
+        Returns:
+            np.ndarray: Heuristic quality scores between 0 and 1.
+        """
+
+        lengths = features["length"]
+        url_ratio = features["url_ratio"]
+        link_density = np.maximum(url_ratio, features["link_density"])
+
+        scores = np.ones_like(lengths)
+        scores -= np.clip(link_density, 0.0, 1.0)
+        scores -= features["duplicate_line_ratio"]
+        # Error pages are short. A long article that merely mentions "404" is fine.
+        is_error_page = (features["boilerplate_hits"] > 0) & (lengths < 2000)
+        scores -= np.where(is_error_page, 0.5, 0.0)
+        scores -= np.where(features["boilerplate_hits"] > 0, 0.1, 0.0)
+        scores *= np.minimum(lengths / self.min_content_length, 1.0)
+        scores *= np.minimum(features["letter_ratio"] / 0.4, 1.0)
+        scores = np.clip(scores, 0.0, 1.0)
+
+        # Without a positive signal, a clean document is still uncertain.
+        has_positive_signal = (features["prose_ratio"] >= 0.5) & (
+            lengths >= 2 * self.min_content_length
+        )
+        max_uncertain_score = np.nextafter(self.high_score_threshold, 0.0)
+        scores = np.where(
+            has_positive_signal, scores, np.minimum(scores, max_uncertain_score)
+        )
+
+        # Hard rules that are always confident.
+        scores = np.where(url_ratio >= 0.5, np.minimum(scores, 0.2), scores)
+        scores = np.where(url_ratio >= 0.7, 0.0, scores)
+        scores = np.where(lengths == 0, 0.0, scores)
+
+        return scores
 
-        Calculates the ratio of URL content length to total content length.
-        Documents with > 70% URL content receive a score of 0.0.
+    def __score_documents(self, documents: list[Document]) -> list[Document]:
+        """Score the documents, leaving the uncertain ones without a score.
 
         Args:
-            document: The Document object to score.
+            documents: List of Document objects to score.
 
         Returns:
-            Document: The input document with an added quality score.
+            list[Document]: The input documents, with quality scores added to the ones
+                that were confidently scored.
+        """
+
+        if not documents:
+            self.stats = {"escalation_rate": 0.0}
+
+            return documents
+
+        features = self.compute_features(documents)
+        scores = self.compute_scores(features)
+
+        is_low = scores <= self.low_score_threshold
+        is_high = scores >= self.high_score_threshold
+        for document, score, is_confident in zip(
+            documents, scores, is_low | is_high, strict=True
+        ):
+            if is_confident:
+                document.add_quality_score(score=round(float(score), 2))
+
+        letters = features["letter_ratio"] > 0
+        thai_ratio = features["thai_ratio"]
+        self.stats = {
+            "num_confident_low": int(is_low.sum()),
+            "num_confident_high": int(is_high.sum()),
+            "num_escalated": int((~is_low & ~is_high).sum()),
+            "escalation_rate": float((~is_low & ~is_high).mean()),
+            "language_en": int((letters & (thai_ratio < 0.2)).sum()),
+            "language_th": int((letters & (thai_ratio > 0.8)).sum()),
+            "language_mixed": int(
+                (letters & (thai_ratio >= 0.2) & (thai_ratio <= 0.8)).sum()
+            ),
+            "language_unknown": int((~letters).sum()),
+        }
+        logger.info(f"Heuristic quality scoring stats: {self.stats}")
+
+        return documents
+
+    def __count_link_characters(self, content: str) -> int:
+        markdown_links = sum(
+            len(match) for match in self.MARKDOWN_LINK_PATTERN.findall(content)
+        )
+        content_without_links = self.MARKDOWN_LINK_PATTERN.sub("", content)
+        raw_urls = sum(
+            len(match) for match in self.URL_PATTERN.findall(content_without_links)
+        )
+
+        return markdown_links + raw_urls
+
+    def __count_prose_characters(self, content: str) -> int:
+        """Count the characters of the lines that read like sentences."""
+
+        return sum(
+            len(line)
+            for line in map(str.strip, content.splitlines())
+            if len(line) >= 60 and self.SENTENCE_END_PATTERN.search(line)
+        )
+
+    def __count_letters(self, content: str) -> tuple[int, int, int]:
+        """Count the letters of a text in any script, with their combining marks
+        (e.g., Thai vowels), and its Latin and Thai letters.
+
+        The text is counted as an array of code points, with the letters and marks
+        looked up in a table instead of checking every character in Python.
         """
 
-        if len(document.content) == 0:
-            return document.add_quality_score(score=0.0)
+        code_points = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+        letters = get_letter_table()[code_points]
+
+        lowercase_code_points = code_points | 0x20
+        latin = (lowercase_code_points >= ord("a")) & (
+            lowercase_code_points <= ord("z")
+        )
+        thai = (code_points >= 0x0E00) & (code_points <= 0x0E7F)
 
-        url_based_content = sum(len(url) for url in document.child_urls)
-        url_content_ratio = url_based_content / len(document.content)
+        return int(letters.sum()), int(latin.sum()), int(thai.sum())
 
-        if url_content_ratio >= 0.7:
-            return document.add_quality_score(score=0.0)
-        elif url_content_ratio >= 0.5:
-            return document.add_quality_score(score=0.2)
+    def __duplicate_line_ratio(self, content: str) -> float:
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        if not lines:
+            return 0.0
 
-        return document
+        return 1.0 - len(set(lines)) / len(lines)
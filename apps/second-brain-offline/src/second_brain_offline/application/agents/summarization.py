@@ -1,12 +1,30 @@
 import asyncio
-import os
+from pathlib import Path
+from typing import Callable
 
-import psutil
 from litellm import acompletion
 from loguru import logger
+from pydantic import BaseModel
 from tqdm.asyncio import tqdm
 
 from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.llm import BatchClient, BatchJob, BatchRequest
+from second_brain_offline.profiling import profile, record_llm_usage
+from second_brain_offline.utils import AsyncRateLimiter
+
+
+class SummaryRecord(BaseModel):
+    """A generated summary, referencing its document instead of copying it.
+
+    Attributes:
+        document_id: ID of the summarized document.
+        temperature: Temperature the summary was generated with.
+        summary: The generated summary.
+    """
+
+    document_id: str
+    temperature: float
+    summary: str
 
 
 class SummarizationAgent:
@@ -21,6 +39,14 @@ class SummarizationAgent:
         model_id: The ID of the language model to use for summarization.
         mock: If True, returns mock summaries instead of using the model.
         max_concurrent_requests: Maximum number of concurrent API requests.
+        batch_client: Optional batch client used by `summarize_pairs` to summarize
+            documents offline through a batch API.
+        batch_dir: Directory where the batch files and state are persisted, used to
+            resume interrupted batch jobs.
+        requests_per_second: Maximum average number of requests per second sent by
+            `summarize_pairs`.
+        retry_delay_seconds: Time all the `summarize_pairs` workers back off after
+            a failed request.
     """
 
     SYSTEM_PROMPT_TEMPLATE = """You are a helpful assistant specialized in summarizing documents.
@@ -46,11 +72,19 @@ Return the document in markdown format regardless of the original format.
         model_id: str = "gpt-4o-mini",
         mock: bool = False,
         max_concurrent_requests: int = 10,
+        batch_client: BatchClient | None = None,
+        batch_dir: Path = Path("data/batches"),
+        requests_per_second: float = 2.0,
+        retry_delay_seconds: float = 20.0,
     ) -> None:
         self.max_characters = max_characters
         self.model_id = model_id
         self.mock = mock
         self.max_concurrent_requests = max_concurrent_requests
+        self.batch_client = batch_client
+        self.batch_dir = batch_dir
+        self.requests_per_second = requests_per_second
+        self.retry_delay_seconds = retry_delay_seconds
 
     def __call__(
         self, documents: Document | list[Document], temperature: float = 0.0
@@ -61,157 +95,191 @@ Return the document in markdown format regardless of the original format.
             documents: Single Document or list of Documents to summarize.
             temperature: Temperature for the summarization model.
         Returns:
-            Document | list[Document]: Processed document(s) with summaries.
+            Document | list[Document]: Processed document(s) with summaries. The
+                documents that failed to be summarized are left out.
         """
 
         is_single_document = isinstance(documents, Document)
         docs_list = [documents] if is_single_document else documents
 
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            results = asyncio.run(self.__summarize_batch(docs_list, temperature))
-        else:
-            results = loop.run_until_complete(
-                self.__summarize_batch(docs_list, temperature)
-            )
+        records = self.summarize_pairs(docs_list, temperatures=[temperature])
+        summaries = {record.document_id: record.summary for record in records}
+        results = [
+            document.add_summary(summaries[document.id])
+            for document in docs_list
+            if document.id in summaries
+        ]
 
         return results[0] if is_single_document else results
 
-    async def __summarize_batch(
-        self, documents: list[Document], temperature: float = 0.0
-    ) -> list[Document]:
-        """Asynchronously summarize multiple documents.
+    def summarize_pairs(
+        self,
+        documents: list[Document],
+        temperatures: list[float],
+        on_record: Callable[[SummaryRecord], None] | None = None,
+    ) -> list[SummaryRecord]:
+        """Summarize every document at every temperature through one work queue.
+
+        All the (document, temperature) pairs are scheduled into a single
+        rate-limited async queue consumed by `max_concurrent_requests` workers, so
+        the total time scales with the number of requests instead of the number of
+        loops. Instead of copies of the documents, lightweight summary records are
+        produced and, if `on_record` is set, streamed to it as soon as they
+        complete. When a batch client is set, the pairs are submitted as a single
+        offline batch job instead.
 
         Args:
             documents: List of documents to summarize.
-            temperature: Temperature for the summarization model.
+            temperatures: Temperatures to summarize each document with.
+            on_record: Optional callback receiving every successful record.
+
         Returns:
-            list[Document]: Documents with generated summaries.
+            list[SummaryRecord]: The successful summaries. Failed requests are
+                retried once and then dropped.
         """
-        process = psutil.Process(os.getpid())
-        start_mem = process.memory_info().rss
-        total_docs = len(documents)
-        logger.debug(
-            f"Starting summarization batch with {self.max_concurrent_requests} concurrent requests. "
-            f"Current process memory usage: {start_mem // (1024 * 1024)} MB"
-        )
 
-        summarized_documents = await self.__process_batch(
-            documents, temperature, await_time_seconds=7
-        )
-        documents_with_summaries = [
-            doc for doc in summarized_documents if doc.summary is not None
-        ]
-        documents_without_summaries = [doc for doc in documents if doc.summary is None]
+        if self.batch_client is not None and not self.mock:
+            records = self.__summarize_pairs_batch_api(documents, temperatures)
+            if on_record is not None:
+                for record in records:
+                    on_record(record)
+
+            return records
 
-        # Retry failed documents with increased await time
-        if documents_without_summaries:
-            logger.info(
-                f"Retrying {len(documents_without_summaries)} failed documents with increased await time..."
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(
+                self.__summarize_pairs(documents, temperatures, on_record)
             )
-            retry_results = await self.__process_batch(
-                documents_without_summaries, temperature, await_time_seconds=20
+        else:
+            return loop.run_until_complete(
+                self.__summarize_pairs(documents, temperatures, on_record)
             )
-            documents_with_summaries += retry_results
-
-        end_mem = process.memory_info().rss
-        memory_diff = end_mem - start_mem
-        logger.debug(
-            f"Summarization batch completed. "
-            f"Final process memory usage: {end_mem // (1024 * 1024)} MB, "
-            f"Memory diff: {memory_diff // (1024 * 1024)} MB"
+
+    async def __summarize_pairs(
+        self,
+        documents: list[Document],
+        temperatures: list[float],
+        on_record: Callable[[SummaryRecord], None] | None,
+        max_retries: int = 1,
+    ) -> list[SummaryRecord]:
+        queue: asyncio.Queue[tuple[Document, float, int]] = asyncio.Queue()
+        for temperature in temperatures:
+            for document in documents:
+                queue.put_nowait((document, temperature, 0))
+        total_requests = queue.qsize()
+
+        rate_limiter = AsyncRateLimiter(self.requests_per_second)
+        records: list[SummaryRecord] = []
+        progress_bar = tqdm(
+            total=total_requests, desc="Processing documents", unit="request"
         )
 
-        success_count = len(documents_with_summaries)
-        failed_count = total_docs - success_count
+        async def worker() -> None:
+            while True:
+                try:
+                    document, temperature, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                if not self.mock:
+                    await rate_limiter.acquire()
+                summary = await self.__generate_summary(document, temperature)
+                if summary is None and attempt < max_retries:
+                    # Back off every worker before retrying the failed request.
+                    rate_limiter.delay(self.retry_delay_seconds)
+                    queue.put_nowait((document, temperature, attempt + 1))
+                    continue
+
+                progress_bar.update(1)
+                if summary is None:
+                    continue
+
+                record = SummaryRecord(
+                    document_id=document.id, temperature=temperature, summary=summary
+                )
+                records.append(record)
+                if on_record is not None:
+                    on_record(record)
+
+        with profile("SummarizationAgent.summarize_pairs", num_items=total_requests):
+            await asyncio.gather(
+                *(worker() for _ in range(max(1, self.max_concurrent_requests)))
+            )
+        progress_bar.close()
+
         logger.info(
             f"Summarization completed: "
-            f"{success_count}/{total_docs} succeeded ✓ | "
-            f"{failed_count}/{total_docs} failed ✗"
+            f"{len(records)}/{total_requests} succeeded ✓ | "
+            f"{total_requests - len(records)}/{total_requests} failed ✗"
         )
 
-        return documents_with_summaries
+        return records
 
-    async def __process_batch(
-        self, documents: list[Document], temperature: float, await_time_seconds: int
-    ) -> list[Document]:
-        """Process a batch of documents with specified await time.
+    async def __generate_summary(
+        self, document: Document, temperature: float
+    ) -> str | None:
+        if self.mock:
+            return "This is a mock summary"
 
-        Args:
-            documents: List of documents to summarize.
-            temperature: Temperature for the summarization model.
-            await_time_seconds: Time to wait between requests.
-        Returns:
-            list[Document]: Processed documents with summaries.
-        """
-        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-        tasks = [
-            self.__summarize(
-                document, semaphore, temperature, await_time_seconds=await_time_seconds
+        try:
+            response = await acompletion(
+                model=self.model_id,
+                messages=self.__build_messages(document),
+                stream=False,
+                temperature=temperature,
             )
+            record_llm_usage(response)
+        except Exception as e:
+            logger.warning(f"Failed to summarize document {document.id}: {str(e)}")
+            return None
+
+        if not response.choices:
+            logger.warning(f"No summary generated for document {document.id}")
+            return None
+
+        return response.choices[0].message.content
+
+    def __summarize_pairs_batch_api(
+        self, documents: list[Document], temperatures: list[float]
+    ) -> list[SummaryRecord]:
+        assert self.batch_client is not None, "Batch client is required."
+
+        requests = [
+            BatchRequest(
+                custom_id=f"{document.id}:{loop_index}",
+                body={
+                    "model": self.model_id,
+                    "messages": self.__build_messages(document),
+                    "temperature": temperature,
+                },
+            )
+            for loop_index, temperature in enumerate(temperatures)
             for document in documents
         ]
-        results = []
-        for coro in tqdm(
-            asyncio.as_completed(tasks),
-            total=len(documents),
-            desc="Processing documents",
-            unit="doc",
-        ):
-            result = await coro
-            results.append(result)
-
-        return results
-
-    async def __summarize(
-        self,
-        document: Document,
-        semaphore: asyncio.Semaphore | None = None,
-        temperature: float = 0.0,
-        await_time_seconds: int = 2,
-    ) -> Document:
-        """Generate a summary for a single document.
-
-        Args:
-            document: The Document object to summarize.
-            semaphore: Optional semaphore for controlling concurrent requests.
-            temperature: Temperature for the summarization model.
-        Returns:
-            Document | None: Document with generated summary or None if failed.
-        """
-        if self.mock:
-            return document.add_summary("This is a mock summary")
-
-        async def process_document():
-            try:
-                response = await acompletion(
-                    model=self.model_id,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": self.SYSTEM_PROMPT_TEMPLATE.format(
-                                characters=self.max_characters, content=document.content
-                            ),
-                        },
-                    ],
-                    stream=False,
-                    temperature=temperature,
-                )
-                await asyncio.sleep(await_time_seconds)  # Rate limiting
-
-                if not response.choices:
-                    logger.warning(f"No summary generated for document {document.id}")
-                    return document
-
-                summary: str = response.choices[0].message.content
-                return document.add_summary(summary)
-            except Exception as e:
-                logger.warning(f"Failed to summarize document {document.id}: {str(e)}")
-                return document
+        batch_job = BatchJob(
+            client=self.batch_client, work_dir=self.batch_dir, name="summarization"
+        )
+        answers = batch_job.run(requests)
 
-        if semaphore:
-            async with semaphore:
-                return await process_document()
+        return [
+            SummaryRecord(
+                document_id=document.id,
+                temperature=temperature,
+                summary=answers[f"{document.id}:{loop_index}"],
+            )
+            for loop_index, temperature in enumerate(temperatures)
+            for document in documents
+            if answers.get(f"{document.id}:{loop_index}") is not None
+        ]
 
-        return await process_document()
+    def __build_messages(self, document: Document) -> list[dict]:
+        return [
+            {
+                "role": "system",
+                "content": self.SYSTEM_PROMPT_TEMPLATE.format(
+                    characters=self.max_characters, content=document.content
+                ),
+            },
+        ]
@@ -0,0 +1,92 @@
+import hashlib
+import time
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel, Field, ValidationError
+
+from .frontier import normalize_url
+
+
+class CrawlCacheEntry(BaseModel):
+    """The cached outcome of crawling a URL, with its HTTP validators.
+
+    Attributes:
+        url: The crawled URL.
+        title: Title of the crawled page.
+        properties: Metadata extracted from the crawled page.
+        markdown: Markdown content of the crawled page.
+        child_urls: Links found on the crawled page.
+        etag: Value of the ETag response header, if any.
+        last_modified: Value of the Last-Modified response header, if any.
+        fetched_at: Unix timestamp of when the page was fetched.
+    """
+
+    url: str
+    title: str = ""
+    properties: dict = Field(default_factory=dict)
+    markdown: str
+    child_urls: list[str] = Field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = Field(default_factory=time.time)
+
+    @property
+    def can_revalidate(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Build the HTTP headers of a conditional request revalidating the entry."""
+
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class CrawlCache:
+    """A persistent on-disk cache of crawled pages, keyed by normalized URL.
+
+    Every entry is stored as a separate JSON file, so the cache never has to be
+    fully loaded into memory and can be shared between runs.
+
+    Args:
+        cache_dir: Directory where the cache entries are stored.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, url: str) -> CrawlCacheEntry | None:
+        """Load the cache entry of a URL, or None if it isn't cached."""
+
+        path = self.__path(url)
+        if not path.exists():
+            return None
+
+        try:
+            return CrawlCacheEntry.model_validate_json(path.read_text(encoding="utf-8"))
+        except ValidationError:
+            logger.warning(f"Ignoring corrupted crawl cache entry for {url}")
+
+            return None
+
+    def put(self, entry: CrawlCacheEntry) -> None:
+        """Store or overwrite the cache entry of a URL."""
+
+        path = self.__path(entry.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write atomically so an interrupted run never leaves a truncated entry.
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(entry.model_dump_json(), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def __path(self, url: str) -> Path:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+        return self.cache_dir / key[:2] / f"{key}.json"
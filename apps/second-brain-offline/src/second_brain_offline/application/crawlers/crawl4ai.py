@@ -1,28 +1,71 @@
 import asyncio
-import os
+import contextvars
+import queue
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator
 
-import psutil
+import aiohttp
 from crawl4ai import AsyncWebCrawler, CacheMode
 from loguru import logger
 
 from second_brain_offline import utils
 from second_brain_offline.domain import Document, DocumentMetadata
+from second_brain_offline.profiling import profile
+
+from .cache import CrawlCache, CrawlCacheEntry
+from .frontier import CrawlFrontier, DomainScheduler, normalize_url
 
 
 class Crawl4AICrawler:
     """A crawler implementation using crawl4ai library for concurrent web crawling.
 
+    The child URLs of all the pages are pushed into a single frontier, deduplicated
+    by normalized URL, and consumed by a fixed pool of workers. Requests to the same
+    domain are throttled by per-domain concurrency and delay budgets. When a cache
+    directory is provided, crawled pages are persisted and, on later runs,
+    revalidated with conditional requests (ETag/Last-Modified) instead of being
+    re-rendered. Revalidation uses HEAD requests, so a changed page is downloaded
+    only once, by the crawler. The crawled documents can be consumed in bounded
+    chunks with `iter_chunks`.
+
     Attributes:
         max_concurrent_requests: Maximum number of concurrent HTTP requests allowed.
+        max_concurrent_requests_per_domain: Maximum number of concurrent HTTP
+            requests allowed to the same domain.
+        domain_delay_seconds: Minimum delay between two requests to the same domain.
+        cache: Persistent crawl cache, or None to always re-crawl.
+        stats: Statistics about the last crawl.
     """
 
-    def __init__(self, max_concurrent_requests: int = 10) -> None:
+    def __init__(
+        self,
+        max_concurrent_requests: int = 10,
+        max_concurrent_requests_per_domain: int = 2,
+        domain_delay_seconds: float = 0.5,
+        cache_dir: Path | None = None,
+        revalidation_timeout_seconds: float = 10.0,
+    ) -> None:
         """Initialize the crawler.
 
         Args:
             max_concurrent_requests: Maximum number of concurrent requests. Defaults to 10.
+            max_concurrent_requests_per_domain: Maximum number of concurrent requests
+                to the same domain. Defaults to 2.
+            domain_delay_seconds: Minimum delay between two requests to the same
+                domain. Defaults to 0.5.
+            cache_dir: Directory of the persistent crawl cache. Defaults to None,
+                which disables caching.
+            revalidation_timeout_seconds: Timeout of the conditional requests used to
+                revalidate cached pages. Defaults to 10.
         """
         self.max_concurrent_requests = max_concurrent_requests
+        self.max_concurrent_requests_per_domain = max_concurrent_requests_per_domain
+        self.domain_delay_seconds = domain_delay_seconds
+        self.cache = CrawlCache(cache_dir) if cache_dir is not None else None
+        self.revalidation_timeout_seconds = revalidation_timeout_seconds
+
+        self.stats: dict = {}
 
     def __call__(self, pages: list[Document]) -> list[Document]:
         """Crawl multiple documents' child URLs.
@@ -33,113 +76,272 @@ class Crawl4AICrawler:
         Returns:
             list[Document]: List of new documents created from crawled child URLs.
         """
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            return asyncio.run(self.__crawl_batch(pages))
-        else:
-            return loop.run_until_complete(self.__crawl_batch(pages))
 
-    async def __crawl_batch(self, pages: list[Document]) -> list[Document]:
-        """Asynchronously crawl all child URLs of multiple documents.
+        return [document for chunk in self.iter_chunks(pages) for document in chunk]
+
+    def iter_chunks(
+        self, pages: list[Document], chunk_size: int = 100, max_pending_chunks: int = 2
+    ) -> Iterator[list[Document]]:
+        """Crawl multiple documents' child URLs, yielding the new documents in
+        chunks as they are crawled.
+
+        The crawl runs in a background thread. Its workers wait while
+        `max_pending_chunks` chunks are waiting to be consumed, so the crawled
+        documents held in memory are bounded by the chunk size, instead of by the
+        number of crawled pages.
 
         Args:
             pages: List of documents containing child URLs to crawl.
+            chunk_size: Number of documents per chunk. Defaults to 100.
+            max_pending_chunks: Maximum number of chunks waiting to be consumed.
+                Defaults to 2.
 
-        Returns:
-            list[Document]: List of new documents created from successfully crawled URLs.
+        Yields:
+            list[Document]: Chunks of new documents created from crawled child URLs.
         """
-        process = psutil.Process(os.getpid())
-        start_mem = process.memory_info().rss
-        logger.debug(
-            f"Starting crawl batch with {self.max_concurrent_requests} concurrent requests. "
-            f"Current process memory usage: {start_mem // (1024 * 1024)} MB"
+
+        chunks: queue.Queue[list[Document] | BaseException | None] = queue.Queue(
+            maxsize=max_pending_chunks
         )
+        stopped = threading.Event()
 
-        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-        all_results = []
+        async def put_chunk(chunk: list[Document]) -> None:
+            # Wait in a thread, so the other workers keep crawling meanwhile.
+            await asyncio.to_thread(chunks.put, chunk)
 
-        async with AsyncWebCrawler(cache_mode=CacheMode.BYPASS) as crawler:
-            for page in pages:
-                tasks = [
-                    self.__crawl_url(crawler, page, url, semaphore)
-                    for url in page.child_urls
-                ]
-                results = await asyncio.gather(*tasks)
-                all_results.extend(results)
+        def crawl() -> None:
+            try:
+                asyncio.run(self.__crawl_batch(pages, chunk_size, put_chunk, stopped))
+            except BaseException as e:
+                chunks.put(e)
+            finally:
+                chunks.put(None)
 
-        end_mem = process.memory_info().rss
-        crawling_memory_diff = end_mem - start_mem
+        # Copy the context, so the crawl is profiled within the caller's blocks.
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(crawl,), name="crawler", daemon=True
+        )
+        thread.start()
+
+        try:
+            while (chunk := chunks.get()) is not None:
+                if isinstance(chunk, BaseException):
+                    raise chunk
+
+                yield chunk
+        finally:
+            # If the caller stopped early, stop the workers and unblock them.
+            stopped.set()
+            while chunk is not None:
+                chunk = chunks.get()
+            thread.join()
+
+    async def __crawl_batch(
+        self,
+        pages: list[Document],
+        chunk_size: int,
+        put_chunk: Callable[[list[Document]], Awaitable[None]],
+        stopped: threading.Event,
+    ) -> None:
+        """Asynchronously crawl all child URLs of multiple documents.
+
+        Args:
+            pages: List of documents containing child URLs to crawl.
+            chunk_size: Number of documents per chunk.
+            put_chunk: Coroutine function called with every chunk of new documents
+                created from successfully crawled URLs.
+            stopped: Event set to stop crawling new URLs.
+        """
         logger.debug(
-            f"Crawl batch completed. "
-            f"Final process memory usage: {end_mem // (1024 * 1024)} MB, "
-            f"Crawling memory diff: {crawling_memory_diff // (1024 * 1024)} MB"
+            f"Starting crawl batch with {self.max_concurrent_requests} concurrent requests."
+        )
+
+        frontier: CrawlFrontier[Document] = CrawlFrontier()
+        for page in pages:
+            for url in page.child_urls:
+                frontier.push(url, page)
+        total_count = len(frontier)
+
+        self.stats = {
+            "num_urls": total_count,
+            "num_duplicate_urls": frontier.num_duplicates,
+            "num_cache_hits": 0,
+            "num_fetched": 0,
+            "num_succeeded": 0,
+            "num_failed": 0,
+        }
+        scheduler = DomainScheduler(
+            max_concurrent_requests_per_domain=self.max_concurrent_requests_per_domain,
+            delay_seconds=self.domain_delay_seconds,
         )
+        chunk: list[Document] = []
+
+        timeout = aiohttp.ClientTimeout(total=self.revalidation_timeout_seconds)
+        with profile("Crawl4AICrawler.batch", num_items=total_count):
+            async with (
+                AsyncWebCrawler(cache_mode=CacheMode.BYPASS) as crawler,
+                aiohttp.ClientSession(timeout=timeout) as session,
+            ):
+
+                async def worker() -> None:
+                    nonlocal chunk
+
+                    while not stopped.is_set() and (item := frontier.pop()) is not None:
+                        url, page = item
+                        document = await self.__crawl_url(
+                            crawler, session, scheduler, page, url
+                        )
+                        if document is None:
+                            self.stats["num_failed"] += 1
+
+                            continue
+
+                        self.stats["num_succeeded"] += 1
+                        chunk.append(document)
+                        if len(chunk) >= chunk_size:
+                            full_chunk, chunk = chunk, []
+                            await put_chunk(full_chunk)
+
+                await asyncio.gather(
+                    *(worker() for _ in range(max(1, self.max_concurrent_requests)))
+                )
 
-        successful_results = [result for result in all_results if result is not None]
+            if chunk:
+                await put_chunk(chunk)
 
-        success_count = len(successful_results)
-        failed_count = len(all_results) - success_count
-        total_count = len(all_results)
+        success_count = self.stats["num_succeeded"]
+        failed_count = total_count - success_count
         logger.info(
             f"Crawling completed: "
             f"{success_count}/{total_count} succeeded ✓ | "
-            f"{failed_count}/{total_count} failed ✗"
+            f"{failed_count}/{total_count} failed ✗ | "
+            f"{self.stats['num_cache_hits']}/{total_count} served from cache | "
+            f"{frontier.num_duplicates} duplicate URLs skipped"
         )
 
-        return successful_results
-
     async def __crawl_url(
         self,
         crawler: AsyncWebCrawler,
+        session: aiohttp.ClientSession,
+        scheduler: DomainScheduler,
         page: Document,
         url: str,
-        semaphore: asyncio.Semaphore,
     ) -> Document | None:
         """Crawl a single URL and create a new document.
 
         Args:
             crawler: AsyncWebCrawler instance to use for crawling.
+            session: HTTP session used to revalidate cached pages.
+            scheduler: Scheduler enforcing the per-domain politeness budgets.
             page: Parent document containing the URL.
             url: URL to crawl.
-            semaphore: Semaphore for controlling concurrent requests.
 
         Returns:
             Document | None: New document if crawl was successful, None otherwise.
         """
 
-        async with semaphore:
-            result = await crawler.arun(url=url)
-            await asyncio.sleep(0.5)  # Rate limiting
+        cached_entry = self.cache.get(url) if self.cache else None
+        if cached_entry is not None and await self.__is_fresh(
+            session, scheduler, cached_entry
+        ):
+            self.stats["num_cache_hits"] += 1
 
-            if not result or not result.success:
-                logger.warning(f"Failed to crawl {url}")
-                return None
+            return self.__to_document(cached_entry, page)
 
-            if result.markdown is None:
-                logger.warning(f"Failed to crawl {url}")
+        async with scheduler.slot(url):
+            try:
+                result = await crawler.arun(url=url)
+            except Exception as e:
+                logger.warning(f"Failed to crawl {url}: {e}")
                 return None
 
-            child_links = [
-                link["href"]
-                for link in result.links["internal"] + result.links["external"]
-            ]
-            if result.metadata:
-                title = result.metadata.pop("title", "") or ""
-            else:
-                title = ""
+        self.stats["num_fetched"] += 1
+        if not result or not result.success:
+            logger.warning(f"Failed to crawl {url}")
+            return None
+
+        if result.markdown is None:
+            logger.warning(f"Failed to crawl {url}")
+            return None
 
-            document_id = utils.generate_random_hex(length=32)
+        child_links = [
+            link["href"] for link in result.links["internal"] + result.links["external"]
+        ]
+        if result.metadata:
+            title = result.metadata.pop("title", "") or ""
+        else:
+            title = ""
+
+        response_headers = {
+            key.lower(): value
+            for key, value in (getattr(result, "response_headers", None) or {}).items()
+        }
+        entry = CrawlCacheEntry(
+            url=url,
+            title=title,
+            properties=result.metadata or {},
+            markdown=str(result.markdown),
+            child_urls=child_links,
+            etag=response_headers.get("etag"),
+            last_modified=response_headers.get("last-modified"),
+        )
+        if self.cache:
+            self.cache.put(entry)
 
-            return Document(
+        return self.__to_document(entry, page)
+
+    async def __is_fresh(
+        self,
+        session: aiohttp.ClientSession,
+        scheduler: DomainScheduler,
+        entry: CrawlCacheEntry,
+    ) -> bool:
+        """Revalidate a cached page with a conditional HEAD request.
+
+        Returns:
+            bool: True if the server answered 304 Not Modified, or if it ignored
+                the conditional headers but returned the cached ETag. False
+                otherwise.
+        """
+
+        if not entry.can_revalidate:
+            return False
+
+        async with scheduler.slot(entry.url):
+            try:
+                async with session.head(
+                    entry.url,
+                    headers=entry.conditional_headers(),
+                    allow_redirects=True,
+                ) as response:
+                    if response.status == 304:
+                        return True
+
+                    return (
+                        response.status == 200
+                        and entry.etag is not None
+                        and response.headers.get("ETag") == entry.etag
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Failed to revalidate {entry.url}: {e}")
+
+                return False
+
+    def __to_document(self, entry: CrawlCacheEntry, page: Document) -> Document:
+        # Derived from the URL, so re-crawling a page always yields the same ID.
+        document_id = utils.get_source_id(normalize_url(entry.url))
+
+        return Document(
+            id=document_id,
+            metadata=DocumentMetadata(
                 id=document_id,
-                metadata=DocumentMetadata(
-                    id=document_id,
-                    url=url,
-                    title=title,
-                    properties=result.metadata or {},
-                ),
-                parent_metadata=page.metadata,
-                content=str(result.markdown),
-                child_urls=child_links,
-            )
+                url=entry.url,
+                title=entry.title,
+                properties=dict(entry.properties),
+                source_id=document_id,
+            ),
+            parent_metadata=page.metadata,
+            content=entry.markdown,
+            child_urls=list(entry.child_urls),
+        )
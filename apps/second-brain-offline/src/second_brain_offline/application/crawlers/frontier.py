@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Generic, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+T = TypeVar("T")
+
+TRACKING_QUERY_PARAMS_PREFIXES = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so different spellings of the same page map to the same key.
+
+    The scheme and host are lowercased, default ports, fragments, tracking query
+    parameters and trailing slashes are dropped and the remaining query parameters
+    are sorted.
+
+    Args:
+        url: The URL to normalize.
+
+    Returns:
+        str: The normalized URL.
+    """
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if path != "/":
+        path = path.rstrip("/")
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(TRACKING_QUERY_PARAMS_PREFIXES)
+        )
+    )
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def get_domain(url: str) -> str:
+    """Return the lowercased host of a URL, used to group politeness budgets."""
+
+    return (urlsplit(url).hostname or "").lower()
+
+
+class CrawlFrontier(Generic[T]):
+    """A global FIFO queue of URLs to crawl, deduplicated by normalized URL.
+
+    Every URL is enqueued at most once for the lifetime of the frontier, together
+    with a payload (e.g., the parent page that referenced it). The normalized URL is
+    only used as the deduplication key, so the first spelling pushed is the one
+    returned, as some servers don't serve the normalized form (e.g., when they
+    require a trailing slash).
+
+    Attributes:
+        num_duplicates: Number of pushed URLs skipped because they were already seen.
+    """
+
+    def __init__(self) -> None:
+        self.num_duplicates = 0
+
+        self.__seen: set[str] = set()
+        self.__queue: deque[tuple[str, T]] = deque()
+
+    def push(self, url: str, payload: T) -> bool:
+        """Enqueue a URL if it wasn't seen before.
+
+        Args:
+            url: The URL to enqueue.
+            payload: Data attached to the URL, returned when it is popped.
+
+        Returns:
+            bool: True if the URL was enqueued, False if it was a duplicate.
+        """
+
+        normalized_url = normalize_url(url)
+        if normalized_url in self.__seen:
+            self.num_duplicates += 1
+
+            return False
+
+        self.__seen.add(normalized_url)
+        self.__queue.append((url, payload))
+
+        return True
+
+    def pop(self) -> tuple[str, T] | None:
+        """Dequeue the next URL and its payload, or None if the frontier is empty."""
+
+        if not self.__queue:
+            return None
+
+        return self.__queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self.__queue)
+
+
+class DomainScheduler:
+    """Enforces per-domain politeness budgets for concurrent crawlers.
+
+    Requests to the same domain are limited to `max_concurrent_requests_per_domain`
+    at a time and are spaced by at least `delay_seconds`, while requests to
+    different domains don't wait on each other.
+
+    Attributes:
+        max_concurrent_requests_per_domain: Maximum in-flight requests per domain.
+        delay_seconds: Minimum delay between two requests to the same domain.
+    """
+
+    def __init__(
+        self, max_concurrent_requests_per_domain: int = 2, delay_seconds: float = 0.5
+    ) -> None:
+        self.max_concurrent_requests_per_domain = max_concurrent_requests_per_domain
+        self.delay_seconds = delay_seconds
+
+        self.__semaphores: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_concurrent_requests_per_domain)
+        )
+        self.__locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.__next_request_at: dict[str, float] = defaultdict(float)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Wait until a request to the URL's domain is allowed and hold the slot.
+
+        Args:
+            url: The URL about to be requested.
+        """
+
+        domain = get_domain(url)
+        async with self.__semaphores[domain]:
+            async with self.__locks[domain]:
+                wait_seconds = self.__next_request_at[domain] - time.monotonic()
+                if wait_seconds > 0:
+                    await asyncio.sleep(wait_seconds)
+                self.__next_request_at[domain] = time.monotonic() + self.delay_seconds
+
+            yield
@@ -1,3 +1,4 @@
 from .generators import SummarizationDatasetGenerator
+from .statistics import CorpusStatistics
 
-__all__ = ["SummarizationDatasetGenerator"]
+__all__ = ["CorpusStatistics", "SummarizationDatasetGenerator"]
@@ -1,11 +1,16 @@
-import copy
-from typing import Callable
+from pathlib import Path
+from typing import Any, Callable
 
 from loguru import logger
 
-from second_brain_offline.application.agents import SummarizationAgent
-from second_brain_offline.domain import Document, InstructDataset
-from second_brain_offline.domain.dataset import InstructDatasetSample
+from second_brain_offline.application.agents import SummarizationAgent, SummaryRecord
+from second_brain_offline.domain import (
+    Document,
+    InstructDataset,
+    InstructDatasetWriter,
+)
+from second_brain_offline.domain.dataset import InstructDatasetSample, ShardFormat
+from second_brain_offline.infrastructure.llm import BatchClient
 
 
 class SummarizationDatasetGenerator:
@@ -13,7 +18,7 @@ class SummarizationDatasetGenerator:
 
     This class takes a list of documents and generates summaries using a specified
     language model. The resulting dataset can be split into training, validation,
-    and test sets.
+    and test sets, either in memory or while streaming the samples to sharded files.
 
     Args:
         summarization_model: Name/ID of the model to use for summarization.
@@ -26,6 +31,9 @@ class SummarizationDatasetGenerator:
         min_quality_score: Minimum content quality score for document filtering.
         max_summary_length_factor: Maximum factor to multiply summarization_max_characters for filtering.
         augmentation_loops: Number of loops for summarization.
+        batch_client: If provided, all the summarization loops are submitted as a
+            single offline batch job instead of one chat completion per request.
+        batch_dir: Directory where the batch files and state are persisted.
     """
 
     def __init__(
@@ -40,6 +48,8 @@ class SummarizationDatasetGenerator:
         min_quality_score: float = 0.3,
         max_summary_length_factor: float = 2,
         augmentation_loops: int = 4,
+        batch_client: BatchClient | None = None,
+        batch_dir: Path = Path("data/batches"),
     ) -> None:
         self.summarization_model = summarization_model
         self.summarization_max_characters = summarization_max_characters
@@ -51,15 +61,16 @@ class SummarizationDatasetGenerator:
         self.min_quality_score = min_quality_score
         self.max_summary_length_factor = max_summary_length_factor
         self.augmentation_loops = augmentation_loops
+        self.batch_client = batch_client
+        self.batch_dir = batch_dir
 
         self.pregeneration_filters: list[Callable[[Document], bool]] = [
             lambda document: len(document.content) > self.min_document_length,
             lambda document: document.content_quality_score is None
             or document.content_quality_score >= self.min_quality_score,
         ]
-        self.postgeneration_filters: list[Callable[[Document], bool]] = [
-            lambda document: document.summary is not None
-            and len(document.summary)
+        self.postgeneration_filters: list[Callable[[SummaryRecord], bool]] = [
+            lambda record: len(record.summary)
             < int(self.summarization_max_characters * self.max_summary_length_factor),
         ]
 
@@ -67,7 +78,9 @@ class SummarizationDatasetGenerator:
         """Generates an instruction dataset from the documents.
 
         Filters, summarizes documents and converts them into instruction-answer pairs.
-        Warns if input document count is less than recommended minimum of 10.
+        Samples are split by hashing their instruction, like in `write`, so all the
+        summaries of a document land in the same split. Warns if input document
+        count is less than recommended minimum of 10.
 
         Args:
             documents: List of Document objects to be processed into the dataset.
@@ -85,30 +98,71 @@ class SummarizationDatasetGenerator:
                 "Less than 10 documents to summarize. For accurate behavior we recommend having at least 10 documents."
             )
 
-        filtered_summarized_documents = self.__summarize_documents(documents)
-        instruct_dataset_samples = [
-            self.__to_instruct_dataset_sample(summarized_document)
-            for summarized_document in filtered_summarized_documents
-            if summarized_document
-        ]
+        instruct_dataset_samples: list[InstructDatasetSample] = []
+        self.__summarize_documents(documents, on_sample=instruct_dataset_samples.append)
         logger.info(f"Num instruct dataset samples: {len(instruct_dataset_samples)}")
 
-        return InstructDataset.from_samples(
+        return InstructDataset.from_sample_stream(
             samples=instruct_dataset_samples,
             val_split_ratio=self.val_split_ratio,
             test_split_ratio=self.test_split_ratio,
             seed=42,
         )
 
-    def __summarize_documents(self, documents: list[Document]) -> list[Document]:
+    def write(
+        self,
+        documents: list[Document],
+        output_dir: Path,
+        shard_format: ShardFormat = "arrow",
+    ) -> dict:
+        """Generates the dataset while streaming its samples to sharded files.
+
+        Every sample is written as soon as its summary is generated and assigned to
+        a split by hashing its instruction, so the dataset is never held in memory
+        and all the summaries of a document land in the same split.
+
+        Args:
+            documents: List of Document objects to be processed into the dataset.
+            output_dir: Directory where the shards and their manifest are written.
+                They can be loaded back with `load_instruct_dataset_dict`.
+            shard_format: Format of the shards. Defaults to "arrow".
+
+        Returns:
+            dict: The manifest of the written dataset.
+        """
+
+        writer = InstructDatasetWriter(
+            output_dir=output_dir,
+            val_split_ratio=self.val_split_ratio,
+            test_split_ratio=self.test_split_ratio,
+            shard_format=shard_format,
+            seed=42,
+        )
+        try:
+            self.__summarize_documents(documents, on_sample=writer.append)
+        finally:
+            manifest = writer.close()
+
+        return manifest
+
+    def __summarize_documents(
+        self,
+        documents: list[Document],
+        on_sample: Callable[[InstructDatasetSample], Any],
+    ) -> int:
         """Summarizes the filtered documents using a summarization agent.
 
+        Every summary passing the post-generation filters is turned into a sample
+        and passed to `on_sample` as soon as it is generated. Samples reference the
+        original document content, so no copies of the documents are made.
+
         Args:
             documents: List of documents to summarize
+            on_sample: Callback receiving every sample built from the summaries
+                that pass both pre and post-generation filters
 
         Returns:
-            list[Document]: List of documents with generated summaries that pass
-                both pre and post-generation filters
+            int: Number of samples passed to `on_sample`
         """
 
         logger.info(f"Num documents before pregeneration filtering: {len(documents)}")
@@ -118,33 +172,52 @@ class SummarizationDatasetGenerator:
         logger.info(
             f"Num documents after pregeneration filtering: {len(filtered_documents)}"
         )
-        summarized_documents: list[Document] = self.__augmented_summarization_loop(
-            filtered_documents, loops=self.augmentation_loops
-        )
-        logger.info(
-            f"Num documents before postgeneration filtering: {len(summarized_documents)}"
-        )
-        filtered_summarized_documents = self.filter_documents(
-            self.postgeneration_filters, summarized_documents
-        )
-        logger.info(
-            f"Num documents after postgeneration filtering: {len(filtered_summarized_documents)}"
+
+        documents_by_id = {document.id: document for document in filtered_documents}
+        num_records = 0
+        num_samples = 0
+
+        def on_record(record: SummaryRecord) -> None:
+            nonlocal num_records, num_samples
+            num_records += 1
+
+            if all(
+                record_filter(record) for record_filter in self.postgeneration_filters
+            ):
+                num_samples += 1
+                on_sample(
+                    self.__to_instruct_dataset_sample(
+                        documents_by_id[record.document_id], record
+                    )
+                )
+
+        self.__augmented_summarization_loop(
+            filtered_documents, loops=self.augmentation_loops, on_record=on_record
         )
+        logger.info(f"Num summaries before postgeneration filtering: {num_records}")
+        logger.info(f"Num summaries after postgeneration filtering: {num_samples}")
 
-        return filtered_summarized_documents
+        return num_samples
 
     def __augmented_summarization_loop(
-        self, documents: list[Document], loops: int = 3
-    ) -> list[Document]:
-        """Performs multiple summarization passes with increasing temperature.
+        self,
+        documents: list[Document],
+        loops: int = 3,
+        on_record: Callable[[SummaryRecord], None] | None = None,
+    ) -> list[SummaryRecord]:
+        """Summarizes every document at multiple, increasing temperatures.
+
+        All the (document, temperature) pairs are processed by a single work queue
+        (or a single batch job, when a batch client is set).
 
         Args:
             documents: List of documents to summarize.
-            loops: Number of summarization iterations with different temperatures.
+            loops: Number of temperatures each document is summarized with.
+            on_record: Optional callback receiving every summary as it completes.
 
         Returns:
-            List of documents with generated summaries, including multiple versions
-            of each document summarized with different temperatures.
+            List of summary records, including multiple summaries of each document
+            generated with different temperatures.
         """
 
         summarization_agent = SummarizationAgent(
@@ -152,33 +225,26 @@ class SummarizationDatasetGenerator:
             model_id=self.summarization_model,
             max_concurrent_requests=self.max_workers,
             mock=self.mock,
+            batch_client=self.batch_client,
+            batch_dir=self.batch_dir,
+        )
+        temperatures = [i * 0.5 / loops for i in range(loops)]  # 0.0 to 0.5
+        logger.info(
+            f"Summarizing {len(documents)} documents with temperatures {temperatures}"
         )
-        augmented_documents = []
-        for i in range(loops):
-            temperature = i * 0.5 / loops  # 0.0 to 0.5
-            logger.info(
-                f"Loop {i + 1} of {loops} - Summarizing documents with temperature {temperature}"
-            )
-
-            copied_documents = copy.deepcopy(documents)
-            summarized_documents = summarization_agent(
-                copied_documents, temperature=temperature
-            )
-            valid_summarized_documents = [
-                doc for doc in summarized_documents if doc.summary is not None
-            ]
-            augmented_documents.extend(valid_summarized_documents)
 
-        return augmented_documents
+        return summarization_agent.summarize_pairs(
+            documents, temperatures=temperatures, on_record=on_record
+        )
 
     def filter_documents(
-        self, filters: list[Callable[[Document], bool]], documents: list[Document]
-    ) -> list[Document]:
+        self, filters: list[Callable[[Any], bool]], documents: list[Any]
+    ) -> list[Any]:
         """Filters documents using provided filter functions.
 
         Args:
-            filters: List of filter functions that take a Document and return bool.
-            documents: List of documents to filter.
+            filters: List of filter functions that take an item and return bool.
+            documents: List of documents (or summary records) to filter.
 
         Returns:
             List of documents that pass all filter functions.
@@ -191,23 +257,21 @@ class SummarizationDatasetGenerator:
 
         return documents
 
-    def __to_instruct_dataset_sample(self, document: Document) -> InstructDatasetSample:
-        """Converts a summarized document to an instruction dataset sample.
+    def __to_instruct_dataset_sample(
+        self, document: Document, record: SummaryRecord
+    ) -> InstructDatasetSample:
+        """Converts a summary record to an instruction dataset sample.
 
         Args:
-            document: A Document object containing both content and summary.
+            document: The summarized Document object.
+            record: The summary generated for the document.
 
         Returns:
             InstructDatasetSample with document content as instruction and
             summary as answer.
-
-        Raises:
-            AssertionError: If the document's summary is None.
         """
 
-        assert document.summary is not None, "Document summary is None"
-
         return InstructDatasetSample(
             instruction=document.content,
-            answer=document.summary,
+            answer=record.summary,
         )
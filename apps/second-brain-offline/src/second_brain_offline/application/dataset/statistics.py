@@ -0,0 +1,331 @@
+import hashlib
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from second_brain_offline import utils
+from second_brain_offline.application.deduplication import MinHashDeduplicator
+from second_brain_offline.domain import Document
+
+QUANTILES = (0.0, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 1.0)
+QUALITY_SCORE_BINS = np.linspace(0.0, 1.0, 21)
+
+DOCUMENT_STATISTICS_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("url", pa.string()),
+        ("source", pa.string()),
+        ("num_characters", pa.int64()),
+        ("num_tokens", pa.int64()),
+        ("quality_score", pa.float32()),
+        ("content_hash", pa.uint64()),
+        ("is_duplicate_content", pa.bool_()),
+        ("is_duplicate_url", pa.bool_()),
+    ]
+)
+
+
+class CorpusStatistics:
+    """Computes data-quality statistics over a corpus of documents in one pass.
+
+    Documents are consumed in batches, so any iterable (e.g., a cursor over a
+    MongoDB collection) can be profiled without loading the whole corpus in memory.
+    Per batch, only the columns needed for the statistics are kept as numpy arrays
+    and, optionally, streamed to a Parquet file with one row per document. The
+    aggregates (length and token quantiles, quality score histogram, duplicate
+    ratios and per-source counts) are computed with vectorized numpy operations
+    once the corpus is consumed.
+
+    Exact duplicates are detected with a 64-bit hash of the content and of the
+    URL. If a `MinHashDeduplicator` is given, near-duplicates are also counted:
+    only the MinHash signature of every document is kept while streaming, and the
+    signatures are clustered once the corpus is consumed.
+
+    Attributes:
+        batch_size: Number of documents processed per batch.
+        tokenizer_model_id: Model whose tokenizer counts the tokens. If None, token
+            counts are skipped.
+        deduplicator: Deduplicator used to find near-duplicates. If None,
+            near-duplicates are not counted.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 10_000,
+        tokenizer_model_id: str | None = "gpt-4o-mini",
+        deduplicator: MinHashDeduplicator | None = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.tokenizer_model_id = tokenizer_model_id
+        self.deduplicator = deduplicator
+
+        self.__num_characters: list[np.ndarray] = []
+        self.__num_tokens: list[np.ndarray] = []
+        self.__quality_scores: list[np.ndarray] = []
+        self.__is_duplicate_content: list[np.ndarray] = []
+        self.__is_duplicate_url: list[np.ndarray] = []
+        self.__signatures: list[np.ndarray] = []
+        self.__source_counts: Counter[str] = Counter()
+        self.__seen_content_hashes: set[int] = set()
+        self.__seen_urls: set[str] = set()
+
+    def compute(
+        self, documents: Iterable[Document], parquet_path: Path | None = None
+    ) -> dict:
+        """Compute the statistics of a corpus.
+
+        Args:
+            documents: The documents to profile.
+            parquet_path: Optional path of a Parquet file where the per-document
+                statistics are written.
+
+        Returns:
+            dict: The corpus-level statistics.
+        """
+
+        writer = None
+        if parquet_path is not None:
+            parquet_path = Path(parquet_path)
+            parquet_path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(parquet_path, DOCUMENT_STATISTICS_SCHEMA)
+
+        try:
+            for batch in self.__batched(documents):
+                table = self.update(batch)
+                if writer is not None:
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        statistics = self.summary()
+        logger.info(
+            f"Computed the statistics of {statistics['num_documents']} documents."
+        )
+
+        return statistics
+
+    def update(self, documents: list[Document]) -> pa.Table:
+        """Add a batch of documents to the statistics.
+
+        Args:
+            documents: The batch of documents.
+
+        Returns:
+            pa.Table: The per-document statistics of the batch.
+        """
+
+        contents = [document.content for document in documents]
+        urls = [document.metadata.url for document in documents]
+        sources = [self.get_source(url) for url in urls]
+
+        num_characters = np.fromiter(
+            (len(content) for content in contents), dtype=np.int64, count=len(contents)
+        )
+        num_tokens = self.__count_tokens(contents)
+        quality_scores = np.fromiter(
+            (
+                np.nan
+                if document.content_quality_score is None
+                else document.content_quality_score
+                for document in documents
+            ),
+            dtype=np.float32,
+            count=len(documents),
+        )
+        content_hashes = np.fromiter(
+            (self.hash_content(content) for content in contents),
+            dtype=np.uint64,
+            count=len(contents),
+        )
+        is_duplicate_content = self.__mark_seen(
+            content_hashes.tolist(), self.__seen_content_hashes
+        )
+        is_duplicate_url = self.__mark_seen(urls, self.__seen_urls)
+        if self.deduplicator is not None:
+            # Hashes are below 2^31, so 32 bits halve the memory of the signatures.
+            self.__signatures.append(
+                np.stack(
+                    [self.deduplicator.signature(content) for content in contents]
+                ).astype(np.uint32)
+            )
+
+        self.__num_characters.append(num_characters)
+        self.__num_tokens.append(num_tokens)
+        self.__quality_scores.append(quality_scores)
+        self.__is_duplicate_content.append(is_duplicate_content)
+        self.__is_duplicate_url.append(is_duplicate_url)
+        self.__source_counts.update(sources)
+
+        return pa.Table.from_arrays(
+            [
+                pa.array([document.id for document in documents], pa.string()),
+                pa.array(urls, pa.string()),
+                pa.array(sources, pa.string()),
+                pa.array(num_characters),
+                pa.array(num_tokens, mask=num_tokens < 0),
+                pa.array(quality_scores, mask=np.isnan(quality_scores)),
+                pa.array(content_hashes),
+                pa.array(is_duplicate_content),
+                pa.array(is_duplicate_url),
+            ],
+            schema=DOCUMENT_STATISTICS_SCHEMA,
+        )
+
+    def summary(self) -> dict:
+        """Aggregate the statistics of the documents added so far.
+
+        Returns:
+            dict: The corpus-level statistics.
+        """
+
+        num_characters = self.__concatenate(self.__num_characters, np.int64)
+        num_tokens = self.__concatenate(self.__num_tokens, np.int64)
+        quality_scores = self.__concatenate(self.__quality_scores, np.float32)
+        is_duplicate_content = self.__concatenate(self.__is_duplicate_content, bool)
+        is_duplicate_url = self.__concatenate(self.__is_duplicate_url, bool)
+
+        num_documents = len(num_characters)
+        scored_quality_scores = quality_scores[~np.isnan(quality_scores)]
+        quality_score_counts, _ = np.histogram(
+            np.clip(scored_quality_scores, 0.0, 1.0), bins=QUALITY_SCORE_BINS
+        )
+
+        duplicates = {
+            "num_duplicate_content": int(is_duplicate_content.sum()),
+            "duplicate_content_ratio": self.__mean(is_duplicate_content),
+            "num_duplicate_urls": int(is_duplicate_url.sum()),
+            "duplicate_url_ratio": self.__mean(is_duplicate_url),
+        }
+        if self.deduplicator is not None:
+            duplicates.update(self.__summarize_near_duplicates(num_documents))
+
+        return {
+            "num_documents": num_documents,
+            "num_characters": {
+                "total": int(num_characters.sum()),
+                "mean": self.__mean(num_characters),
+                "quantiles": self.__quantiles(num_characters),
+            },
+            "num_tokens": {
+                "total": int(num_tokens.sum()),
+                "mean": self.__mean(num_tokens),
+                "quantiles": self.__quantiles(num_tokens),
+            }
+            if num_tokens.size > 0 and (num_tokens >= 0).all()
+            else None,
+            "quality_score": {
+                "num_scored": int(scored_quality_scores.size),
+                "mean": self.__mean(scored_quality_scores),
+                "quantiles": self.__quantiles(scored_quality_scores),
+                "histogram": {
+                    f"{low:.2f}-{high:.2f}": int(count)
+                    for low, high, count in zip(
+                        QUALITY_SCORE_BINS[:-1],
+                        QUALITY_SCORE_BINS[1:],
+                        quality_score_counts,
+                    )
+                },
+            },
+            "duplicates": duplicates,
+            "source_counts": dict(self.__source_counts.most_common()),
+        }
+
+    @staticmethod
+    def get_source(url: str) -> str:
+        """Get the source of a document as the domain of its URL."""
+
+        netloc = urlsplit(url).netloc.lower()
+
+        return netloc.removeprefix("www.") or "unknown"
+
+    @staticmethod
+    def hash_content(content: str) -> int:
+        """Hash the content of a document, ignoring surrounding whitespace."""
+
+        digest = hashlib.blake2b(
+            content.strip().encode("utf-8"), digest_size=8
+        ).digest()
+
+        return int.from_bytes(digest, "little")
+
+    def __summarize_near_duplicates(self, num_documents: int) -> dict:
+        if self.__signatures:
+            clusters = self.deduplicator.cluster_signatures(
+                np.concatenate(self.__signatures)
+            )
+        else:
+            clusters = []
+        duplicate_clusters = [cluster for cluster in clusters if len(cluster) > 1]
+        # Every cluster keeps one document, like when deduplicating.
+        num_near_duplicates = sum(len(cluster) - 1 for cluster in duplicate_clusters)
+
+        return {
+            "num_near_duplicates": num_near_duplicates,
+            "near_duplicate_ratio": round(num_near_duplicates / num_documents, 4)
+            if num_documents > 0
+            else None,
+            "num_near_duplicate_clusters": len(duplicate_clusters),
+        }
+
+    def __batched(self, documents: Iterable[Document]) -> Iterator[list[Document]]:
+        iterator = iter(documents)
+        while batch := list(islice(iterator, self.batch_size)):
+            yield batch
+
+    def __count_tokens(self, contents: list[str]) -> np.ndarray:
+        if self.tokenizer_model_id is None:
+            return np.full(len(contents), -1, dtype=np.int64)
+
+        encoding = utils.get_encoding(self.tokenizer_model_id)
+        tokens = encoding.encode_ordinary_batch(contents)
+
+        return np.fromiter(
+            (len(document_tokens) for document_tokens in tokens),
+            dtype=np.int64,
+            count=len(tokens),
+        )
+
+    @staticmethod
+    def __mark_seen(keys: list, seen: set) -> np.ndarray:
+        is_duplicate = np.zeros(len(keys), dtype=bool)
+        for index, key in enumerate(keys):
+            if key in seen:
+                is_duplicate[index] = True
+            else:
+                seen.add(key)
+
+        return is_duplicate
+
+    @staticmethod
+    def __concatenate(arrays: list[np.ndarray], dtype: type) -> np.ndarray:
+        if not arrays:
+            return np.array([], dtype=dtype)
+
+        return np.concatenate(arrays)
+
+    @staticmethod
+    def __mean(values: np.ndarray) -> float | None:
+        if values.size == 0:
+            return None
+
+        return round(float(values.mean()), 4)
+
+    @staticmethod
+    def __quantiles(values: np.ndarray) -> dict[str, float] | None:
+        if values.size == 0:
+            return None
+
+        quantiles = np.quantile(values, QUANTILES)
+
+        return {
+            f"p{round(q * 100)}": round(float(value), 4)
+            for q, value in zip(QUANTILES, quantiles)
+        }
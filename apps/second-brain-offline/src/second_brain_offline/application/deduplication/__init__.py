@@ -0,0 +1,3 @@
+from .minhash import MinHashDeduplicator
+
+__all__ = ["MinHashDeduplicator"]
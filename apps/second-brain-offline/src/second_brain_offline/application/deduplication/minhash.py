@@ -0,0 +1,222 @@
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from loguru import logger
+
+from second_brain_offline.domain import Document
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class MinHashDeduplicator:
+    """Finds and removes near-duplicate documents using MinHash and LSH banding.
+
+    Every document is turned into a set of word shingles, summarized as a MinHash
+    signature. Signatures are split into bands and hashed into buckets, so only the
+    documents sharing at least one bucket are compared, which avoids the quadratic
+    all-pairs comparison. Candidates whose estimated Jaccard similarity is above the
+    threshold are clustered, and only the best representative of every cluster is
+    kept: the one with the highest quality score, then the longest content.
+
+    Attributes:
+        threshold: Minimum estimated Jaccard similarity to consider two documents
+            near-duplicates.
+        num_perm: Number of permutations (hash functions) of the MinHash signature.
+        num_bands: Number of LSH bands. Must divide `num_perm`.
+        shingle_size: Number of words per shingle.
+        seed: Seed used to generate the hash functions.
+        chunk_size: Number of shingles hashed at once, which bounds the memory used
+            to compute the signature of long documents.
+        stats: Statistics about the last deduplication run.
+    """
+
+    WORD_PATTERN = re.compile(r"\w+")
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        num_bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 42,
+        chunk_size: int = 4096,
+    ) -> None:
+        assert num_perm % num_bands == 0, "num_bands must divide num_perm"
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.num_bands = num_bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+        rng = np.random.default_rng(seed)
+        self.__a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.__b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self.stats: dict = {}
+
+    def __call__(self, documents: list[Document]) -> list[Document]:
+        """Remove the near-duplicates from a list of documents.
+
+        Args:
+            documents: List of documents to deduplicate.
+
+        Returns:
+            list[Document]: The cluster representatives, in their original order.
+        """
+
+        clusters = self.find_clusters(documents)
+
+        keep = set()
+        for cluster in clusters:
+            best_index = max(cluster, key=lambda index: self.__rank(documents[index]))
+            keep.add(best_index)
+
+        deduplicated_documents = [
+            document for index, document in enumerate(documents) if index in keep
+        ]
+
+        self.stats = {
+            "len_documents_before_deduplication": len(documents),
+            "len_documents_after_deduplication": len(deduplicated_documents),
+            "len_near_duplicates_removed": len(documents) - len(deduplicated_documents),
+            "len_duplicate_clusters": sum(
+                1 for cluster in clusters if len(cluster) > 1
+            ),
+        }
+        logger.info(f"Near-duplicate detection stats: {self.stats}")
+
+        return deduplicated_documents
+
+    def find_clusters(self, documents: list[Document]) -> list[list[int]]:
+        """Group the documents into clusters of near-duplicates.
+
+        Args:
+            documents: List of documents to cluster.
+
+        Returns:
+            list[list[int]]: Clusters of document indices. Documents without any
+                near-duplicate, and documents without any word, form a cluster of
+                their own.
+        """
+
+        if not documents:
+            return []
+
+        signatures = np.stack(
+            [self.signature(document.content) for document in documents]
+        )
+
+        return self.cluster_signatures(signatures)
+
+    def cluster_signatures(self, signatures: np.ndarray) -> list[list[int]]:
+        """Group MinHash signatures into clusters of near-duplicates.
+
+        Useful when the signatures are computed while streaming the documents, so
+        only the signatures, not the documents, are kept in memory.
+
+        Args:
+            signatures: Array of shape (num_documents, num_perm), as computed by
+                `signature`. It may be downcast to 32 bits, as hashes are below
+                2^31.
+
+        Returns:
+            list[list[int]]: Clusters of row indices. Documents without any
+                near-duplicate, and documents without any word, form a cluster of
+                their own.
+        """
+
+        if len(signatures) == 0:
+            return []
+
+        # Hashes are reduced modulo the prime, so only documents without any
+        # shingle have this signature. They would all share the same buckets.
+        is_empty = np.all(signatures == MERSENNE_PRIME, axis=1)
+
+        parents = list(range(len(signatures)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+
+            return index
+
+        rows_per_band = self.num_perm // self.num_bands
+        checked_pairs = set()
+        for band in range(self.num_bands):
+            band_signatures = signatures[
+                :, band * rows_per_band : (band + 1) * rows_per_band
+            ]
+            buckets: dict[bytes, list[int]] = defaultdict(list)
+            for index, band_signature in enumerate(band_signatures):
+                if not is_empty[index]:
+                    buckets[band_signature.tobytes()].append(index)
+
+            # Similarity isn't transitive, so every pair of a bucket is compared,
+            # except the ones already in the same cluster.
+            for bucket in buckets.values():
+                for position, index in enumerate(bucket):
+                    for other_index in bucket[position + 1 :]:
+                        pair = (index, other_index)
+                        if pair in checked_pairs or find(index) == find(other_index):
+                            continue
+                        checked_pairs.add(pair)
+
+                        similarity = np.mean(
+                            signatures[index] == signatures[other_index]
+                        )
+                        if similarity >= self.threshold:
+                            parents[find(other_index)] = find(index)
+
+        clusters: dict[int, list[int]] = defaultdict(list)
+        for index in range(len(signatures)):
+            clusters[find(index)].append(index)
+
+        return list(clusters.values())
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: The text to compute the signature for.
+
+        Returns:
+            np.ndarray: Array of `num_perm` unsigned integers.
+        """
+
+        shingle_hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self.__shingles(text)),
+            dtype=np.uint64,
+        )
+
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(shingle_hashes), self.chunk_size):
+            chunk = shingle_hashes[start : start + self.chunk_size]
+            # (a * h + b) mod p fits into 64 bits as a, b < 2^31 and h < 2^32.
+            permuted_hashes = (np.outer(chunk, self.__a) + self.__b) % MERSENNE_PRIME
+            np.minimum(signature, permuted_hashes.min(axis=0), out=signature)
+
+        return signature
+
+    def __shingles(self, text: str) -> set[str]:
+        words = self.WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def __rank(self, document: Document) -> tuple[float, int]:
+        quality_score = (
+            document.content_quality_score
+            if document.content_quality_score is not None
+            else -1.0
+        )
+
+        return quality_score, len(document.content)
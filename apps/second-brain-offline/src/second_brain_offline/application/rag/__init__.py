@@ -1,4 +1,9 @@
-from .embeddings import EmbeddingModelType, get_embedding_model
+from .embeddings import (
+    EmbeddingModelType,
+    EmbeddingTransform,
+    EmbeddingTransformMethod,
+    get_embedding_model,
+)
 from .retrievers import RetrieverType, get_retriever
 from .splitters import SummarizationType, get_splitter
 
@@ -6,6 +11,8 @@ __all__ = [
     "get_retriever",
     "get_splitter",
     "EmbeddingModelType",
+    "EmbeddingTransform",
+    "EmbeddingTransformMethod",
     "get_embedding_model",
     "RetrieverType",
     "SummarizationType",
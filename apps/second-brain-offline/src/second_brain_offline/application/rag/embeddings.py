@@ -1,10 +1,15 @@
 from typing import Literal, Union
 
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_openai import OpenAIEmbeddings
+from pydantic import BaseModel
 
 EmbeddingModelType = Literal["openai", "huggingface"]
 EmbeddingsModel = Union[OpenAIEmbeddings, HuggingFaceEmbeddings]
+EmbeddingTransformMethod = Literal["none", "matryoshka", "pca"]
+EmbeddingDType = Literal["float32", "float16"]
 
 
 def get_embedding_model(
@@ -72,3 +77,144 @@ def get_huggingface_embedding_model(
         model_kwargs={"device": device, "trust_remote_code": True},
         encode_kwargs={"normalize_embeddings": False},
     )
+
+
+class EmbeddingTransform(BaseModel):
+    """A post-embedding transform reducing the size of the stored vectors.
+
+    The transform is stored next to the vector index, so the exact same transform
+    can be applied to the queries at retrieval time.
+
+    Attributes:
+        method: "matryoshka" keeps the first `output_dim` dimensions, which is
+            suited to models trained with Matryoshka representation learning
+            (e.g., text-embedding-3). "pca" projects the embeddings on the
+            `output_dim` principal components fitted on a sample of embeddings.
+            "none" keeps the full embeddings.
+        output_dim: Dimension of the transformed embeddings. Required by
+            "matryoshka" and "pca".
+        dtype: Precision of the transformed embeddings. "float16" rounds the
+            values to half precision.
+        normalize: Whether to L2-normalize the transformed embeddings, which
+            keeps dot-product and cosine scores consistent after truncation.
+        mean: The mean embedding of the PCA sample.
+        components: The PCA components, of shape (output_dim, input_dim).
+    """
+
+    method: EmbeddingTransformMethod = "none"
+    output_dim: int | None = None
+    dtype: EmbeddingDType = "float32"
+    normalize: bool = True
+    mean: list[float] | None = None
+    components: list[list[float]] | None = None
+
+    @property
+    def is_identity(self) -> bool:
+        return self.method == "none" and self.dtype == "float32"
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.method != "pca" or self.components is not None
+
+    def get_output_dim(self, input_dim: int) -> int:
+        if self.method == "none":
+            return input_dim
+
+        assert self.output_dim is not None, f"'{self.method}' requires an output_dim."
+
+        return self.output_dim
+
+    def fit(self, embeddings: np.ndarray) -> "EmbeddingTransform":
+        """Fit the PCA components on a sample of embeddings. No-op for other methods.
+
+        Args:
+            embeddings: Sample of embeddings, of shape (num_samples, input_dim).
+
+        Returns:
+            EmbeddingTransform: The fitted transform.
+
+        Raises:
+            ValueError: If the sample has fewer embeddings than `output_dim`.
+        """
+
+        if self.method != "pca":
+            return self
+
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        output_dim = self.get_output_dim(embeddings.shape[1])
+        if embeddings.shape[0] < output_dim:
+            raise ValueError(
+                f"PCA to {output_dim} dimensions requires at least {output_dim} "
+                f"sample embeddings, got {embeddings.shape[0]}."
+            )
+
+        mean = embeddings.mean(axis=0)
+        _, _, components = np.linalg.svd(embeddings - mean, full_matrices=False)
+
+        self.mean = mean.tolist()
+        self.components = components[:output_dim].tolist()
+
+        return self
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Apply the transform to a batch of embeddings.
+
+        Args:
+            embeddings: Embeddings of shape (num_embeddings, input_dim).
+
+        Returns:
+            np.ndarray: Transformed embeddings of shape (num_embeddings, output_dim).
+        """
+
+        assert self.is_fitted, "The PCA transform must be fitted before use."
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.method == "matryoshka":
+            embeddings = embeddings[:, : self.get_output_dim(embeddings.shape[1])]
+        elif self.method == "pca":
+            embeddings = (embeddings - np.asarray(self.mean, dtype=np.float32)) @ (
+                np.asarray(self.components, dtype=np.float32).T
+            )
+
+        if self.normalize and self.method != "none":
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        return embeddings.astype(self.dtype)
+
+
+class TransformedEmbeddings(Embeddings):
+    """Wraps an embedding model to apply an `EmbeddingTransform` to its outputs.
+
+    Args:
+        embedding_model: The wrapped embedding model.
+        transform: The transform applied to both documents and queries.
+    """
+
+    def __init__(self, embedding_model: Embeddings, transform: EmbeddingTransform):
+        self.embedding_model = embedding_model
+        self.transform = transform
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        embeddings = self.embedding_model.embed_documents(texts)
+
+        return self.transform.transform(np.asarray(embeddings)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        embedding = self.embedding_model.embed_query(text)
+
+        return self.transform.transform(np.asarray([embedding]))[0].tolist()
+
+
+def apply_embedding_transform(
+    embedding_model: EmbeddingsModel, transform: EmbeddingTransform | None
+) -> Embeddings:
+    """Wrap an embedding model with a transform, unless the transform is a no-op."""
+
+    if transform is None or transform.is_identity:
+        return embedding_model
+
+    return TransformedEmbeddings(embedding_model, transform)
@@ -1,5 +1,6 @@
 from typing import Literal, Union
 
+from langchain_core.embeddings import Embeddings
 from langchain_mongodb import MongoDBAtlasVectorSearch
 from langchain_mongodb.retrievers import (
     MongoDBAtlasHybridSearchRetriever,
@@ -9,7 +10,12 @@ from loguru import logger
 
 from second_brain_offline.config import settings
 
-from .embeddings import EmbeddingModelType, EmbeddingsModel, get_embedding_model
+from .embeddings import (
+    EmbeddingModelType,
+    EmbeddingTransform,
+    apply_embedding_transform,
+    get_embedding_model,
+)
 from .splitters import get_splitter
 
 # Add these type definitions at the top of the file
@@ -25,14 +31,16 @@ def get_retriever(
     retriever_type: RetrieverType = "contextual",
     k: int = 3,
     device: str = "cpu",
+    embedding_transform: EmbeddingTransform | None = None,
 ) -> RetrieverModel:
     logger.info(
         f"Getting '{retriever_type}' retriever for '{embedding_model_type}' - '{embedding_model_id}' on '{device}' "
         f"with {k} top results"
     )
 
-    embedding_model = get_embedding_model(
-        embedding_model_id, embedding_model_type, device
+    embedding_model = apply_embedding_transform(
+        get_embedding_model(embedding_model_id, embedding_model_type, device),
+        embedding_transform,
     )
 
     if retriever_type == "contextual":
@@ -44,7 +52,7 @@ def get_retriever(
 
 
 def get_hybrid_search_retriever(
-    embedding_model: EmbeddingsModel, k: int
+    embedding_model: Embeddings, k: int
 ) -> MongoDBAtlasHybridSearchRetriever:
     vectorstore = MongoDBAtlasVectorSearch.from_connection_string(
         connection_string=settings.MONGODB_URI,
@@ -67,7 +75,7 @@ def get_hybrid_search_retriever(
 
 
 def get_parent_document_retriever(
-    embedding_model: EmbeddingsModel, k: int = 3
+    embedding_model: Embeddings, k: int = 3
 ) -> MongoDBAtlasParentDocumentRetriever:
     retriever = MongoDBAtlasParentDocumentRetriever.from_connection_string(
         connection_string=settings.MONGODB_URI,
@@ -1,3 +1,4 @@
+import functools
 from typing import Callable, Literal, Union
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -7,6 +8,7 @@ from second_brain_offline.application.agents import (
     ContextualSummarizationAgent,
     SimpleSummarizationAgent,
 )
+from second_brain_offline.utils import count_tokens
 
 # Add type definitions at the top of the file
 SummarizationType = Literal["contextual", "simple", "none"]
@@ -35,25 +37,34 @@ def get_splitter(
     )
 
     if summarization_type == "none":
-        return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            encoding_name="cl100k_base",
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-        )
+        return __get_token_splitter(chunk_size, chunk_overlap)
 
     if summarization_type == "contextual":
         handler = ContextualSummarizationAgent(**kwargs)
     elif summarization_type == "simple":
         handler = SimpleSummarizationAgent(**kwargs)
 
-    return HandlerRecursiveCharacterTextSplitter.from_tiktoken_encoder(
-        encoding_name="cl100k_base",
+    return HandlerRecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
+        length_function=count_tokens,
         handler=handler,
     )
 
 
+@functools.lru_cache(maxsize=None)
+def __get_token_splitter(
+    chunk_size: int, chunk_overlap: int
+) -> RecursiveCharacterTextSplitter:
+    # Stateless, so a single instance is shared by all the callers. Chunks are
+    # measured with the shared memoized token counter instead of a new encoder.
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=count_tokens,
+    )
+
+
 class HandlerRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
     """A text splitter that can apply custom handling to chunks after splitting.
 
@@ -64,11 +64,27 @@ class Settings(BaseSettings):
         default=None, description="Secret key for Notion API authentication."
     )
 
+    # --- Obfuscation Configuration ---
+    OBFUSCATION_KEY: str = Field(
+        default="",
+        description="Secret key of the hash replacing the IDs of the saved documents. "
+        "If empty, the obfuscated IDs are still deterministic but can be linked back "
+        "to the original ones.",
+    )
+
     # --- OpenAI API Configuration ---
     OPENAI_API_KEY: str = Field(
         description="API key for OpenAI service authentication.",
     )
 
+    # --- Profiling Configuration ---
+    PROFILING_TRACES_DIR: str | None = Field(
+        default=None,
+        description="Directory where the Chrome trace of every profiled step is written. "
+        "If not provided, no traces are written and the profiles are only logged as "
+        "step metadata.",
+    )
+
     @field_validator("OPENAI_API_KEY")
     @classmethod
     def check_not_empty(cls, value: str, info) -> str:
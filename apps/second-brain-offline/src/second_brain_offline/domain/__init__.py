@@ -1,4 +1,16 @@
-from .dataset import InstructDataset, InstructDatasetSample
+from .dataset import (
+    InstructDataset,
+    InstructDatasetSample,
+    InstructDatasetWriter,
+    load_instruct_dataset_dict,
+)
 from .document import Document, DocumentMetadata
 
-__all__ = ["Document", "DocumentMetadata", "InstructDataset", "InstructDatasetSample"]
+__all__ = [
+    "Document",
+    "DocumentMetadata",
+    "InstructDataset",
+    "InstructDatasetSample",
+    "InstructDatasetWriter",
+    "load_instruct_dataset_dict",
+]
@@ -1,17 +1,55 @@
+import hashlib
 import json
 import random
 from pathlib import Path
+from typing import IO, Iterable, Literal
 
-from datasets import Dataset, DatasetDict
+import pyarrow as pa
+from datasets import Dataset, DatasetDict, concatenate_datasets
 from loguru import logger
 from pydantic import BaseModel
 
+SplitName = Literal["train", "validation", "test"]
+ShardFormat = Literal["jsonl", "arrow"]
+
+SPLIT_NAMES: tuple[SplitName, ...] = ("train", "validation", "test")
+ARROW_SCHEMA = pa.schema([("instruction", pa.string()), ("answer", pa.string())])
+
 
 class InstructDatasetSample(BaseModel):
     instruction: str
     answer: str
 
 
+def hash_split(
+    key: str, val_split_ratio: float, test_split_ratio: float, seed: int = 42
+) -> SplitName:
+    """Deterministically assign a key to a split by hashing it.
+
+    The same key always lands in the same split, so samples can be split while
+    streaming, without shuffling them in memory.
+
+    Args:
+        key: The key to hash. Samples sharing a key always share a split.
+        val_split_ratio: Ratio of keys assigned to validation (between 0 and 1).
+        test_split_ratio: Ratio of keys assigned to testing (between 0 and 1).
+        seed: Seed mixed into the hash to draw a different split.
+
+    Returns:
+        SplitName: The split the key belongs to.
+    """
+
+    digest = hashlib.sha256(f"{seed}:{key}".encode("utf-8")).digest()
+    position = int.from_bytes(digest[:8], "big") / 2**64
+
+    if position < 1 - val_split_ratio - test_split_ratio:
+        return "train"
+    if position < 1 - test_split_ratio:
+        return "validation"
+
+    return "test"
+
+
 class InstructDataset(BaseModel):
     train: list[InstructDatasetSample]
     validation: list[InstructDatasetSample]
@@ -58,6 +96,67 @@ class InstructDataset(BaseModel):
             int(len(shuffled_samples) * (1 - test_split_ratio)) :
         ]
 
+        return cls.__from_splits(
+            train_samples,
+            val_samples,
+            test_samples,
+            val_split_ratio=val_split_ratio,
+            test_split_ratio=test_split_ratio,
+            seed=seed,
+        )
+
+    @classmethod
+    def from_sample_stream(
+        cls,
+        samples: Iterable[InstructDatasetSample],
+        val_split_ratio: float,
+        test_split_ratio: float,
+        seed: int = 42,
+    ) -> "InstructDataset":
+        """Creates an InstructDataset by hash-splitting a stream of samples.
+
+        Samples are split by hashing their instruction, so all the samples
+        generated from the same document land in the same split and no shuffling
+        is needed.
+
+        Args:
+            samples: Iterable of samples to split
+            val_split_ratio: Ratio of samples to use for validation (between 0 and 1)
+            test_split_ratio: Ratio of samples to use for testing (between 0 and 1)
+            seed: Seed mixed into the split hash.
+
+        Returns:
+            InstructDataset with hash-split samples
+        """
+
+        splits: dict[SplitName, list[InstructDatasetSample]] = {
+            split_name: [] for split_name in SPLIT_NAMES
+        }
+        for sample in samples:
+            split_name = hash_split(
+                sample.instruction, val_split_ratio, test_split_ratio, seed=seed
+            )
+            splits[split_name].append(sample)
+
+        return cls.__from_splits(
+            splits["train"],
+            splits["validation"],
+            splits["test"],
+            val_split_ratio=val_split_ratio,
+            test_split_ratio=test_split_ratio,
+            seed=seed,
+        )
+
+    @classmethod
+    def __from_splits(
+        cls,
+        train_samples: list[InstructDatasetSample],
+        val_samples: list[InstructDatasetSample],
+        test_samples: list[InstructDatasetSample],
+        val_split_ratio: float,
+        test_split_ratio: float,
+        seed: int | None,
+    ) -> "InstructDataset":
         logger.info(
             "Created dataset with the following splits: "
             f"- Train samples: {len(train_samples)}, "
@@ -69,7 +168,7 @@ class InstructDataset(BaseModel):
         assert len(val_samples) > 0, "Validation split must have at least one sample"
         assert len(test_samples) > 0, "Test split must have at least one sample"
 
-        return InstructDataset(
+        return cls(
             train=train_samples,
             validation=val_samples,
             test=test_samples,
@@ -78,24 +177,56 @@ class InstructDataset(BaseModel):
             seed=seed,
         )
 
-    def to_huggingface(self) -> DatasetDict:
-        train = Dataset.from_list([sample.model_dump() for sample in self.train])
-        validation = Dataset.from_list(
-            [sample.model_dump() for sample in self.validation]
+    def get_split(self, split_name: SplitName) -> list[InstructDatasetSample]:
+        return getattr(self, split_name)
+
+    def to_arrow(self, split_name: SplitName) -> pa.Table:
+        """Convert a split to a columnar Arrow table, without intermediate dicts."""
+
+        samples = self.get_split(split_name)
+
+        return pa.table(
+            {
+                "instruction": [sample.instruction for sample in samples],
+                "answer": [sample.answer for sample in samples],
+            },
+            schema=ARROW_SCHEMA,
         )
-        test = Dataset.from_list([sample.model_dump() for sample in self.test])
 
-        return DatasetDict({"train": train, "validation": validation, "test": test})
+    def to_huggingface(self) -> DatasetDict:
+        return DatasetDict(
+            {
+                split_name: Dataset(self.to_arrow(split_name))
+                for split_name in SPLIT_NAMES
+            }
+        )
 
-    def write(self, output_dir: Path) -> Path:
-        """Writes the dataset splits to JSON files in the specified directory.
+    def write(self, output_dir: Path, shard_format: ShardFormat | None = None) -> Path:
+        """Writes the dataset splits to the specified directory.
 
         Args:
             output_dir: Directory path where the dataset files will be saved
+            shard_format: If None, each split is written as a single indented JSON
+                file. Otherwise, splits are written as sharded JSONL or Arrow files
+                with a manifest, which can be loaded back with
+                `load_instruct_dataset_dict`.
 
         Returns:
             Path to the output directory containing the saved files
         """
+
+        if shard_format is not None:
+            with InstructDatasetWriter(
+                output_dir=output_dir,
+                val_split_ratio=self.val_split_ratio,
+                test_split_ratio=self.test_split_ratio,
+                shard_format=shard_format,
+            ) as writer:
+                for split_name in SPLIT_NAMES:
+                    writer.extend(self.get_split(split_name), split_name=split_name)
+
+            return output_dir
+
         train = [sample.model_dump() for sample in self.train]
         validation = [sample.model_dump() for sample in self.validation]
         test = [sample.model_dump() for sample in self.test]
@@ -114,3 +245,228 @@ class InstructDataset(BaseModel):
         logger.info(f"Wrote dataset splits to {output_dir}")
 
         return output_dir
+
+
+class InstructDatasetWriter:
+    """Incrementally writes instruct dataset samples to sharded JSONL or Arrow files.
+
+    Samples are appended one at a time and assigned to a split by hashing their
+    instruction, unless a split is given explicitly. Arrow shards are written in
+    the Arrow streaming format, so they can be memory-mapped by Hugging Face
+    `datasets` without copying. A `manifest.json` listing the shards of each split
+    is written when the writer is closed.
+
+    Args:
+        output_dir: Directory where the shards and the manifest are written.
+        val_split_ratio: Ratio of samples assigned to validation.
+        test_split_ratio: Ratio of samples assigned to testing.
+        shard_format: Format of the shards. Defaults to "arrow".
+        shard_size: Maximum number of samples per shard. Defaults to 100_000.
+        batch_size: Number of samples buffered before writing an Arrow record batch.
+            Defaults to 1000.
+        seed: Seed mixed into the split hash. Defaults to 42.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+
+    def __init__(
+        self,
+        output_dir: Path,
+        val_split_ratio: float,
+        test_split_ratio: float,
+        shard_format: ShardFormat = "arrow",
+        shard_size: int = 100_000,
+        batch_size: int = 1000,
+        seed: int = 42,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.val_split_ratio = val_split_ratio
+        self.test_split_ratio = test_split_ratio
+        self.shard_format = shard_format
+        self.shard_size = shard_size
+        self.batch_size = batch_size
+        self.seed = seed
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.__shards: dict[SplitName, list[dict]] = {
+            split_name: [] for split_name in SPLIT_NAMES
+        }
+        self.__buffers: dict[SplitName, list[InstructDatasetSample]] = {
+            split_name: [] for split_name in SPLIT_NAMES
+        }
+        self.__open_files: dict[SplitName, IO | pa.RecordBatchStreamWriter] = {}
+        self.__open_sinks: dict[SplitName, IO] = {}
+
+    def __enter__(self) -> "InstructDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def append(
+        self, sample: InstructDatasetSample, split_name: SplitName | None = None
+    ) -> SplitName:
+        """Append a sample to its split.
+
+        Args:
+            sample: The sample to write.
+            split_name: Optional explicit split. Defaults to hash-based splitting.
+
+        Returns:
+            SplitName: The split the sample was written to.
+        """
+
+        if split_name is None:
+            split_name = hash_split(
+                sample.instruction,
+                self.val_split_ratio,
+                self.test_split_ratio,
+                seed=self.seed,
+            )
+
+        self.__buffers[split_name].append(sample)
+        if len(self.__buffers[split_name]) >= self.batch_size:
+            self.__flush(split_name)
+
+        return split_name
+
+    def extend(
+        self,
+        samples: Iterable[InstructDatasetSample],
+        split_name: SplitName | None = None,
+    ) -> None:
+        for sample in samples:
+            self.append(sample, split_name=split_name)
+
+    def close(self) -> dict:
+        """Flush the buffered samples, close the shards and write the manifest.
+
+        Returns:
+            dict: The manifest.
+        """
+
+        for split_name in SPLIT_NAMES:
+            self.__flush(split_name)
+            self.__close_shard(split_name)
+
+        manifest = {
+            "format": self.shard_format,
+            "val_split_ratio": self.val_split_ratio,
+            "test_split_ratio": self.test_split_ratio,
+            "seed": self.seed,
+            "splits": {
+                split_name: {
+                    "num_samples": sum(
+                        shard["num_samples"] for shard in self.__shards[split_name]
+                    ),
+                    "shards": self.__shards[split_name],
+                }
+                for split_name in SPLIT_NAMES
+            },
+        }
+        (self.output_dir / self.MANIFEST_FILE_NAME).write_text(
+            json.dumps(manifest, indent=4), encoding="utf-8"
+        )
+
+        logger.info(
+            f"Wrote dataset shards to {self.output_dir}: "
+            + ", ".join(
+                f"{split_name}={split['num_samples']}"
+                for split_name, split in manifest["splits"].items()
+            )
+        )
+
+        return manifest
+
+    def __flush(self, split_name: SplitName) -> None:
+        samples = self.__buffers[split_name]
+        while samples:
+            if split_name not in self.__open_files:
+                self.__open_shard(split_name)
+
+            current_shard = self.__shards[split_name][-1]
+            num_samples = min(
+                len(samples), self.shard_size - current_shard["num_samples"]
+            )
+            batch, samples = samples[:num_samples], samples[num_samples:]
+
+            writer = self.__open_files[split_name]
+            if self.shard_format == "arrow":
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(
+                                [sample.instruction for sample in batch], pa.string()
+                            ),
+                            pa.array([sample.answer for sample in batch], pa.string()),
+                        ],
+                        schema=ARROW_SCHEMA,
+                    )
+                )
+            else:
+                writer.writelines(sample.model_dump_json() + "\n" for sample in batch)
+
+            current_shard["num_samples"] += len(batch)
+            if current_shard["num_samples"] >= self.shard_size:
+                self.__close_shard(split_name)
+
+        self.__buffers[split_name] = []
+
+    def __open_shard(self, split_name: SplitName) -> None:
+        shard_index = len(self.__shards[split_name])
+        file_name = f"{split_name}-{shard_index:05d}.{self.shard_format}"
+        shard_path = self.output_dir / file_name
+
+        if self.shard_format == "arrow":
+            sink = pa.OSFile(str(shard_path), "wb")
+            self.__open_sinks[split_name] = sink
+            self.__open_files[split_name] = pa.ipc.new_stream(sink, ARROW_SCHEMA)
+        else:
+            self.__open_files[split_name] = open(shard_path, "w", encoding="utf-8")
+
+        self.__shards[split_name].append({"path": file_name, "num_samples": 0})
+
+    def __close_shard(self, split_name: SplitName) -> None:
+        writer = self.__open_files.pop(split_name, None)
+        if writer is not None:
+            writer.close()
+
+        sink = self.__open_sinks.pop(split_name, None)
+        if sink is not None:
+            sink.close()
+
+
+def load_instruct_dataset_dict(dataset_dir: Path) -> DatasetDict:
+    """Load sharded splits written by `InstructDatasetWriter` as a `DatasetDict`.
+
+    Arrow shards are memory-mapped instead of being loaded into memory.
+
+    Args:
+        dataset_dir: Directory containing the shards and the manifest.
+
+    Returns:
+        DatasetDict: The train, validation and test splits.
+    """
+
+    manifest = json.loads(
+        (Path(dataset_dir) / InstructDatasetWriter.MANIFEST_FILE_NAME).read_text(
+            encoding="utf-8"
+        )
+    )
+
+    splits = {}
+    for split_name, split in manifest["splits"].items():
+        shard_paths = [
+            str(Path(dataset_dir) / shard["path"]) for shard in split["shards"]
+        ]
+        if not shard_paths:
+            splits[split_name] = Dataset(ARROW_SCHEMA.empty_table())
+        elif manifest["format"] == "arrow":
+            splits[split_name] = concatenate_datasets(
+                [Dataset.from_file(shard_path) for shard_path in shard_paths]
+            )
+        else:
+            splits[split_name] = Dataset.from_json(shard_paths)
+
+    return DatasetDict(splits)
@@ -11,16 +11,29 @@ class DocumentMetadata(BaseModel):
     url: str
     title: str
     properties: dict
+    # Stable across syncs and obfuscation, so a re-synced document replaces its
+    # previous version. See `utils.get_source_id`.
+    source_id: str | None = None
 
-    def obfuscate(self) -> "DocumentMetadata":
+    def obfuscate(self, key: str = "") -> "DocumentMetadata":
         """Create an obfuscated version of this metadata by modifying in place.
 
+        The ID is replaced by a keyed hash, so the same document is always
+        obfuscated the same way. The source ID is derived from the original ID
+        first, if not set yet.
+
+        Args:
+            key: Secret key of the obfuscation hash.
+
         Returns:
             DocumentMetadata: Self, with ID and URL obfuscated.
         """
 
+        if self.source_id is None:
+            self.source_id = utils.get_source_id(self.id)
+
         original_id = self.id.replace("-", "")
-        fake_id = utils.generate_random_hex(len(original_id))
+        fake_id = utils.obfuscate_id(original_id, key=key)
 
         self.id = fake_id
         self.url = self.url.replace(original_id, fake_id)
@@ -67,7 +80,11 @@ class Document(BaseModel):
         return self
 
     def write(
-        self, output_dir: Path, obfuscate: bool = False, also_save_as_txt: bool = False
+        self,
+        output_dir: Path,
+        obfuscate: bool = False,
+        also_save_as_txt: bool = False,
+        obfuscation_key: str = "",
     ) -> None:
         """Write document data to file, optionally obfuscating sensitive information.
 
@@ -75,12 +92,13 @@ class Document(BaseModel):
             output_dir: Directory path where the files should be written.
             obfuscate: If True, sensitive information will be obfuscated.
             also_save_as_txt: If True, content will also be saved as a text file.
+            obfuscation_key: Secret key of the obfuscation hash.
         """
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
         if obfuscate:
-            self.obfuscate()
+            self.obfuscate(key=obfuscation_key)
 
         json_page = self.model_dump()
 
@@ -98,16 +116,19 @@ class Document(BaseModel):
             with open(txt_path, "w", encoding="utf-8") as f:
                 f.write(self.content)
 
-    def obfuscate(self) -> "Document":
+    def obfuscate(self, key: str = "") -> "Document":
         """Create an obfuscated version of this document by modifying in place.
 
+        Args:
+            key: Secret key of the obfuscation hash.
+
         Returns:
             Document: Self, with obfuscated metadata and parent_metadata.
         """
 
-        self.metadata = self.metadata.obfuscate()
+        self.metadata = self.metadata.obfuscate(key=key)
         self.parent_metadata = (
-            self.parent_metadata.obfuscate() if self.parent_metadata else None
+            self.parent_metadata.obfuscate(key=key) if self.parent_metadata else None
         )
         self.id = self.metadata.id
 
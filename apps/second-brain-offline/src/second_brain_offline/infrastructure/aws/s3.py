@@ -1,23 +1,66 @@
+import hashlib
+import io
 import os
 import tempfile
 import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Callable, Union
 
 import boto3
 import botocore
 import botocore.config
+import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
 from loguru import logger
+from pydantic import BaseModel, Field
 
 from second_brain_offline.config import settings
 
+MB = 1024 * 1024
+
+
+class S3SyncManifestEntry(BaseModel):
+    """A synced file, identified by its content hash.
+
+    Attributes:
+        sha256: Hex digest of the file's content.
+        size: Size of the file in bytes.
+        shard: Key of the packed shard holding the file, or None if the file is
+            stored as its own object.
+    """
+
+    sha256: str
+    size: int
+    shard: str | None = None
+
+
+class S3SyncManifest(BaseModel):
+    """Index of a folder synced to S3, mapping relative POSIX paths to files."""
+
+    files: dict[str, S3SyncManifestEntry] = Field(default_factory=dict)
+
+
+class S3SyncStats(BaseModel):
+    transferred_files: int = 0
+    transferred_bytes: int = 0
+    skipped_files: int = 0
+    deleted_files: int = 0
+
 
 class S3Client:
+    MANIFEST_FILE_NAME = "manifest.json"
+
     def __init__(
         self,
         bucket_name: str,
         no_sign_request: bool = False,
         region: str = settings.AWS_DEFAULT_REGION,
+        endpoint_url: str | None = None,
+        max_workers: int = 10,
+        multipart_threshold_mb: int = 16,
+        multipart_chunksize_mb: int = 16,
     ) -> None:
         """Initialize S3 client and bucket name.
 
@@ -27,21 +70,45 @@ class S3Client:
                 If False will use the AWS credentials set by the user. Defaults to False.
             region (str, optional): AWS region. Defaults to AWS_DEFAULT_REGION or AWS_REGION env var,
                 or 'us-east-1'.
+            endpoint_url (str, optional): Custom S3 endpoint, e.g., a local S3-compatible server
+                such as MinIO or LocalStack. Defaults to AWS.
+            max_workers (int, optional): Number of objects transferred concurrently when syncing.
+                Defaults to 10.
+            multipart_threshold_mb (int, optional): Files larger than this are transferred in
+                concurrent multipart chunks. Defaults to 16.
+            multipart_chunksize_mb (int, optional): Size of a multipart chunk. Defaults to 16.
         """
 
         self.region = region
         self.bucket_name = bucket_name
         self.no_sign_request = no_sign_request
+        self.max_workers = max_workers
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold_mb * MB,
+            multipart_chunksize=multipart_chunksize_mb * MB,
+            max_concurrency=max_workers,
+        )
+        client_config = botocore.config.Config(
+            max_pool_connections=max(10, max_workers * 2)
+        )
         if self.no_sign_request:
             # Use unsigned mode for public buckets
             self.s3_client = boto3.client(
                 "s3",
                 region_name=self.region,
-                config=botocore.config.Config(signature_version=botocore.UNSIGNED),
+                endpoint_url=endpoint_url,
+                config=client_config.merge(
+                    botocore.config.Config(signature_version=botocore.UNSIGNED)
+                ),
             )
         else:
             # Default authenticated S3 client
-            self.s3_client = boto3.client("s3", region_name=self.region)
+            self.s3_client = boto3.client(
+                "s3",
+                region_name=self.region,
+                endpoint_url=endpoint_url,
+                config=client_config,
+            )
 
     def upload_folder(self, local_path: Union[str, Path], s3_prefix: str = "") -> None:
         """Upload a local folder as a zip file to S3.
@@ -88,6 +155,340 @@ class S3Client:
         # Clean up temporary zip file
         os.unlink(temp_zip.name)
 
+    def sync_folder_to_s3(
+        self,
+        local_path: Union[str, Path],
+        s3_prefix: str = "",
+        num_packed_shards: int | None = None,
+        packed_file_max_size_kb: int = 256,
+        delete: bool = True,
+    ) -> S3SyncStats:
+        """Incrementally upload a local folder to S3, transferring only changed files.
+
+        Files are stored under `{s3_prefix}/{folder name}/files/` next to a
+        `manifest.json` holding their content hashes. Only the files whose hash
+        differs from the remote manifest are uploaded, concurrently and in
+        multipart chunks for large files. The manifest is written last, so readers
+        never see a manifest referencing missing objects.
+
+        Args:
+            local_path (Union[str, Path]): Path to the local folder
+            s3_prefix (str, optional): Optional prefix (folder path) in S3 bucket. Defaults to "".
+            num_packed_shards (int, optional): If set, small files are packed into this
+                many zip shards, assigned by path hash, instead of one object per
+                file. Only the shards containing changed files are re-uploaded.
+            packed_file_max_size_kb (int, optional): Files up to this size are packed
+                when `num_packed_shards` is set. Defaults to 256.
+            delete (bool, optional): Delete remote objects no longer referenced by the
+                manifest. Defaults to True.
+
+        Returns:
+            S3SyncStats: Statistics of the sync.
+
+        Raises:
+            FileNotFoundError: If the local path does not exist
+            NotADirectoryError: If the local path is not a directory
+        """
+
+        self.__create_bucket_if_doesnt_exist()
+
+        local_path = Path(local_path)
+        if not local_path.exists():
+            raise FileNotFoundError(f"Local path does not exist: {local_path}")
+
+        if not local_path.is_dir():
+            raise NotADirectoryError(f"Local path is not a directory: {local_path}")
+
+        root = f"{s3_prefix.rstrip('/')}/{local_path.name}".lstrip("/")
+        remote_manifest = self.__load_manifest(root) or S3SyncManifest()
+        local_manifest = self.__build_local_manifest(local_path)
+
+        packed_files: dict[str, list[str]] = defaultdict(list)
+        if num_packed_shards:
+            shard_members: dict[int, list[str]] = defaultdict(list)
+            for relative_path, entry in local_manifest.files.items():
+                if entry.size <= packed_file_max_size_kb * 1024:
+                    shard_index = self.__get_shard_index(
+                        relative_path, num_packed_shards
+                    )
+                    shard_members[shard_index].append(relative_path)
+
+            for shard_index, relative_paths in shard_members.items():
+                # Shards are content-addressed: their key only changes when one of
+                # their members does.
+                shard_hash = hashlib.sha256(
+                    "".join(
+                        f"{relative_path}:{local_manifest.files[relative_path].sha256}\n"
+                        for relative_path in sorted(relative_paths)
+                    ).encode("utf-8")
+                ).hexdigest()
+                shard_key = (
+                    f"{root}/shards/shard-{shard_index:05d}-{shard_hash[:16]}.zip"
+                )
+                for relative_path in relative_paths:
+                    local_manifest.files[relative_path].shard = shard_key
+                packed_files[shard_key] = relative_paths
+
+        remote_object_keys = {
+            self.__get_object_key(root, relative_path, entry)
+            for relative_path, entry in remote_manifest.files.items()
+        }
+        stats = S3SyncStats()
+        tasks: list[Callable[[], None]] = []
+        for relative_path, entry in local_manifest.files.items():
+            remote_entry = remote_manifest.files.get(relative_path)
+            if entry.shard is not None:
+                if entry.shard in remote_object_keys:
+                    stats.skipped_files += 1
+                continue
+
+            if (
+                remote_entry is not None
+                and remote_entry.shard is None
+                and remote_entry.sha256 == entry.sha256
+            ):
+                stats.skipped_files += 1
+                continue
+
+            tasks.append(
+                self.__upload_file_task(
+                    local_path / relative_path,
+                    self.get_file_key(root, relative_path),
+                )
+            )
+            stats.transferred_files += 1
+            stats.transferred_bytes += entry.size
+
+        for shard_key, relative_paths in packed_files.items():
+            if shard_key in remote_object_keys:
+                continue
+
+            tasks.append(
+                self.__upload_shard_task(local_path, relative_paths, shard_key)
+            )
+            stats.transferred_files += len(relative_paths)
+            stats.transferred_bytes += sum(
+                local_manifest.files[relative_path].size
+                for relative_path in relative_paths
+            )
+
+        logger.info(
+            f"Syncing {local_path} to s3://{self.bucket_name}/{root}: "
+            f"{stats.transferred_files} changed files in {len(tasks)} objects, "
+            f"{stats.skipped_files} unchanged files."
+        )
+        self.__run_tasks(tasks)
+
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=f"{root}/{self.MANIFEST_FILE_NAME}",
+            Body=local_manifest.model_dump_json().encode("utf-8"),
+        )
+
+        if delete:
+            local_object_keys = {
+                self.__get_object_key(root, relative_path, entry)
+                for relative_path, entry in local_manifest.files.items()
+            }
+            stale_object_keys = sorted(remote_object_keys - local_object_keys)
+            self.__delete_objects(stale_object_keys)
+            stats.deleted_files = len(
+                set(remote_manifest.files) - set(local_manifest.files)
+            )
+
+        return stats
+
+    def sync_folder_from_s3(
+        self, s3_prefix: str, local_path: Union[str, Path], delete: bool = False
+    ) -> S3SyncStats:
+        """Incrementally download a folder uploaded with `sync_folder_to_s3`.
+
+        Only the files missing locally or whose content hash differs from the remote
+        manifest are downloaded, concurrently. Packed shards are downloaded once and
+        only their changed members are extracted.
+
+        Args:
+            s3_prefix (str): Prefix (folder path) in S3 bucket pointing to the synced folder
+            local_path (Union[str, Path]): Local path where files should be written
+            delete (bool, optional): Delete local files missing from the remote manifest.
+                Defaults to False.
+
+        Returns:
+            S3SyncStats: Statistics of the sync.
+
+        Raises:
+            FileNotFoundError: If no manifest exists under the prefix
+        """
+
+        root = s3_prefix.rstrip("/")
+        remote_manifest = self.__load_manifest(root)
+        if remote_manifest is None:
+            raise FileNotFoundError(
+                f"No sync manifest found at s3://{self.bucket_name}/{root}"
+            )
+
+        local_path = Path(local_path)
+        local_path.mkdir(parents=True, exist_ok=True)
+        local_manifest = self.__build_local_manifest(local_path)
+
+        stats = S3SyncStats()
+        tasks: list[Callable[[], None]] = []
+        shard_members: dict[str, list[str]] = defaultdict(list)
+        for relative_path, entry in remote_manifest.files.items():
+            local_entry = local_manifest.files.get(relative_path)
+            if local_entry is not None and local_entry.sha256 == entry.sha256:
+                stats.skipped_files += 1
+                continue
+
+            stats.transferred_files += 1
+            stats.transferred_bytes += entry.size
+            if entry.shard is not None:
+                shard_members[entry.shard].append(relative_path)
+            else:
+                tasks.append(
+                    self.__download_file_task(
+                        self.get_file_key(root, relative_path),
+                        local_path / relative_path,
+                    )
+                )
+
+        for shard_key, relative_paths in shard_members.items():
+            tasks.append(
+                self.__download_shard_task(shard_key, relative_paths, local_path)
+            )
+
+        logger.info(
+            f"Syncing s3://{self.bucket_name}/{root} to {local_path}: "
+            f"{stats.transferred_files} changed files in {len(tasks)} objects, "
+            f"{stats.skipped_files} unchanged files."
+        )
+        self.__run_tasks(tasks)
+
+        if delete:
+            for relative_path in set(local_manifest.files) - set(remote_manifest.files):
+                (local_path / relative_path).unlink()
+                stats.deleted_files += 1
+
+        return stats
+
+    @staticmethod
+    def get_file_key(root: str, relative_path: str) -> str:
+        return f"{root}/files/{relative_path}".lstrip("/")
+
+    def __get_object_key(
+        self, root: str, relative_path: str, entry: S3SyncManifestEntry
+    ) -> str:
+        return entry.shard or self.get_file_key(root, relative_path)
+
+    @staticmethod
+    def __get_shard_index(relative_path: str, num_shards: int) -> int:
+        digest = hashlib.sha256(relative_path.encode("utf-8")).digest()
+
+        return int.from_bytes(digest[:8], "big") % num_shards
+
+    def __build_local_manifest(self, local_path: Path) -> S3SyncManifest:
+        file_paths = sorted(path for path in local_path.rglob("*") if path.is_file())
+
+        def hash_file(file_path: Path) -> S3SyncManifestEntry:
+            with open(file_path, "rb") as f:
+                sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+
+            return S3SyncManifestEntry(sha256=sha256, size=file_path.stat().st_size)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            entries = executor.map(hash_file, file_paths)
+
+            return S3SyncManifest(
+                files={
+                    file_path.relative_to(local_path).as_posix(): entry
+                    for file_path, entry in zip(file_paths, entries)
+                }
+            )
+
+    def __load_manifest(self, root: str) -> S3SyncManifest | None:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name, Key=f"{root}/{self.MANIFEST_FILE_NAME}"
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+
+        return S3SyncManifest.model_validate_json(response["Body"].read())
+
+    def __run_tasks(self, tasks: list[Callable[[], None]]) -> None:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            for future in futures:
+                future.result()
+
+    def __upload_file_task(self, file_path: Path, key: str) -> Callable[[], None]:
+        def task() -> None:
+            self.s3_client.upload_file(
+                str(file_path), self.bucket_name, key, Config=self.transfer_config
+            )
+
+        return task
+
+    def __upload_shard_task(
+        self, local_path: Path, relative_paths: list[str], shard_key: str
+    ) -> Callable[[], None]:
+        def task() -> None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                shard_path = Path(temp_dir) / "shard.zip"
+                # The synced files are mostly small JSON documents: storing them
+                # without compression keeps packing I/O bound.
+                with zipfile.ZipFile(shard_path, "w", zipfile.ZIP_STORED) as zipf:
+                    for relative_path in sorted(relative_paths):
+                        zipf.write(local_path / relative_path, relative_path)
+
+                self.s3_client.upload_file(
+                    str(shard_path),
+                    self.bucket_name,
+                    shard_key,
+                    Config=self.transfer_config,
+                )
+
+        return task
+
+    def __download_file_task(self, key: str, target_file: Path) -> Callable[[], None]:
+        def task() -> None:
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = target_file.with_name(f"{target_file.name}.part")
+            self.s3_client.download_file(
+                self.bucket_name, key, str(temp_file), Config=self.transfer_config
+            )
+            temp_file.replace(target_file)
+
+        return task
+
+    def __download_shard_task(
+        self, shard_key: str, relative_paths: list[str], local_path: Path
+    ) -> Callable[[], None]:
+        def task() -> None:
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(
+                self.bucket_name, shard_key, buffer, Config=self.transfer_config
+            )
+            with zipfile.ZipFile(buffer, "r") as zipf:
+                for relative_path in relative_paths:
+                    target_file = local_path / relative_path
+                    target_file.parent.mkdir(parents=True, exist_ok=True)
+                    target_file.write_bytes(zipf.read(relative_path))
+
+        return task
+
+    def __delete_objects(self, keys: list[str]) -> None:
+        # DeleteObjects accepts at most 1000 keys per request.
+        for start in range(0, len(keys), 1000):
+            self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    "Objects": [{"Key": key} for key in keys[start : start + 1000]]
+                },
+            )
+
     def __create_bucket_if_doesnt_exist(self) -> None:
         """Check if bucket exists and create it if it doesn't.
 
@@ -0,0 +1,15 @@
+from .batch import (
+    BatchClient,
+    BatchJob,
+    BatchRequest,
+    LocalBatchClient,
+    OpenAIBatchClient,
+)
+
+__all__ = [
+    "BatchClient",
+    "BatchJob",
+    "BatchRequest",
+    "LocalBatchClient",
+    "OpenAIBatchClient",
+]
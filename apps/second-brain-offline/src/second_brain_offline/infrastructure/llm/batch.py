@@ -0,0 +1,305 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+from openai import OpenAI
+from pydantic import BaseModel
+
+from second_brain_offline.config import settings
+
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchRequest(BaseModel):
+    """A single chat completion request to be executed as part of a batch.
+
+    Attributes:
+        custom_id: Unique identifier used to map the response back to its request.
+        body: The chat completion request body (model, messages, temperature, etc.).
+    """
+
+    custom_id: str
+    body: dict
+
+    def to_jsonl(self) -> str:
+        """Serialize the request in the OpenAI Batch API JSONL format."""
+
+        return json.dumps(
+            {
+                "custom_id": self.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self.body,
+            },
+            ensure_ascii=False,
+        )
+
+
+class BatchClient(ABC):
+    """Interface for submitting JSONL batch files to a batch inference provider."""
+
+    @abstractmethod
+    def submit(self, requests_path: Path) -> str:
+        """Submit a JSONL batch file and return the batch ID."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return the current status of the batch."""
+
+    @abstractmethod
+    def download_results(self, batch_id: str, output_path: Path) -> Path:
+        """Download the JSONL results of a completed batch to `output_path`."""
+
+
+class OpenAIBatchClient(BatchClient):
+    """Batch client backed by the OpenAI Batch API.
+
+    Args:
+        api_key: OpenAI API key. Defaults to settings.OPENAI_API_KEY.
+        completion_window: Time frame within which the batch should be processed.
+    """
+
+    def __init__(
+        self,
+        api_key: str = settings.OPENAI_API_KEY,
+        completion_window: str = "24h",
+    ) -> None:
+        self.client = OpenAI(api_key=api_key)
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: Path) -> str:
+        with open(requests_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download_results(self, batch_id: str, output_path: Path) -> Path:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.output_file_id is None:
+            raise RuntimeError(f"Batch {batch_id} has no output file.")
+
+        content = self.client.files.content(batch.output_file_id)
+        output_path.write_text(content.text, encoding="utf-8")
+
+        return output_path
+
+
+class LocalBatchClient(BatchClient):
+    """In-process batch client that answers every request with a local callable.
+
+    Useful for tests and mock runs, as it produces results in the same format as
+    the OpenAI Batch API without any network calls.
+
+    Args:
+        responder: Callable that receives a request body and returns the message content.
+    """
+
+    def __init__(self, responder: Callable[[dict], str]) -> None:
+        self.responder = responder
+        self.submitted_batches = 0
+
+        self.__results: dict[str, list[dict]] = {}
+
+    def submit(self, requests_path: Path) -> str:
+        batch_id = f"local_batch_{self.submitted_batches}"
+        self.submitted_batches += 1
+
+        results = []
+        with open(requests_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                results.append(
+                    {
+                        "id": f"{batch_id}_{len(results)}",
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [
+                                    {
+                                        "message": {
+                                            "role": "assistant",
+                                            "content": content,
+                                        }
+                                    }
+                                ]
+                            },
+                        },
+                        "error": None,
+                    }
+                )
+        self.__results[batch_id] = results
+
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if batch_id in self.__results else "failed"
+
+    def download_results(self, batch_id: str, output_path: Path) -> Path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for result in self.__results[batch_id]:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+        return output_path
+
+
+class BatchJob:
+    """Runs a list of requests through a batch client in a resumable way.
+
+    Requests are split into shards of at most `max_requests_per_batch`. Every shard
+    writes its requests, its batch ID and its downloaded results to `work_dir`, keyed
+    by a fingerprint of its request IDs, so an interrupted job picks up where it left
+    off: shards with downloaded results are not resubmitted and shards with a known
+    batch ID are only polled.
+
+    Args:
+        client: The batch client used to submit and poll the batches.
+        work_dir: Directory where the batch files and state are persisted.
+        name: Name of the job, used as prefix for all the persisted files.
+        poll_interval_seconds: Time to wait between two status checks.
+        max_requests_per_batch: Maximum number of requests per submitted batch.
+    """
+
+    def __init__(
+        self,
+        client: BatchClient,
+        work_dir: Path,
+        name: str,
+        poll_interval_seconds: float = 30.0,
+        max_requests_per_batch: int = 50_000,
+    ) -> None:
+        self.client = client
+        self.work_dir = Path(work_dir)
+        self.name = name
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_requests_per_batch = max_requests_per_batch
+
+    def run(self, requests: list[BatchRequest]) -> dict[str, str | None]:
+        """Submit the requests, wait for completion and collect the responses.
+
+        Args:
+            requests: The requests to execute.
+
+        Returns:
+            dict[str, str | None]: Mapping from each request's custom ID to the
+                generated message content, or None if the request failed.
+        """
+
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+
+        results: dict[str, str | None] = {}
+        for shard_index, start in enumerate(
+            range(0, len(requests), self.max_requests_per_batch)
+        ):
+            shard = requests[start : start + self.max_requests_per_batch]
+            results.update(self.__run_shard(shard, shard_index))
+
+        num_failed = sum(1 for content in results.values() if content is None)
+        logger.info(
+            f"Batch job '{self.name}' completed: "
+            f"{len(results) - num_failed}/{len(requests)} succeeded ✓ | "
+            f"{num_failed}/{len(requests)} failed ✗"
+        )
+
+        return results
+
+    def __run_shard(
+        self, requests: list[BatchRequest], shard_index: int
+    ) -> dict[str, str | None]:
+        # Fingerprint the full requests (IDs, model, prompts and sampling
+        # parameters), so changing any of them never reuses stale results.
+        fingerprint = hashlib.sha256(
+            "\n".join(request.to_jsonl() for request in requests).encode("utf-8")
+        ).hexdigest()[:12]
+        prefix = f"{self.name}_{shard_index}_{fingerprint}"
+        requests_path = self.work_dir / f"{prefix}.requests.jsonl"
+        results_path = self.work_dir / f"{prefix}.results.jsonl"
+        state_path = self.work_dir / f"{prefix}.state.json"
+
+        if results_path.exists():
+            logger.info(f"Reusing downloaded results for batch shard '{prefix}'.")
+
+            return self.__parse_results(results_path)
+
+        state = (
+            json.loads(state_path.read_text(encoding="utf-8"))
+            if state_path.exists()
+            else {}
+        )
+        batch_id = state.get("batch_id")
+        if batch_id is None:
+            with open(requests_path, "w", encoding="utf-8") as f:
+                for request in requests:
+                    f.write(request.to_jsonl() + "\n")
+
+            batch_id = self.client.submit(requests_path)
+            state_path.write_text(
+                json.dumps({"batch_id": batch_id, "num_requests": len(requests)}),
+                encoding="utf-8",
+            )
+            logger.info(
+                f"Submitted batch shard '{prefix}' with {len(requests)} requests as '{batch_id}'."
+            )
+        else:
+            logger.info(f"Resuming batch shard '{prefix}' with ID '{batch_id}'.")
+
+        status = self.__wait(batch_id)
+        if status != "completed":
+            # Forget the batch so the next run resubmits the shard.
+            state_path.unlink(missing_ok=True)
+
+            raise RuntimeError(f"Batch '{batch_id}' ended with status '{status}'.")
+
+        self.client.download_results(batch_id, results_path)
+
+        return self.__parse_results(results_path)
+
+    def __wait(self, batch_id: str) -> str:
+        while True:
+            status = self.client.status(batch_id)
+            if status in BATCH_TERMINAL_STATUSES:
+                return status
+
+            logger.debug(
+                f"Batch '{batch_id}' is '{status}'. Checking again in {self.poll_interval_seconds}s."
+            )
+            time.sleep(self.poll_interval_seconds)
+
+    def __parse_results(self, results_path: Path) -> dict[str, str | None]:
+        results: dict[str, str | None] = {}
+        with open(results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                result = json.loads(line)
+                try:
+                    content = result["response"]["body"]["choices"][0]["message"][
+                        "content"
+                    ]
+                except (KeyError, IndexError, TypeError):
+                    logger.warning(
+                        f"Failed request '{result.get('custom_id')}' in batch: {result.get('error')}"
+                    )
+                    content = None
+
+                results[result["custom_id"]] = content
+
+        return results
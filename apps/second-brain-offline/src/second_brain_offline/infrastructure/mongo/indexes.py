@@ -1,7 +1,12 @@
+from datetime import datetime, timezone
+
 from langchain_mongodb.index import create_fulltext_search_index
 
+from second_brain_offline import utils
 from second_brain_offline.infrastructure.mongo.service import MongoDBService
 
+INDEX_METADATA_COLLECTION_NAME = "index_metadata"
+
 
 class MongoDBIndex:
     def __init__(
@@ -28,3 +33,21 @@ class MongoDBIndex:
                 field=vectorstore._text_key,
                 index_name=self.retriever.search_index_name,
             )
+
+    def save_metadata(self, metadata: dict) -> None:
+        """Store the index metadata (e.g., the embedding model and transform) in the
+        index metadata collection, keyed by the indexed collection's name, so
+        retrievers can rebuild the exact query embedding pipeline.
+
+        Every call stamps a new random `version`, which retrievers use to
+        invalidate the results they cached from the previous index."""
+
+        self.mongodb_client.database[INDEX_METADATA_COLLECTION_NAME].replace_one(
+            {"_id": self.mongodb_client.collection_name},
+            {
+                **metadata,
+                "version": utils.generate_random_hex(length=16),
+                "updated_at": datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
@@ -1,9 +1,9 @@
-from typing import Generic, Type, TypeVar
+from typing import Generic, Iterable, Iterator, Type, TypeVar
 
 from bson import ObjectId
 from loguru import logger
-from pydantic import BaseModel
-from pymongo import MongoClient, errors
+from pydantic import BaseModel, ValidationError
+from pymongo import MongoClient, ReplaceOne, errors
 
 from second_brain_offline.config import settings
 
@@ -110,35 +110,140 @@ class MongoDBService(Generic[T]):
             logger.error(f"Error clearing the collection: {e}")
             raise
 
-    def ingest_documents(self, documents: list[T]) -> None:
-        """Insert multiple documents into the MongoDB collection.
+    def ingest_documents(
+        self,
+        documents: Iterable[T],
+        batch_size: int = 1000,
+        upsert: bool = False,
+        upsert_key: str = "id",
+    ) -> int:
+        """Insert or upsert multiple documents into the MongoDB collection in chunks.
+
+        Documents are written in unordered batches of `batch_size`, so memory stays
+        bounded and a single invalid document doesn't abort the rest of the batch.
 
         Args:
-            documents: List of Pydantic model instances to insert.
+            documents: Pydantic model instances to write. Can be a lazy iterable.
+            batch_size: Number of documents written per request. Defaults to 1000.
+            upsert: If True, documents replace the stored documents with the same
+                `upsert_key` field, or are inserted if missing. Defaults to False.
+            upsert_key: Field, with dots separating nested fields, identifying the
+                documents to replace. Documents without it are matched by their `id`
+                instead. Defaults to "id".
+
+        Returns:
+            int: Number of documents successfully written.
 
         Raises:
-            ValueError: If documents is empty or contains non-Pydantic model items.
-            errors.PyMongoError: If the insertion operation fails.
+            ValueError: If documents is empty, unless upserting, or contains
+                non-Pydantic model items.
+            errors.PyMongoError: If a write fails for any other reason than
+                per-document write errors.
         """
 
-        try:
-            if not documents or not all(
-                isinstance(doc, BaseModel) for doc in documents
-            ):
+        if upsert:
+            self.collection.create_index("id")
+            if upsert_key != "id":
+                self.collection.create_index(upsert_key)
+
+        num_documents = 0
+        num_written = 0
+        for batch in self.__batched(documents, batch_size):
+            if not all(isinstance(doc, BaseModel) for doc in batch):
                 raise ValueError("Documents must be a list of Pycantic models.")
 
-            dict_documents = [doc.model_dump() for doc in documents]
+            dict_documents = [doc.model_dump() for doc in batch]
 
             # Remove '_id' fields to avoid duplicate key errors
             for doc in dict_documents:
                 doc.pop("_id", None)
 
-            self.collection.insert_many(dict_documents)
-            logger.debug(f"Inserted {len(documents)} documents into MongoDB.")
+            num_documents += len(dict_documents)
+            try:
+                if upsert:
+                    result = self.collection.bulk_write(
+                        [
+                            ReplaceOne(
+                                self.__get_upsert_filter(doc, upsert_key),
+                                doc,
+                                upsert=True,
+                            )
+                            for doc in dict_documents
+                        ],
+                        ordered=False,
+                    )
+                    num_written += result.upserted_count + result.matched_count
+                else:
+                    result = self.collection.insert_many(dict_documents, ordered=False)
+                    num_written += len(result.inserted_ids)
+            except errors.BulkWriteError as e:
+                details = e.details
+                num_written += (
+                    details.get("nInserted", 0)
+                    + details.get("nUpserted", 0)
+                    + details.get("nMatched", 0)
+                )
+                logger.warning(
+                    f"Failed to write {len(details.get('writeErrors', []))} documents: "
+                    f"{details.get('writeErrors', [])[:3]}"
+                )
+            except errors.PyMongoError as e:
+                logger.error(f"Error inserting documents: {e}")
+                raise
+
+        if num_documents == 0:
+            if upsert:
+                # An incremental sync without changed documents is a no-op.
+                logger.info("No documents to upsert into MongoDB.")
+
+                return 0
+
+            raise ValueError("Documents must be a list of Pycantic models.")
+
+        logger.debug(f"Wrote {num_written}/{num_documents} documents into MongoDB.")
+
+        return num_written
+
+    def delete_documents(self, query: dict) -> int:
+        """Delete the documents matching a query.
+
+        Args:
+            query: MongoDB query filter of the documents to delete.
+
+        Returns:
+            int: Number of deleted documents.
+
+        Raises:
+            errors.PyMongoError: If the deletion operation fails.
+        """
+
+        try:
+            result = self.collection.delete_many(query)
         except errors.PyMongoError as e:
-            logger.error(f"Error inserting documents: {e}")
+            logger.error(f"Error deleting documents: {e}")
             raise
 
+        logger.debug(f"Deleted {result.deleted_count} documents with query: {query}")
+
+        return result.deleted_count
+
+    def get_distinct_values(self, field: str, query: dict | None = None) -> list:
+        """Get the distinct values of a field over the documents matching a query.
+
+        Args:
+            field: The field, with dots separating nested fields.
+            query: MongoDB query filter to apply. Defaults to all documents.
+
+        Returns:
+            list: The distinct values, without None.
+        """
+
+        return [
+            value
+            for value in self.collection.distinct(field, query or {})
+            if value is not None
+        ]
+
     def fetch_documents(self, limit: int, query: dict) -> list[T]:
         """Retrieve documents from the MongoDB collection based on a query.
 
@@ -153,38 +258,98 @@ class MongoDBService(Generic[T]):
             Exception: If the query operation fails.
         """
         try:
-            documents = list(self.collection.find(query).limit(limit))
+            documents = list(self.iter_documents(query=query, limit=limit))
             logger.debug(f"Fetched {len(documents)} documents with query: {query}")
-            return self.__parse_documents(documents)
+            return documents
         except Exception as e:
             logger.error(f"Error fetching documents: {e}")
             raise
 
-    def __parse_documents(self, documents: list[dict]) -> list[T]:
-        """Convert MongoDB documents to Pydantic model instances.
+    def iter_documents(
+        self,
+        query: dict | None = None,
+        batch_size: int = 1000,
+        projection: dict | None = None,
+        limit: int = 0,
+    ) -> Iterator[T]:
+        """Lazily stream documents from the MongoDB collection.
+
+        Documents are fetched from the server in batches of `batch_size` and
+        validated one at a time, so only one batch is held in memory. Documents
+        failing validation are logged and skipped.
+
+        Args:
+            query: MongoDB query filter to apply. Defaults to all documents.
+            batch_size: Number of documents fetched per round trip. Defaults to 1000.
+            projection: Optional MongoDB projection. Fields excluded by it must be
+                optional in the Pydantic model.
+            limit: Maximum number of documents to retrieve. Defaults to 0 (no limit).
+
+        Yields:
+            Pydantic model instances matching the query criteria.
+        """
+
+        cursor = (
+            self.collection.find(query or {}, projection)
+            .batch_size(batch_size)
+            .limit(limit)
+        )
+        try:
+            for doc in cursor:
+                try:
+                    yield self.__parse_document(doc)
+                except ValidationError as e:
+                    logger.warning(
+                        f"Skipping invalid document '{doc.get('id')}': {e.error_count()} validation errors"
+                    )
+        finally:
+            cursor.close()
+
+    def __parse_document(self, doc: dict) -> T:
+        """Convert a MongoDB document to a Pydantic model instance.
 
         Converts MongoDB ObjectId fields to strings and transforms the document structure
         to match the Pydantic model schema.
 
         Args:
-            documents: List of MongoDB documents to parse.
+            doc: MongoDB document to parse.
 
         Returns:
-            List of validated Pydantic model instances.
+            Validated Pydantic model instance.
         """
-        parsed_documents = []
-        for doc in documents:
-            for key, value in doc.items():
-                if isinstance(value, ObjectId):
-                    doc[key] = str(value)
 
-            _id = doc.pop("_id", None)
+        for key, value in doc.items():
+            if isinstance(value, ObjectId):
+                doc[key] = str(value)
+
+        _id = doc.pop("_id", None)
+        if _id is not None:
             doc["id"] = _id
 
-            parsed_doc = self.model.model_validate(doc)
-            parsed_documents.append(parsed_doc)
+        return self.model.model_validate(doc)
+
+    @staticmethod
+    def __get_upsert_filter(doc: dict, upsert_key: str) -> dict:
+        value = doc
+        for key in upsert_key.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+
+        if value is None:
+            return {"id": doc["id"]}
+
+        return {upsert_key: value}
+
+    @staticmethod
+    def __batched(documents: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+        batch: list[T] = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
 
-        return parsed_documents
+        if batch:
+            yield batch
 
     def get_collection_count(self) -> int:
         """Count the total number of documents in the collection.
@@ -1,4 +1,5 @@
 from .database import NotionDatabaseClient
 from .document import NotionDocumentClient
+from .sync import NotionSyncState
 
-__all__ = ["NotionDatabaseClient", "NotionDocumentClient"]
+__all__ = ["NotionDatabaseClient", "NotionDocumentClient", "NotionSyncState"]
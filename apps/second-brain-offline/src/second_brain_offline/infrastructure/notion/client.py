@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+import aiohttp
+from loguru import logger
+
+from second_brain_offline.utils import AsyncRateLimiter
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class NotionAPIClient:
+    """Asynchronous Notion API client sharing one pooled HTTP session.
+
+    Requests go through a rate limiter matching Notion's limit of 3 requests per
+    second, are bounded by a concurrency limit and are retried on rate limiting
+    and server errors. Paginated endpoints are followed through their
+    `has_more`/`next_cursor` fields.
+
+    Must be used as an async context manager, which owns the HTTP session.
+
+    Args:
+        api_key: The Notion API secret key used for authentication.
+        requests_per_second: Maximum average number of requests per second.
+        max_concurrent_requests: Maximum number of in-flight requests.
+        max_retries: Maximum number of retries of a failed request.
+        timeout_seconds: Timeout of a single request.
+        base_url: Root URL of the Notion API.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        requests_per_second: float = 3.0,
+        max_concurrent_requests: int = 10,
+        max_retries: int = 5,
+        timeout_seconds: float = 30.0,
+        base_url: str = NOTION_API_URL,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrent_requests = max_concurrent_requests
+
+        self.__rate_limiter = AsyncRateLimiter(requests_per_second)
+        self.__semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.__session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "NotionAPIClient":
+        self.__session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Notion-Version": NOTION_VERSION,
+            },
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrent_requests),
+        )
+
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json: dict | None = None,
+    ) -> dict:
+        """Send a request to the Notion API, retrying transient failures.
+
+        Args:
+            method: The HTTP method.
+            path: The endpoint path, relative to the API root (e.g., "blocks/{id}/children").
+            params: Optional query parameters.
+            json: Optional JSON body.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            aiohttp.ClientError: If the request keeps failing after all the retries.
+        """
+
+        assert self.__session is not None, (
+            "NotionAPIClient must be used as an async context manager."
+        )
+
+        for attempt in range(self.max_retries + 1):
+            await self.__rate_limiter.acquire()
+            async with self.__semaphore:
+                try:
+                    async with self.__session.request(
+                        method, f"{self.base_url}/{path}", params=params, json=json
+                    ) as response:
+                        if (
+                            response.status in RETRYABLE_STATUS_CODES
+                            and attempt < self.max_retries
+                        ):
+                            retry_after = float(
+                                response.headers.get("Retry-After", 2**attempt)
+                            )
+                            logger.warning(
+                                f"Notion API returned {response.status} for '{path}'. "
+                                f"Retrying in {retry_after}s."
+                            )
+                            self.__rate_limiter.delay(retry_after)
+                            continue
+
+                        response.raise_for_status()
+
+                        return await response.json()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt == self.max_retries:
+                        raise
+
+                    logger.warning(f"Connection error for '{path}'. Retrying.")
+                    self.__rate_limiter.delay(2**attempt)
+
+        raise aiohttp.ClientError(f"Request to '{path}' failed after retries.")
+
+    async def paginate(
+        self,
+        method: str,
+        path: str,
+        json: dict | None = None,
+        page_size: int = 100,
+        params: dict | None = None,
+    ) -> AsyncIterator[dict]:
+        """Iterate over all the results of a paginated endpoint.
+
+        Args:
+            method: The HTTP method. Cursors are sent as query parameters for GET
+                requests and in the JSON body otherwise.
+            path: The endpoint path, relative to the API root.
+            json: Optional JSON body, for POST endpoints.
+            page_size: Number of results per page (maximum 100).
+            params: Optional extra query parameters, sent with every page.
+
+        Yields:
+            dict: The results of all the pages.
+        """
+
+        start_cursor = None
+        while True:
+            if method.upper() == "GET":
+                page_params = {**(params or {}), "page_size": page_size}
+                if start_cursor:
+                    page_params["start_cursor"] = start_cursor
+                response = await self.request(method, path, params=page_params)
+            else:
+                body = {**(json or {}), "page_size": page_size}
+                if start_cursor:
+                    body["start_cursor"] = start_cursor
+                response = await self.request(method, path, params=params, json=body)
+
+            for result in response.get("results", []):
+                yield result
+
+            if not response.get("has_more"):
+                break
+
+            start_cursor = response.get("next_cursor")
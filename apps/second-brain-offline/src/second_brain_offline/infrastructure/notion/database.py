@@ -1,12 +1,15 @@
+import asyncio
 import json
 from typing import Any
 
-import requests
+import aiohttp
 from loguru import logger
 
 from second_brain_offline.config import settings
 from second_brain_offline.domain import DocumentMetadata
 
+from .client import NotionAPIClient
+
 
 class NotionDatabaseClient:
     """Client for interacting with Notion databases.
@@ -31,25 +34,24 @@ class NotionDatabaseClient:
         self.api_key = api_key
 
     def query_notion_database(
-        self, database_id: str, query_json: str | None = None
+        self,
+        database_id: str,
+        query_json: str | None = None,
+        edited_after: str | None = None,
     ) -> list[DocumentMetadata]:
-        """Query a Notion database and return its results.
+        """Query a Notion database and return all its results, following the
+        pagination cursors.
 
         Args:
             database_id: The ID of the Notion database to query.
             query_json: Optional JSON string containing query parameters.
+            edited_after: Optional ISO timestamp. If set, only the pages edited on
+                or after it are returned.
 
         Returns:
             A list of dictionaries containing the query results.
         """
 
-        url = f"https://api.notion.com/v1/databases/{database_id}/query"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28",
-        }
-
         query_payload = {}
         if query_json and query_json.strip():
             try:
@@ -58,14 +60,21 @@ class NotionDatabaseClient:
                 logger.opt(exception=True).debug("Invalid JSON format for query")
                 return []
 
+        if edited_after is not None:
+            query_payload = self.__add_edited_after_filter(query_payload, edited_after)
+
         try:
-            response = requests.post(
-                url, headers=headers, json=query_payload, timeout=10
-            )
-            response.raise_for_status()
-            results = response.json()
-            results = results["results"]
-        except requests.exceptions.RequestException:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                results = asyncio.run(
+                    self.__query_all_pages(database_id, query_payload)
+                )
+            else:
+                results = loop.run_until_complete(
+                    self.__query_all_pages(database_id, query_payload)
+                )
+        except aiohttp.ClientError:
             logger.opt(exception=True).debug("Error querying Notion database")
             return []
         except KeyError:
@@ -79,6 +88,63 @@ class NotionDatabaseClient:
 
         return [self.__build_page_metadata(page) for page in results]
 
+    def list_page_ids(self, database_id: str) -> list[str]:
+        """List the IDs of all the pages of a Notion database.
+
+        Only the title property is requested to keep the responses small. Unlike
+        `query_notion_database`, errors are raised instead of returning an empty
+        list, as a partial listing would be mistaken for deleted pages.
+
+        Args:
+            database_id: The ID of the Notion database to list.
+
+        Returns:
+            list[str]: The IDs of all the pages of the database.
+        """
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            results = asyncio.run(
+                self.__query_all_pages(
+                    database_id, {}, params={"filter_properties": "title"}
+                )
+            )
+        else:
+            results = loop.run_until_complete(
+                self.__query_all_pages(
+                    database_id, {}, params={"filter_properties": "title"}
+                )
+            )
+
+        return [page["id"] for page in results]
+
+    async def __query_all_pages(
+        self, database_id: str, query_payload: dict, params: dict | None = None
+    ) -> list[dict[str, Any]]:
+        async with NotionAPIClient(api_key=self.api_key) as client:
+            return [
+                page
+                async for page in client.paginate(
+                    "POST",
+                    f"databases/{database_id}/query",
+                    json=query_payload,
+                    params=params,
+                )
+            ]
+
+    def __add_edited_after_filter(self, query_payload: dict, edited_after: str) -> dict:
+        edited_after_filter = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": edited_after},
+        }
+        if "filter" in query_payload:
+            edited_after_filter = {
+                "and": [query_payload["filter"], edited_after_filter]
+            }
+
+        return {**query_payload, "filter": edited_after_filter}
+
     def __build_page_metadata(self, page: dict[str, Any]) -> DocumentMetadata:
         """Build a PageMetadata object from a Notion page dictionary.
 
@@ -90,6 +156,7 @@ class NotionDatabaseClient:
         """
         properties = self.__flatten_properties(page.get("properties", {}))
         title = properties.pop("Name")
+        properties["last_edited_time"] = page.get("last_edited_time")
 
         if page.get("parent"):
             properties["parent"] = {
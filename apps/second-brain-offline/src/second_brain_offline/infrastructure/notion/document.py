@@ -1,9 +1,13 @@
-import requests
+import asyncio
+
+import aiohttp
 from loguru import logger
 
 from second_brain_offline.config import settings
 from second_brain_offline.domain import Document, DocumentMetadata
 
+from .client import NotionAPIClient
+
 
 class NotionDocumentClient:
     """Client for interacting with Notion API to extract document content.
@@ -12,11 +16,20 @@ class NotionDocumentClient:
     rich text content, and embedded URLs.
     """
 
-    def __init__(self, api_key: str | None = settings.NOTION_SECRET_KEY):
+    def __init__(
+        self,
+        api_key: str | None = settings.NOTION_SECRET_KEY,
+        requests_per_second: float = 3.0,
+        max_concurrent_requests: int = 10,
+    ):
         """Initialize the Notion client.
 
         Args:
             api_key: The Notion API key to use for authentication.
+            requests_per_second: Maximum average number of requests per second sent
+                to the Notion API. Defaults to 3, Notion's rate limit.
+            max_concurrent_requests: Maximum number of in-flight requests.
+                Defaults to 10.
         """
 
         assert api_key is not None, (
@@ -24,6 +37,8 @@ class NotionDocumentClient:
         )
 
         self.api_key = api_key
+        self.requests_per_second = requests_per_second
+        self.max_concurrent_requests = max_concurrent_requests
 
     def extract_document(self, document_metadata: DocumentMetadata) -> Document:
         """Extract content from a Notion document.
@@ -35,7 +50,51 @@ class NotionDocumentClient:
             Document: A Document object containing the extracted content and metadata.
         """
 
-        blocks = self.__retrieve_child_blocks(document_metadata.id)
+        return self.extract_documents([document_metadata])[0]
+
+    def extract_documents(
+        self, documents_metadata: list[DocumentMetadata]
+    ) -> list[Document]:
+        """Concurrently extract the content of multiple Notion documents.
+
+        All the documents and their nested blocks are fetched concurrently through
+        a single pooled HTTP session, under the Notion API rate limit.
+
+        Args:
+            documents_metadata: Metadata about the documents to extract.
+
+        Returns:
+            list[Document]: The extracted documents, in the same order as the metadata.
+        """
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.__extract_documents(documents_metadata))
+        else:
+            return loop.run_until_complete(self.__extract_documents(documents_metadata))
+
+    async def __extract_documents(
+        self, documents_metadata: list[DocumentMetadata]
+    ) -> list[Document]:
+        async with NotionAPIClient(
+            api_key=self.api_key,
+            requests_per_second=self.requests_per_second,
+            max_concurrent_requests=self.max_concurrent_requests,
+        ) as client:
+            return list(
+                await asyncio.gather(
+                    *(
+                        self.__extract_document(client, document_metadata)
+                        for document_metadata in documents_metadata
+                    )
+                )
+            )
+
+    async def __extract_document(
+        self, client: NotionAPIClient, document_metadata: DocumentMetadata
+    ) -> Document:
+        blocks = await self.__retrieve_block_tree(client, document_metadata.id)
         content, urls = self.__parse_blocks(blocks)
 
         parent_metadata = document_metadata.properties.pop("parent", None)
@@ -55,12 +114,50 @@ class NotionDocumentClient:
             child_urls=urls,
         )
 
-    def __retrieve_child_blocks(
-        self, block_id: str, page_size: int = 100
+    async def __retrieve_block_tree(
+        self, client: NotionAPIClient, block_id: str, depth: int = 0
+    ) -> list[dict]:
+        """Retrieve the child blocks of a block and, concurrently, their own
+        nested children.
+
+        The nested children of a block are attached to it under the "_children" key.
+
+        Args:
+            client: The Notion API client.
+            block_id: The ID of the block to retrieve children from.
+            depth: Current depth of the block in the page.
+
+        Returns:
+            list[dict]: List of block data.
+        """
+
+        blocks = await self.__retrieve_child_blocks(client, block_id)
+
+        # Mirrors the blocks expanded by `__parse_blocks`.
+        blocks_with_children = [
+            block
+            for block in blocks
+            if (block.get("type") == "child_page" and depth < 3)
+            or (block.get("type") != "child_page" and block.get("has_children"))
+        ]
+        children = await asyncio.gather(
+            *(
+                self.__retrieve_block_tree(client, block["id"], depth + 1)
+                for block in blocks_with_children
+            )
+        )
+        for block, block_children in zip(blocks_with_children, children):
+            block["_children"] = block_children
+
+        return blocks
+
+    async def __retrieve_child_blocks(
+        self, client: NotionAPIClient, block_id: str, page_size: int = 100
     ) -> list[dict]:
-        """Retrieve child blocks from a Notion block.
+        """Retrieve all the child blocks of a Notion block, following pagination.
 
         Args:
+            client: The Notion API client.
             block_id: The ID of the block to retrieve children from.
             page_size: Number of blocks to retrieve per request.
 
@@ -68,21 +165,17 @@ class NotionDocumentClient:
             list[dict]: List of block data.
         """
 
-        blocks_url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size={page_size}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Notion-Version": "2022-06-28",
-        }
         try:
-            blocks_response = requests.get(blocks_url, headers=headers, timeout=10)
-            blocks_response.raise_for_status()
-            blocks_data = blocks_response.json()
-            return blocks_data.get("results", [])
-        except requests.exceptions.RequestException as e:
-            error_message = f"Error: Failed to retrieve Notion page content. {e}"
-            if hasattr(e, "response") and e.response is not None:
-                error_message += f" Status code: {e.response.status_code}, Response: {e.response.text}"
-            logger.exception(error_message)
+            return [
+                block
+                async for block in client.paginate(
+                    "GET", f"blocks/{block_id}/children", page_size=page_size
+                )
+            ]
+        except aiohttp.ClientResponseError as e:
+            logger.exception(
+                f"Error: Failed to retrieve Notion page content. {e} Status code: {e.status}"
+            )
             return []
         except Exception:
             logger.exception("Error retrieving Notion page content")
@@ -106,7 +199,6 @@ class NotionDocumentClient:
         urls = []
         for block in blocks:
             block_type = block.get("type")
-            block_id = block.get("id")
 
             if block_type in {
                 "heading_1",
@@ -135,11 +227,10 @@ class NotionDocumentClient:
             elif block_type == "divider":
                 content += "---\n\n"
             elif block_type == "child_page" and depth < 3:
-                child_id = block["id"]
                 child_title = block.get("child_page", {}).get("title", "Untitled")
                 content += f"\n\n<child_page>\n# {child_title}\n\n"
 
-                child_blocks = self.__retrieve_child_blocks(child_id)
+                child_blocks = block.get("_children", [])
                 child_content, child_urls = self.__parse_blocks(child_blocks, depth + 1)
                 content += child_content + "\n</child_page>\n\n"
                 urls += child_urls
@@ -159,7 +250,7 @@ class NotionDocumentClient:
                 and "has_children" in block
                 and block["has_children"]
             ):
-                child_blocks = self.__retrieve_child_blocks(block_id)
+                child_blocks = block.get("_children", [])
                 child_content, child_urls = self.__parse_blocks(child_blocks, depth + 1)
                 content += (
                     "\n".join("\t" + line for line in child_content.split("\n"))
@@ -0,0 +1,157 @@
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from second_brain_offline.domain import DocumentMetadata
+
+LAST_EDITED_TIME_PROPERTY = "last_edited_time"
+
+
+class NotionSyncState(BaseModel):
+    """The incremental sync state of a Notion database.
+
+    Attributes:
+        database_id: The ID of the synced Notion database.
+        watermark: The latest `last_edited_time` seen during the last sync.
+        pages: Manifest mapping every known page ID to its `last_edited_time`.
+        deleted_page_ids: Pages removed from the database since the previous sync.
+    """
+
+    database_id: str
+    watermark: str | None = None
+    pages: dict[str, str] = Field(default_factory=dict)
+    deleted_page_ids: list[str] = Field(default_factory=list)
+
+    @classmethod
+    def load(cls, state_dir: Path, database_id: str) -> "NotionSyncState":
+        """Load the committed state of a database, or an empty state if it was
+        never synced."""
+
+        state_path = cls.__state_path(state_dir, database_id)
+        if not state_path.exists():
+            return cls(database_id=database_id)
+
+        return cls.model_validate_json(state_path.read_text(encoding="utf-8"))
+
+    @classmethod
+    def load_pending(cls, state_dir: Path, database_id: str) -> "NotionSyncState":
+        """Load the pending state of a database, computed but not committed yet."""
+
+        pending_path = cls.__pending_path(state_dir, database_id)
+        if not pending_path.exists():
+            raise FileNotFoundError(f"No pending sync state found: '{pending_path}'")
+
+        return cls.model_validate_json(pending_path.read_text(encoding="utf-8"))
+
+    def save_pending(self, state_dir: Path) -> None:
+        """Persist the state as pending, until the synced documents are saved."""
+
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.__pending_path(state_dir, self.database_id).write_text(
+            self.model_dump_json(indent=4), encoding="utf-8"
+        )
+
+    def commit(self, state_dir: Path) -> None:
+        """Persist the state as the new committed state and drop the pending one."""
+
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.__state_path(state_dir, self.database_id).write_text(
+            self.model_dump_json(indent=4), encoding="utf-8"
+        )
+        self.__pending_path(state_dir, self.database_id).unlink(missing_ok=True)
+
+    def diff(
+        self,
+        edited_pages: list[DocumentMetadata],
+        all_page_ids: list[str] | None = None,
+    ) -> tuple[list[DocumentMetadata], "NotionSyncState"]:
+        """Compare the pages returned by Notion against the manifest.
+
+        Args:
+            edited_pages: Pages edited since the watermark. As Notion timestamps
+                have a coarse granularity, pages already in the manifest with the
+                same `last_edited_time` are ignored.
+            all_page_ids: IDs of all the pages currently in the database, used to
+                detect deletions. If None, deletions aren't detected.
+
+        Returns:
+            tuple[list[DocumentMetadata], NotionSyncState]: The new or changed pages
+                and the state after the sync.
+        """
+
+        changed_pages = [
+            page
+            for page in edited_pages
+            if self.pages.get(page.id) != get_last_edited_time(page)
+        ]
+
+        pages = dict(self.pages)
+        deleted_page_ids = []
+        if all_page_ids is not None:
+            current_page_ids = set(all_page_ids)
+            deleted_page_ids = [
+                page_id for page_id in pages if page_id not in current_page_ids
+            ]
+            for page_id in deleted_page_ids:
+                del pages[page_id]
+
+        for page in changed_pages:
+            pages[page.id] = get_last_edited_time(page)
+
+        watermark = max(
+            (timestamp for timestamp in pages.values() if timestamp),
+            default=self.watermark,
+        )
+
+        logger.info(
+            f"Notion database '{self.database_id}' sync: "
+            f"{len(changed_pages)} new or changed pages, {len(deleted_page_ids)} deleted pages."
+        )
+
+        return changed_pages, NotionSyncState(
+            database_id=self.database_id,
+            watermark=watermark,
+            pages=pages,
+            deleted_page_ids=deleted_page_ids,
+        )
+
+    def write_deletions(self, output_dir: Path) -> Path:
+        """Write the deleted page IDs next to the delta documents, one per line.
+
+        A plain text file is used so readers globbing the documents' JSON files
+        don't pick it up.
+        """
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / "deleted.txt"
+        output_path.write_text(
+            "".join(f"{page_id}\n" for page_id in self.deleted_page_ids),
+            encoding="utf-8",
+        )
+
+        return output_path
+
+    @staticmethod
+    def read_deletions(delta_dir: Path) -> list[str]:
+        """Read the deleted page IDs written by `write_deletions` in every
+        subdirectory of a delta directory, e.g., one per synced database."""
+
+        return [
+            page_id
+            for path in sorted(Path(delta_dir).rglob("deleted.txt"))
+            for page_id in path.read_text(encoding="utf-8").splitlines()
+            if page_id.strip()
+        ]
+
+    @staticmethod
+    def __state_path(state_dir: Path, database_id: str) -> Path:
+        return state_dir / f"{database_id}.json"
+
+    @staticmethod
+    def __pending_path(state_dir: Path, database_id: str) -> Path:
+        return state_dir / f"{database_id}.pending.json"
+
+
+def get_last_edited_time(page: DocumentMetadata) -> str:
+    return page.properties.get(LAST_EDITED_TIME_PROPERTY) or ""
@@ -0,0 +1,3 @@
+from .documents import DocumentSnapshot
+
+__all__ = ["DocumentSnapshot"]
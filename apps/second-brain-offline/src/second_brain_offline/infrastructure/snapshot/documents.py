@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from second_brain_offline.domain import Document
+
+SnapshotCompression = Literal["gzip", "none"]
+
+
+class SnapshotShard(BaseModel):
+    path: str
+    num_documents: int
+    sha256: str
+
+
+class SnapshotManifest(BaseModel):
+    version: int = 1
+    format: Literal["jsonl"] = "jsonl"
+    compression: SnapshotCompression = "gzip"
+    num_documents: int = 0
+    shards: list[SnapshotShard] = Field(default_factory=list)
+
+
+class DocumentSnapshot:
+    """A bulk, sharded on-disk format for collections of documents.
+
+    Documents are stored as JSON lines split into (optionally gzip-compressed)
+    shards, described by a `manifest.json` file. Shards are written and read in
+    parallel, and reading streams the documents shard by shard, so only a bounded
+    number of shards is held in memory at any time. Every shard is verified against
+    the checksum recorded in the manifest when it's read.
+
+    Args:
+        snapshot_dir: Directory holding the manifest and the shards.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+
+    def __init__(self, snapshot_dir: Path) -> None:
+        self.snapshot_dir = Path(snapshot_dir)
+
+    @classmethod
+    def exists(cls, snapshot_dir: Path) -> bool:
+        """Check whether a directory holds a document snapshot."""
+
+        return (Path(snapshot_dir) / cls.MANIFEST_FILE_NAME).exists()
+
+    @property
+    def manifest(self) -> SnapshotManifest:
+        manifest_path = self.snapshot_dir / self.MANIFEST_FILE_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Snapshot manifest not found: '{manifest_path}'")
+
+        return SnapshotManifest.model_validate_json(
+            manifest_path.read_text(encoding="utf-8")
+        )
+
+    def write(
+        self,
+        documents: Iterable[Document],
+        shard_size: int = 1000,
+        compression: SnapshotCompression = "gzip",
+        max_workers: int = 4,
+    ) -> SnapshotManifest:
+        """Write the documents as a sharded snapshot.
+
+        The manifest is written last, so an interrupted write never looks like a
+        complete snapshot.
+
+        Args:
+            documents: Documents to write. Can be a lazy iterable.
+            shard_size: Maximum number of documents per shard. Defaults to 1000.
+            compression: Compression of the shards. Defaults to "gzip".
+            max_workers: Number of shards serialized and written in parallel.
+                Defaults to 4.
+
+        Returns:
+            SnapshotManifest: The manifest of the written snapshot.
+        """
+
+        assert shard_size > 0, "Shard size must be positive"
+
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        shards: list[SnapshotShard] = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: deque[Future[SnapshotShard]] = deque()
+            for shard_index, batch in enumerate(self.__batched(documents, shard_size)):
+                # Bound the number of batches waiting to be written.
+                if len(pending) >= max_workers:
+                    shards.append(pending.popleft().result())
+
+                pending.append(
+                    executor.submit(self.__write_shard, batch, shard_index, compression)
+                )
+
+            shards.extend(future.result() for future in pending)
+
+        manifest = SnapshotManifest(
+            compression=compression,
+            num_documents=sum(shard.num_documents for shard in shards),
+            shards=shards,
+        )
+        (self.snapshot_dir / self.MANIFEST_FILE_NAME).write_text(
+            manifest.model_dump_json(indent=4), encoding="utf-8"
+        )
+
+        logger.info(
+            f"Wrote snapshot of {manifest.num_documents} documents in {len(shards)} shards to '{self.snapshot_dir}'."
+        )
+
+        return manifest
+
+    def iter_documents(self, max_workers: int = 4) -> Iterator[Document]:
+        """Lazily stream the documents of the snapshot, in their written order.
+
+        Up to `max_workers` shards are read and parsed ahead in parallel.
+
+        Args:
+            max_workers: Number of shards read in parallel. Defaults to 4.
+
+        Yields:
+            Document: The documents of the snapshot.
+
+        Raises:
+            ValueError: If a shard doesn't match the checksum of the manifest.
+        """
+
+        manifest = self.manifest
+        shards = iter(manifest.shards)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: deque[Future[list[Document]]] = deque(
+                executor.submit(self.__read_shard, shard, manifest.compression)
+                for _, shard in zip(range(max_workers), shards)
+            )
+            while pending:
+                documents = pending.popleft().result()
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    pending.append(
+                        executor.submit(
+                            self.__read_shard, next_shard, manifest.compression
+                        )
+                    )
+
+                yield from documents
+
+    def __iter__(self) -> Iterator[Document]:
+        return self.iter_documents()
+
+    def __len__(self) -> int:
+        return self.manifest.num_documents
+
+    def __write_shard(
+        self,
+        documents: list[Document],
+        shard_index: int,
+        compression: SnapshotCompression,
+    ) -> SnapshotShard:
+        data = "".join(document.model_dump_json() + "\n" for document in documents)
+        data = data.encode("utf-8")
+        if compression == "gzip":
+            data = gzip.compress(data, compresslevel=6)
+
+        suffix = ".jsonl.gz" if compression == "gzip" else ".jsonl"
+        shard_path = self.snapshot_dir / f"shard-{shard_index:05d}{suffix}"
+        shard_path.write_bytes(data)
+
+        return SnapshotShard(
+            path=shard_path.name,
+            num_documents=len(documents),
+            sha256=hashlib.sha256(data).hexdigest(),
+        )
+
+    def __read_shard(
+        self, shard: SnapshotShard, compression: SnapshotCompression
+    ) -> list[Document]:
+        data = (self.snapshot_dir / shard.path).read_bytes()
+        if hashlib.sha256(data).hexdigest() != shard.sha256:
+            raise ValueError(
+                f"Snapshot shard '{shard.path}' is corrupted: its checksum doesn't match the manifest."
+            )
+
+        if compression == "gzip":
+            data = gzip.decompress(data)
+
+        return [
+            Document.model_validate_json(line)
+            for line in data.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+
+    @staticmethod
+    def __batched(
+        documents: Iterable[Document], batch_size: int
+    ) -> Iterator[list[Document]]:
+        batch: list[Document] = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
@@ -0,0 +1,396 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+import psutil
+from loguru import logger
+from pydantic import BaseModel
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MB = 1024 * 1024
+
+
+class ProfileRecord(BaseModel):
+    """Resources used by a profiled block of code.
+
+    Attributes:
+        name: Name of the profiled block.
+        start_time: Unix timestamp of when the block started.
+        wall_time_seconds: Elapsed wall-clock time.
+        cpu_time_seconds: CPU time of the whole process (all threads) while the
+            block ran.
+        start_rss_mb: Resident memory of the process when the block started.
+        peak_rss_mb: Peak resident memory of the process while the block ran.
+        num_items: Number of items processed by the block.
+        llm_requests: Number of LLM requests sent by the block.
+        llm_prompt_tokens: Number of prompt tokens sent to LLMs.
+        llm_completion_tokens: Number of completion tokens returned by LLMs.
+        pid: ID of the process that ran the block.
+        thread_id: ID of the thread that ran the block.
+    """
+
+    name: str
+    start_time: float
+    wall_time_seconds: float = 0.0
+    cpu_time_seconds: float = 0.0
+    start_rss_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+    num_items: int = 0
+    llm_requests: int = 0
+    llm_prompt_tokens: int = 0
+    llm_completion_tokens: int = 0
+    pid: int = 0
+    thread_id: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        if self.wall_time_seconds <= 0:
+            return 0.0
+
+        return self.num_items / self.wall_time_seconds
+
+    def add_items(self, num_items: int) -> None:
+        self.num_items += num_items
+
+
+class Profiler:
+    """Collects the profile records of a process and exports them.
+
+    While at least one block is being profiled, a background thread samples the
+    resident memory of the process, so peak memory is captured even for
+    allocations freed before the block ends.
+
+    Only the latest `max_records` records are kept, so profiling long-running
+    processes doesn't grow memory unbounded.
+
+    Args:
+        rss_sampling_interval_seconds: Interval between two memory samples.
+        max_records: Maximum number of finished records kept in memory.
+    """
+
+    def __init__(
+        self, rss_sampling_interval_seconds: float = 0.05, max_records: int = 10_000
+    ) -> None:
+        self.rss_sampling_interval_seconds = rss_sampling_interval_seconds
+        self.max_records = max_records
+
+        self.__process = psutil.Process(os.getpid())
+        self.__records: deque[ProfileRecord] = deque(maxlen=max_records)
+        self.__num_recorded = 0
+        self.__active_records: list[ProfileRecord] = []
+        self.__lock = threading.Lock()
+        self.__sampler_stop: threading.Event | None = None
+
+    @property
+    def records(self) -> list[ProfileRecord]:
+        with self.__lock:
+            return list(self.__records)
+
+    @property
+    def num_recorded(self) -> int:
+        """Number of records finished since the last reset, including dropped ones."""
+
+        with self.__lock:
+            return self.__num_recorded
+
+    def records_since(self, num_recorded: int) -> list[ProfileRecord]:
+        """Get the records finished after a given `num_recorded` value.
+
+        Args:
+            num_recorded: Value of `num_recorded` to start from.
+
+        Returns:
+            list[ProfileRecord]: The records still kept, in finishing order.
+        """
+
+        with self.__lock:
+            num_records = min(self.__num_recorded - num_recorded, len(self.__records))
+
+            return list(self.__records)[len(self.__records) - num_records :]
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__records.clear()
+            self.__num_recorded = 0
+
+    def get_rss_mb(self) -> float:
+        return self.__process.memory_info().rss / MB
+
+    def start(self, record: ProfileRecord) -> None:
+        with self.__lock:
+            self.__active_records.append(record)
+            if self.__sampler_stop is None:
+                # Every sampler thread gets its own stop event, so a stopping
+                # sampler can't be revived by a block starting right after.
+                self.__sampler_stop = threading.Event()
+                threading.Thread(
+                    target=self.__sample_rss,
+                    args=(self.__sampler_stop,),
+                    name="profiler-rss-sampler",
+                    daemon=True,
+                ).start()
+
+    def stop(self, record: ProfileRecord) -> None:
+        with self.__lock:
+            self.__active_records.remove(record)
+            self.__records.append(record)
+            self.__num_recorded += 1
+            if not self.__active_records and self.__sampler_stop is not None:
+                # The sampler exits on its own by its next sample, so the
+                # profiled block doesn't wait for it.
+                self.__sampler_stop.set()
+                self.__sampler_stop = None
+
+    def summary(self, records: list[ProfileRecord] | None = None) -> dict[str, dict]:
+        """Aggregate records by name, e.g., to log them as step metadata.
+
+        Args:
+            records: The records to aggregate. Defaults to all the records.
+
+        Returns:
+            dict[str, dict]: Aggregated metrics per record name.
+        """
+
+        records = self.records if records is None else records
+
+        summary: dict[str, dict] = {}
+        for record in records:
+            metrics = summary.setdefault(
+                record.name,
+                {
+                    "calls": 0,
+                    "wall_time_seconds": 0.0,
+                    "cpu_time_seconds": 0.0,
+                    "peak_rss_mb": 0.0,
+                    "num_items": 0,
+                    "llm_requests": 0,
+                    "llm_prompt_tokens": 0,
+                    "llm_completion_tokens": 0,
+                },
+            )
+            metrics["calls"] += 1
+            metrics["wall_time_seconds"] += record.wall_time_seconds
+            metrics["cpu_time_seconds"] += record.cpu_time_seconds
+            metrics["peak_rss_mb"] = max(metrics["peak_rss_mb"], record.peak_rss_mb)
+            metrics["num_items"] += record.num_items
+            metrics["llm_requests"] += record.llm_requests
+            metrics["llm_prompt_tokens"] += record.llm_prompt_tokens
+            metrics["llm_completion_tokens"] += record.llm_completion_tokens
+
+        for metrics in summary.values():
+            metrics["items_per_second"] = (
+                metrics["num_items"] / metrics["wall_time_seconds"]
+                if metrics["wall_time_seconds"] > 0
+                else 0.0
+            )
+            for key in ("wall_time_seconds", "cpu_time_seconds", "peak_rss_mb"):
+                metrics[key] = round(metrics[key], 3)
+            metrics["items_per_second"] = round(metrics["items_per_second"], 3)
+
+        return summary
+
+    def to_chrome_trace(self, records: list[ProfileRecord] | None = None) -> dict:
+        """Convert records to the Chrome trace event format.
+
+        The output can be opened in `chrome://tracing` or https://ui.perfetto.dev
+        to inspect nested blocks as a flame graph.
+
+        Args:
+            records: The records to convert. Defaults to all the records.
+
+        Returns:
+            dict: The trace, as complete ("X") events in microseconds.
+        """
+
+        records = self.records if records is None else records
+
+        return {
+            "traceEvents": [
+                {
+                    "name": record.name,
+                    "cat": "profile",
+                    "ph": "X",
+                    "ts": int(record.start_time * 1e6),
+                    "dur": int(record.wall_time_seconds * 1e6),
+                    "pid": record.pid,
+                    "tid": record.thread_id,
+                    "args": {
+                        **record.model_dump(
+                            exclude={"name", "start_time", "pid", "thread_id"}
+                        ),
+                        "items_per_second": record.items_per_second,
+                    },
+                }
+                for record in records
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(
+        self, output_path: Path, records: list[ProfileRecord] | None = None
+    ) -> Path:
+        """Write the records as a Chrome trace JSON file.
+
+        Args:
+            output_path: Path of the output JSON file.
+            records: The records to write. Defaults to all the records.
+
+        Returns:
+            Path: The output path.
+        """
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(
+            json.dumps(self.to_chrome_trace(records), indent=2), encoding="utf-8"
+        )
+
+        return output_path
+
+    def __sample_rss(self, stop: threading.Event) -> None:
+        while not stop.wait(self.rss_sampling_interval_seconds):
+            rss_mb = self.get_rss_mb()
+            with self.__lock:
+                for record in self.__active_records:
+                    record.peak_rss_mb = max(record.peak_rss_mb, rss_mb)
+
+
+profiler = Profiler()
+
+_active_records: contextvars.ContextVar[tuple[ProfileRecord, ...]] = (
+    contextvars.ContextVar("active_profile_records", default=())
+)
+
+
+@contextmanager
+def profile(name: str, num_items: int = 0) -> Iterator[ProfileRecord]:
+    """Profile a block of code.
+
+    Blocks can be nested. LLM usage recorded with `record_llm_usage` is attributed
+    to all the enclosing blocks of the current thread or asyncio task.
+
+    Args:
+        name: Name of the block, used to aggregate the records.
+        num_items: Number of items processed by the block. Can be increased while
+            the block runs through `ProfileRecord.add_items`.
+
+    Yields:
+        ProfileRecord: The record of the block, filled when the block exits.
+    """
+
+    rss_mb = profiler.get_rss_mb()
+    record = ProfileRecord(
+        name=name,
+        start_time=time.time(),
+        start_rss_mb=rss_mb,
+        peak_rss_mb=rss_mb,
+        num_items=num_items,
+        pid=os.getpid(),
+        thread_id=threading.get_ident(),
+    )
+    token = _active_records.set((*_active_records.get(), record))
+    profiler.start(record)
+    record.start_time = time.time()
+    start_wall_time = time.perf_counter()
+    start_cpu_time = time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_time_seconds = time.perf_counter() - start_wall_time
+        record.cpu_time_seconds = time.process_time() - start_cpu_time
+        record.peak_rss_mb = max(record.peak_rss_mb, profiler.get_rss_mb())
+        _active_records.reset(token)
+        profiler.stop(record)
+
+        logger.debug(
+            f"Profiled '{name}': "
+            f"wall time {record.wall_time_seconds:.2f}s, "
+            f"CPU time {record.cpu_time_seconds:.2f}s, "
+            f"peak memory {record.peak_rss_mb:.0f} MB "
+            f"(started at {record.start_rss_mb:.0f} MB), "
+            f"{record.num_items} items ({record.items_per_second:.2f} items/s), "
+            f"{record.llm_requests} LLM requests"
+        )
+
+
+def profiled(
+    name: str | None = None, count_items: Callable[..., int] | None = None
+) -> Callable[[F], F]:
+    """Decorator profiling every call of a sync or async function.
+
+    Args:
+        name: Name of the records. Defaults to the function's qualified name.
+        count_items: Optional function called with the decorated function's
+            arguments, returning the number of processed items.
+
+    Returns:
+        Callable[[F], F]: The decorator.
+    """
+
+    def decorator(func: F) -> F:
+        record_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                num_items = count_items(*args, **kwargs) if count_items else 0
+                with profile(record_name, num_items=num_items):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            num_items = count_items(*args, **kwargs) if count_items else 0
+            with profile(record_name, num_items=num_items):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def record_llm_usage(response: Any) -> None:
+    """Attribute an LLM response's request and token usage to the active blocks.
+
+    Works with any OpenAI-compatible response exposing a `usage` attribute, such
+    as the ones returned by LiteLLM and the OpenAI client.
+
+    Args:
+        response: The LLM response.
+    """
+
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+
+    for record in _active_records.get():
+        record.llm_requests += 1
+        record.llm_prompt_tokens += prompt_tokens
+        record.llm_completion_tokens += completion_tokens
+
+
+def run_in_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Bind a function to the current profiling context.
+
+    Useful when submitting work to thread pools, which don't propagate context
+    variables, so LLM usage in the workers is attributed to the caller's blocks.
+    """
+
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
@@ -1,5 +1,12 @@
+import asyncio
+import functools
+import hashlib
+import hmac
 import random
 import string
+import threading
+import time
+from collections import OrderedDict
 
 import tiktoken
 
@@ -36,9 +43,74 @@ def generate_random_hex(length: int) -> str:
     return "".join(random.choice(hex_chars) for _ in range(length))
 
 
+def obfuscate_id(original_id: str, key: str = "") -> str:
+    """Replace an ID with a keyed hash of the same length.
+
+    Unlike a random ID, the same ID is always replaced by the same value, so files
+    named after obfuscated IDs don't change between runs. Without the key, the
+    obfuscated ID can't be linked back to the original one.
+
+    Args:
+        original_id: The ID to obfuscate, of at most 64 characters.
+        key: Secret key of the hash.
+
+    Returns:
+        str: Hex string of the same length as the original ID.
+    """
+
+    digest = hmac.new(
+        key.encode("utf-8"), original_id.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+    return digest[: len(original_id)]
+
+
+def get_source_id(source_key: str) -> str:
+    """Compute the stable ID of a document's source, such as a Notion page ID or a
+    crawled URL, without exposing the key itself.
+
+    Args:
+        source_key: The key identifying the source.
+
+    Returns:
+        str: A hex string of 32 characters, always the same for the same key.
+    """
+
+    return hashlib.sha256(source_key.encode("utf-8")).hexdigest()[:32]
+
+
+DEFAULT_ENCODING_NAME = "cl100k_base"
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model_id: str | None = None) -> tiktoken.Encoding:
+    """Get the cached tiktoken encoding of a model.
+
+    Args:
+        model_id: The model name used to determine the encoding. If None or
+            unknown, falls back to cl100k_base (used by gpt-4, gpt-3.5-turbo and
+            text-embedding-ada-002).
+
+    Returns:
+        tiktoken.Encoding: The encoding, shared between all the callers.
+    """
+
+    if model_id is None:
+        return tiktoken.get_encoding(DEFAULT_ENCODING_NAME)
+
+    try:
+        return tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING_NAME)
+
+
 def clip_tokens(text: str, max_tokens: int, model_id: str) -> str:
     """Clip the text to a maximum number of tokens using the tiktoken tokenizer.
 
+    Instead of encoding the whole text, growing prefixes of the text are encoded
+    until they contain enough tokens, so long documents are only partially
+    tokenized. Special tokens are encoded as plain text.
+
     Args:
         text: The input text to clip.
         max_tokens: Maximum number of tokens to keep (default: 8192).
@@ -48,14 +120,117 @@ def clip_tokens(text: str, max_tokens: int, model_id: str) -> str:
         str: The clipped text that fits within the token limit.
     """
 
-    try:
-        encoding = tiktoken.encoding_for_model(model_id)
-    except KeyError:
-        # Fallback to cl100k_base encoding (used by gpt-4, gpt-3.5-turbo, text-embedding-ada-002)
-        encoding = tiktoken.get_encoding("cl100k_base")
+    # Every token spans at least one byte, so short texts can't exceed the limit.
+    if len(text) <= max_tokens and len(text.encode("utf-8")) <= max_tokens:
+        return text
+
+    encoding = get_encoding(model_id)
+
+    # Tokens near the end of a prefix can differ from the ones of the full text,
+    # so the prefix must hold a margin of extra tokens before it is trusted.
+    margin_tokens = 64
+    window = max(max_tokens * 4, 1024)
+    while True:
+        is_full_text = window >= len(text)
+        tokens = encoding.encode_ordinary(text if is_full_text else text[:window])
+        if is_full_text or len(tokens) > max_tokens + margin_tokens:
+            break
+
+        window *= 2
 
-    tokens = encoding.encode(text)
     if len(tokens) <= max_tokens:
         return text
 
     return encoding.decode(tokens[:max_tokens])
+
+
+class TokenCountCache:
+    """Thread-safe LRU cache of token counts.
+
+    Entries are keyed by a digest of the text instead of the text itself, so the
+    cache holds a few dozen bytes per entry whatever the length of the texts.
+
+    Args:
+        max_size: Maximum number of cached counts.
+    """
+
+    def __init__(self, max_size: int = 2**16) -> None:
+        self.max_size = max_size
+
+        self.__counts: OrderedDict[tuple[bytes, str], int] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def count_tokens(self, text: str, encoding_name: str) -> int:
+        key = (
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(),
+            encoding_name,
+        )
+        with self.__lock:
+            num_tokens = self.__counts.get(key)
+            if num_tokens is not None:
+                self.__counts.move_to_end(key)
+
+                return num_tokens
+
+        num_tokens = len(tiktoken.get_encoding(encoding_name).encode_ordinary(text))
+        with self.__lock:
+            self.__counts[key] = num_tokens
+            while len(self.__counts) > self.max_size:
+                self.__counts.popitem(last=False)
+
+        return num_tokens
+
+
+__token_count_cache = TokenCountCache()
+
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING_NAME) -> int:
+    """Count the tokens of a text, memoizing the counts of short texts.
+
+    Text splitters measure the same pieces of text many times while merging them
+    into chunks, so their counts are cached. Long texts, measured once, aren't
+    cached, as hashing them would be wasted.
+
+    Args:
+        text: The text to measure.
+        encoding_name: Name of the tiktoken encoding. Defaults to cl100k_base.
+
+    Returns:
+        int: The number of tokens.
+    """
+
+    if len(text) > 8192:
+        return len(tiktoken.get_encoding(encoding_name).encode_ordinary(text))
+
+    return __token_count_cache.count_tokens(text, encoding_name)
+
+
+class AsyncRateLimiter:
+    """Spaces out requests so they never exceed an average rate.
+
+    Attributes:
+        requests_per_second: Maximum average number of requests per second.
+    """
+
+    def __init__(self, requests_per_second: float = 3.0) -> None:
+        self.requests_per_second = requests_per_second
+
+        self.__interval = 1.0 / requests_per_second
+        self.__next_request_at = 0.0
+        self.__lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the next request is allowed."""
+
+        async with self.__lock:
+            now = time.monotonic()
+            wait_seconds = self.__next_request_at - now
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+
+            self.__next_request_at = max(now, self.__next_request_at) + self.__interval
+
+    def delay(self, seconds: float) -> None:
+        """Push back all the following requests, e.g., after a 429 response."""
+
+        self.__next_request_at = max(self.__next_request_at, time.monotonic() + seconds)
@@ -1,7 +1,9 @@
+from .commit_notion_sync_state import commit_notion_sync_state
 from .extract_notion_documents import extract_notion_documents
 from .extract_notion_documents_metadata import extract_notion_documents_metadata
 
 __all__ = [
+    "commit_notion_sync_state",
     "extract_notion_documents",
     "extract_notion_documents_metadata",
 ]
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from second_brain_offline.infrastructure.notion import NotionSyncState
+from steps.profiling import profile_step
+
+
+@step(enable_cache=False)
+@profile_step
+def commit_notion_sync_state(
+    database_id: str,
+    sync_state_dir: Path,
+    delta_dir: Path,
+) -> Annotated[str, "sync_state"]:
+    """Commit the pending incremental sync state of a Notion database.
+
+    Must run after the changed documents are saved, so a failed run is retried
+    from the previous watermark. The deleted page IDs are written to
+    `delta_dir/deleted.txt` for the downstream pipelines.
+
+    Args:
+        database_id: The ID of the synced Notion database.
+        sync_state_dir: Directory of the incremental sync state.
+        delta_dir: Directory where the delta documents were saved.
+
+    Returns:
+        str: The committed watermark.
+    """
+
+    sync_state = NotionSyncState.load_pending(sync_state_dir, database_id)
+    sync_state.write_deletions(delta_dir)
+    sync_state.commit(sync_state_dir)
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="sync_state",
+        metadata={
+            "database_id": database_id,
+            "watermark": sync_state.watermark,
+            "len_pages": len(sync_state.pages),
+            "len_deleted_pages": len(sync_state.deleted_page_ids),
+        },
+    )
+
+    return sync_state.watermark or ""
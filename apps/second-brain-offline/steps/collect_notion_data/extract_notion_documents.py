@@ -3,25 +3,28 @@ from zenml import get_step_context, step
 
 from second_brain_offline.domain import Document, DocumentMetadata
 from second_brain_offline.infrastructure.notion import NotionDocumentClient
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def extract_notion_documents(
     documents_metadata: list[DocumentMetadata],
+    max_concurrent_requests: int = 10,
 ) -> Annotated[list[Document], "notion_documents"]:
     """Extract content from multiple Notion documents.
 
     Args:
         documents_metadata: List of document metadata to extract content from.
+        max_concurrent_requests: Maximum number of concurrent requests to the
+            Notion API. Defaults to 10.
 
     Returns:
         list[Document]: List of documents with their extracted content.
     """
 
-    client = NotionDocumentClient()
-    documents = []
-    for document_metadata in documents_metadata:
-        documents.append(client.extract_document(document_metadata))
+    client = NotionDocumentClient(max_concurrent_requests=max_concurrent_requests)
+    documents = client.extract_documents(documents_metadata)
 
     step_context = get_step_context()
     step_context.add_output_metadata(
@@ -1,26 +1,59 @@
+from pathlib import Path
+
 from loguru import logger
 from typing_extensions import Annotated
 from zenml import get_step_context, step
 
 from second_brain_offline.domain import DocumentMetadata
-from second_brain_offline.infrastructure.notion import NotionDatabaseClient
+from second_brain_offline.infrastructure.notion import (
+    NotionDatabaseClient,
+    NotionSyncState,
+)
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def extract_notion_documents_metadata(
     database_id: str,
+    sync_state_dir: Path | None = None,
 ) -> Annotated[list[DocumentMetadata], "notion_documents_metadata"]:
     """Extract metadata from Notion documents in a specified database.
 
     Args:
         database_id: The ID of the Notion database to query.
+        sync_state_dir: Directory of the incremental sync state. If set, only the
+            pages edited since the last committed sync are returned, deleted pages
+            are detected by diffing against the page manifest and the new state is
+            saved as pending until `commit_notion_sync_state` runs. Defaults to
+            None, which returns all the pages.
 
     Returns:
         A list of DocumentMetadata objects containing the extracted information.
     """
 
     client = NotionDatabaseClient()
-    documents_metadata = client.query_notion_database(database_id)
+
+    step_metadata = {"database_id": database_id}
+    if sync_state_dir is not None:
+        sync_state = NotionSyncState.load(sync_state_dir, database_id)
+        edited_documents_metadata = client.query_notion_database(
+            database_id, edited_after=sync_state.watermark
+        )
+        documents_metadata, new_sync_state = sync_state.diff(
+            edited_documents_metadata, all_page_ids=client.list_page_ids(database_id)
+        )
+        new_sync_state.save_pending(sync_state_dir)
+
+        step_metadata.update(
+            {
+                "watermark": sync_state.watermark,
+                "new_watermark": new_sync_state.watermark,
+                "len_deleted_documents": len(new_sync_state.deleted_page_ids),
+            }
+        )
+    else:
+        documents_metadata = client.query_notion_database(database_id)
 
     logger.info(
         f"Extracted {len(documents_metadata)} documents metadata from {database_id}"
@@ -30,7 +63,7 @@ def extract_notion_documents_metadata(
     step_context.add_output_metadata(
         output_name="notion_documents_metadata",
         metadata={
-            "database_id": database_id,
+            **step_metadata,
             "len_documents_metadata": len(documents_metadata),
         },
     )
@@ -1,6 +1,7 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Generator
 
+import numpy as np
 from langchain_core.documents import Document as LangChainDocument
 from langchain_mongodb.retrievers import (
     MongoDBAtlasParentDocumentRetriever,
@@ -12,7 +13,10 @@ from zenml.steps import step
 
 from second_brain_offline.application.rag import (
     EmbeddingModelType,
+    EmbeddingTransform,
+    EmbeddingTransformMethod,
     SummarizationType,
+    get_embedding_model,
     get_retriever,
     get_splitter,
 )
@@ -22,9 +26,12 @@ from second_brain_offline.infrastructure.mongo import (
     MongoDBIndex,
     MongoDBService,
 )
+from second_brain_offline.profiling import profiled, run_in_context
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def chunk_embed_load(
     documents: list[Document],
     collection_name: str,
@@ -40,6 +47,10 @@ def chunk_embed_load(
     contextual_agent_max_characters: int | None = None,
     mock: bool = False,
     device: str = "cpu",
+    embedding_transform_method: EmbeddingTransformMethod = "none",
+    embedding_transform_dim: int | None = None,
+    embedding_transform_dtype: str = "float32",
+    embedding_transform_sample_size: int = 1000,
 ) -> None:
     """Process documents by chunking, embedding, and loading into MongoDB.
 
@@ -58,13 +69,38 @@ def chunk_embed_load(
         contextual_agent_max_characters: Maximum characters for contextual summarization. Defaults to None.
         mock: Whether to use mock processing. Defaults to False.
         device: Device to run embeddings on ('cpu' or 'cuda'). Defaults to 'cpu'.
+        embedding_transform_method: Transform reducing the stored embeddings
+            ("none", "matryoshka" or "pca"). Defaults to "none".
+        embedding_transform_dim: Dimension of the transformed embeddings. Required
+            by "matryoshka" and "pca". Defaults to None.
+        embedding_transform_dtype: Precision of the transformed embeddings
+            ("float32" or "float16"). Defaults to "float32".
+        embedding_transform_sample_size: Number of chunks embedded to fit the PCA.
+            Defaults to 1000.
     """
 
+    embedding_transform = EmbeddingTransform(
+        method=embedding_transform_method,
+        output_dim=embedding_transform_dim,
+        dtype=embedding_transform_dtype,
+    )
+    if not embedding_transform.is_fitted:
+        embedding_transform = fit_embedding_transform(
+            embedding_transform,
+            documents,
+            embedding_model_id=embedding_model_id,
+            embedding_model_type=embedding_model_type,
+            chunk_size=chunk_size,
+            sample_size=embedding_transform_sample_size,
+            device=device,
+        )
+
     retriever = get_retriever(
         embedding_model_id=embedding_model_id,
         embedding_model_type=embedding_model_type,
         retriever_type=retriever_type,
         device=device,
+        embedding_transform=embedding_transform,
     )
     splitter = get_splitter(
         chunk_size=chunk_size,
@@ -100,9 +136,65 @@ def chunk_embed_load(
             mongodb_client=mongodb_client,
         )
         index.create(
-            embedding_dim=embedding_model_dim,
+            embedding_dim=embedding_transform.get_output_dim(embedding_model_dim),
             is_hybrid=retriever_type == "contextual",
         )
+        index.save_metadata(
+            {
+                "retriever_type": retriever_type,
+                "embedding_model_id": embedding_model_id,
+                "embedding_model_type": embedding_model_type,
+                "embedding_model_dim": embedding_model_dim,
+                "embedding_transform": embedding_transform.model_dump(),
+            }
+        )
+
+
+def fit_embedding_transform(
+    embedding_transform: EmbeddingTransform,
+    documents: list[Document],
+    embedding_model_id: str,
+    embedding_model_type: EmbeddingModelType,
+    chunk_size: int,
+    sample_size: int,
+    device: str = "cpu",
+) -> EmbeddingTransform:
+    """Fit an embedding transform on the embeddings of a sample of chunks.
+
+    The sample is chunked with a plain token splitter, so no summarization
+    requests are sent to fit the transform.
+
+    Args:
+        embedding_transform: The transform to fit.
+        documents: Documents the sample of chunks is drawn from.
+        embedding_model_id: Identifier for the embedding model.
+        embedding_model_type: Type of embedding model to use.
+        chunk_size: Size of text chunks for splitting documents.
+        sample_size: Maximum number of chunks to embed.
+        device: Device to run embeddings on. Defaults to 'cpu'.
+
+    Returns:
+        EmbeddingTransform: The fitted transform.
+    """
+
+    splitter = get_splitter(chunk_size=chunk_size)
+    sample_chunks = []
+    for document in documents:
+        sample_chunks.extend(splitter.split_text(document.content))
+        if len(sample_chunks) >= sample_size:
+            break
+    sample_chunks = sample_chunks[:sample_size]
+
+    logger.info(
+        f"Fitting '{embedding_transform.method}' embedding transform on {len(sample_chunks)} chunks."
+    )
+    embedding_model = get_embedding_model(
+        embedding_model_id, embedding_model_type, device
+    )
+
+    return embedding_transform.fit(
+        np.asarray(embedding_model.embed_documents(sample_chunks))
+    )
 
 
 def process_docs(
@@ -130,7 +222,7 @@ def process_docs(
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = [
-            executor.submit(process_batch, retriever, batch, splitter)
+            executor.submit(run_in_context(process_batch), retriever, batch, splitter)
             for batch in batches
         ]
 
@@ -159,6 +251,7 @@ def get_batches(
         yield docs[i : i + batch_size]
 
 
+@profiled(count_items=lambda retriever, batch, splitter: len(batch))
 def process_batch(
     retriever: Any,
     batch: list[LangChainDocument],
@@ -3,9 +3,11 @@ from zenml import get_step_context
 from zenml.steps import step
 
 from second_brain_offline.domain import Document
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def filter_by_quality(
     documents: list[Document],
     content_quality_score_threshold: float,
@@ -1,4 +1,6 @@
 from .add_quality_score import add_quality_score
 from .crawl import crawl
+from .deduplicate import deduplicate
+from .remove_outdated_documents import remove_outdated_documents
 
-__all__ = ["crawl", "add_quality_score"]
+__all__ = ["crawl", "deduplicate", "add_quality_score", "remove_outdated_documents"]
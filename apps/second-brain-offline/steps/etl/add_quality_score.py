@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from loguru import logger
 from typing_extensions import Annotated
 from zenml import get_step_context, step
@@ -7,20 +9,27 @@ from second_brain_offline.application.agents.quality import (
     QualityScoreAgent,
 )
 from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.llm import OpenAIBatchClient
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def add_quality_score(
     documents: list[Document],
     model_id: str = "gpt-4o-mini",
     mock: bool = False,
     max_workers: int = 10,
+    use_batch_api: bool = False,
+    batch_dir: Path = Path("data/batches"),
 ) -> Annotated[list[Document], "scored_documents"]:
     """Adds quality scores to documents using heuristic and model-based scoring agents.
 
     This function processes documents in two stages:
-    1. Applies heuristic-based quality scoring
-    2. Uses a model-based quality agent for documents that weren't scored by heuristics
+    1. Applies vectorized heuristic-based quality scoring to confidently score the
+       obvious cases
+    2. Escalates the documents within the heuristics' uncertain band to a
+       model-based quality agent
 
     Args:
         documents: List of documents to evaluate for quality
@@ -30,6 +39,10 @@ def add_quality_score(
             Defaults to False
         max_workers: Maximum number of concurrent quality check operations.
             Defaults to 10
+        use_batch_api: If True, the model-based scoring is submitted as a resumable
+            offline job through the OpenAI Batch API. Defaults to False
+        batch_dir: Directory where the batch files and state are persisted.
+            Defaults to "data/batches"
 
     Returns:
         list[Document]: Documents enhanced with quality scores, annotated as
@@ -37,7 +50,8 @@ def add_quality_score(
 
     Note:
         The function adds metadata to the step context including the total number
-        of documents and how many received quality scores.
+        of documents, how many received quality scores and the rate of documents
+        escalated to the model-based quality agent.
     """
     heuristic_quality_agent = HeuristicQualityAgent()
     scored_documents: list[Document] = heuristic_quality_agent(documents)
@@ -50,7 +64,11 @@ def add_quality_score(
     ]
 
     quality_agent = QualityScoreAgent(
-        model_id=model_id, mock=mock, max_concurrent_requests=max_workers
+        model_id=model_id,
+        mock=mock,
+        max_concurrent_requests=max_workers,
+        batch_client=OpenAIBatchClient() if use_batch_api else None,
+        batch_dir=batch_dir,
     )
     scored_documents_with_agents: list[Document] = quality_agent(
         documents_without_scores
@@ -64,8 +82,12 @@ def add_quality_score(
     len_documents_with_scores = len(
         [doc for doc in scored_documents if doc.content_quality_score is not None]
     )
+    escalation_rate = (
+        len(documents_without_scores) / len_documents if documents else 0.0
+    )
     logger.info(f"Total documents: {len_documents}")
     logger.info(f"Total documents that were scored: {len_documents_with_scores}")
+    logger.info(f"Documents escalated to the LLM quality agent: {escalation_rate:.2%}")
 
     step_context = get_step_context()
     step_context.add_output_metadata(
@@ -77,6 +99,8 @@ def add_quality_score(
                 scored_documents_with_heuristics
             ),
             "len_documents_scored_with_agents": len(scored_documents_with_agents),
+            "escalation_rate": escalation_rate,
+            "heuristics": heuristic_quality_agent.stats,
         },
     )
 
@@ -1,25 +1,44 @@
+from pathlib import Path
+
 from loguru import logger
 from typing_extensions import Annotated
 from zenml import get_step_context, step
 
 from second_brain_offline.application.crawlers import Crawl4AICrawler
 from second_brain_offline.domain import Document
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def crawl(
-    documents: list[Document], max_workers: int = 10
+    documents: list[Document],
+    max_workers: int = 10,
+    max_workers_per_domain: int = 2,
+    domain_delay_seconds: float = 0.5,
+    cache_dir: Path | None = None,
 ) -> Annotated[list[Document], "crawled_documents"]:
     """Crawl the child URLs of each document.
 
     Args:
         documents: List of documents to crawl and extract child URLs from.
         max_workers: Maximum number of concurrent requests. Defaults to 10.
+        max_workers_per_domain: Maximum number of concurrent requests to the same
+            domain. Defaults to 2.
+        domain_delay_seconds: Minimum delay between two requests to the same
+            domain. Defaults to 0.5.
+        cache_dir: Directory of the persistent crawl cache, used to skip unchanged
+            pages on re-crawls. Defaults to None, which disables caching.
 
     Returns:
         list[Document]: List containing original documents plus newly crawled child documents.
     """
-    crawler = Crawl4AICrawler(max_concurrent_requests=max_workers)
+    crawler = Crawl4AICrawler(
+        max_concurrent_requests=max_workers,
+        max_concurrent_requests_per_domain=max_workers_per_domain,
+        domain_delay_seconds=domain_delay_seconds,
+        cache_dir=cache_dir,
+    )
     child_pages = crawler(documents)
 
     augmented_pages = documents.copy()
@@ -39,6 +58,7 @@ def crawl(
             "len_documents_before_crawling": len(documents),
             "len_documents_after_crawling": len(augmented_pages),
             "len_documents_new": len(augmented_pages) - len(documents),
+            "crawler": crawler.stats,
         },
     )
 
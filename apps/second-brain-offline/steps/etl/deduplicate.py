@@ -0,0 +1,55 @@
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from second_brain_offline.application.deduplication import MinHashDeduplicator
+from second_brain_offline.domain import Document
+from steps.profiling import profile_step
+
+
+@step
+@profile_step
+def deduplicate(
+    documents: list[Document],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    num_bands: int = 16,
+    shingle_size: int = 5,
+) -> Annotated[list[Document], "deduplicated_documents"]:
+    """Removes near-duplicate documents, such as mirror pages or crawled copies of
+    the same article, before they are scored, summarized and embedded.
+
+    Near-duplicates are found with MinHash signatures over word shingles and LSH
+    banding. From every cluster of near-duplicates, only the document with the
+    highest quality score (or the longest content, if not scored yet) is kept.
+
+    Args:
+        documents: List of documents to deduplicate
+        threshold: Minimum estimated Jaccard similarity between two documents to
+            consider them near-duplicates. Defaults to 0.8
+        num_perm: Number of hash functions of the MinHash signatures.
+            Defaults to 128
+        num_bands: Number of LSH bands. Must divide `num_perm`. Defaults to 16
+        shingle_size: Number of words per shingle. Defaults to 5
+
+    Returns:
+        list[Document]: The deduplicated documents, annotated as
+            "deduplicated_documents" for pipeline metadata tracking
+    """
+
+    assert 0 <= threshold <= 1, "Deduplication threshold must be between 0 and 1"
+
+    deduplicator = MinHashDeduplicator(
+        threshold=threshold,
+        num_perm=num_perm,
+        num_bands=num_bands,
+        shingle_size=shingle_size,
+    )
+    deduplicated_documents = deduplicator(documents)
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="deduplicated_documents",
+        metadata=deduplicator.stats,
+    )
+
+    return deduplicated_documents
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from second_brain_offline import utils
+from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.mongo import MongoDBService
+from second_brain_offline.infrastructure.notion import NotionSyncState
+from steps.profiling import profile_step
+
+
+@step(enable_cache=False)
+@profile_step
+def remove_outdated_documents(
+    documents: list[Document],
+    delta_dir: Path,
+    collection_name: str,
+    rag_collection_name: str | None = None,
+) -> Annotated[int, "len_removed_documents"]:
+    """Remove the documents made outdated by an incremental Notion sync.
+
+    The pages deleted from Notion (listed in the `deleted.txt` files of the delta)
+    are removed, together with the crawled children of both the deleted and the
+    changed pages, as the changed pages are re-crawled. Documents are matched by
+    their stable source ID, as their `id` changes on every sync. Must run before
+    the new versions of the documents are ingested.
+
+    Args:
+        documents: The new or changed Notion pages of the delta.
+        delta_dir: Directory of the incremental Notion sync delta.
+        collection_name: Name of the MongoDB collection of the documents.
+        rag_collection_name: Name of the MongoDB collection of the RAG index, whose
+            chunks of the removed documents are also removed. Defaults to None,
+            which leaves the index untouched until it's recomputed.
+
+    Returns:
+        int: Number of documents removed from `collection_name`.
+    """
+
+    deleted_source_ids = [
+        utils.get_source_id(page_id)
+        for page_id in NotionSyncState.read_deletions(delta_dir)
+    ]
+    changed_source_ids = [
+        document.metadata.source_id
+        for document in documents
+        if document.metadata.source_id is not None
+    ]
+    query = {
+        "$or": [
+            {"metadata.source_id": {"$in": deleted_source_ids}},
+            {
+                "parent_metadata.source_id": {
+                    "$in": deleted_source_ids + changed_source_ids
+                }
+            },
+        ]
+    }
+
+    with MongoDBService(model=Document, collection_name=collection_name) as service:
+        removed_source_ids = service.get_distinct_values("metadata.source_id", query)
+        num_removed = service.delete_documents(query)
+    logger.info(
+        f"Removed {num_removed} outdated documents from MongoDB collection '{collection_name}' "
+        f"({len(deleted_source_ids)} deleted Notion pages, {len(changed_source_ids)} changed Notion pages)."
+    )
+
+    num_removed_chunks = 0
+    if rag_collection_name is not None and removed_source_ids:
+        with MongoDBService(
+            model=Document, collection_name=rag_collection_name
+        ) as service:
+            # Depending on the retriever, the metadata of the chunks is stored at
+            # the top level or nested.
+            num_removed_chunks = service.delete_documents(
+                {
+                    "$or": [
+                        {"source_id": {"$in": removed_source_ids}},
+                        {"metadata.source_id": {"$in": removed_source_ids}},
+                    ]
+                }
+            )
+        logger.info(
+            f"Removed {num_removed_chunks} chunks of outdated documents from the RAG index '{rag_collection_name}'."
+        )
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="len_removed_documents",
+        metadata={
+            "len_deleted_pages": len(deleted_source_ids),
+            "len_changed_pages": len(changed_source_ids),
+            "len_removed_documents": num_removed,
+            "len_removed_chunks": num_removed_chunks,
+        },
+    )
+
+    return num_removed
@@ -1,4 +1,11 @@
+from .compute_corpus_statistics import compute_corpus_statistics
 from .create_histograms import create_histograms
 from .generate_summary_dataset import generate_summary_dataset
+from .write_summary_dataset import write_summary_dataset
 
-__all__ = ["generate_summary_dataset", "create_histograms"]
+__all__ = [
+    "generate_summary_dataset",
+    "write_summary_dataset",
+    "compute_corpus_statistics",
+    "create_histograms",
+]
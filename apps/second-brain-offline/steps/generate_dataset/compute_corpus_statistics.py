@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from second_brain_offline.application.dataset import CorpusStatistics
+from second_brain_offline.application.deduplication import MinHashDeduplicator
+from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.mongo import MongoDBService
+from steps.profiling import profile_step
+
+
+@step
+@profile_step
+def compute_corpus_statistics(
+    collection_name: str,
+    limit: int = 0,
+    output_dir: Path = Path("data/statistics"),
+    tokenizer_model_id: str | None = "gpt-4o-mini",
+    near_duplicate_threshold: float | None = 0.8,
+    batch_size: int = 10_000,
+) -> Annotated[dict, "corpus_statistics"]:
+    """Compute machine-readable data-quality statistics of a MongoDB collection.
+
+    The documents are streamed from the collection with a cursor, so the whole
+    collection is never loaded in memory. The corpus-level statistics (length and
+    token quantiles, quality score histogram, exact and near-duplicate ratios and
+    per-source counts) are returned and logged as output metadata, while the
+    per-document statistics are written to `output_dir/documents.parquet`.
+
+    Args:
+        collection_name: Name of the MongoDB collection to profile.
+        limit: Maximum number of documents to profile. 0 means no limit.
+        output_dir: Directory where the Parquet file is written.
+        tokenizer_model_id: Model whose tokenizer counts the tokens. If None,
+            token counts are skipped.
+        near_duplicate_threshold: Minimum estimated Jaccard similarity between two
+            documents to count them as near-duplicates. If None, near-duplicates
+            are not counted.
+        batch_size: Number of documents fetched and processed per batch.
+
+    Returns:
+        dict: The corpus-level statistics.
+    """
+
+    deduplicator = (
+        MinHashDeduplicator(threshold=near_duplicate_threshold)
+        if near_duplicate_threshold is not None
+        else None
+    )
+    parquet_path = output_dir / "documents.parquet"
+    with MongoDBService(model=Document, collection_name=collection_name) as service:
+        statistics = CorpusStatistics(
+            batch_size=batch_size,
+            tokenizer_model_id=tokenizer_model_id,
+            deduplicator=deduplicator,
+        ).compute(
+            service.iter_documents(batch_size=batch_size, limit=limit),
+            parquet_path=parquet_path,
+        )
+    logger.info(f"Wrote the per-document statistics to '{parquet_path}'")
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="corpus_statistics",
+        metadata={
+            **{key: value for key, value in statistics.items() if value is not None},
+            "parquet_path": str(parquet_path),
+        },
+    )
+
+    return statistics
@@ -1,14 +1,17 @@
 from io import BytesIO
 
 import matplotlib.pyplot as plt
+import numpy as np
 from PIL import Image
 from typing_extensions import Annotated
 from zenml import ArtifactConfig, step
 
 from second_brain_offline.domain import Document
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def create_histograms(
     documents: list[Document],
 ) -> Annotated[Image.Image, ArtifactConfig(name="histogram_chart")]:
@@ -22,12 +25,17 @@ def create_histograms(
     """
 
     # Extract content lengths and quality scores
-    content_lengths = [len(doc.content) for doc in documents]
-    quality_scores = [
-        doc.content_quality_score
-        for doc in documents
-        if doc.content_quality_score is not None
-    ]
+    content_lengths = np.fromiter(
+        (len(doc.content) for doc in documents), dtype=np.int64, count=len(documents)
+    )
+    quality_scores = np.fromiter(
+        (
+            doc.content_quality_score
+            for doc in documents
+            if doc.content_quality_score is not None
+        ),
+        dtype=np.float32,
+    )
 
     # Create a figure with two subplots with a light background style
     plt.style.use("default")
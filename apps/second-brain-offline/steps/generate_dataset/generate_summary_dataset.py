@@ -1,11 +1,16 @@
+from pathlib import Path
+
 from typing_extensions import Annotated
 from zenml import step
 
 from second_brain_offline.application.dataset import SummarizationDatasetGenerator
 from second_brain_offline.domain import Document, InstructDataset
+from second_brain_offline.infrastructure.llm import OpenAIBatchClient
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def generate_summary_dataset(
     documents: list[Document],
     summarization_model: str,
@@ -17,6 +22,8 @@ def generate_summary_dataset(
     max_workers: int = 10,
     mock: bool = False,
     summarization_max_characters: int = 256,
+    use_batch_api: bool = False,
+    batch_dir: Path = Path("data/batches"),
 ) -> Annotated[InstructDataset, "summary_dataset"]:
     dataset_generator = SummarizationDatasetGenerator(
         summarization_model=summarization_model,
@@ -28,6 +35,8 @@ def generate_summary_dataset(
         min_document_length=min_document_characters,
         min_quality_score=min_quality_score,
         augmentation_loops=augmentation_loops,
+        batch_client=OpenAIBatchClient() if use_batch_api else None,
+        batch_dir=batch_dir,
     )
     dataset = dataset_generator.generate(documents=documents)
 
@@ -0,0 +1,72 @@
+import shutil
+from pathlib import Path
+
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from second_brain_offline.application.dataset import SummarizationDatasetGenerator
+from second_brain_offline.domain import Document
+from second_brain_offline.domain.dataset import ShardFormat
+from second_brain_offline.infrastructure.llm import OpenAIBatchClient
+from steps.profiling import profile_step
+
+
+@step
+@profile_step
+def write_summary_dataset(
+    documents: list[Document],
+    summarization_model: str,
+    output_dir: Path,
+    shard_format: ShardFormat = "arrow",
+    val_split_ratio: float = 0.1,
+    test_split_ratio: float = 0.1,
+    min_document_characters: int = 50,
+    min_quality_score: float = 0.3,
+    augmentation_loops: int = 4,
+    max_workers: int = 10,
+    mock: bool = False,
+    summarization_max_characters: int = 256,
+    use_batch_api: bool = False,
+    batch_dir: Path = Path("data/batches"),
+) -> Annotated[str, "output"]:
+    """Generate the summary dataset while streaming its samples to sharded files,
+    instead of materializing it as an `InstructDataset` artifact.
+
+    Returns:
+        str: The output directory, holding the shards and their manifest.
+    """
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+
+    dataset_generator = SummarizationDatasetGenerator(
+        summarization_model=summarization_model,
+        summarization_max_characters=summarization_max_characters,
+        val_split_ratio=val_split_ratio,
+        test_split_ratio=test_split_ratio,
+        max_workers=max_workers,
+        mock=mock,
+        min_document_length=min_document_characters,
+        min_quality_score=min_quality_score,
+        augmentation_loops=augmentation_loops,
+        batch_client=OpenAIBatchClient() if use_batch_api else None,
+        batch_dir=batch_dir,
+    )
+    manifest = dataset_generator.write(
+        documents=documents, output_dir=output_dir, shard_format=shard_format
+    )
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="output",
+        metadata={
+            **{
+                f"{split_name}_samples": split["num_samples"]
+                for split_name, split in manifest["splits"].items()
+            },
+            "output_dir": str(output_dir),
+            "shard_format": shard_format,
+        },
+    )
+
+    return str(output_dir)
@@ -3,15 +3,29 @@ from zenml.steps import get_step_context, step
 
 from second_brain_offline.domain import Document
 from second_brain_offline.infrastructure.mongo import MongoDBService
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def fetch_from_mongodb(
     collection_name: str,
     limit: int,
+    batch_size: int = 1000,
 ) -> Annotated[list[dict], "documents"]:
+    """Stream documents from a MongoDB collection.
+
+    Args:
+        collection_name: Name of the MongoDB collection to fetch from.
+        limit: Maximum number of documents to fetch. 0 means no limit.
+        batch_size: Number of documents fetched per round trip. Defaults to 1000.
+
+    Returns:
+        list[Document]: The fetched documents.
+    """
+
     with MongoDBService(model=Document, collection_name=collection_name) as service:
-        documents = service.fetch_documents(limit, query={})
+        documents = list(service.iter_documents(batch_size=batch_size, limit=limit))
 
     step_context = get_step_context()
     step_context.add_output_metadata(
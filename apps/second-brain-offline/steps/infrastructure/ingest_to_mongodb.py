@@ -4,11 +4,18 @@ from typing_extensions import Annotated
 from zenml.steps import get_step_context, step
 
 from second_brain_offline.infrastructure.mongo.service import MongoDBService
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def ingest_to_mongodb(
-    models: list[BaseModel], collection_name: str, clear_collection: bool = True
+    models: list[BaseModel],
+    collection_name: str,
+    clear_collection: bool = True,
+    upsert: bool = False,
+    upsert_key: str = "id",
+    batch_size: int = 1000,
 ) -> Annotated[int, "output"]:
     """ZenML step to ingest documents into MongoDB.
 
@@ -16,18 +23,25 @@ def ingest_to_mongodb(
         models: List of Pydantic BaseModel instances to ingest into MongoDB.
         collection_name: Name of the MongoDB collection to ingest into.
         clear_collection: If True, clears the collection before ingestion. Defaults to True.
+        upsert: If True, documents replace the stored documents with the same
+            `upsert_key` instead of being appended. Defaults to False.
+        upsert_key: Field, with dots separating nested fields, identifying the
+            documents replaced when upserting. Defaults to "id".
+        batch_size: Number of documents written per request. Defaults to 1000.
 
     Returns:
         int: Number of documents in the collection after ingestion.
 
     Raises:
-        ValueError: If no documents are provided for ingestion.
+        ValueError: If no documents are provided for ingestion, unless upserting.
+            An empty upsert (e.g., an incremental sync without changed pages)
+            leaves the collection unchanged.
     """
 
-    if not models:
+    if not models and not upsert:
         raise ValueError("No documents provided for ingestion")
 
-    model_type = type(models[0])
+    model_type = type(models[0]) if models else BaseModel
     logger.info(
         f"Ingesting {len(models)} documents of type '{model_type.__name__}' into MongoDB collection '{collection_name}'"
     )
@@ -37,7 +51,13 @@ def ingest_to_mongodb(
                 f"'clear_collection' is set to True. Clearing MongoDB collection '{collection_name}' before ingestion."
             )
             service.clear_collection()
-        service.ingest_documents(models)
+        num_written = (
+            service.ingest_documents(
+                models, batch_size=batch_size, upsert=upsert, upsert_key=upsert_key
+            )
+            if models
+            else 0
+        )
 
         count = service.get_collection_count()
         logger.info(
@@ -49,6 +69,8 @@ def ingest_to_mongodb(
         output_name="output",
         metadata={
             "count": count,
+            "len_documents_written": num_written,
+            "len_documents_failed": len(models) - num_written,
         },
     )
 
@@ -1,15 +1,20 @@
+from pathlib import Path
+
 from loguru import logger
 from typing_extensions import Annotated
 from zenml import get_step_context, step
 
 from second_brain_offline.config import settings
-from second_brain_offline.domain import InstructDataset
+from second_brain_offline.domain import InstructDataset, load_instruct_dataset_dict
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def push_to_huggingface(
-    dataset: Annotated[InstructDataset, "instruct_dataset"],
     dataset_id: Annotated[str, "dataset_id"],
+    dataset: Annotated[InstructDataset | None, "instruct_dataset"] = None,
+    dataset_dir: str | None = None,
 ) -> Annotated[str, "output"]:
     assert settings.HUGGINGFACE_ACCESS_TOKEN is not None, (
         "Huggingface access token must be provided for pushing to Huggingface"
@@ -17,7 +22,16 @@ def push_to_huggingface(
 
     logger.info(f"Pushing dataset {dataset_id} to Hugging Face.")
 
-    huggingface_dataset = dataset.to_huggingface()
+    assert dataset is not None or dataset_dir is not None, (
+        "Either the dataset or the directory of its shards must be provided"
+    )
+
+    if dataset_dir is not None:
+        # Memory-map the shards written by `write_summary_dataset` or
+        # `save_dataset_to_disk` instead of converting in-memory samples.
+        huggingface_dataset = load_instruct_dataset_dict(Path(dataset_dir))
+    else:
+        huggingface_dataset = dataset.to_huggingface()
     huggingface_dataset.push_to_hub(dataset_id, token=settings.HUGGINGFACE_ACCESS_TOKEN)
 
     step_context = get_step_context()
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from loguru import logger
@@ -5,12 +6,31 @@ from typing_extensions import Annotated
 from zenml.steps import get_step_context, step
 
 from second_brain_offline.domain.document import Document
+from second_brain_offline.infrastructure.snapshot import DocumentSnapshot
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def read_documents_from_disk(
-    data_directory: Path, nesting_level: int = 0
+    data_directory: Path, nesting_level: int = 0, max_workers: int = 8
 ) -> Annotated[list[Document], "documents"]:
+    """Read documents from disk, either from snapshots or from one JSON file per
+    document.
+
+    Directories containing a snapshot manifest are streamed shard by shard, while
+    the other directories fall back to reading their JSON files in parallel.
+
+    Args:
+        data_directory: Root directory of the documents.
+        nesting_level: Depth of the directories holding the documents, relative to
+            `data_directory`. Defaults to 0.
+        max_workers: Number of files read in parallel. Defaults to 8.
+
+    Returns:
+        list[Document]: The documents read from disk.
+    """
+
     pages: list[Document] = []
 
     logger.info(f"Reading documents from '{data_directory}'")
@@ -18,12 +38,21 @@ def read_documents_from_disk(
     if not data_directory.exists():
         raise FileNotFoundError(f"Directory not found: '{data_directory}'")
 
-    json_files = __get_json_files(
+    document_dirs = __get_document_dirs(
         data_directory=data_directory, nesting_level=nesting_level
     )
-    for json_file in json_files:
-        page = Document.from_file(json_file)
-        pages.append(page)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for document_dir in document_dirs:
+            if DocumentSnapshot.exists(document_dir):
+                pages.extend(
+                    DocumentSnapshot(document_dir).iter_documents(
+                        max_workers=max_workers
+                    )
+                )
+            else:
+                pages.extend(
+                    executor.map(Document.from_file, document_dir.glob("*.json"))
+                )
 
     logger.info(f"Successfully read {len(pages)} documents from disk.")
 
@@ -38,16 +67,16 @@ def read_documents_from_disk(
     return pages
 
 
-def __get_json_files(data_directory: Path, nesting_level: int = 0) -> list[Path]:
+def __get_document_dirs(data_directory: Path, nesting_level: int = 0) -> list[Path]:
     if nesting_level == 0:
-        return list(data_directory.glob("*.json"))
+        return [data_directory]
     else:
-        json_files = []
+        document_dirs = []
         for database_dir in data_directory.iterdir():
             if database_dir.is_dir():
-                nested_json_files = __get_json_files(
+                nested_document_dirs = __get_document_dirs(
                     data_directory=database_dir, nesting_level=nesting_level - 1
                 )
-                json_files.extend(nested_json_files)
+                document_dirs.extend(nested_document_dirs)
 
-        return json_files
+        return document_dirs
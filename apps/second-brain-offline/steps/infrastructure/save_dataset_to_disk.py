@@ -6,19 +6,22 @@ from typing_extensions import Annotated
 from zenml import get_step_context, step
 
 from second_brain_offline.domain import InstructDataset
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def save_dataset_to_disk(
     dataset: Annotated[InstructDataset, "instruct_dataset"],
     output_dir: Path,
+    shard_format: str | None = None,
 ) -> Annotated[str, "output"]:
     if output_dir.exists():
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True)
 
     logger.info(f"Saving dataset to '{output_dir}'")
-    output_dir = dataset.write(output_dir=output_dir)
+    output_dir = dataset.write(output_dir=output_dir, shard_format=shard_format)
 
     step_context = get_step_context()
     step_context.add_output_metadata(
@@ -28,6 +31,7 @@ def save_dataset_to_disk(
             "validation_samples": len(dataset.validation),
             "test_samples": len(dataset.test),
             "output_dir": str(output_dir),
+            "shard_format": shard_format or "json",
         },
     )
 
@@ -4,20 +4,61 @@ from pathlib import Path
 from typing_extensions import Annotated
 from zenml import get_step_context, step
 
+from second_brain_offline.config import settings
 from second_brain_offline.domain import Document
+from second_brain_offline.infrastructure.snapshot import DocumentSnapshot
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def save_documents_to_disk(
     documents: Annotated[list[Document], "documents"],
     output_dir: Path,
+    as_snapshot: bool = False,
+    snapshot_shard_size: int = 1000,
+    max_workers: int = 4,
 ) -> Annotated[str, "output"]:
+    """Save documents to disk, either as one JSON (and TXT) file per document or as
+    a sharded snapshot.
+
+    Args:
+        documents: Documents to save. They are obfuscated in place, with a keyed
+            hash, so saving the same documents always produces the same files.
+        output_dir: Directory where the documents are saved. Any existing content
+            is removed.
+        as_snapshot: If True, documents are saved as compressed JSONL shards with a
+            manifest instead of one file per document. Defaults to False.
+        snapshot_shard_size: Maximum number of documents per snapshot shard.
+            Defaults to 1000.
+        max_workers: Number of snapshot shards written in parallel. Defaults to 4.
+
+    Returns:
+        str: The output directory.
+    """
+
     if output_dir.exists():
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True)
 
-    for document in documents:
-        document.write(output_dir=output_dir, obfuscate=True, also_save_as_txt=True)
+    if as_snapshot:
+        for document in documents:
+            document.obfuscate(key=settings.OBFUSCATION_KEY)
+        # The documents may come in any order (e.g., out of a set), so they are
+        # sorted for the shards to have the same content between runs.
+        DocumentSnapshot(output_dir).write(
+            sorted(documents, key=lambda document: document.id),
+            shard_size=snapshot_shard_size,
+            max_workers=max_workers,
+        )
+    else:
+        for document in documents:
+            document.write(
+                output_dir=output_dir,
+                obfuscate=True,
+                also_save_as_txt=True,
+                obfuscation_key=settings.OBFUSCATION_KEY,
+            )
 
     step_context = get_step_context()
     step_context.add_output_metadata(
@@ -25,6 +66,7 @@ def save_documents_to_disk(
         metadata={
             "count": len(documents),
             "output_dir": str(output_dir),
+            "format": "snapshot" if as_snapshot else "json",
         },
     )
 
@@ -5,23 +5,37 @@ from zenml import get_step_context, step
 
 from second_brain_offline.config import settings
 from second_brain_offline.infrastructure.aws.s3 import S3Client
+from steps.profiling import profile_step
 
 
 @step
+@profile_step
 def upload_to_s3(
     folder_path: Path,
     s3_prefix: str = "",
+    sync: bool = False,
+    num_packed_shards: int | None = None,
 ) -> Annotated[str, "output"]:
     s3_client = S3Client(bucket_name=settings.AWS_S3_BUCKET_NAME)
-    s3_client.upload_folder(local_path=folder_path, s3_prefix=s3_prefix)
+    metadata = {
+        "folder_path": str(folder_path),
+        "s3_prefix": s3_prefix,
+        "sync": sync,
+    }
+    if sync:
+        stats = s3_client.sync_folder_to_s3(
+            local_path=folder_path,
+            s3_prefix=s3_prefix,
+            num_packed_shards=num_packed_shards,
+        )
+        metadata.update(stats.model_dump())
+    else:
+        s3_client.upload_folder(local_path=folder_path, s3_prefix=s3_prefix)
 
     step_context = get_step_context()
     step_context.add_output_metadata(
         output_name="output",
-        metadata={
-            "folder_path": str(folder_path),
-            "s3_prefix": s3_prefix,
-        },
+        metadata=metadata,
     )
 
     return str(folder_path)
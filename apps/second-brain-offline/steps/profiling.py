@@ -0,0 +1,49 @@
+import functools
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+from zenml import log_metadata
+
+from second_brain_offline.config import settings
+from second_brain_offline.profiling import profile, profiler
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def profile_step(func: F) -> F:
+    """Profile a ZenML step, applied below the `@step` decorator.
+
+    The wall time, CPU time, peak memory, throughput and LLM usage of the step and
+    of the profiled blocks it ran are logged as step metadata. If
+    `PROFILING_TRACES_DIR` is set, they are also written there as a Chrome trace.
+    If the step returns a list, its length is used as the step's number of
+    processed items.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        num_recorded = profiler.num_recorded
+        with profile(func.__name__) as record:
+            output = func(*args, **kwargs)
+            if isinstance(output, list):
+                record.add_items(len(output))
+
+        records = profiler.records_since(num_recorded)
+        metadata: dict[str, Any] = profiler.summary(records)
+        if settings.PROFILING_TRACES_DIR:
+            trace_path = profiler.write_chrome_trace(
+                Path(settings.PROFILING_TRACES_DIR)
+                / f"{func.__name__}-{int(record.start_time)}.json",
+                records=records,
+            )
+            logger.info(
+                f"Wrote the profile of step '{func.__name__}' to '{trace_path}'"
+            )
+            metadata["trace_path"] = str(trace_path)
+
+        log_metadata(metadata={"profile": metadata})
+
+        return output
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+from second_brain_offline.application.agents import QualityScoreAgent
+from second_brain_offline.domain import Document, DocumentMetadata
+from second_brain_offline.infrastructure.llm import (
+    BatchJob,
+    BatchRequest,
+    LocalBatchClient,
+)
+
+
+def build_document(document_id: str, content: str) -> Document:
+    return Document(
+        id=document_id,
+        metadata=DocumentMetadata(
+            id=document_id,
+            url=f"https://example.com/{document_id}",
+            title="",
+            properties={},
+        ),
+        content=content,
+    )
+
+
+def test_quality_score_agent_batch_mode(tmp_path: Path) -> None:
+    """
+    Test that the batch mode merges the batch results back into the documents.
+    """
+
+    client = LocalBatchClient(responder=lambda body: json.dumps({"score": 0.8}))
+    agent = QualityScoreAgent(batch_client=client, batch_dir=tmp_path)
+    documents = [build_document(f"doc{i}", f"content {i}") for i in range(3)]
+
+    scored_documents = agent(documents)
+
+    assert client.submitted_batches == 1
+    assert [doc.content_quality_score for doc in scored_documents] == [0.8] * 3
+
+
+def test_batch_job_is_resumable(tmp_path: Path) -> None:
+    """
+    Test that a second run of a finished job reuses the downloaded results
+    instead of resubmitting the requests.
+    """
+
+    client = LocalBatchClient(responder=lambda body: body["messages"][0]["content"])
+    requests = [
+        BatchRequest(
+            custom_id=f"request_{i}",
+            body={"model": "mock", "messages": [{"role": "user", "content": str(i)}]},
+        )
+        for i in range(5)
+    ]
+
+    first_results = BatchJob(
+        client, work_dir=tmp_path, name="job", max_requests_per_batch=2
+    ).run(requests)
+    second_results = BatchJob(
+        client, work_dir=tmp_path, name="job", max_requests_per_batch=2
+    ).run(requests)
+
+    assert client.submitted_batches == 3
+    assert first_results == second_results
+    assert first_results == {f"request_{i}": str(i) for i in range(5)}
+
+
+def test_batch_job_resubmits_changed_requests(tmp_path: Path) -> None:
+    """
+    Test that changing the body of a request with the same custom ID (e.g., the
+    model or the prompt) doesn't reuse the results of the previous run.
+    """
+
+    client = LocalBatchClient(responder=lambda body: body["model"])
+
+    def build_requests(model: str) -> list[BatchRequest]:
+        return [
+            BatchRequest(
+                custom_id="request_0",
+                body={"model": model, "messages": [{"role": "user", "content": "0"}]},
+            )
+        ]
+
+    first_results = BatchJob(client, work_dir=tmp_path, name="job").run(
+        build_requests("model-a")
+    )
+    second_results = BatchJob(client, work_dir=tmp_path, name="job").run(
+        build_requests("model-b")
+    )
+
+    assert client.submitted_batches == 2
+    assert first_results == {"request_0": "model-a"}
+    assert second_results == {"request_0": "model-b"}
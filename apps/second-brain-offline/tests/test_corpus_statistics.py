@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from second_brain_offline import utils
+from second_brain_offline.application.dataset import CorpusStatistics
+from second_brain_offline.application.deduplication import MinHashDeduplicator
+from second_brain_offline.domain import Document, DocumentMetadata
+
+
+def make_document(
+    content: str, url: str, quality_score: float | None = None
+) -> Document:
+    return Document(
+        metadata=DocumentMetadata(id="id", url=url, title="title", properties={}),
+        content=content,
+        content_quality_score=quality_score,
+    )
+
+
+@pytest.fixture
+def documents() -> list[Document]:
+    return [
+        make_document("a" * 10, "https://www.example.com/a", 0.1),
+        make_document("b" * 20, "https://example.com/b", 0.9),
+        make_document("a" * 10 + "\n", "https://notion.so/c", 1.0),
+        make_document("c" * 40, "https://example.com/b"),
+        make_document("d" * 30, "https://notion.so/d", 0.5),
+    ]
+
+
+def test_summary(documents: list[Document]) -> None:
+    statistics = CorpusStatistics(batch_size=2, tokenizer_model_id=None).compute(
+        iter(documents)
+    )
+
+    assert statistics["num_documents"] == 5
+    assert statistics["num_characters"]["total"] == 111
+    assert statistics["num_characters"]["quantiles"]["p50"] == 20
+    assert statistics["num_characters"]["quantiles"]["p100"] == 40
+    assert statistics["num_tokens"] is None
+    assert statistics["quality_score"]["num_scored"] == 4
+    assert statistics["quality_score"]["mean"] == pytest.approx(0.625)
+    histogram = statistics["quality_score"]["histogram"]
+    assert sum(histogram.values()) == 4
+    assert histogram["0.95-1.00"] == 1
+    assert statistics["duplicates"] == {
+        "num_duplicate_content": 1,
+        "duplicate_content_ratio": 0.2,
+        "num_duplicate_urls": 1,
+        "duplicate_url_ratio": 0.2,
+    }
+    assert statistics["source_counts"] == {"example.com": 3, "notion.so": 2}
+
+
+def test_empty_corpus() -> None:
+    statistics = CorpusStatistics(tokenizer_model_id=None).compute([])
+
+    assert statistics["num_documents"] == 0
+    assert statistics["num_characters"]["quantiles"] is None
+    assert statistics["source_counts"] == {}
+
+
+def test_token_counts_and_parquet(
+    documents: list[Document], tmp_path, monkeypatch
+) -> None:
+    fake_encoding = SimpleNamespace(
+        encode_ordinary_batch=lambda texts: [text.split("a") for text in texts]
+    )
+    monkeypatch.setattr(utils, "get_encoding", lambda model_id: fake_encoding)
+
+    parquet_path = tmp_path / "statistics" / "documents.parquet"
+    statistics = CorpusStatistics(batch_size=3).compute(
+        documents, parquet_path=parquet_path
+    )
+
+    assert statistics["num_tokens"]["total"] == 11 + 1 + 11 + 1 + 1
+    table = pq.read_table(parquet_path)
+    assert table.num_rows == 5
+    assert table.column("source").to_pylist() == [
+        "example.com",
+        "example.com",
+        "notion.so",
+        "example.com",
+        "notion.so",
+    ]
+    assert table.column("is_duplicate_content").to_pylist() == [
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert table.column("quality_score").null_count == 1
+    np.testing.assert_array_equal(
+        table.column("num_tokens").to_numpy(), [11, 1, 11, 1, 1]
+    )
+
+
+def test_near_duplicates_are_counted_while_streaming() -> None:
+    words = [f"word{i}" for i in range(200)]
+    documents = [
+        make_document(" ".join(words), "https://example.com/a"),
+        make_document(" ".join(words[:-2]), "https://mirror.com/a"),
+        make_document(" ".join(reversed(words)), "https://example.com/b"),
+        make_document("", "https://example.com/c"),
+        make_document("", "https://example.com/d"),
+    ]
+
+    statistics = CorpusStatistics(
+        batch_size=2,
+        tokenizer_model_id=None,
+        deduplicator=MinHashDeduplicator(threshold=0.8),
+    ).compute(iter(documents))
+
+    assert statistics["duplicates"]["num_near_duplicates"] == 1
+    assert statistics["duplicates"]["num_near_duplicate_clusters"] == 1
+    assert statistics["duplicates"]["near_duplicate_ratio"] == 0.2
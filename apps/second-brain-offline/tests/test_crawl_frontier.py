@@ -0,0 +1,84 @@
+import asyncio
+import time
+from pathlib import Path
+
+from second_brain_offline.application.crawlers.cache import CrawlCache, CrawlCacheEntry
+from second_brain_offline.application.crawlers.frontier import (
+    CrawlFrontier,
+    DomainScheduler,
+    normalize_url,
+)
+
+
+def test_frontier_deduplicates_normalized_urls() -> None:
+    """
+    Test that different spellings of the same URL are crawled only once, using
+    the first spelling pushed.
+    """
+
+    frontier: CrawlFrontier[str] = CrawlFrontier()
+    urls = [
+        "https://Example.com/post/?utm_source=x&b=2&a=1#section",
+        "https://example.com:443/post?a=1&b=2",
+        "https://example.com/other",
+    ]
+
+    enqueued = [frontier.push(url, "parent") for url in urls]
+
+    assert enqueued == [True, False, True]
+    assert frontier.num_duplicates == 1
+    assert frontier.pop() == (urls[0], "parent")
+    assert frontier.pop() == ("https://example.com/other", "parent")
+    assert frontier.pop() is None
+    assert normalize_url("HTTP://example.com") == "http://example.com/"
+
+
+def test_domain_scheduler_spaces_requests_per_domain() -> None:
+    """
+    Test that requests to the same domain are delayed, while requests to other
+    domains are not.
+    """
+
+    scheduler = DomainScheduler(max_concurrent_requests_per_domain=2, delay_seconds=0.2)
+
+    async def request(url: str) -> float:
+        async with scheduler.slot(url):
+            return time.monotonic()
+
+    async def run() -> list[float]:
+        return await asyncio.gather(
+            request("https://a.com/1"),
+            request("https://a.com/2"),
+            request("https://b.com/1"),
+        )
+
+    start = time.monotonic()
+    first_a, second_a, first_b = asyncio.run(run())
+
+    assert second_a - first_a >= 0.19
+    assert first_b - start < 0.1
+
+
+def test_crawl_cache_roundtrip(tmp_path: Path) -> None:
+    """
+    Test that cache entries are persisted by normalized URL and expose their
+    HTTP validators as conditional request headers.
+    """
+
+    cache = CrawlCache(tmp_path)
+    entry = CrawlCacheEntry(
+        url="https://example.com/post",
+        markdown="# Post",
+        etag='"abc"',
+        last_modified="Wed, 21 Oct 2015 07:28:00 GMT",
+    )
+
+    cache.put(entry)
+    cached_entry = cache.get("https://example.com/post/#top")
+
+    assert cached_entry == entry
+    assert cached_entry.conditional_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert cache.get("https://example.com/missing") is None
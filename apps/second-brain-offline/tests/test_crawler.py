@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from second_brain_offline.application.crawlers import crawl4ai
+from second_brain_offline.application.crawlers.crawl4ai import Crawl4AICrawler
+from second_brain_offline.domain import Document, DocumentMetadata
+
+
+class FakeAsyncWebCrawler:
+    num_requests = 0
+
+    def __init__(self, cache_mode) -> None:
+        pass
+
+    async def __aenter__(self) -> "FakeAsyncWebCrawler":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def arun(self, url: str) -> SimpleNamespace:
+        FakeAsyncWebCrawler.num_requests += 1
+
+        return SimpleNamespace(
+            success=not url.endswith("/broken"),
+            markdown=f"content of {url}",
+            links={"internal": [], "external": []},
+            metadata={"title": url},
+            response_headers={},
+        )
+
+
+def build_page(num_child_urls: int) -> Document:
+    child_urls = [f"https://example{i}.com/page" for i in range(num_child_urls)]
+
+    return Document(
+        id="page",
+        metadata=DocumentMetadata(id="page", url="", title="", properties={}),
+        content="",
+        child_urls=[*child_urls, "https://example.com/broken"],
+    )
+
+
+def test_crawled_documents_are_yielded_in_chunks(monkeypatch) -> None:
+    """
+    Test that the crawled documents are yielded in bounded chunks, and that the
+    failed URLs are counted instead of yielded.
+    """
+
+    monkeypatch.setattr(crawl4ai, "AsyncWebCrawler", FakeAsyncWebCrawler)
+    crawler = Crawl4AICrawler(max_concurrent_requests=3, domain_delay_seconds=0)
+
+    chunks = list(crawler.iter_chunks([build_page(7)], chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert {document.metadata.url for chunk in chunks for document in chunk} == {
+        f"https://example{i}.com/page" for i in range(7)
+    }
+    assert crawler.stats["num_succeeded"] == 7
+    assert crawler.stats["num_failed"] == 1
+    assert len(crawler([build_page(7)])) == 7
+
+
+def test_crawl_stops_when_the_chunks_are_no_longer_consumed(monkeypatch) -> None:
+    """
+    Test that closing the chunk iterator early stops the crawl instead of crawling
+    every remaining URL.
+    """
+
+    monkeypatch.setattr(crawl4ai, "AsyncWebCrawler", FakeAsyncWebCrawler)
+    FakeAsyncWebCrawler.num_requests = 0
+    crawler = Crawl4AICrawler(max_concurrent_requests=1, domain_delay_seconds=0)
+
+    chunks = crawler.iter_chunks([build_page(100)], chunk_size=2, max_pending_chunks=1)
+    first_chunk = next(chunks)
+    chunks.close()
+
+    assert len(first_chunk) == 2
+    assert FakeAsyncWebCrawler.num_requests < 100
@@ -0,0 +1,69 @@
+from second_brain_offline.application.deduplication import MinHashDeduplicator
+from second_brain_offline.domain import Document, DocumentMetadata
+
+
+def build_document(
+    document_id: str, content: str, content_quality_score: float | None = None
+) -> Document:
+    return Document(
+        id=document_id,
+        metadata=DocumentMetadata(id=document_id, url="", title="", properties={}),
+        content=content,
+        content_quality_score=content_quality_score,
+    )
+
+
+def test_deduplicator_keeps_the_best_representative() -> None:
+    """
+    Test that near-duplicates are clustered together and only the copy with the
+    highest quality score is kept, while unrelated documents are left untouched.
+    """
+
+    article = " ".join(
+        f"Sentence number {i} describes how vector search indexes embeddings."
+        for i in range(50)
+    )
+    mirror = article + " Mirrored from the original website."
+    unrelated = " ".join(
+        f"Step {i} of the recipe mixes flour, sugar and butter together."
+        for i in range(50)
+    )
+    documents = [
+        build_document("article", article, content_quality_score=0.5),
+        build_document("unrelated", unrelated),
+        build_document("mirror", mirror, content_quality_score=0.9),
+    ]
+
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    deduplicated_documents = deduplicator(documents)
+
+    assert [doc.id for doc in deduplicated_documents] == ["unrelated", "mirror"]
+    assert deduplicator.stats["len_near_duplicates_removed"] == 1
+    assert deduplicator.stats["len_duplicate_clusters"] == 1
+
+
+def test_deduplicator_compares_every_bucket_member() -> None:
+    """
+    Test that near-duplicates sharing their buckets with a less similar document
+    are still clustered, and that documents without any word are never clustered.
+    """
+
+    words = [f"word{i}" for i in range(40)]
+    article = " ".join(words)
+    mirror = " ".join([*words, "mirrored", "from", "elsewhere"])
+    # Shares the bucket of the article and its mirror, ahead of them.
+    partial_copy = " ".join([*words[:16], *(f"other{i}" for i in range(24))])
+    documents = [
+        build_document("empty", ""),
+        build_document("partial_copy", partial_copy),
+        build_document("article", article),
+        build_document("mirror", mirror),
+        build_document("blank", "   "),
+    ]
+
+    deduplicator = MinHashDeduplicator(
+        threshold=0.75, num_perm=8, num_bands=2, shingle_size=1, seed=1787, chunk_size=4
+    )
+    clusters = deduplicator.find_clusters(documents)
+
+    assert sorted(sorted(cluster) for cluster in clusters) == [[0], [1], [2, 3], [4]]
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from second_brain_offline.application.rag.embeddings import (
+    EmbeddingTransform,
+    TransformedEmbeddings,
+    apply_embedding_transform,
+)
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, dim: int = 64) -> None:
+        self.dim = dim
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        rng = np.random.default_rng(abs(hash(text)) % 2**32)
+
+        return rng.normal(size=self.dim).tolist()
+
+
+def make_low_rank_embeddings(
+    num_samples: int = 200, dim: int = 64, rank: int = 8
+) -> np.ndarray:
+    rng = np.random.default_rng(0)
+
+    return rng.normal(size=(num_samples, rank)) @ rng.normal(size=(rank, dim)) + 3.0
+
+
+def test_matryoshka_truncates_and_normalizes() -> None:
+    embeddings = np.random.default_rng(0).normal(size=(10, 64))
+    transform = EmbeddingTransform(method="matryoshka", output_dim=16)
+
+    transformed = transform.transform(embeddings)
+
+    assert transformed.shape == (10, 16)
+    assert transformed.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(transformed, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(
+        transformed,
+        embeddings[:, :16] / np.linalg.norm(embeddings[:, :16], axis=1, keepdims=True),
+        rtol=1e-5,
+    )
+
+
+def test_pca_preserves_neighbours_of_low_rank_embeddings() -> None:
+    embeddings = make_low_rank_embeddings()
+    transform = EmbeddingTransform(method="pca", output_dim=8, normalize=False)
+
+    assert not transform.is_fitted
+    transformed = transform.fit(embeddings).transform(embeddings)
+
+    assert transform.is_fitted
+    assert transformed.shape == (200, 8)
+    centered = embeddings - embeddings.mean(axis=0)
+    np.testing.assert_allclose(
+        transformed @ transformed.T, centered @ centered.T, rtol=1e-3, atol=1e-2
+    )
+
+
+def test_pca_requires_enough_samples() -> None:
+    transform = EmbeddingTransform(method="pca", output_dim=16)
+
+    with pytest.raises(ValueError):
+        transform.fit(make_low_rank_embeddings(num_samples=8))
+
+
+def test_float16_and_metadata_round_trip() -> None:
+    embeddings = make_low_rank_embeddings()
+    transform = EmbeddingTransform(method="pca", output_dim=8, dtype="float16").fit(
+        embeddings
+    )
+
+    restored = EmbeddingTransform.model_validate(transform.model_dump())
+
+    assert restored.transform(embeddings).dtype == np.float16
+    np.testing.assert_array_equal(
+        restored.transform(embeddings), transform.transform(embeddings)
+    )
+
+
+def test_transformed_embeddings_apply_the_same_transform_to_queries() -> None:
+    embedding_model = FakeEmbeddings()
+    transform = EmbeddingTransform(method="matryoshka", output_dim=16)
+
+    transformed_model = apply_embedding_transform(embedding_model, transform)
+
+    assert isinstance(transformed_model, TransformedEmbeddings)
+    assert transformed_model.embed_documents([]) == []
+    [document_embedding] = transformed_model.embed_documents(["second brain"])
+    query_embedding = transformed_model.embed_query("second brain")
+    assert len(query_embedding) == 16
+    np.testing.assert_allclose(document_embedding, query_embedding)
+    assert apply_embedding_transform(embedding_model, None) is embedding_model
+    assert (
+        apply_embedding_transform(embedding_model, EmbeddingTransform())
+        is embedding_model
+    )
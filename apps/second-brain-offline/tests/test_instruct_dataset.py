@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from second_brain_offline.domain import (
+    InstructDataset,
+    InstructDatasetSample,
+    InstructDatasetWriter,
+    load_instruct_dataset_dict,
+)
+from second_brain_offline.domain.dataset import hash_split
+
+
+def make_samples(num_documents: int, num_summaries: int = 1):
+    return [
+        InstructDatasetSample(
+            instruction=f"Document {i}", answer=f"Summary {j} of document {i}"
+        )
+        for i in range(num_documents)
+        for j in range(num_summaries)
+    ]
+
+
+def test_hash_split_is_deterministic_and_follows_ratios():
+    splits = [hash_split(f"key-{i}", 0.1, 0.2) for i in range(10_000)]
+
+    assert splits == [hash_split(f"key-{i}", 0.1, 0.2) for i in range(10_000)]
+    assert splits.count("validation") / len(splits) == pytest.approx(0.1, abs=0.02)
+    assert splits.count("test") / len(splits) == pytest.approx(0.2, abs=0.02)
+
+
+def test_from_sample_stream_keeps_documents_in_one_split():
+    dataset = InstructDataset.from_sample_stream(
+        make_samples(200, num_summaries=3), val_split_ratio=0.1, test_split_ratio=0.1
+    )
+
+    instructions_per_split = [
+        {sample.instruction for sample in split}
+        for split in (dataset.train, dataset.validation, dataset.test)
+    ]
+    assert sum(len(split) for split in instructions_per_split) == 200
+    assert len(set.union(*instructions_per_split)) == 200
+
+
+@pytest.mark.parametrize("shard_format", ["arrow", "jsonl"])
+def test_writer_shards_and_loads_splits(tmp_path, shard_format):
+    samples = make_samples(500)
+
+    with InstructDatasetWriter(
+        tmp_path,
+        val_split_ratio=0.1,
+        test_split_ratio=0.1,
+        shard_format=shard_format,
+        shard_size=100,
+        batch_size=30,
+    ) as writer:
+        written_splits = [writer.append(sample) for sample in samples]
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    train_shards = manifest["splits"]["train"]["shards"]
+    assert len(train_shards) > 1
+    assert all(shard["num_samples"] <= 100 for shard in train_shards)
+
+    dataset_dict = load_instruct_dataset_dict(tmp_path)
+    for split_name in ("train", "validation", "test"):
+        expected = [
+            sample.model_dump()
+            for sample, written_split in zip(samples, written_splits)
+            if written_split == split_name
+        ]
+        assert dataset_dict[split_name].to_list() == expected
+
+
+def test_sharded_write_matches_huggingface_conversion(tmp_path):
+    dataset = InstructDataset.from_samples(
+        make_samples(50), val_split_ratio=0.2, test_split_ratio=0.2, seed=42
+    )
+
+    dataset.write(tmp_path, shard_format="arrow")
+    loaded = load_instruct_dataset_dict(tmp_path)
+    converted = dataset.to_huggingface()
+
+    for split_name in ("train", "validation", "test"):
+        assert loaded[split_name].to_list() == converted[split_name].to_list()
+        assert converted[split_name].to_list() == [
+            sample.model_dump() for sample in dataset.get_split(split_name)
+        ]
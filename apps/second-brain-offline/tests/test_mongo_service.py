@@ -0,0 +1,168 @@
+import pytest
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult
+
+from second_brain_offline.domain import Document, DocumentMetadata
+from second_brain_offline.infrastructure.mongo import MongoDBService
+
+
+class InMemoryCursor:
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents = documents
+        self.fetched_batch_size = None
+
+    def batch_size(self, batch_size: int) -> "InMemoryCursor":
+        self.fetched_batch_size = batch_size
+        return self
+
+    def limit(self, limit: int) -> "InMemoryCursor":
+        if limit:
+            self.documents = self.documents[:limit]
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class InMemoryCollection:
+    def __init__(self) -> None:
+        self.documents: list[dict] = []
+        self.insert_calls = 0
+
+    def insert_many(self, documents: list[dict], ordered: bool) -> InsertManyResult:
+        assert ordered is False
+        self.insert_calls += 1
+        self.documents.extend(documents)
+        return InsertManyResult([doc["id"] for doc in documents], acknowledged=True)
+
+    def create_index(self, key: str) -> None:
+        pass
+
+    def bulk_write(self, requests: list, ordered: bool) -> BulkWriteResult:
+        num_matched = 0
+        for request in requests:
+            ((key, value),) = request._filter.items()
+            matches = [
+                index
+                for index, doc in enumerate(self.documents)
+                if get_field(doc, key) == value
+            ]
+            if matches:
+                self.documents[matches[0]] = request._doc
+                num_matched += 1
+            else:
+                self.documents.append(request._doc)
+        return BulkWriteResult(
+            {"nMatched": num_matched, "nUpserted": len(requests) - num_matched},
+            acknowledged=True,
+        )
+
+    def delete_many(self, query: dict) -> DeleteResult:
+        ((key, condition),) = query.items()
+        kept = [
+            doc for doc in self.documents if get_field(doc, key) not in condition["$in"]
+        ]
+        num_deleted = len(self.documents) - len(kept)
+        self.documents = kept
+        return DeleteResult({"n": num_deleted}, acknowledged=True)
+
+    def find(self, query: dict, projection: dict | None = None) -> InMemoryCursor:
+        return InMemoryCursor([dict(doc) for doc in self.documents])
+
+
+def get_field(doc: dict, key: str):
+    for part in key.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def build_service() -> MongoDBService:
+    service = MongoDBService.__new__(MongoDBService)
+    service.model = Document
+    service.collection = InMemoryCollection()
+    return service
+
+
+def build_document(index: int) -> Document:
+    return Document(
+        id=f"doc{index}",
+        metadata=DocumentMetadata(id=f"doc{index}", url="", title="", properties={}),
+        content=f"content {index}",
+    )
+
+
+def test_ingest_documents_is_chunked() -> None:
+    """
+    Test that documents are written in unordered batches of the given size.
+    """
+
+    service = build_service()
+
+    num_written = service.ingest_documents(
+        (build_document(i) for i in range(5)), batch_size=2
+    )
+
+    assert num_written == 5
+    assert service.collection.insert_calls == 3
+
+
+def test_iter_documents_streams_and_skips_invalid_documents() -> None:
+    """
+    Test that documents are validated lazily and invalid ones are skipped instead
+    of failing the whole fetch.
+    """
+
+    service = build_service()
+    service.ingest_documents([build_document(i) for i in range(3)])
+    service.collection.documents.insert(1, {"id": "broken", "content": None})
+
+    documents = service.iter_documents(batch_size=10, limit=3)
+
+    assert [doc.id for doc in documents] == ["doc0", "doc1"]
+
+
+def test_upsert_matches_documents_by_source_id() -> None:
+    """
+    Test that re-synced documents, whose `id` changes on every sync, replace their
+    previous version when upserted by source ID, and can be deleted by it.
+    """
+
+    service = build_service()
+    first_version = build_document(0)
+    first_version.metadata.source_id = "source"
+    second_version = build_document(1)
+    second_version.metadata.source_id = "source"
+    without_source_id = build_document(2)
+
+    for document in (first_version, second_version, without_source_id):
+        service.ingest_documents(
+            [document], upsert=True, upsert_key="metadata.source_id"
+        )
+
+    assert [doc["id"] for doc in service.collection.documents] == ["doc1", "doc2"]
+
+    num_deleted = service.delete_documents({"metadata.source_id": {"$in": ["source"]}})
+
+    assert num_deleted == 1
+    assert [doc["id"] for doc in service.collection.documents] == ["doc2"]
+
+
+def test_upserting_an_empty_delta_is_a_no_op() -> None:
+    """
+    Test that an incremental sync without changed documents leaves the collection
+    unchanged instead of failing, while an empty insert still fails.
+    """
+
+    service = build_service()
+    service.ingest_documents([build_document(0)])
+
+    num_written = service.ingest_documents(
+        [], upsert=True, upsert_key="metadata.source_id"
+    )
+
+    assert num_written == 0
+    assert [doc["id"] for doc in service.collection.documents] == ["doc0"]
+    with pytest.raises(ValueError):
+        service.ingest_documents([])
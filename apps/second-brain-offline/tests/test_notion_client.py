@@ -0,0 +1,51 @@
+import asyncio
+
+from aiohttp import web
+
+from second_brain_offline.infrastructure.notion.client import NotionAPIClient
+
+
+def test_notion_client_follows_pagination_cursors() -> None:
+    """
+    Test that all the pages of a paginated endpoint are fetched, instead of only
+    the first one, and that the cursors are forwarded.
+    """
+
+    pages = {
+        None: {"results": [1, 2], "has_more": True, "next_cursor": "a"},
+        "a": {"results": [3, 4], "has_more": True, "next_cursor": "b"},
+        "b": {"results": [5], "has_more": False, "next_cursor": None},
+    }
+    attempts = {"count": 0}
+
+    async def children(request: web.Request) -> web.Response:
+        attempts["count"] += 1
+        if attempts["count"] == 2:
+            return web.json_response({}, status=429, headers={"Retry-After": "0"})
+
+        return web.json_response(pages[request.query.get("start_cursor")])
+
+    async def run() -> list[int]:
+        app = web.Application()
+        app.router.add_get("/v1/blocks/{block_id}/children", children)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            async with NotionAPIClient(
+                api_key="secret",
+                requests_per_second=100,
+                base_url=f"http://127.0.0.1:{port}/v1",
+            ) as client:
+                return [
+                    result
+                    async for result in client.paginate("GET", "blocks/id/children")
+                ]
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5]
+    assert attempts["count"] == 4
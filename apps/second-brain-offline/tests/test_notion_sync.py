@@ -0,0 +1,103 @@
+from pathlib import Path
+
+from second_brain_offline import utils
+from second_brain_offline.domain import Document, DocumentMetadata
+from second_brain_offline.infrastructure.notion import NotionSyncState
+
+
+def build_metadata(page_id: str, last_edited_time: str) -> DocumentMetadata:
+    return DocumentMetadata(
+        id=page_id,
+        url=f"https://www.notion.so/{page_id}",
+        title=page_id,
+        properties={"last_edited_time": last_edited_time},
+    )
+
+
+def test_sync_state_detects_changes_and_deletions(tmp_path: Path) -> None:
+    """
+    Test that only new or edited pages are returned, that pages missing from the
+    database are reported as deleted and that the state is only persisted once
+    committed.
+    """
+
+    sync_state = NotionSyncState(
+        database_id="db",
+        watermark="2025-01-02T00:00:00.000Z",
+        pages={
+            "unchanged": "2025-01-02T00:00:00.000Z",
+            "edited": "2025-01-01T00:00:00.000Z",
+            "deleted": "2025-01-01T00:00:00.000Z",
+        },
+    )
+    sync_state.commit(tmp_path)
+
+    changed_pages, new_sync_state = NotionSyncState.load(tmp_path, "db").diff(
+        [
+            build_metadata("unchanged", "2025-01-02T00:00:00.000Z"),
+            build_metadata("edited", "2025-01-03T00:00:00.000Z"),
+            build_metadata("new", "2025-01-04T00:00:00.000Z"),
+        ],
+        all_page_ids=["unchanged", "edited", "new"],
+    )
+    new_sync_state.save_pending(tmp_path)
+
+    assert [page.id for page in changed_pages] == ["edited", "new"]
+    assert new_sync_state.deleted_page_ids == ["deleted"]
+    assert new_sync_state.watermark == "2025-01-04T00:00:00.000Z"
+    assert NotionSyncState.load(tmp_path, "db") == sync_state
+
+    NotionSyncState.load_pending(tmp_path, "db").commit(tmp_path)
+
+    assert NotionSyncState.load(tmp_path, "db") == new_sync_state
+
+
+def test_deletions_and_source_ids_survive_obfuscation(tmp_path: Path) -> None:
+    """
+    Test that the deleted page IDs written next to a delta are read back from all
+    its databases, and match the source IDs of the obfuscated documents.
+    """
+
+    NotionSyncState(
+        database_id="db0", deleted_page_ids=["page-a", "page-b"]
+    ).write_deletions(tmp_path / "database_0")
+    NotionSyncState(database_id="db1", deleted_page_ids=["page-c"]).write_deletions(
+        tmp_path / "database_1"
+    )
+    document = Document(
+        metadata=build_metadata("page-a", "2025-01-01T00:00:00.000Z"), content=""
+    ).obfuscate()
+
+    assert NotionSyncState.read_deletions(tmp_path) == ["page-a", "page-b", "page-c"]
+    assert document.metadata.id != "page-a"
+    assert document.metadata.source_id == utils.get_source_id("page-a")
+
+
+def test_obfuscation_is_deterministic_and_keyed(tmp_path: Path) -> None:
+    """
+    Test that writing the same document twice produces the same files, so they're
+    skipped when syncing to S3, and that the obfuscated ID depends on the key.
+    """
+
+    def build_document() -> Document:
+        return Document(
+            metadata=build_metadata("page-a", "2025-01-01T00:00:00.000Z"),
+            parent_metadata=build_metadata("db", "2025-01-01T00:00:00.000Z"),
+            content="content",
+        )
+
+    for run in ("first", "second"):
+        build_document().write(tmp_path / run, obfuscate=True, obfuscation_key="secret")
+
+    first_files = {
+        path.name: path.read_bytes() for path in (tmp_path / "first").iterdir()
+    }
+    second_files = {
+        path.name: path.read_bytes() for path in (tmp_path / "second").iterdir()
+    }
+
+    assert first_files == second_files
+    assert (
+        build_document().obfuscate(key="secret").id
+        != build_document().obfuscate(key="other").id
+    )
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from second_brain_offline.profiling import (
+    Profiler,
+    ProfileRecord,
+    profile,
+    profiled,
+    profiler,
+    record_llm_usage,
+    run_in_context,
+)
+
+
+def fake_llm_response(prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_profiler():
+    profiler.reset()
+    yield
+    profiler.reset()
+
+
+def test_profile_records_resources_and_nested_llm_usage() -> None:
+    with profile("outer", num_items=10) as outer:
+        with profile("inner"):
+            record_llm_usage(fake_llm_response(100, 20))
+        record_llm_usage(fake_llm_response(50, 5))
+        buffer = bytearray(64 * 1024 * 1024)
+        time.sleep(0.1)
+        del buffer
+
+    records = {record.name: record for record in profiler.records}
+    assert records["inner"].llm_requests == 1
+    assert records["inner"].llm_prompt_tokens == 100
+    assert outer.llm_requests == 2
+    assert outer.llm_prompt_tokens == 150
+    assert outer.llm_completion_tokens == 25
+    assert outer.wall_time_seconds >= 0.1
+    assert outer.peak_rss_mb >= outer.start_rss_mb + 32
+    assert outer.items_per_second == pytest.approx(10 / outer.wall_time_seconds)
+
+
+def test_profiled_decorator_supports_async_and_threads() -> None:
+    @profiled(count_items=lambda items: len(items))
+    async def process_async(items: list[int]) -> int:
+        record_llm_usage(fake_llm_response(1, 1))
+        return len(items)
+
+    @profiled(name="process_batch", count_items=lambda items: len(items))
+    def process_batch(items: list[int]) -> None:
+        record_llm_usage(fake_llm_response(10, 1))
+
+    async def run_async() -> None:
+        await asyncio.gather(process_async([1, 2]), process_async([3]))
+
+    with profile("step") as step:
+        asyncio.run(run_async())
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(run_in_context(process_batch), [[1], [2, 3], [4]]))
+
+    summary = profiler.summary()
+    assert summary["process_batch"]["calls"] == 3
+    assert summary["process_batch"]["num_items"] == 4
+    assert summary["process_batch"]["llm_prompt_tokens"] == 30
+    assert summary[process_async.__qualname__]["num_items"] == 3
+    assert step.llm_requests == 5
+
+
+def test_write_chrome_trace(tmp_path) -> None:
+    with profile("step"):
+        with profile("batch", num_items=3):
+            pass
+
+    trace_path = profiler.write_chrome_trace(tmp_path / "trace.json")
+    events = json.loads(trace_path.read_text())["traceEvents"]
+
+    assert [event["name"] for event in events] == ["batch", "step"]
+    assert all(event["ph"] == "X" for event in events)
+    batch, step = events
+    assert step["ts"] <= batch["ts"]
+    assert batch["ts"] + batch["dur"] <= step["ts"] + step["dur"] + 1
+    assert batch["args"]["num_items"] == 3
+
+
+def test_profiler_caps_records_and_stops_without_waiting() -> None:
+    capped_profiler = Profiler(rss_sampling_interval_seconds=1.0, max_records=3)
+    for i in range(5):
+        record = ProfileRecord(name=f"block-{i}", start_time=time.time())
+        capped_profiler.start(record)
+        start_time = time.perf_counter()
+        capped_profiler.stop(record)
+
+        assert time.perf_counter() - start_time < 0.5
+
+    assert [record.name for record in capped_profiler.records] == [
+        "block-2",
+        "block-3",
+        "block-4",
+    ]
+    assert capped_profiler.num_recorded == 5
+    assert [record.name for record in capped_profiler.records_since(3)] == [
+        "block-3",
+        "block-4",
+    ]
+    assert [record.name for record in capped_profiler.records_since(0)] == [
+        "block-2",
+        "block-3",
+        "block-4",
+    ]
@@ -0,0 +1,85 @@
+from second_brain_offline.application.agents import HeuristicQualityAgent
+from second_brain_offline.domain import Document, DocumentMetadata
+
+
+def build_document(content: str, child_urls: list[str] | None = None) -> Document:
+    return Document(
+        metadata=DocumentMetadata(id="id", url="", title="", properties={}),
+        content=content,
+        child_urls=child_urls or [],
+    )
+
+
+def test_heuristics_score_obvious_cases_and_escalate_the_rest() -> None:
+    """
+    Test that noise and clean articles are scored while borderline documents are
+    left without a score, so they can be escalated to the LLM.
+    """
+
+    article = "\n".join(
+        f"Paragraph {i} explains how retrieval augmented generation works in practice."
+        for i in range(20)
+    )
+    documents = [
+        build_document(""),
+        build_document("404 Page not found"),
+        build_document("[link](https://example.com/a)\n" * 30),
+        build_document("duplicate line\n" * 40),
+        build_document(article),
+        build_document(article[:300]),
+    ]
+
+    agent = HeuristicQualityAgent()
+    scored_documents = agent(documents)
+    scores = [doc.content_quality_score for doc in scored_documents]
+
+    assert all(score is not None and score <= 0.2 for score in scores[:4])
+    assert scores[4] is not None and scores[4] >= 0.9
+    assert scores[5] is None
+    assert agent.stats["num_escalated"] == 1
+
+
+def test_heuristics_detect_thai_content() -> None:
+    """
+    Test that the language mix is computed from the Thai and Latin characters.
+    """
+
+    agent = HeuristicQualityAgent()
+    features = agent.compute_features(
+        [build_document("สวัสดีครับ"), build_document("hello"), build_document("สวัสดี hi")]
+    )
+
+    assert features["thai_ratio"].tolist() == [1.0, 0.0, 0.75]
+
+
+def test_heuristics_escalate_clean_documents_without_prose() -> None:
+    """
+    Test that a clean document without a positive signal, such as a long list of
+    short items, is capped below the high threshold and escalated to the LLM.
+    """
+
+    agent = HeuristicQualityAgent()
+    document = agent(build_document("\n".join(f"Item {i}" for i in range(200))))
+
+    assert document.content_quality_score is None
+    assert agent.stats["num_escalated"] == 1
+
+
+def test_heuristics_count_letters_of_every_script() -> None:
+    """
+    Test that the letter ratio counts the letters of any script, with their
+    combining marks, and that only error page phrasing counts as boilerplate.
+    """
+
+    agent = HeuristicQualityAgent()
+    features = agent.compute_features(
+        [
+            build_document("สวัสดีครับ"),
+            build_document("こんにちは"),
+            build_document("Error 404"),
+            build_document("We served 404 requests."),
+        ]
+    )
+
+    assert features["letter_ratio"].tolist()[:2] == [1.0, 1.0]
+    assert features["boilerplate_hits"].tolist()[2:] == [1.0, 0.0]
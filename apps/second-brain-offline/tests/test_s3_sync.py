@@ -0,0 +1,135 @@
+import io
+from pathlib import Path
+
+import botocore.exceptions
+import pytest
+
+from second_brain_offline.infrastructure.aws.s3 import S3Client
+
+
+class InMemoryS3:
+    """Local stand-in for the subset of the boto3 S3 client used by syncing."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.uploaded_keys: list[str] = []
+        self.downloaded_keys: list[str] = []
+
+    def head_bucket(self, Bucket: str) -> dict:
+        return {}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, Config=None) -> None:
+        self.objects[Key] = Path(Filename).read_bytes()
+        self.uploaded_keys.append(Key)
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> None:
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        if Key not in self.objects:
+            raise botocore.exceptions.ClientError(
+                {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+            )
+
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, Config=None) -> None:
+        Path(Filename).write_bytes(self.objects[Key])
+        self.downloaded_keys.append(Key)
+
+    def download_fileobj(self, Bucket: str, Key: str, Fileobj, Config=None) -> None:
+        Fileobj.write(self.objects[Key])
+        self.downloaded_keys.append(Key)
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> None:
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+
+
+@pytest.fixture
+def s3_client() -> S3Client:
+    client = S3Client(bucket_name="test-bucket", region="us-east-1")
+    client.s3_client = InMemoryS3()
+
+    return client
+
+
+def write_folder(folder: Path, num_files: int) -> None:
+    for i in range(num_files):
+        path = folder / f"database_{i % 3}" / f"document_{i}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'{{"id": {i}}}')
+
+
+def read_folder(folder: Path) -> dict[str, str]:
+    return {
+        path.relative_to(folder).as_posix(): path.read_text()
+        for path in folder.rglob("*")
+        if path.is_file()
+    }
+
+
+@pytest.mark.parametrize("num_packed_shards", [None, 4])
+def test_sync_transfers_only_changed_files(
+    tmp_path: Path, s3_client: S3Client, num_packed_shards: int | None
+) -> None:
+    source = tmp_path / "notion"
+    write_folder(source, 20)
+
+    stats = s3_client.sync_folder_to_s3(
+        source, "course", num_packed_shards=num_packed_shards
+    )
+    assert stats.transferred_files == 20
+
+    target = tmp_path / "downloaded"
+    stats = s3_client.sync_folder_from_s3("course/notion", target)
+    assert stats.transferred_files == 20
+    assert read_folder(target) == read_folder(source)
+
+    # Change one document and delete another.
+    (source / "database_0" / "document_0.json").write_text('{"id": "changed"}')
+    (source / "database_1" / "document_1.json").unlink()
+    s3_client.s3_client.uploaded_keys.clear()
+
+    stats = s3_client.sync_folder_to_s3(
+        source, "course", num_packed_shards=num_packed_shards
+    )
+    assert stats.deleted_files == 1
+    assert len(s3_client.s3_client.uploaded_keys) == 1
+    if num_packed_shards is None:
+        assert stats.transferred_files == 1
+        assert stats.skipped_files == 18
+
+    s3_client.s3_client.downloaded_keys.clear()
+    stats = s3_client.sync_folder_from_s3("course/notion", target, delete=True)
+    assert stats.transferred_files == 1
+    assert stats.deleted_files == 1
+    assert len(s3_client.s3_client.downloaded_keys) == 1
+    assert read_folder(target) == read_folder(source)
+
+    # Stale objects are removed from the bucket.
+    num_objects = len(s3_client.s3_client.objects)
+    expected_num_objects = 1 + (num_packed_shards or 19)
+    assert num_objects == expected_num_objects
+
+
+def test_sync_switches_layout(tmp_path: Path, s3_client: S3Client) -> None:
+    source = tmp_path / "crawled"
+    write_folder(source, 10)
+
+    s3_client.sync_folder_to_s3(source, num_packed_shards=2)
+    s3_client.sync_folder_to_s3(source)
+
+    assert all(
+        key.startswith("crawled/files/") or key == "crawled/manifest.json"
+        for key in s3_client.s3_client.objects
+    )
+
+    target = tmp_path / "downloaded"
+    s3_client.sync_folder_from_s3("crawled", target)
+    assert read_folder(target) == read_folder(source)
+
+
+def test_sync_from_missing_prefix_raises(tmp_path: Path, s3_client: S3Client) -> None:
+    with pytest.raises(FileNotFoundError):
+        s3_client.sync_folder_from_s3("missing", tmp_path)
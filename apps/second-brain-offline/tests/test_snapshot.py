@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from second_brain_offline.domain import Document, DocumentMetadata
+from second_brain_offline.infrastructure.snapshot import DocumentSnapshot
+
+
+def build_document(index: int) -> Document:
+    return Document(
+        id=f"doc{index}",
+        metadata=DocumentMetadata(
+            id=f"doc{index}",
+            url=f"https://example.com/{index}",
+            title=f"Title {index}",
+            properties={"tags": ["a", "b"], "index": index},
+        ),
+        content=f"Content of document {index} ✓",
+        content_quality_score=index / 100,
+    )
+
+
+def test_snapshot_roundtrip(tmp_path: Path) -> None:
+    """
+    Test that a snapshot is split into shards described by its manifest and that
+    streaming it back yields the same documents in the same order.
+    """
+
+    documents = [build_document(i) for i in range(25)]
+
+    snapshot = DocumentSnapshot(tmp_path)
+    manifest = snapshot.write(iter(documents), shard_size=10, max_workers=2)
+    read_documents = list(snapshot.iter_documents(max_workers=2))
+
+    assert DocumentSnapshot.exists(tmp_path)
+    assert [shard.num_documents for shard in manifest.shards] == [10, 10, 5]
+    assert len(snapshot) == 25
+    assert [doc.model_dump() for doc in read_documents] == [
+        doc.model_dump() for doc in documents
+    ]
+
+
+def test_snapshot_rejects_corrupted_shards(tmp_path: Path) -> None:
+    """
+    Test that reading a shard whose content doesn't match the checksum of the
+    manifest fails instead of yielding corrupted documents.
+    """
+
+    snapshot = DocumentSnapshot(tmp_path)
+    manifest = snapshot.write([build_document(i) for i in range(5)], compression="none")
+    shard_path = tmp_path / manifest.shards[0].path
+    shard_path.write_bytes(shard_path.read_bytes().replace(b"doc1", b"doc9"))
+
+    with pytest.raises(ValueError, match="corrupted"):
+        list(snapshot.iter_documents())
@@ -0,0 +1,128 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from second_brain_offline.application.agents import SummarizationAgent, summarization
+from second_brain_offline.application.dataset import SummarizationDatasetGenerator
+from second_brain_offline.domain import (
+    Document,
+    DocumentMetadata,
+    load_instruct_dataset_dict,
+)
+
+
+def build_document(index: int) -> Document:
+    return Document(
+        id=f"doc{index}",
+        metadata=DocumentMetadata(id=f"doc{index}", url="", title="", properties={}),
+        content=f"Document {index} " + "content " * 20,
+    )
+
+
+def test_generator_builds_samples_from_summary_records() -> None:
+    """
+    Test that every (document, temperature) pair becomes a sample referencing the
+    original document content, with all the samples of a document in one split.
+    """
+
+    documents = [build_document(i) for i in range(30)]
+    generator = SummarizationDatasetGenerator(
+        summarization_model="mock",
+        summarization_max_characters=256,
+        mock=True,
+        augmentation_loops=3,
+    )
+
+    dataset = generator.generate(documents)
+    samples = dataset.train + dataset.validation + dataset.test
+
+    assert len(samples) == 90
+    assert {sample.instruction for sample in samples} == {
+        doc.content for doc in documents
+    }
+    assert sum(
+        len({sample.instruction for sample in split})
+        for split in (dataset.train, dataset.validation, dataset.test)
+    ) == len(documents)
+
+
+def test_summarize_pairs_retries_failed_requests(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that a failed request is put back into the work queue and that records
+    are streamed to the callback as they complete.
+    """
+
+    calls: list[tuple[str, float]] = []
+
+    async def fake_acompletion(model, messages, stream, temperature):
+        calls.append((messages[0]["content"], temperature))
+        if len(calls) == 1:
+            raise RuntimeError("rate limited")
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="summary"))]
+        )
+
+    monkeypatch.setattr(summarization, "acompletion", fake_acompletion)
+
+    agent = SummarizationAgent(
+        max_characters=64,
+        max_concurrent_requests=2,
+        requests_per_second=1000,
+        retry_delay_seconds=0,
+    )
+    streamed_records = []
+    records = agent.summarize_pairs(
+        [build_document(0), build_document(1)],
+        temperatures=[0.0, 0.25],
+        on_record=streamed_records.append,
+    )
+
+    assert len(calls) == 5
+    assert len(records) == 4
+    assert streamed_records == records
+    assert {(record.document_id, record.temperature) for record in records} == {
+        (f"doc{i}", temperature) for i in range(2) for temperature in (0.0, 0.25)
+    }
+
+
+def test_generator_streams_samples_to_shards(tmp_path: Path) -> None:
+    """
+    Test that the samples are written to sharded splits as they are generated,
+    with all the summaries of a document in the same split.
+    """
+
+    documents = [build_document(i) for i in range(30)]
+    generator = SummarizationDatasetGenerator(
+        summarization_model="mock",
+        summarization_max_characters=256,
+        mock=True,
+        augmentation_loops=2,
+    )
+
+    manifest = generator.write(documents, output_dir=tmp_path)
+    dataset_dict = load_instruct_dataset_dict(tmp_path)
+
+    assert manifest["format"] == "arrow"
+    assert sum(len(split) for split in dataset_dict.values()) == 60
+    instructions_per_split = [
+        set(split["instruction"]) for split in dataset_dict.values()
+    ]
+    assert sum(map(len, instructions_per_split)) == 30
+
+
+def test_agent_call_summarizes_documents() -> None:
+    """
+    Test that calling the agent summarizes the documents through the work queue.
+    """
+
+    agent = SummarizationAgent(max_characters=64, mock=True)
+
+    documents = agent([build_document(0), build_document(1)])
+
+    assert [document.summary for document in documents] == [
+        "This is a mock summary"
+    ] * 2
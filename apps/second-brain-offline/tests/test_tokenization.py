@@ -0,0 +1,72 @@
+import random
+
+import pytest
+import tiktoken
+
+from second_brain_offline import utils
+
+
+def reference_clip_tokens(text: str, max_tokens: int, model_id: str) -> str:
+    encoding = tiktoken.encoding_for_model(model_id)
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+
+    return encoding.decode(tokens[:max_tokens])
+
+
+def make_text(num_words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["second", "brain", "RAG", "Îńŧĕřŋâŧîőŋâĺ", "🚀", "42", "\n\n", "##", "é"]
+
+    return " ".join(rng.choice(words) for _ in range(num_words))
+
+
+def test_get_encoding_is_cached() -> None:
+    assert utils.get_encoding("gpt-4o-mini") is utils.get_encoding("gpt-4o-mini")
+    assert utils.get_encoding("unknown-model").name == "cl100k_base"
+
+
+@pytest.mark.parametrize("num_words", [0, 10, 500, 5_000, 50_000])
+@pytest.mark.parametrize("max_tokens", [1, 100, 8192])
+def test_clip_tokens_matches_full_encoding(num_words: int, max_tokens: int) -> None:
+    text = make_text(num_words, seed=num_words)
+
+    clipped = utils.clip_tokens(text, max_tokens=max_tokens, model_id="gpt-4o-mini")
+
+    assert clipped == reference_clip_tokens(text, max_tokens, "gpt-4o-mini")
+
+
+def test_count_tokens() -> None:
+    encoding = tiktoken.get_encoding("cl100k_base")
+    for text in ["", "hello world", make_text(100), make_text(5_000)]:
+        assert utils.count_tokens(text) == len(encoding.encode_ordinary(text))
+        assert utils.count_tokens(text) == len(encoding.encode_ordinary(text))
+
+
+def test_token_count_cache_is_bounded_and_keyed_by_digest(monkeypatch) -> None:
+    encoded_texts = []
+
+    class CharacterEncoding:
+        def encode_ordinary(self, text: str) -> list[int]:
+            encoded_texts.append(text)
+
+            return [ord(character) for character in text]
+
+    monkeypatch.setattr(
+        utils.tiktoken, "get_encoding", lambda name: CharacterEncoding()
+    )
+    cache = utils.TokenCountCache(max_size=2)
+
+    assert cache.count_tokens("first", "cl100k_base") == 5
+    assert cache.count_tokens("first", "cl100k_base") == 5
+    assert cache.count_tokens("second", "cl100k_base") == 6
+    assert cache.count_tokens("third", "cl100k_base") == 5
+    # "first" was evicted as the least recently used text.
+    assert cache.count_tokens("first", "cl100k_base") == 5
+
+    assert encoded_texts == ["first", "second", "third", "first"]
+    assert all(
+        isinstance(digest, bytes) and len(digest) == 16
+        for digest, _ in cache._TokenCountCache__counts
+    )
@@ -13,20 +13,44 @@ def cli() -> None:
 @click.argument("local_path")
 @click.argument("bucket_name")
 @click.option("--s3-prefix", default="", help="Optional S3 prefix (folder path)")
-def upload(local_path: str, bucket_name: str, s3_prefix: str) -> None:
+@click.option(
+    "--sync",
+    is_flag=True,
+    help="Upload only the changed files, with a manifest, instead of a single zip",
+)
+@click.option(
+    "--num-packed-shards",
+    type=int,
+    default=None,
+    help="When syncing, pack small files into this many zip shards",
+)
+def upload(
+    local_path: str,
+    bucket_name: str,
+    s3_prefix: str,
+    sync: bool,
+    num_packed_shards: int | None,
+) -> None:
     """Upload a local folder to S3 bucket.
 
     Args:
         local_path: Path to the local folder to upload
         bucket_name: Name of the S3 bucket
         s3_prefix: Optional S3 prefix (folder path)
+        sync: If True, upload only the changed files instead of a zip
+        num_packed_shards: Number of shards small files are packed into when syncing
 
     Raises:
         click.Abort: If upload fails or path is invalid
     """
     try:
         s3_client = S3Client(bucket_name)
-        s3_client.upload_folder(local_path, s3_prefix)
+        if sync:
+            s3_client.sync_folder_to_s3(
+                local_path, s3_prefix, num_packed_shards=num_packed_shards
+            )
+        else:
+            s3_client.upload_folder(local_path, s3_prefix)
         click.echo(
             f"Successfully uploaded '{local_path}' to 's3://{bucket_name}/{s3_prefix}'"
         )
@@ -44,15 +68,21 @@ def upload(local_path: str, bucket_name: str, s3_prefix: str) -> None:
     is_flag=True,
     help="If True will access S3 un-authenticated for public buckets",
 )
+@click.option(
+    "--sync",
+    is_flag=True,
+    help="Download only the changed files of a folder uploaded with --sync",
+)
 def download(
-    bucket_name: str, s3_path: str, local_path: str, no_sign_request: bool
+    bucket_name: str, s3_path: str, local_path: str, no_sign_request: bool, sync: bool
 ) -> None:
     """Download a zipped folder from S3 and extract it to local storage.
 
     Args:
         bucket_name: Name of the S3 bucket
-        s3_path: Path to the zip file in S3 bucket
+        s3_path: Path to the zip file in S3 bucket, or to the synced folder if `sync`
         local_path: Local path where files should be extracted
+        sync: If True, download only the files that changed since the last download
 
     Raises:
         click.Abort: If download fails or path is invalid
@@ -60,7 +90,10 @@ def download(
 
     try:
         s3_client = S3Client(bucket_name, no_sign_request=no_sign_request)
-        s3_client.download_folder(s3_path, local_path)
+        if sync:
+            s3_client.sync_folder_from_s3(s3_path, local_path)
+        else:
+            s3_client.download_folder(s3_path, local_path)
         click.echo(
             f"Successfully downloaded 's3://{bucket_name}/{s3_path}' to '{local_path}'"
         )
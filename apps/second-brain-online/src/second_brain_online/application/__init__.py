@@ -1,4 +1,22 @@
-from . import agents, rag
-from .evaluation import evaluate
+import importlib
+from types import ModuleType
 
 __all__ = ["rag", "agents", "evaluate"]
+
+# The submodules are imported on first access, so importing the agents doesn't
+# load the evaluation dependencies nor configure Opik as a side effect.
+_LAZY_SUBMODULES = {
+    "agents": ".agents",
+    "evaluate": ".evaluation.evaluate",
+    "rag": ".rag",
+}
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name not in _LAZY_SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_LAZY_SUBMODULES[name], __name__)
+    globals()[name] = module
+
+    return module
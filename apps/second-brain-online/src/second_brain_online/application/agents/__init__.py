@@ -1,3 +1,4 @@
-from .agents import extract_tool_responses, get_agent
+from .agents import AgentPool, extract_tool_responses, get_agent
+from .streaming import AgentEvent
 
-__all__ = ["get_agent", "extract_tool_responses"]
+__all__ = ["get_agent", "AgentEvent", "AgentPool", "extract_tool_responses"]
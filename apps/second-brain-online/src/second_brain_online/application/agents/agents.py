@@ -1,29 +1,119 @@
+import contextvars
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import opik
 from loguru import logger
 from opik import opik_context
-from smolagents import LiteLLMModel, MessageRole, MultiStepAgent, ToolCallingAgent
+from smolagents import (
+    LiteLLMModel,
+    MessageRole,
+    MultiStepAgent,
+    Tool,
+    ToolCallingAgent,
+)
+from smolagents.agents import ActionStep
 
 from second_brain_online.config import settings
+from second_brain_online.latency import latency_span
 
+from .streaming import AgentEvent, stream_tokens
+from .tool_calling import ParallelToolCallingAgent
 from .tools import (
     HuggingFaceEndpointSummarizerTool,
+    LocalSummarizerTool,
     MongoDBRetrieverTool,
     OpenAISummarizerTool,
     what_can_i_do,
 )
 
 
-def get_agent(retriever_config_path: Path) -> "AgentWrapper":
+def get_agent(retriever_config_path: Path, stream: bool = False) -> "AgentWrapper":
     agent = AgentWrapper.build_from_smolagents(
-        retriever_config_path=retriever_config_path
+        retriever_config_path=retriever_config_path, stream=stream
     )
 
     return agent
 
 
+class AgentPool:
+    """Thread-safe pool of prebuilt agents.
+
+    Building an agent loads the embedding model and opens the MongoDB and OpenAI
+    clients of its tools. The pool builds these tools once and shares them
+    between `size` agents, as they hold no per-request state, while every agent
+    keeps its own memory. An agent is used by a single thread at a time, so run
+    `size` threads to use the whole pool.
+
+    Args:
+        retriever_config_path: Path to the retriever config.
+        size: Number of agents in the pool.
+    """
+
+    def __init__(self, retriever_config_path: Path, size: int) -> None:
+        assert size > 0, "The agent pool size must be positive."
+
+        self.size = size
+
+        retriever_tool = MongoDBRetrieverTool(config_path=retriever_config_path)
+        summarizer_tool = get_summarizer_tool()
+
+        self.__agents: queue.Queue[AgentWrapper] = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self.__agents.put(
+                AgentWrapper.build_from_smolagents(
+                    retriever_config_path=retriever_config_path,
+                    retriever_tool=retriever_tool,
+                    summarizer_tool=summarizer_tool,
+                )
+            )
+
+        logger.info(f"Built a pool of {size} agents.")
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None) -> Iterator["AgentWrapper"]:
+        """Borrow an agent, blocking until one is available.
+
+        Args:
+            timeout: Maximum number of seconds to wait for an agent. Defaults to
+                None, which waits indefinitely.
+
+        Yields:
+            AgentWrapper: The agent, returned to the pool on exit.
+
+        Raises:
+            queue.Empty: If no agent is available before the timeout.
+        """
+
+        agent = self.__agents.get(timeout=timeout)
+        try:
+            yield agent
+        finally:
+            self.__agents.put(agent)
+
+
+def get_summarizer_tool(stream: bool = False) -> Tool:
+    if settings.USE_LOCAL_SUMMARIZER:
+        logger.warning(
+            f"Using the local model as the summarizer with model: {settings.LOCAL_SUMMARIZER_MODEL_ID}"
+        )
+        return LocalSummarizerTool(stream=stream)
+    elif settings.USE_HUGGINGFACE_DEDICATED_ENDPOINT:
+        logger.warning(
+            f"Using Hugging Face dedicated endpoint as the summarizer with URL: {settings.HUGGINGFACE_DEDICATED_ENDPOINT}"
+        )
+        return HuggingFaceEndpointSummarizerTool(stream=stream)
+    else:
+        logger.warning(
+            f"Using OpenAI as the summarizer with model: {settings.OPENAI_MODEL_ID}"
+        )
+        return OpenAISummarizerTool(stream=stream)
+
+
 class AgentWrapper:
     def __init__(self, agent: MultiStepAgent) -> None:
         self.__agent = agent
@@ -41,18 +131,17 @@ class AgentWrapper:
         return self.__agent.max_steps
 
     @classmethod
-    def build_from_smolagents(cls, retriever_config_path: Path) -> "AgentWrapper":
-        retriever_tool = MongoDBRetrieverTool(config_path=retriever_config_path)
-        if settings.USE_HUGGINGFACE_DEDICATED_ENDPOINT:
-            logger.warning(
-                f"Using Hugging Face dedicated endpoint as the summarizer with URL: {settings.HUGGINGFACE_DEDICATED_ENDPOINT}"
-            )
-            summarizer_tool = HuggingFaceEndpointSummarizerTool()
-        else:
-            logger.warning(
-                f"Using OpenAI as the summarizer with model: {settings.OPENAI_MODEL_ID}"
-            )
-            summarizer_tool = OpenAISummarizerTool(stream=False)
+    def build_from_smolagents(
+        cls,
+        retriever_config_path: Path,
+        retriever_tool: Tool | None = None,
+        summarizer_tool: Tool | None = None,
+        stream: bool = False,
+    ) -> "AgentWrapper":
+        retriever_tool = retriever_tool or MongoDBRetrieverTool(
+            config_path=retriever_config_path
+        )
+        summarizer_tool = summarizer_tool or get_summarizer_tool(stream=stream)
 
         model = LiteLLMModel(
             model_id=settings.OPENAI_MODEL_ID,
@@ -60,7 +149,7 @@ class AgentWrapper:
             api_key=settings.OPENAI_API_KEY,
         )
 
-        agent = ToolCallingAgent(
+        agent = ParallelToolCallingAgent(
             tools=[what_can_i_do, retriever_tool, summarizer_tool],
             model=model,
             max_steps=3,
@@ -69,10 +158,133 @@ class AgentWrapper:
 
         return cls(agent)
 
+    def prewarm(self) -> None:
+        """Warm up the tools exposing a `prewarm` method (e.g., loading models or
+        opening connections), so the first query doesn't pay for it.
+
+        Failures are logged and ignored, as the tools warm up on first use anyway.
+        """
+
+        for tool in self.__agent.tools.values():
+            if not hasattr(tool, "prewarm"):
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                tool.prewarm()
+            except Exception:
+                logger.opt(exception=True).warning(
+                    f"Failed to prewarm tool '{tool.name}'."
+                )
+
+                continue
+
+            logger.info(
+                f"Prewarmed tool '{tool.name}' in {time.perf_counter() - start_time:.2f} seconds."
+            )
+
     @opik.track(name="Agent.run")
     def run(self, task: str, **kwargs) -> Any:
-        result = self.__agent.run(task, **kwargs)
+        # The root latency span ends inside the Opik trace, so it's attached to it.
+        with latency_span("agent.run"):
+            result = self.__agent.run(task, **kwargs)
+
+            self.__update_trace_metadata()
+
+        return result
+
+    def stream(self, task: str, **kwargs) -> Iterator[AgentEvent]:
+        """Run the agent, yielding its steps, tool tokens and answer as they happen.
+
+        The agent runs in a background thread, so the tokens generated by
+        streaming tools (e.g., the summarizer) are yielded while their step is
+        still running, instead of when the whole step finishes. The Opik trace
+        and the root latency span are opened in that thread, as a tracked
+        generator would lose its trace between two `yield`s.
+
+        Args:
+            task: The user's task.
+            **kwargs: Additional arguments passed to the agent's `run` method.
+
+        Yields:
+            AgentEvent: The step, token and final answer events.
+
+        Raises:
+            Exception: Any error raised while running the agent.
+        """
+
+        events: queue.Queue[AgentEvent | BaseException | None] = queue.Queue()
+
+        def on_token(token: str, source: str) -> None:
+            events.put(
+                AgentEvent(
+                    type="token",
+                    content=token,
+                    source=source,
+                    step_number=self.__agent.step_number,
+                )
+            )
 
+        @opik.track(name="Agent.stream")
+        def run_agent(task: str, **kwargs) -> Any:
+            # The root latency span ends inside the Opik trace, so it's attached to it.
+            with latency_span("agent.stream"):
+                final_answer = None
+                with stream_tokens(on_token):
+                    for step in self.__agent.run(task, stream=True, **kwargs):
+                        if isinstance(step, ActionStep):
+                            events.put(self.__to_step_event(step))
+                        else:
+                            final_answer = step
+
+                self.__update_trace_metadata()
+
+            return final_answer
+
+        def run_in_thread() -> None:
+            try:
+                final_answer = run_agent(task, **kwargs)
+                events.put(AgentEvent(type="final_answer", content=str(final_answer)))
+            except BaseException as e:
+                events.put(e)
+            finally:
+                events.put(None)
+
+        # Copy the context so the agent's trace and spans are nested under the
+        # caller's, if any.
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(run_in_thread,), daemon=True
+        )
+        thread.start()
+
+        while (event := events.get()) is not None:
+            if isinstance(event, BaseException):
+                thread.join()
+
+                raise event
+
+            yield event
+
+        thread.join()
+
+    def __to_step_event(self, step: ActionStep) -> AgentEvent:
+        lines = []
+        for tool_call in step.tool_calls or []:
+            lines.append(f"Called tool '{tool_call.name}' with: {tool_call.arguments}")
+        if step.observations:
+            lines.append(f"Observations: {step.observations}")
+        if step.error:
+            lines.append(f"Error: {step.error}")
+
+        return AgentEvent(
+            type="step",
+            content="\n\n".join(lines),
+            step_number=step.step,
+            duration_seconds=step.duration,
+        )
+
+    def __update_trace_metadata(self) -> None:
         model = self.__agent.model
         metadata = {
             "system_prompt": self.__agent.system_prompt,
@@ -91,8 +303,6 @@ class AgentWrapper:
             metadata=metadata,
         )
 
-        return result
-
 
 def extract_tool_responses(agent: ToolCallingAgent) -> str:
     """
@@ -0,0 +1,66 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from functools import lru_cache
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """An asyncio event loop running forever in a daemon thread.
+
+    Sync code, such as the smolagents agents, submits coroutines to it and blocks
+    on their results. As all coroutines run on the same loop, async clients
+    (e.g., `AsyncOpenAI`) keep their connection pools alive between calls, while
+    a fresh loop per call would close them.
+    """
+
+    def __init__(self) -> None:
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target=self.__loop.run_forever, name="agent-event-loop", daemon=True
+        )
+        self.__thread.start()
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the loop and wait for its result.
+
+        The coroutine runs in a copy of the caller's context, so context variables
+        (e.g., the active Opik trace) are propagated.
+
+        Args:
+            coroutine: The coroutine to run.
+
+        Returns:
+            T: The result of the coroutine.
+        """
+
+        assert threading.current_thread() is not self.__thread, (
+            "Can't block on the background event loop from its own thread."
+        )
+
+        context = contextvars.copy_context()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def on_done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def schedule() -> None:
+            task = self.__loop.create_task(coroutine, context=context)
+            task.add_done_callback(on_done)
+
+        self.__loop.call_soon_threadsafe(schedule)
+
+        return future.result()
+
+
+@lru_cache(maxsize=1)
+def get_background_event_loop() -> BackgroundEventLoop:
+    return BackgroundEventLoop()
@@ -0,0 +1,78 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Literal
+
+from pydantic import BaseModel
+
+TokenCallback = Callable[[str, str], None]
+
+_token_callback: contextvars.ContextVar[TokenCallback | None] = contextvars.ContextVar(
+    "agent_token_callback", default=None
+)
+
+
+class AgentEvent(BaseModel):
+    """An event emitted while an agent runs in streaming mode.
+
+    Attributes:
+        type: "step" when an agent step finishes, with its tool calls and
+            observations, "token" for a token generated by a streaming tool,
+            "final_answer" for the agent's answer and "error" if the run failed.
+        content: The step summary, token, answer or error message.
+        source: The tool that generated a token.
+        step_number: The agent step the event belongs to.
+        duration_seconds: Duration of the step.
+    """
+
+    type: Literal["step", "token", "final_answer", "error"]
+    content: str
+    source: str | None = None
+    step_number: int | None = None
+    duration_seconds: float | None = None
+
+
+@contextmanager
+def stream_tokens(callback: TokenCallback) -> Iterator[None]:
+    """Forward the tokens emitted with `emit_token` in the current context to a callback.
+
+    Args:
+        callback: Called with every token and the name of the tool emitting it.
+    """
+
+    token = _token_callback.set(callback)
+    try:
+        yield
+    finally:
+        _token_callback.reset(token)
+
+
+def emit_token(token: str, source: str) -> None:
+    """Emit a generated token to the active `stream_tokens` callback, if any."""
+
+    callback = _token_callback.get()
+    if callback is not None and token:
+        callback(token, source)
+
+
+def iter_completion_tokens(response: Any) -> Iterator[str]:
+    """Iterate over the text deltas of an OpenAI-compatible streamed completion."""
+
+    for chunk in response:
+        if not chunk.choices:
+            continue
+
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
+
+
+async def aiter_completion_tokens(response: Any) -> AsyncIterator[str]:
+    """Async version of `iter_completion_tokens`."""
+
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
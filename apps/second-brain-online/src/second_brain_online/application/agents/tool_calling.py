@@ -0,0 +1,182 @@
+import asyncio
+from typing import Any
+
+from loguru import logger
+from smolagents import ToolCallingAgent
+from smolagents.agents import ActionStep, ToolCall
+from smolagents.tools import get_tool_description_with_args
+from smolagents.types import handle_agent_input_types, handle_agent_output_types
+from smolagents.utils import AgentExecutionError, AgentGenerationError
+
+from second_brain_online.latency import latency_span
+
+from .event_loop import get_background_event_loop
+
+
+class ParallelToolCallingAgent(ToolCallingAgent):
+    """A `ToolCallingAgent` executing all the tool calls of a step concurrently.
+
+    The base agent only executes the first tool call returned by the model, so
+    independent calls, such as retrieving documents for two sub-questions, take
+    one step each. Here, all the calls of a step run concurrently on a shared
+    background event loop: tools exposing an async `ainvoke` method are awaited
+    directly, while the others run in worker threads. A step with several tool
+    calls thus costs one LLM round trip and the latency of its slowest tool.
+
+    Tool calls keep the semantics of `execute_tool_call`: arguments naming state
+    variables are replaced by their values, inputs and outputs are sanitized, and
+    a failing call fails the step with an `AgentExecutionError`.
+    """
+
+    def step(self, log_entry: ActionStep) -> Any | None:
+        agent_memory = self.write_inner_memory_from_logs()
+        self.input_messages = agent_memory
+        log_entry.agent_memory = agent_memory.copy()
+
+        try:
+            with latency_span("agent.llm_step", step_number=self.step_number):
+                model_message = self.model(
+                    self.input_messages,
+                    tools_to_call_from=list(self.tools.values()),
+                    stop_sequences=["Observation:"],
+                )
+            tool_calls = [
+                ToolCall(
+                    name=tool_call.function.name,
+                    arguments=tool_call.function.arguments,
+                    id=tool_call.id,
+                )
+                for tool_call in model_message.tool_calls
+            ]
+        except Exception as e:
+            raise AgentGenerationError(
+                f"Error in generating tool call with model:\n{e}"
+            ) from e
+
+        log_entry.tool_calls = tool_calls
+
+        final_answer_call = next(
+            (tool_call for tool_call in tool_calls if tool_call.name == "final_answer"),
+            None,
+        )
+        if final_answer_call is not None:
+            final_answer = self.__get_final_answer(final_answer_call.arguments)
+            log_entry.action_output = final_answer
+
+            return final_answer
+
+        for tool_call in tool_calls:
+            logger.info(
+                f"Calling tool '{tool_call.name}' with arguments: {tool_call.arguments}"
+            )
+        with latency_span("agent.tool_calls", num_tool_calls=len(tool_calls)):
+            results = get_background_event_loop().run(
+                self.__execute_tool_calls(tool_calls)
+            )
+
+        successful_calls = [
+            (tool_call, result)
+            for tool_call, result in zip(tool_calls, results)
+            if not isinstance(result, BaseException)
+        ]
+        failed_calls = [
+            (tool_call, result)
+            for tool_call, result in zip(tool_calls, results)
+            if isinstance(result, BaseException)
+        ]
+
+        # The agent memory prefixes the observations with the first call's ID.
+        if successful_calls:
+            log_entry.observations = "\n\n".join(
+                observation
+                if i == 0
+                else f"Call id: {tool_call.id}\nObservation: {observation}"
+                for i, (tool_call, observation) in enumerate(successful_calls)
+            )
+
+        if failed_calls:
+            for _, error in failed_calls:
+                if not isinstance(error, Exception):
+                    raise error
+
+            # The agent memory only shows the error of a failed step, so it also
+            # carries the observations of the calls that succeeded.
+            message = "\n\n".join(
+                f"Call id: {tool_call.id}\n{error}" for tool_call, error in failed_calls
+            )
+            if log_entry.observations is not None:
+                message += (
+                    f"\n\nObservations of the other calls:\n{log_entry.observations}"
+                )
+
+            raise AgentExecutionError(message) from failed_calls[0][1]
+
+        return None
+
+    async def __execute_tool_calls(
+        self, tool_calls: list[ToolCall]
+    ) -> list[str | BaseException]:
+        # Every call runs to completion, even if another one fails.
+        return await asyncio.gather(
+            *(self.__execute_tool_call(tool_call) for tool_call in tool_calls),
+            return_exceptions=True,
+        )
+
+    async def __execute_tool_call(self, tool_call: ToolCall) -> str:
+        with latency_span(f"tool.{tool_call.name}"):
+            observation = await self.__invoke_tool(tool_call)
+
+        return str(observation).strip()
+
+    async def __invoke_tool(self, tool_call: ToolCall) -> Any:
+        tool = self.tools.get(tool_call.name)
+        if not hasattr(tool, "ainvoke"):
+            return await asyncio.to_thread(
+                self.execute_tool_call, tool_call.name, tool_call.arguments
+            )
+
+        # Same as `execute_tool_call`, awaiting the tool's `ainvoke` instead of
+        # calling its `forward`.
+        arguments = tool_call.arguments
+        try:
+            if isinstance(arguments, str):
+                args, kwargs = handle_agent_input_types(arguments)
+            elif isinstance(arguments, dict):
+                args, kwargs = handle_agent_input_types(
+                    **{
+                        key: self.state[value]
+                        if isinstance(value, str) and value in self.state
+                        else value
+                        for key, value in arguments.items()
+                    }
+                )
+            else:
+                raise AgentExecutionError(
+                    f"Arguments passed to tool should be a dict or string: got a {type(arguments)}."
+                )
+
+            if not tool.is_initialized:
+                tool.setup()
+            observation = await tool.ainvoke(*args, **kwargs)
+
+            return handle_agent_output_types(observation, tool.output_type)
+        except AgentExecutionError:
+            raise
+        except Exception as e:
+            logger.opt(exception=True).debug(f"Error calling tool '{tool_call.name}'.")
+
+            raise AgentExecutionError(
+                f"Error in tool call execution: {e}\nYou should only use this tool with a correct input.\n"
+                f"As a reminder, this tool's description is the following:\n{get_tool_description_with_args(tool)}"
+            ) from e
+
+    def __get_final_answer(self, arguments: Any) -> Any:
+        if isinstance(arguments, dict):
+            answer = arguments.get("answer", arguments)
+        else:
+            answer = arguments
+
+        if isinstance(answer, str) and answer in self.state:
+            return self.state[answer]
+
+        return answer
@@ -1,3 +1,4 @@
+from .local_summarizer import LocalSummarizerTool
 from .mongodb_retriever import MongoDBRetrieverTool
 from .summarizer import HuggingFaceEndpointSummarizerTool, OpenAISummarizerTool
 from .what_can_i_do import what_can_i_do
@@ -6,5 +7,6 @@ __all__ = [
     "what_can_i_do",
     "MongoDBRetrieverTool",
     "HuggingFaceEndpointSummarizerTool",
+    "LocalSummarizerTool",
     "OpenAISummarizerTool",
 ]
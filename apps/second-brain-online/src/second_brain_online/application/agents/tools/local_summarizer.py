@@ -0,0 +1,368 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache, partial
+from typing import Callable, Generic, Literal, TypeVar
+
+from loguru import logger
+from opik import track
+from smolagents import Tool
+
+from second_brain_online.config import settings
+
+from ..streaming import emit_token
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Groups items submitted from many threads into batches processed together.
+
+    A worker thread waits for a first item, then collects more items for at most
+    `max_wait_seconds` or until `max_batch_size` items are queued, and processes
+    them with a single `process_batch` call. Concurrent callers, such as agent
+    sessions summarizing at the same time, thus share one forward pass instead
+    of running one each.
+
+    Args:
+        process_batch: Function processing a batch of items, returning one
+            result per item, in order. Otherwise, the whole batch fails.
+        max_batch_size: Maximum number of items per batch.
+        max_wait_seconds: Maximum time to wait for more items after the first
+            one of a batch.
+        name: Name of the worker thread.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[T]], list[R]],
+        max_batch_size: int = 8,
+        max_wait_seconds: float = 0.02,
+        name: str = "micro-batcher",
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self.__process_batch = process_batch
+        self.__queue: queue.Queue[tuple[T, Future]] = queue.Queue()
+        self.__thread = threading.Thread(target=self.__run, name=name, daemon=True)
+        self.__thread.start()
+
+    def submit(self, item: T) -> Future:
+        """Queue an item for the next batch.
+
+        Args:
+            item: The item to process.
+
+        Returns:
+            Future: A future resolved with the result of the item.
+        """
+
+        future: Future = Future()
+        self.__queue.put((item, future))
+
+        return future
+
+    def __run(self) -> None:
+        while True:
+            batch = [self.__queue.get()]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining_seconds = deadline - time.monotonic()
+                if remaining_seconds <= 0:
+                    break
+                try:
+                    batch.append(self.__queue.get(timeout=remaining_seconds))
+                except queue.Empty:
+                    break
+
+            # Skip the items whose caller gave up waiting.
+            batch = [
+                (item, future)
+                for item, future in batch
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.__process_batch(items)
+                # A missing result would leave its caller waiting forever.
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"Got {len(results)} results for a batch of {len(items)} items."
+                    )
+            except Exception as e:
+                logger.opt(exception=True).error(
+                    f"Failed to process a batch of {len(items)} items."
+                )
+                for _, future in batch:
+                    future.set_exception(e)
+
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class LocalSummarizationModel:
+    """The fine-tuned summarization model, running locally on CPU.
+
+    The model is loaded lazily with either:
+        - `onnxruntime`: exported to ONNX and run with ONNX Runtime through
+          `optimum`.
+        - `transformers`: run with PyTorch, with its linear layers dynamically
+          quantized to int8 if `quantize` is True.
+
+    Prompts of a batch are left-padded and generated together with greedy
+    decoding.
+
+    Args:
+        model_id: Hugging Face ID of the model.
+        backend: The inference backend.
+        quantize: Whether to quantize the PyTorch model to int8.
+        max_input_tokens: Maximum number of tokens per prompt. With
+            `generate_from_template`, the content is truncated to fit.
+        max_new_tokens: Maximum number of generated tokens per summary.
+        num_threads: Number of CPU threads used by PyTorch. If None, the
+            PyTorch default is kept.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        backend: Literal["onnxruntime", "transformers"] = "transformers",
+        quantize: bool = True,
+        max_input_tokens: int = 4096,
+        max_new_tokens: int = 256,
+        num_threads: int | None = None,
+    ) -> None:
+        self.model_id = model_id
+        self.backend = backend
+        self.quantize = quantize
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+        self.num_threads = num_threads
+
+        self.__model = None
+        self.__tokenizer = None
+        self.__lock = threading.Lock()
+
+    def load(self) -> None:
+        with self.__lock:
+            if self.__model is not None:
+                return
+
+            try:
+                import torch
+                from transformers import AutoTokenizer
+            except ImportError as e:
+                raise ImportError(
+                    "The local summarizer requires the `local-summarizer` extra. "
+                    "Install it with `uv sync --extra local-summarizer`."
+                ) from e
+
+            if self.num_threads is not None:
+                torch.set_num_threads(self.num_threads)
+
+            logger.info(
+                f"Loading the local summarization model '{self.model_id}' with the '{self.backend}' backend."
+            )
+            start_time = time.perf_counter()
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+            tokenizer.padding_side = "left"
+            # Prompts end with the header the model completes, so if one is still
+            # too long, its start is dropped instead.
+            tokenizer.truncation_side = "left"
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+
+            if self.backend == "onnxruntime":
+                from optimum.onnxruntime import ORTModelForCausalLM
+
+                model = ORTModelForCausalLM.from_pretrained(self.model_id, export=True)
+            else:
+                from transformers import AutoModelForCausalLM
+
+                model = AutoModelForCausalLM.from_pretrained(
+                    self.model_id, torch_dtype=torch.float32
+                )
+                model.eval()
+                if self.quantize:
+                    model = torch.ao.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+
+            self.__tokenizer = tokenizer
+            self.__model = model
+
+            logger.info(
+                f"Loaded the local summarization model in {time.perf_counter() - start_time:.1f} seconds."
+            )
+
+    def generate_from_template(self, template: str, contents: list[str]) -> list[str]:
+        """Generate the completions of a prompt template filled with every content.
+
+        Every content is truncated so its prompt fits in `max_input_tokens`,
+        instead of truncating the prompt, which would drop the end of the template
+        (e.g., the "### Response:" header).
+
+        Args:
+            template: The prompt template, with a `{content}` placeholder.
+            contents: The contents to fill the template with.
+
+        Returns:
+            list[str]: The completions, in order.
+        """
+
+        self.load()
+
+        return self.generate(
+            [self.__format_prompt(template, content) for content in contents]
+        )
+
+    def generate(self, prompts: list[str]) -> list[str]:
+        """Generate the completions of a batch of prompts.
+
+        Args:
+            prompts: The prompts.
+
+        Returns:
+            list[str]: The completions, without their prompts, in order.
+        """
+
+        import torch
+
+        self.load()
+
+        inputs = self.__tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_tokens,
+        )
+        with torch.inference_mode():
+            output_ids = self.__model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+                pad_token_id=self.__tokenizer.pad_token_id,
+            )
+
+        # With left padding, all the prompts end at the same position.
+        generated_ids = output_ids[:, inputs["input_ids"].shape[1] :]
+
+        return [
+            completion.strip()
+            for completion in self.__tokenizer.batch_decode(
+                generated_ids, skip_special_tokens=True
+            )
+        ]
+
+    def __format_prompt(self, template: str, content: str) -> str:
+        num_template_tokens = len(
+            self.__tokenizer(template.format(content=""))["input_ids"]
+        )
+        max_content_tokens = max(self.max_input_tokens - num_template_tokens, 0)
+
+        content_ids = self.__tokenizer(content, add_special_tokens=False)["input_ids"]
+        if len(content_ids) > max_content_tokens:
+            content = self.__tokenizer.decode(
+                content_ids[:max_content_tokens], skip_special_tokens=True
+            )
+
+        return template.format(content=content)
+
+
+@lru_cache(maxsize=1)
+def get_local_summarization_model() -> LocalSummarizationModel:
+    return LocalSummarizationModel(
+        model_id=settings.LOCAL_SUMMARIZER_MODEL_ID,
+        backend=settings.LOCAL_SUMMARIZER_BACKEND,
+        quantize=settings.LOCAL_SUMMARIZER_QUANTIZE,
+        max_input_tokens=settings.LOCAL_SUMMARIZER_MAX_INPUT_TOKENS,
+        max_new_tokens=settings.LOCAL_SUMMARIZER_MAX_NEW_TOKENS,
+        num_threads=settings.LOCAL_SUMMARIZER_NUM_THREADS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_local_summarizer_batcher() -> MicroBatcher[str, str]:
+    """Get the process-wide batcher of the local summarization model.
+
+    It's shared by all the `LocalSummarizerTool` instances, so the agents of a
+    pool batch their summaries together and the model is loaded only once.
+    """
+
+    # The prompts are formatted in the worker thread, as the tokenizer shouldn't
+    # be used by several threads at once.
+    return MicroBatcher(
+        partial(
+            get_local_summarization_model().generate_from_template,
+            LocalSummarizerTool.SYSTEM_PROMPT,
+        ),
+        max_batch_size=settings.LOCAL_SUMMARIZER_MAX_BATCH_SIZE,
+        max_wait_seconds=settings.LOCAL_SUMMARIZER_MAX_WAIT_MS / 1000,
+        name="local-summarizer",
+    )
+
+
+class LocalSummarizerTool(Tool):
+    name = "local_summarizer"
+    description = """Use this tool to summarize a piece of text. Especially useful when you need to summarize a document."""
+
+    inputs = {
+        "text": {
+            "type": "string",
+            "description": """The text to summarize.""",
+        }
+    }
+    output_type = "string"
+
+    SYSTEM_PROMPT = """Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
+
+### Instruction:
+You are a helpful assistant specialized in summarizing documents. Generate a concise TL;DR summary in markdown format having a maximum of 512 characters of the key findings from the provided documents, highlighting the most significant insights
+
+### Input:
+{content}
+
+### Response:
+"""
+
+    def __init__(self, *args, stream: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        # Batched generation returns whole summaries, so a streamed summary is
+        # emitted at once when it's ready.
+        self.stream = stream
+        self.__batcher = get_local_summarizer_batcher()
+
+    def prewarm(self) -> None:
+        """Load the model ahead of the first summary."""
+
+        get_local_summarization_model().load()
+
+    @track
+    def forward(self, text: str) -> str:
+        future = self.__batcher.submit(text)
+
+        return self.__emit(future.result())
+
+    @track
+    async def ainvoke(self, text: str) -> str:
+        future = self.__batcher.submit(text)
+
+        return self.__emit(await asyncio.wrap_future(future))
+
+    def __emit(self, summary: str) -> str:
+        if self.stream:
+            emit_token(summary, source=self.name)
+
+        return summary
@@ -6,7 +6,15 @@ from loguru import logger
 from opik import opik_context, track
 from smolagents import Tool
 
-from second_brain_online.application.rag import get_retriever
+from second_brain_online.application.rag import (
+    ContextPacker,
+    RetrievalCache,
+    get_index_version,
+    get_retriever,
+    reuse_query_embedding,
+)
+from second_brain_online.config import settings
+from second_brain_online.latency import latency_span
 
 
 class MongoDBRetrieverTool(Tool):
@@ -33,6 +41,39 @@ class MongoDBRetrieverTool(Tool):
 
         self.config_path = config_path
         self.retriever = self.__load_retriever(config_path)
+        self.cache = RetrievalCache(
+            max_size=settings.RETRIEVAL_CACHE_MAX_SIZE,
+            ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.RETRIEVAL_CACHE_SIMILARITY_THRESHOLD,
+            # Reuse the vector store's client instead of connecting on every check.
+            get_version=lambda: get_index_version(
+                collection_name="rag",
+                client=self.retriever.vectorstore.collection.database.client,
+            ),
+        )
+        self.context_packer = (
+            ContextPacker(
+                max_tokens=settings.RETRIEVAL_CONTEXT_MAX_TOKENS,
+                model_id=settings.OPENAI_MODEL_ID,
+                compress=settings.RETRIEVAL_CONTEXT_COMPRESSION,
+            )
+            if settings.RETRIEVAL_CONTEXT_MAX_TOKENS > 0
+            else None
+        )
+
+    def prewarm(self) -> None:
+        """Pay the one-time costs of the first search ahead of the first query.
+
+        Embeds a dummy query, which loads the embedding model weights (or opens
+        the HTTP connection of an API model), opens the connection pool of the
+        vector store's MongoDB client and loads the tokenizer of the context
+        packer.
+        """
+
+        self.retriever.vectorstore.embeddings.embed_query("warmup")
+        self.retriever.vectorstore.collection.database.client.admin.command("ping")
+        if self.context_packer is not None:
+            self.context_packer.count_tokens("warmup")
 
     def __load_retriever(self, config_path: Path):
         config = yaml.safe_load(config_path.read_text())
@@ -48,6 +89,80 @@ class MongoDBRetrieverTool(Tool):
 
     @track(name="MongoDBRetrieverTool.forward")
     def forward(self, query: str) -> str:
+        metadata = self.__get_search_metadata()
+
+        try:
+            query = self.__parse_query(query)
+            with latency_span("retrieval") as span:
+                relevant_docs, cache_status = self.cache.get_or_compute(
+                    query,
+                    config_key=self.__get_cache_key(metadata),
+                    compute=self.__search,
+                    embed_query=self.retriever.vectorstore.embeddings.embed_query,
+                )
+                if span is not None:
+                    span.attributes["cache_status"] = cache_status
+            metadata["retrieval_cache"] = {"status": cache_status, **self.cache.stats}
+
+            return self.__format_documents(query, relevant_docs, metadata)
+        except Exception:
+            logger.opt(exception=True).debug("Error retrieving documents.")
+
+            return "Error retrieving documents."
+        finally:
+            opik_context.update_current_trace(tags=["agent"], metadata=metadata)
+
+    @track(name="MongoDBRetrieverTool.ainvoke")
+    async def ainvoke(self, query: str) -> str:
+        """Async version of `forward`, used to run several tool calls concurrently.
+
+        Args:
+            query: The tool call arguments, as a JSON string with a "query" key.
+
+        Returns:
+            str: The formatted search results.
+        """
+
+        metadata = self.__get_search_metadata()
+
+        try:
+            query = self.__parse_query(query)
+            with latency_span("retrieval") as span:
+                relevant_docs, cache_status = await self.cache.aget_or_compute(
+                    query,
+                    config_key=self.__get_cache_key(metadata),
+                    compute=self.__asearch,
+                    embed_query=self.retriever.vectorstore.embeddings.embed_query,
+                )
+                if span is not None:
+                    span.attributes["cache_status"] = cache_status
+            metadata["retrieval_cache"] = {"status": cache_status, **self.cache.stats}
+
+            return self.__format_documents(query, relevant_docs, metadata)
+        except Exception:
+            logger.opt(exception=True).debug("Error retrieving documents.")
+
+            return "Error retrieving documents."
+        finally:
+            opik_context.update_current_trace(tags=["agent"], metadata=metadata)
+
+    def __search(self, query: str, query_embedding: list[float] | None) -> list:
+        # Embeds the query, unless the cache already did, then runs the search,
+        # timed by the MongoDB commands.
+        with (
+            latency_span("retrieval.search"),
+            reuse_query_embedding(query, query_embedding),
+        ):
+            return self.retriever.invoke(query)
+
+    async def __asearch(self, query: str, query_embedding: list[float] | None) -> list:
+        with (
+            latency_span("retrieval.search"),
+            reuse_query_embedding(query, query_embedding),
+        ):
+            return await self.retriever.ainvoke(query)
+
+    def __get_search_metadata(self) -> dict:
         if hasattr(self.retriever, "search_kwargs"):
             search_kwargs = self.retriever.search_kwargs
         else:
@@ -62,42 +177,58 @@ class MongoDBRetrieverTool(Tool):
 
                 search_kwargs = {}
 
-        opik_context.update_current_trace(
-            tags=["agent"],
-            metadata={
-                "search": search_kwargs,
-                "embedding_model_id": self.retriever.vectorstore.embeddings.model,
+        # Unwrap the embedding model from its wrappers (e.g., transform or timing).
+        embeddings = self.retriever.vectorstore.embeddings
+        while hasattr(embeddings, "embedding_model"):
+            embeddings = embeddings.embedding_model
+        embedding_model_id = getattr(embeddings, "model", None) or getattr(
+            embeddings, "model_name", None
+        )
+
+        return {
+            "search": search_kwargs,
+            "embedding_model_id": embedding_model_id,
+        }
+
+    def __get_cache_key(self, metadata: dict) -> str:
+        return json.dumps(
+            {
+                "search": metadata["search"],
+                "embedding_model_id": metadata["embedding_model_id"],
             },
+            sort_keys=True,
+            default=str,
         )
 
-        try:
-            query = self.__parse_query(query)
-            relevant_docs = self.retriever.invoke(query)
+    def __format_documents(
+        self, query: str, relevant_docs: list, metadata: dict
+    ) -> str:
+        if self.context_packer is not None:
+            with latency_span("retrieval.context_packing"):
+                relevant_docs, metadata["context_packing"] = self.context_packer.pack(
+                    query, relevant_docs
+                )
 
-            formatted_docs = []
-            for i, doc in enumerate(relevant_docs, 1):
-                formatted_docs.append(
-                    f"""
+        formatted_docs = []
+        for i, doc in enumerate(relevant_docs, 1):
+            formatted_docs.append(
+                f"""
 <document id="{i}">
 <title>{doc.metadata.get("title")}</title>
 <url>{doc.metadata.get("url")}</url>
 <content>{doc.page_content.strip()}</content>
 </document>
 """
-                )
+            )
 
-            result = "\n".join(formatted_docs)
-            result = f"""
+        result = "\n".join(formatted_docs)
+        result = f"""
 <search_results>
 {result}
 </search_results>
 When using context from any document, also include the document URL as reference, which is found in the <url> tag.
 """
-            return result
-        except Exception:
-            logger.opt(exception=True).debug("Error retrieving documents.")
-
-            return "Error retrieving documents."
+        return result
 
     @track(name="MongoDBRetrieverTool.parse_query")
     def __parse_query(self, query: str) -> str:
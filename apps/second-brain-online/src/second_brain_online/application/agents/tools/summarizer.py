@@ -1,9 +1,69 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from opik import track
 from smolagents import Tool
 
 from second_brain_online.config import settings
 
+from ..streaming import aiter_completion_tokens, emit_token, iter_completion_tokens
+
+
+def complete(
+    client: OpenAI, model: str, content: str, stream: bool, source: str
+) -> str:
+    """Generate a chat completion, optionally streaming its tokens.
+
+    When streaming, every token is emitted with `emit_token` as it is generated,
+    so it can be displayed before the whole completion is returned.
+
+    Args:
+        client: The OpenAI-compatible client.
+        model: The model to use.
+        content: The user message.
+        stream: Whether to stream the completion.
+        source: Name of the tool generating the completion.
+
+    Returns:
+        str: The generated text.
+    """
+
+    messages = [{"role": "user", "content": content}]
+    if not stream:
+        result = client.chat.completions.create(model=model, messages=messages)
+
+        return result.choices[0].message.content
+
+    response = client.chat.completions.create(
+        model=model, messages=messages, stream=True
+    )
+    tokens = []
+    for token in iter_completion_tokens(response):
+        emit_token(token, source=source)
+        tokens.append(token)
+
+    return "".join(tokens)
+
+
+async def acomplete(
+    client: AsyncOpenAI, model: str, content: str, stream: bool, source: str
+) -> str:
+    """Async version of `complete`."""
+
+    messages = [{"role": "user", "content": content}]
+    if not stream:
+        result = await client.chat.completions.create(model=model, messages=messages)
+
+        return result.choices[0].message.content
+
+    response = await client.chat.completions.create(
+        model=model, messages=messages, stream=True
+    )
+    tokens = []
+    async for token in aiter_completion_tokens(response):
+        emit_token(token, source=source)
+        tokens.append(token)
+
+    return "".join(tokens)
+
 
 class HuggingFaceEndpointSummarizerTool(Tool):
     name = "huggingface_summarizer"
@@ -28,9 +88,11 @@ You are a helpful assistant specialized in summarizing documents. Generate a con
 ### Response:
 """
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args, stream: bool = False, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
+        self.stream = stream
+
         assert settings.HUGGINGFACE_ACCESS_TOKEN is not None, (
             "HUGGINGFACE_ACCESS_TOKEN is required to use the dedicated endpoint. Add it to the .env file."
         )
@@ -42,20 +104,30 @@ You are a helpful assistant specialized in summarizing documents. Generate a con
             base_url=settings.HUGGINGFACE_DEDICATED_ENDPOINT,
             api_key=settings.HUGGINGFACE_ACCESS_TOKEN,
         )
+        self.__async_client = AsyncOpenAI(
+            base_url=settings.HUGGINGFACE_DEDICATED_ENDPOINT,
+            api_key=settings.HUGGINGFACE_ACCESS_TOKEN,
+        )
 
     @track
     def forward(self, text: str) -> str:
-        result = self.__client.chat.completions.create(
+        return complete(
+            self.__client,
             model="tgi",
-            messages=[
-                {
-                    "role": "user",
-                    "content": self.SYSTEM_PROMPT.format(content=text),
-                },
-            ],
+            content=self.SYSTEM_PROMPT.format(content=text),
+            stream=self.stream,
+            source=self.name,
         )
 
-        return result.choices[0].message.content
+    @track
+    async def ainvoke(self, text: str) -> str:
+        return await acomplete(
+            self.__async_client,
+            model="tgi",
+            content=self.SYSTEM_PROMPT.format(content=text),
+            stream=self.stream,
+            source=self.name,
+        )
 
 
 class OpenAISummarizerTool(Tool):
@@ -87,24 +159,35 @@ Generate a concise summary of the key findings from the provided documents, high
 Return the document in plain text format regardless of the original format.
 """
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args, stream: bool = False, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
+        self.stream = stream
         self.__client = OpenAI(
             base_url="https://api.openai.com/v1",
             api_key=settings.OPENAI_API_KEY,
         )
+        self.__async_client = AsyncOpenAI(
+            base_url="https://api.openai.com/v1",
+            api_key=settings.OPENAI_API_KEY,
+        )
 
     @track
     def forward(self, text: str) -> str:
-        result = self.__client.chat.completions.create(
+        return complete(
+            self.__client,
             model=settings.OPENAI_MODEL_ID,
-            messages=[
-                {
-                    "role": "user",
-                    "content": self.SYSTEM_PROMPT.format(content=text),
-                },
-            ],
+            content=self.SYSTEM_PROMPT.format(content=text),
+            stream=self.stream,
+            source=self.name,
         )
 
-        return result.choices[0].message.content
+    @track
+    async def ainvoke(self, text: str) -> str:
+        return await acomplete(
+            self.__async_client,
+            model=settings.OPENAI_MODEL_ID,
+            content=self.SYSTEM_PROMPT.format(content=text),
+            stream=self.stream,
+            source=self.name,
+        )
@@ -1,5 +1,16 @@
-from .evaluate import evaluate_agent
+from .batched_judge import BatchedLLMJudge
+from .evaluate import evaluate_agent, score_experiment
 from .summary_density_heuristic import SummaryDensityHeuristic
 from .summary_density_judge import SummaryDensityJudge
+from .traces import load_trace_outputs, score_traces, summarize_scores
 
-__all__ = ["evaluate_agent", "SummaryDensityHeuristic", "SummaryDensityJudge"]
+__all__ = [
+    "evaluate_agent",
+    "score_experiment",
+    "load_trace_outputs",
+    "score_traces",
+    "summarize_scores",
+    "BatchedLLMJudge",
+    "SummaryDensityHeuristic",
+    "SummaryDensityJudge",
+]
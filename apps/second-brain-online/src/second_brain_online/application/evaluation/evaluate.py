@@ -1,33 +1,62 @@
 from pathlib import Path
 
 from loguru import logger
-from opik.evaluation import evaluate
+from opik.evaluation import evaluate, evaluate_experiment
 from opik.evaluation.metrics import AnswerRelevance, Hallucination, Moderation
 
 from second_brain_online import opik_utils
-from second_brain_online.application.agents import agents, extract_tool_responses
+from second_brain_online.application.agents import AgentPool, extract_tool_responses
 from second_brain_online.config import settings
+from second_brain_online.latency import get_latency_tracer
 
+from .batched_judge import BatchedLLMJudge
 from .summary_density_heuristic import SummaryDensityHeuristic
 from .summary_density_judge import SummaryDensityJudge
 
-opik_utils.configure()
 
+def evaluate_agent(
+    prompts: list[str],
+    retriever_config_path: Path,
+    task_threads: int = 2,
+    batch_judges: bool = True,
+    judge_concurrency: int = 16,
+) -> None:
+    """Evaluate the agent on a set of prompts and track the experiment with Opik.
+
+    With `batch_judges`, the agent tasks only compute the cheap heuristic metrics.
+    The LLM judges then score the experiment in a second phase, with a single
+    cached call per item and up to `judge_concurrency` concurrent calls,
+    independently of the `task_threads` running the agent.
+
+    Args:
+        prompts: The evaluation prompts.
+        retriever_config_path: Path to the retriever config.
+        task_threads: Number of threads running the agent.
+        batch_judges: Whether to score the LLM judge metrics with `BatchedLLMJudge`
+            instead of one Opik metric call per judge.
+        judge_concurrency: Maximum number of concurrent judge calls.
+    """
 
-def evaluate_agent(prompts: list[str], retriever_config_path: Path) -> None:
     assert settings.COMET_API_KEY, (
         "COMET_API_KEY is not set. We need it to track the experiment with Opik."
     )
 
+    opik_utils.configure()
+
     logger.info("Starting evaluation...")
     logger.info(f"Evaluating agent with {len(prompts)} prompts.")
 
+    # Build the agents once, one per evaluation thread.
+    agent_pool = AgentPool(
+        retriever_config_path=retriever_config_path, size=task_threads
+    )
+
     def evaluation_task(x: dict) -> dict:
         """Call agentic app logic to evaluate."""
 
-        agent = agents.get_agent(retriever_config_path=retriever_config_path)
-        response = agent.run(x["input"])
-        context = extract_tool_responses(agent)
+        with agent_pool.acquire() as agent:
+            response = agent.run(x["input"])
+            context = extract_tool_responses(agent)
 
         return {
             "input": x["input"],
@@ -40,34 +69,68 @@ def evaluate_agent(prompts: list[str], retriever_config_path: Path) -> None:
     dataset = opik_utils.get_or_create_dataset(name=dataset_name, prompts=prompts)
 
     # Evaluate
-    agent = agents.get_agent(retriever_config_path=retriever_config_path)
-    experiment_config = {
-        "model_id": settings.OPENAI_MODEL_ID,
-        "retriever_config_path": retriever_config_path,
-        "agent_config": {
-            "max_steps": agent.max_steps,
-            "agent_name": agent.agent_name,
-        },
-    }
-    scoring_metrics = [
-        Hallucination(),
-        AnswerRelevance(),
-        Moderation(),
-        SummaryDensityHeuristic(),
-        SummaryDensityJudge(),
-    ]
+    with agent_pool.acquire() as agent:
+        experiment_config = {
+            "model_id": settings.OPENAI_MODEL_ID,
+            "retriever_config_path": retriever_config_path,
+            "agent_config": {
+                "max_steps": agent.max_steps,
+                "agent_name": agent.agent_name,
+            },
+        }
+    if batch_judges:
+        scoring_metrics = [SummaryDensityHeuristic()]
+    else:
+        scoring_metrics = [
+            Hallucination(),
+            AnswerRelevance(),
+            Moderation(),
+            SummaryDensityHeuristic(),
+            SummaryDensityJudge(),
+        ]
 
     if dataset:
         logger.info("Evaluation details:")
         logger.info(f"Dataset: {dataset_name}")
         logger.info(f"Metrics: {[m.__class__.__name__ for m in scoring_metrics]}")
 
-        evaluate(
+        evaluation = evaluate(
             dataset=dataset,
             task=evaluation_task,
             scoring_metrics=scoring_metrics,
             experiment_config=experiment_config,
-            task_threads=2,
+            task_threads=task_threads,
         )
+
+        if batch_judges:
+            score_experiment(
+                evaluation.experiment_name, judge_concurrency=judge_concurrency
+            )
+
+        logger.info(get_latency_tracer().aggregator.format_report())
     else:
         logger.error("Can't run the evaluation as the dataset items are empty.")
+
+
+def score_experiment(experiment_name: str, judge_concurrency: int = 16) -> None:
+    """Score an existing experiment with the batched LLM judges.
+
+    The verdicts are cached, so re-scoring an unchanged experiment doesn't call
+    the judge model again.
+
+    Args:
+        experiment_name: Name of the Opik experiment to score.
+        judge_concurrency: Maximum number of concurrent judge calls.
+    """
+
+    opik_utils.configure()
+
+    logger.info(
+        f"Scoring experiment '{experiment_name}' with up to {judge_concurrency} concurrent judge calls."
+    )
+
+    evaluate_experiment(
+        experiment_name=experiment_name,
+        scoring_metrics=[BatchedLLMJudge(max_concurrency=judge_concurrency)],
+        scoring_threads=judge_concurrency,
+    )
@@ -1,5 +1,6 @@
-from typing import Any
+from typing import Any, Iterable
 
+import numpy as np
 from opik.evaluation.metrics import base_metric, score_result
 
 
@@ -55,6 +56,44 @@ class SummaryDensityHeuristic(base_metric.BaseMetric):
             reason=reason,
         )
 
+    def score_batch(self, outputs: Iterable[str | None]) -> np.ndarray:
+        """
+        Score many outputs at once, without going through Opik.
+
+        Args:
+            outputs: The outputs of an LLM to score. Missing outputs have a length of 0.
+
+        Returns:
+            np.ndarray: The scores of the outputs, in order.
+        """
+
+        lengths = np.fromiter(
+            (len(output) if output is not None else 0 for output in outputs),
+            dtype=np.int64,
+        )
+
+        return self.score_lengths(lengths)
+
+    def score_lengths(self, lengths: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of `_compute_length_score` over output lengths.
+
+        Args:
+            lengths: The lengths of the outputs, in characters.
+
+        Returns:
+            np.ndarray: The scores of the lengths, in order.
+        """
+
+        lengths = np.asarray(lengths, dtype=np.float64)
+        deviations = np.where(
+            lengths < self.min_length,
+            (self.min_length - lengths) / self.min_length,
+            np.maximum(lengths - self.max_length, 0.0) / self.max_length,
+        )
+
+        return np.maximum(0.0, 1.0 - deviations)
+
     def _compute_length_score(self, text: str) -> float:
         """
         Compute a score based on text length relative to min and max boundaries.
@@ -0,0 +1,159 @@
+import json
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+import numpy as np
+from loguru import logger
+
+from .summary_density_heuristic import SummaryDensityHeuristic
+
+
+class BatchMetric(Protocol):
+    name: str
+
+    def score_batch(self, outputs: list[str | None]) -> np.ndarray: ...
+
+
+def get_field(record: dict, field: str) -> Any:
+    """Get a field of a record, following the dots of nested fields (e.g.,
+    "output.output" for the answers of `Agent.run` traces).
+    """
+
+    value: Any = record
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+
+    return value
+
+
+def load_trace_outputs(
+    traces_path: Path, output_field: str = "output"
+) -> list[str | None]:
+    """Load the outputs of exported traces.
+
+    Args:
+        traces_path: Path to the traces, as a JSONL or Parquet file.
+        output_field: Field of the outputs, with dots separating nested fields.
+
+    Returns:
+        list[str | None]: The outputs, in order. None where a trace has no output.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+
+    traces_path = Path(traces_path)
+    if traces_path.suffix == ".jsonl":
+        outputs = [
+            __to_text(get_field(record, output_field))
+            for record in __iter_jsonl(traces_path)
+        ]
+    elif traces_path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Reading Parquet traces requires `pyarrow`. Install it or export the traces as JSONL."
+            ) from e
+
+        root_field = output_field.split(".")[0]
+        table = pq.read_table(traces_path, columns=[root_field])
+        # Flatten the nested fields into dotted columns (e.g., "output.output").
+        while output_field not in table.column_names and any(
+            column.type.num_fields > 0 for column in table.columns
+        ):
+            table = table.flatten()
+        if output_field not in table.column_names:
+            raise ValueError(f"Field '{output_field}' not found in '{traces_path}'.")
+
+        outputs = [
+            __to_text(output) for output in table.column(output_field).to_pylist()
+        ]
+    else:
+        raise ValueError(
+            f"Unsupported traces format: '{traces_path.suffix}'. Use .jsonl or .parquet."
+        )
+
+    logger.info(f"Loaded {len(outputs)} trace outputs from '{traces_path}'.")
+
+    return outputs
+
+
+def score_traces(
+    traces_path: Path,
+    output_field: str = "output",
+    metrics: list[BatchMetric] | None = None,
+) -> dict[str, np.ndarray]:
+    """Score the outputs of exported traces with batch metrics, without Opik.
+
+    Args:
+        traces_path: Path to the traces, as a JSONL or Parquet file.
+        output_field: Field of the outputs, with dots separating nested fields.
+        metrics: Metrics exposing a `score_batch` method. Defaults to the
+            `SummaryDensityHeuristic`.
+
+    Returns:
+        dict[str, np.ndarray]: The output lengths, under "output_length", and
+            the scores of every metric, under its name.
+    """
+
+    metrics = metrics or [SummaryDensityHeuristic()]
+    outputs = load_trace_outputs(traces_path, output_field=output_field)
+
+    results = {
+        "output_length": np.fromiter(
+            (len(output) if output is not None else 0 for output in outputs),
+            dtype=np.int64,
+            count=len(outputs),
+        )
+    }
+    for metric in metrics:
+        results[metric.name] = metric.score_batch(outputs)
+
+    return results
+
+
+def summarize_scores(results: dict[str, np.ndarray]) -> dict[str, dict]:
+    """Summarize the distribution of scores, e.g., to track them daily.
+
+    Args:
+        results: The arrays returned by `score_traces`.
+
+    Returns:
+        dict[str, dict]: The count, mean and 5th, 50th and 95th percentiles of
+            every array.
+    """
+
+    summary = {}
+    for name, values in results.items():
+        if len(values) == 0:
+            summary[name] = {"count": 0}
+
+            continue
+
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        summary[name] = {
+            "count": int(len(values)),
+            "mean": float(np.mean(values)),
+            "p5": float(p5),
+            "p50": float(p50),
+            "p95": float(p95),
+        }
+
+    return summary
+
+
+def __iter_jsonl(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def __to_text(value: Any) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+
+    return json.dumps(value)
@@ -1,11 +1,23 @@
-from .embeddings import EmbeddingModelType, get_embedding_model
-from .retrievers import RetrieverType, get_retriever
+from .cache import RetrievalCache
+from .context import ContextPacker
+from .embeddings import (
+    EmbeddingModelType,
+    EmbeddingTransform,
+    get_embedding_model,
+    reuse_query_embedding,
+)
+from .retrievers import RetrieverType, get_index_version, get_retriever
 from .splitters import get_splitter
 
 __all__ = [
+    "ContextPacker",
     "get_retriever",
+    "get_index_version",
     "get_splitter",
     "EmbeddingModelType",
+    "EmbeddingTransform",
     "get_embedding_model",
+    "reuse_query_embedding",
+    "RetrievalCache",
     "RetrieverType",
 ]
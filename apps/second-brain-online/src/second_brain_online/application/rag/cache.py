@@ -0,0 +1,258 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Literal
+
+import numpy as np
+from loguru import logger
+
+CacheStatus = Literal["exact_hit", "similar_hit", "miss", "disabled"]
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    config_key: str
+    created_at: float
+    embedding: np.ndarray | None = None
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache of retrieval results with a time-to-live.
+
+    Results are keyed by the normalized query and a key of the retriever config
+    (e.g., top k, penalties and embedding model), so changing the search settings
+    never returns stale results. Optionally, a query whose embedding is close
+    enough to the one of a cached query is served from the cache as well, which
+    saves the vector search but not the query embedding. On a miss, the query
+    embedding is passed to `compute`, so the search doesn't embed it again.
+
+    The cache is cleared when the version returned by `get_version` changes,
+    e.g., after the offline pipeline rebuilt the index. The version is checked at
+    most every `version_check_interval_seconds`.
+
+    Args:
+        max_size: Maximum number of cached results. 0 disables the cache.
+        ttl_seconds: Time after which a cached result expires.
+        similarity_threshold: Minimum cosine similarity between two query
+            embeddings to reuse a result. None disables similarity hits.
+        get_version: Function returning the current version of the indexed
+            collection.
+        version_check_interval_seconds: Minimum interval between two version
+            checks.
+    """
+
+    WHITESPACE_PATTERN = re.compile(r"\s+")
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float | None = None,
+        get_version: Callable[[], str | None] | None = None,
+        version_check_interval_seconds: float = 60,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version_check_interval_seconds = version_check_interval_seconds
+
+        self.__get_version = get_version
+        self.__version: str | None = None
+        self.__last_version_check = float("-inf")
+        self.__entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                **self.__stats,
+                "size": len(self.__entries),
+                "version": self.__version,
+            }
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        return cls.WHITESPACE_PATTERN.sub(" ", query).strip().lower().rstrip("?.! ")
+
+    def get_or_compute(
+        self,
+        query: str,
+        config_key: str,
+        compute: Callable[[str, list[float] | None], Any],
+        embed_query: Callable[[str], list[float]] | None = None,
+    ) -> tuple[Any, CacheStatus]:
+        """Return the cached result of a query, computing and caching it on a miss.
+
+        Args:
+            query: The search query.
+            config_key: Key of the retriever config used to compute the result.
+            compute: Function computing the result of a query, given the query
+                and its embedding if the cache already computed it, else None.
+            embed_query: Function embedding a query. Required for similarity hits.
+
+        Returns:
+            tuple[Any, CacheStatus]: The result and whether it came from the cache.
+        """
+
+        if not self.enabled:
+            return compute(query, None), "disabled"
+
+        key = self.__get_key(query, config_key)
+        if (entry := self.__lookup(key)) is not None:
+            return entry.value, "exact_hit"
+
+        query_embedding = embedding = None
+        if self.similarity_threshold is not None and embed_query is not None:
+            query_embedding = embed_query(query)
+            embedding = self.__normalize(np.asarray(query_embedding))
+            if (entry := self.__lookup_similar(embedding, config_key)) is not None:
+                return entry.value, "similar_hit"
+
+        value = compute(query, query_embedding)
+        self.__store(key, value, embedding)
+
+        return value, "miss"
+
+    async def aget_or_compute(
+        self,
+        query: str,
+        config_key: str,
+        compute: Callable[[str, list[float] | None], Awaitable[Any]],
+        embed_query: Callable[[str], list[float]] | None = None,
+    ) -> tuple[Any, CacheStatus]:
+        """Async version of `get_or_compute`, awaiting `compute` on a miss.
+
+        The version check and the query embedding are blocking, so they run in a
+        worker thread.
+        """
+
+        if not self.enabled:
+            return await compute(query, None), "disabled"
+
+        key = await asyncio.to_thread(self.__get_key, query, config_key)
+        if (entry := self.__lookup(key)) is not None:
+            return entry.value, "exact_hit"
+
+        query_embedding = embedding = None
+        if self.similarity_threshold is not None and embed_query is not None:
+            query_embedding = await asyncio.to_thread(embed_query, query)
+            embedding = self.__normalize(np.asarray(query_embedding))
+            if (entry := self.__lookup_similar(embedding, config_key)) is not None:
+                return entry.value, "similar_hit"
+
+        value = await compute(query, query_embedding)
+        self.__store(key, value, embedding)
+
+        return value, "miss"
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def __get_key(self, query: str, config_key: str) -> tuple[str, str]:
+        self.__check_version()
+
+        return self.normalize_query(query), config_key
+
+    def __lookup(self, key: tuple[str, str]) -> CacheEntry | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+
+            if self.__is_expired(entry):
+                del self.__entries[key]
+
+                return None
+
+            self.__entries.move_to_end(key)
+            self.__stats["exact_hits"] += 1
+
+            return entry
+
+    def __lookup_similar(
+        self, embedding: np.ndarray, config_key: str
+    ) -> CacheEntry | None:
+        with self.__lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self.__entries.items()
+                if entry.embedding is not None
+                and entry.config_key == config_key
+                and not self.__is_expired(entry)
+            ]
+            if not candidates:
+                return None
+
+            similarities = np.stack([entry.embedding for _, entry in candidates]) @ (
+                embedding
+            )
+            best_index = int(np.argmax(similarities))
+            if similarities[best_index] < self.similarity_threshold:
+                return None
+
+            key, entry = candidates[best_index]
+            self.__entries.move_to_end(key)
+            self.__stats["similar_hits"] += 1
+
+            return entry
+
+    def __store(
+        self, key: tuple[str, str], value: Any, embedding: np.ndarray | None
+    ) -> None:
+        with self.__lock:
+            self.__stats["misses"] += 1
+            self.__entries[key] = CacheEntry(
+                value=value,
+                config_key=key[1],
+                created_at=time.monotonic(),
+                embedding=embedding,
+            )
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def __is_expired(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def __check_version(self) -> None:
+        if self.__get_version is None:
+            return
+
+        now = time.monotonic()
+        with self.__lock:
+            if now - self.__last_version_check < self.version_check_interval_seconds:
+                return
+            self.__last_version_check = now
+
+        try:
+            version = self.__get_version()
+        except Exception:
+            logger.opt(exception=True).warning(
+                "Could not check the index version. Keeping the cached results."
+            )
+
+            return
+
+        with self.__lock:
+            if version != self.__version:
+                if self.__entries:
+                    logger.info(
+                        f"Index version changed from '{self.__version}' to '{version}'. Clearing the retrieval cache."
+                    )
+                self.__entries.clear()
+                self.__version = version
+
+    @staticmethod
+    def __normalize(embedding: np.ndarray) -> np.ndarray:
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
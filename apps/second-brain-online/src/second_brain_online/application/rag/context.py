@@ -0,0 +1,195 @@
+import re
+from functools import lru_cache
+
+import tiktoken
+from langchain_core.documents import Document
+from loguru import logger
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model_id: str | None = None) -> tiktoken.Encoding:
+    """Get the cached tiktoken encoding of a model, defaulting to cl100k_base."""
+
+    if model_id is None:
+        return tiktoken.get_encoding("cl100k_base")
+
+    try:
+        return tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class ContextPacker:
+    """Packs retrieved documents into a token budget before they reach an LLM.
+
+    The documents are expected in decreasing order of relevance, as returned by
+    the retrievers. Packing runs in three stages:
+        1. Every document is token-counted with a cached tokenizer.
+        2. Documents from the same URL overlapping a more relevant one (e.g.,
+           neighbouring chunks or identical parents) are dropped.
+        3. Documents are greedily added by relevance while they fit in the
+           budget. A document that doesn't fit is either compressed, by keeping
+           its sentences sharing the most words with the query, or truncated.
+
+    Args:
+        max_tokens: Token budget of the packed documents.
+        model_id: Model whose tokenizer counts the tokens.
+        compress: Whether to extractively compress the documents that don't fit,
+            instead of truncating them.
+        overlap_threshold: Fraction of the shingles of the smaller of two
+            documents found in the other one above which they are considered
+            overlapping.
+        min_document_tokens: Documents are only compressed or truncated if at
+            least this many tokens are left in the budget.
+        shingle_size: Number of words per shingle used to detect overlaps.
+    """
+
+    WORD_PATTERN = re.compile(r"\w+")
+    SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        model_id: str | None = None,
+        compress: bool = False,
+        overlap_threshold: float = 0.8,
+        min_document_tokens: int = 64,
+        shingle_size: int = 5,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.model_id = model_id
+        self.compress = compress
+        self.overlap_threshold = overlap_threshold
+        self.min_document_tokens = min_document_tokens
+        self.shingle_size = shingle_size
+
+    def count_tokens(self, text: str) -> int:
+        return len(get_encoding(self.model_id).encode_ordinary(text))
+
+    def pack(
+        self, query: str, documents: list[Document]
+    ) -> tuple[list[Document], dict]:
+        """Pack documents into the token budget.
+
+        Args:
+            query: The query the documents were retrieved for.
+            documents: The documents, sorted by decreasing relevance.
+
+        Returns:
+            tuple[list[Document], dict]: The packed documents, in relevance order,
+                and statistics about the packing.
+        """
+
+        num_tokens = [
+            self.count_tokens(document.page_content) for document in documents
+        ]
+        unique_indices = self.__deduplicate(documents)
+
+        packed_documents = []
+        remaining_tokens = self.max_tokens
+        num_compressed = num_truncated = 0
+        for index in unique_indices:
+            document = documents[index]
+            if num_tokens[index] <= remaining_tokens:
+                packed_documents.append(document)
+                remaining_tokens -= num_tokens[index]
+                continue
+
+            if remaining_tokens < self.min_document_tokens:
+                continue
+
+            if self.compress:
+                content = self.__compress(
+                    query, document.page_content, remaining_tokens
+                )
+                num_compressed += 1
+            else:
+                content = self.__truncate(document.page_content, remaining_tokens)
+                num_truncated += 1
+            if not content:
+                continue
+
+            packed_documents.append(
+                Document(page_content=content, metadata=document.metadata)
+            )
+            remaining_tokens -= self.count_tokens(content)
+
+        stats = {
+            "max_tokens": self.max_tokens,
+            "input_documents": len(documents),
+            "input_tokens": sum(num_tokens),
+            "overlapping_documents": len(documents) - len(unique_indices),
+            "output_documents": len(packed_documents),
+            "output_tokens": self.max_tokens - remaining_tokens,
+            "compressed_documents": num_compressed,
+            "truncated_documents": num_truncated,
+        }
+        logger.debug(f"Packed the retrieved context: {stats}")
+
+        return packed_documents, stats
+
+    def __deduplicate(self, documents: list[Document]) -> list[int]:
+        kept_shingles_by_url: dict[str, list[set[str]]] = {}
+        unique_indices = []
+        for index, document in enumerate(documents):
+            url = document.metadata.get("url")
+            shingles = self.__shingles(document.page_content)
+            kept_shingles = kept_shingles_by_url.setdefault(url, [])
+            if any(
+                self.__overlap(shingles, other_shingles) >= self.overlap_threshold
+                for other_shingles in kept_shingles
+            ):
+                continue
+
+            kept_shingles.append(shingles)
+            unique_indices.append(index)
+
+        return unique_indices
+
+    def __compress(self, query: str, content: str, max_tokens: int) -> str:
+        query_words = set(self.WORD_PATTERN.findall(query.lower()))
+        sentences = [
+            sentence.strip()
+            for sentence in self.SENTENCE_PATTERN.split(content)
+            if sentence.strip()
+        ]
+
+        def score(index: int) -> tuple[float, int]:
+            sentence_words = set(self.WORD_PATTERN.findall(sentences[index].lower()))
+            matches = len(query_words & sentence_words)
+
+            # Prefer the earlier sentences on ties, as they often introduce the topic.
+            return matches / max(len(query_words), 1), -index
+
+        selected_indices = []
+        remaining_tokens = max_tokens
+        for index in sorted(range(len(sentences)), key=score, reverse=True):
+            # Count the newline separating the sentence from the others.
+            num_tokens = self.count_tokens(sentences[index]) + 1
+            if num_tokens <= remaining_tokens:
+                selected_indices.append(index)
+                remaining_tokens -= num_tokens
+
+        return "\n".join(sentences[index] for index in sorted(selected_indices))
+
+    def __truncate(self, content: str, max_tokens: int) -> str:
+        encoding = get_encoding(self.model_id)
+
+        return encoding.decode(encoding.encode_ordinary(content)[:max_tokens])
+
+    def __shingles(self, text: str) -> set[str]:
+        words = self.WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    @staticmethod
+    def __overlap(shingles: set[str], other_shingles: set[str]) -> float:
+        if not shingles or not other_shingles:
+            return float(shingles == other_shingles)
+
+        return len(shingles & other_shingles) / min(len(shingles), len(other_shingles))
@@ -1,10 +1,23 @@
-from typing import Literal, Union
+import contextvars
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Literal, Union
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_openai import OpenAIEmbeddings
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+
+from second_brain_online.latency import latency_span
+
+# The embedding providers are imported when used, as loading them is slow (e.g.,
+# `langchain_huggingface` imports PyTorch) and only one of them is needed.
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_openai import OpenAIEmbeddings
 
 EmbeddingModelType = Literal["openai", "huggingface"]
-EmbeddingsModel = Union[OpenAIEmbeddings, HuggingFaceEmbeddings]
+EmbeddingsModel = Union["OpenAIEmbeddings", "HuggingFaceEmbeddings"]
+EmbeddingTransformMethod = Literal["none", "matryoshka", "pca"]
+EmbeddingDType = Literal["float32", "float16"]
 
 
 def get_embedding_model(
@@ -38,7 +51,7 @@ def get_embedding_model(
         raise ValueError(f"Invalid embedding model type: {model_type}")
 
 
-def get_openai_embedding_model(model_id: str) -> OpenAIEmbeddings:
+def get_openai_embedding_model(model_id: str) -> "OpenAIEmbeddings":
     """Gets an OpenAI embedding model instance.
 
     Args:
@@ -48,6 +61,8 @@ def get_openai_embedding_model(model_id: str) -> OpenAIEmbeddings:
         OpenAIEmbeddings: A configured OpenAI embeddings model instance with
             special token handling enabled
     """
+    from langchain_openai import OpenAIEmbeddings
+
     return OpenAIEmbeddings(
         model=model_id,
         allowed_special={"<|endoftext|>"},
@@ -56,7 +71,7 @@ def get_openai_embedding_model(model_id: str) -> OpenAIEmbeddings:
 
 def get_huggingface_embedding_model(
     model_id: str, device: str
-) -> HuggingFaceEmbeddings:
+) -> "HuggingFaceEmbeddings":
     """Gets a HuggingFace embedding model instance.
 
     Args:
@@ -67,8 +82,208 @@ def get_huggingface_embedding_model(
         HuggingFaceEmbeddings: A configured HuggingFace embeddings model instance
             with remote code trust enabled and embedding normalization disabled
     """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
     return HuggingFaceEmbeddings(
         model_name=model_id,
         model_kwargs={"device": device, "trust_remote_code": True},
         encode_kwargs={"normalize_embeddings": False},
     )
+
+
+class EmbeddingTransform(BaseModel):
+    """A post-embedding transform reducing the size of the stored vectors.
+
+    The transform is stored next to the vector index, so the exact same transform
+    can be applied to the queries at retrieval time.
+
+    Attributes:
+        method: "matryoshka" keeps the first `output_dim` dimensions, which is
+            suited to models trained with Matryoshka representation learning
+            (e.g., text-embedding-3). "pca" projects the embeddings on the
+            `output_dim` principal components fitted on a sample of embeddings.
+            "none" keeps the full embeddings.
+        output_dim: Dimension of the transformed embeddings. Required by
+            "matryoshka" and "pca".
+        dtype: Precision of the transformed embeddings. "float16" rounds the
+            values to half precision.
+        normalize: Whether to L2-normalize the transformed embeddings, which
+            keeps dot-product and cosine scores consistent after truncation.
+        mean: The mean embedding of the PCA sample.
+        components: The PCA components, of shape (output_dim, input_dim).
+    """
+
+    method: EmbeddingTransformMethod = "none"
+    output_dim: int | None = None
+    dtype: EmbeddingDType = "float32"
+    normalize: bool = True
+    mean: list[float] | None = None
+    components: list[list[float]] | None = None
+
+    @property
+    def is_identity(self) -> bool:
+        return self.method == "none" and self.dtype == "float32"
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.method != "pca" or self.components is not None
+
+    def get_output_dim(self, input_dim: int) -> int:
+        if self.method == "none":
+            return input_dim
+
+        assert self.output_dim is not None, f"'{self.method}' requires an output_dim."
+
+        return self.output_dim
+
+    def fit(self, embeddings: np.ndarray) -> "EmbeddingTransform":
+        """Fit the PCA components on a sample of embeddings. No-op for other methods.
+
+        Args:
+            embeddings: Sample of embeddings, of shape (num_samples, input_dim).
+
+        Returns:
+            EmbeddingTransform: The fitted transform.
+
+        Raises:
+            ValueError: If the sample has fewer embeddings than `output_dim`.
+        """
+
+        if self.method != "pca":
+            return self
+
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        output_dim = self.get_output_dim(embeddings.shape[1])
+        if embeddings.shape[0] < output_dim:
+            raise ValueError(
+                f"PCA to {output_dim} dimensions requires at least {output_dim} "
+                f"sample embeddings, got {embeddings.shape[0]}."
+            )
+
+        mean = embeddings.mean(axis=0)
+        _, _, components = np.linalg.svd(embeddings - mean, full_matrices=False)
+
+        self.mean = mean.tolist()
+        self.components = components[:output_dim].tolist()
+
+        return self
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Apply the transform to a batch of embeddings.
+
+        Args:
+            embeddings: Embeddings of shape (num_embeddings, input_dim).
+
+        Returns:
+            np.ndarray: Transformed embeddings of shape (num_embeddings, output_dim).
+        """
+
+        assert self.is_fitted, "The PCA transform must be fitted before use."
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.method == "matryoshka":
+            embeddings = embeddings[:, : self.get_output_dim(embeddings.shape[1])]
+        elif self.method == "pca":
+            embeddings = (embeddings - np.asarray(self.mean, dtype=np.float32)) @ (
+                np.asarray(self.components, dtype=np.float32).T
+            )
+
+        if self.normalize and self.method != "none":
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        return embeddings.astype(self.dtype)
+
+
+class TransformedEmbeddings(Embeddings):
+    """Wraps an embedding model to apply an `EmbeddingTransform` to its outputs.
+
+    Args:
+        embedding_model: The wrapped embedding model.
+        transform: The transform applied to both documents and queries.
+    """
+
+    def __init__(self, embedding_model: Embeddings, transform: EmbeddingTransform):
+        self.embedding_model = embedding_model
+        self.transform = transform
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        embeddings = self.embedding_model.embed_documents(texts)
+
+        return self.transform.transform(np.asarray(embeddings)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        embedding = self.embedding_model.embed_query(text)
+
+        return self.transform.transform(np.asarray([embedding]))[0].tolist()
+
+
+_precomputed_query_embedding: contextvars.ContextVar[tuple[str, list[float]] | None] = (
+    contextvars.ContextVar("precomputed_query_embedding", default=None)
+)
+
+
+@contextmanager
+def reuse_query_embedding(query: str, embedding: list[float] | None) -> Iterator[None]:
+    """Serve an already computed query embedding from `TimedEmbeddings.embed_query`.
+
+    The retrievers embed the query themselves, so this avoids embedding it again
+    when the caller already did (e.g., the retrieval cache). Only the embedding of
+    the same query is reused.
+
+    Args:
+        query: The query.
+        embedding: Its embedding, as returned by the retriever's embedding model.
+            If None, the query is embedded as usual.
+    """
+
+    if embedding is None:
+        yield
+
+        return
+
+    token = _precomputed_query_embedding.set((query, embedding))
+    try:
+        yield
+    finally:
+        _precomputed_query_embedding.reset(token)
+
+
+class TimedEmbeddings(Embeddings):
+    """Wraps an embedding model to time its calls with latency spans.
+
+    Query embeddings set with `reuse_query_embedding` are returned without calling
+    the wrapped model.
+
+    Args:
+        embedding_model: The wrapped embedding model.
+    """
+
+    def __init__(self, embedding_model: Embeddings):
+        self.embedding_model = embedding_model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with latency_span("embedding.documents", num_texts=len(texts)):
+            return self.embedding_model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        precomputed = _precomputed_query_embedding.get()
+        if precomputed is not None and precomputed[0] == text:
+            return list(precomputed[1])
+
+        with latency_span("embedding.query"):
+            return self.embedding_model.embed_query(text)
+
+
+def apply_embedding_transform(
+    embedding_model: EmbeddingsModel, transform: EmbeddingTransform | None
+) -> Embeddings:
+    """Wrap an embedding model with a transform, unless the transform is a no-op."""
+
+    if transform is None or transform.is_identity:
+        return embedding_model
+
+    return TransformedEmbeddings(embedding_model, transform)
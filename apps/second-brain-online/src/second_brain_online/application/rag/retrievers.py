@@ -1,15 +1,31 @@
+import threading
 from typing import Literal, Union
 
+import pymongo
+from langchain_core.embeddings import Embeddings
 from langchain_mongodb import MongoDBAtlasVectorSearch
+from langchain_mongodb.docstores import MongoDBDocStore
 from langchain_mongodb.retrievers import (
     MongoDBAtlasHybridSearchRetriever,
     MongoDBAtlasParentDocumentRetriever,
 )
 from loguru import logger
+from pymongo import MongoClient, monitoring
 
 from second_brain_online.config import settings
+from second_brain_online.latency import (
+    LatencyTracer,
+    get_current_span,
+    get_latency_tracer,
+)
 
-from .embeddings import EmbeddingModelType, EmbeddingsModel, get_embedding_model
+from .embeddings import (
+    EmbeddingModelType,
+    EmbeddingTransform,
+    TimedEmbeddings,
+    apply_embedding_transform,
+    get_embedding_model,
+)
 from .splitters import get_splitter
 
 # Add these type definitions at the top of the file
@@ -18,6 +34,8 @@ RetrieverModel = Union[
     MongoDBAtlasHybridSearchRetriever, MongoDBAtlasParentDocumentRetriever
 ]
 
+INDEX_METADATA_COLLECTION_NAME = "index_metadata"
+
 
 def get_retriever(
     embedding_model_id: str,
@@ -25,14 +43,22 @@ def get_retriever(
     retriever_type: RetrieverType = "contextual",
     k: int = 3,
     device: str = "cpu",
+    embedding_transform: EmbeddingTransform | None = None,
 ) -> RetrieverModel:
     logger.info(
         f"Getting '{retriever_type}' retriever for '{embedding_model_type}' - '{embedding_model_id}' on '{device}' "
         f"with {k} top results"
     )
 
-    embedding_model = get_embedding_model(
-        embedding_model_id, embedding_model_type, device
+    if embedding_transform is None:
+        embedding_transform = get_index_embedding_transform(
+            collection_name="rag", embedding_model_id=embedding_model_id
+        )
+    embedding_model = TimedEmbeddings(
+        apply_embedding_transform(
+            get_embedding_model(embedding_model_id, embedding_model_type, device),
+            embedding_transform,
+        )
     )
 
     if retriever_type == "contextual":
@@ -43,13 +69,98 @@ def get_retriever(
         raise ValueError(f"Invalid retriever type: {retriever_type}")
 
 
+class CommandLatencyListener(monitoring.CommandListener):
+    """Records the duration of the MongoDB commands of a client as latency spans.
+
+    The driver publishes the command events in the thread running the command,
+    so the spans are nested under the caller's span. Commands run outside of a
+    span (e.g., the connection checks at startup) are skipped instead of
+    starting traces of their own. The hybrid search runs the vector search, the
+    full-text search and their fusion in a single aggregation pipeline, so its
+    stages are listed in the `pipeline` attribute.
+
+    Args:
+        tracer: The tracer recording the spans. Defaults to the application's.
+    """
+
+    def __init__(self, tracer: LatencyTracer | None = None) -> None:
+        self.__tracer = tracer
+        self.__pipelines: dict[int, str] = {}
+        self.__lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name != "aggregate" or get_current_span() is None:
+            return
+
+        pipeline = self.__format_pipeline(event.command.get("pipeline", []))
+        with self.__lock:
+            self.__pipelines[event.request_id] = pipeline
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.__record(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.__record(event, error=str(event.failure.get("errmsg")))
+
+    def __record(
+        self,
+        event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent,
+        error: str | None = None,
+    ) -> None:
+        with self.__lock:
+            pipeline = self.__pipelines.pop(event.request_id, None)
+        if get_current_span() is None:
+            return
+
+        attributes = {"database": event.database_name, "request_id": event.request_id}
+        if pipeline is not None:
+            attributes["pipeline"] = pipeline
+
+        tracer = self.__tracer or get_latency_tracer()
+        tracer.record(
+            f"mongodb.{event.command_name}",
+            duration_ns=event.duration_micros * 1000,
+            error=error,
+            **attributes,
+        )
+
+    @classmethod
+    def __format_pipeline(cls, pipeline: list[dict]) -> str:
+        """Format the stage names of a pipeline, including the nested ones, e.g.,
+        "$vectorSearch, $group, $unionWith($search, $group)".
+        """
+
+        stages = []
+        for stage in pipeline:
+            name, options = next(iter(stage.items()))
+            if isinstance(options, dict) and "pipeline" in options:
+                name = f"{name}({cls.__format_pipeline(options['pipeline'])})"
+            stages.append(name)
+
+        return ", ".join(stages)
+
+
+def get_mongodb_client() -> MongoClient:
+    """Create a MongoDB client whose commands are timed by the latency tracer.
+
+    Only the retrievers' clients are timed, so the commands of other clients
+    (e.g., the one loading the index metadata) don't show up as latency spans.
+    """
+
+    return MongoClient(
+        settings.MONGODB_URI,
+        appname="second_brain_course",
+        event_listeners=[CommandLatencyListener()],
+    )
+
+
 def get_hybrid_search_retriever(
-    embedding_model: EmbeddingsModel, k: int
+    embedding_model: Embeddings, k: int
 ) -> MongoDBAtlasHybridSearchRetriever:
-    vectorstore = MongoDBAtlasVectorSearch.from_connection_string(
-        connection_string=settings.MONGODB_URI,
+    client = get_mongodb_client()
+    vectorstore = MongoDBAtlasVectorSearch(
+        collection=client[settings.MONGODB_DATABASE_NAME]["rag"],
         embedding=embedding_model,
-        namespace=f"{settings.MONGODB_DATABASE_NAME}.rag",
         text_key="chunk",
         embedding_key="embedding",
         relevance_score_fn="dotProduct",
@@ -67,17 +178,109 @@ def get_hybrid_search_retriever(
 
 
 def get_parent_document_retriever(
-    embedding_model: EmbeddingsModel, k: int = 3
+    embedding_model: Embeddings, k: int = 3
 ) -> MongoDBAtlasParentDocumentRetriever:
-    retriever = MongoDBAtlasParentDocumentRetriever.from_connection_string(
-        connection_string=settings.MONGODB_URI,
-        embedding_model=embedding_model,
+    client = get_mongodb_client()
+    collection = client[settings.MONGODB_DATABASE_NAME]["rag"]
+    vectorstore = MongoDBAtlasVectorSearch(
+        collection=collection, embedding=embedding_model, text_key="page_content"
+    )
+    docstore = MongoDBDocStore(collection=collection)
+    docstore.collection.create_index([("doc_id", pymongo.ASCENDING)])
+
+    retriever = MongoDBAtlasParentDocumentRetriever(
+        vectorstore=vectorstore,
+        docstore=docstore,
         child_splitter=get_splitter(200),
         parent_splitter=get_splitter(800),
-        database_name=settings.MONGODB_DATABASE_NAME,
-        collection_name="rag",
-        text_key="page_content",
+        id_key="doc_id",
         search_kwargs={"k": k},
     )
 
     return retriever
+
+
+def get_index_embedding_transform(
+    collection_name: str, embedding_model_id: str | None = None
+) -> EmbeddingTransform | None:
+    """Load the embedding transform the vector index was built with.
+
+    The offline RAG pipeline stores the transform applied to the document
+    embeddings (e.g., Matryoshka truncation or PCA) in the index metadata, so the
+    queries are embedded in the same space.
+
+    Args:
+        collection_name: Name of the indexed collection.
+        embedding_model_id: The query embedding model, checked against the one used
+            to build the index.
+
+    Returns:
+        EmbeddingTransform | None: The transform, or None if the index has no
+            metadata.
+    """
+
+    metadata = get_index_metadata(collection_name)
+    if metadata is None:
+        logger.warning(
+            f"No index metadata found for collection '{collection_name}'. Using full embeddings."
+        )
+
+        return None
+
+    if (
+        embedding_model_id is not None
+        and metadata.get("embedding_model_id") != embedding_model_id
+    ):
+        logger.warning(
+            f"Index '{collection_name}' was built with embedding model "
+            f"'{metadata.get('embedding_model_id')}', but queries use '{embedding_model_id}'."
+        )
+
+    transform = EmbeddingTransform.model_validate(metadata["embedding_transform"])
+    logger.info(
+        f"Applying '{transform.method}' embedding transform to queries "
+        f"(output dim: {transform.output_dim}, dtype: {transform.dtype})"
+    )
+
+    return transform
+
+
+def get_index_version(
+    collection_name: str, client: MongoClient | None = None
+) -> str | None:
+    """Get the version stamped on the index metadata every time the index is rebuilt.
+
+    Args:
+        collection_name: Name of the indexed collection.
+        client: MongoDB client to query with, e.g., the one of the retriever's
+            vector store, as the version is checked periodically. If None, a
+            client is created for the query.
+
+    Returns:
+        str | None: The version, or None if the index has no versioned metadata.
+    """
+
+    metadata = get_index_metadata(
+        collection_name, projection={"version": True}, client=client
+    )
+    if metadata is None:
+        return None
+
+    return metadata.get("version")
+
+
+def get_index_metadata(
+    collection_name: str,
+    projection: dict | None = None,
+    client: MongoClient | None = None,
+) -> dict | None:
+    if client is not None:
+        return client[settings.MONGODB_DATABASE_NAME][
+            INDEX_METADATA_COLLECTION_NAME
+        ].find_one({"_id": collection_name}, projection)
+
+    client = MongoClient(settings.MONGODB_URI, appname="second_brain_course")
+    try:
+        return get_index_metadata(collection_name, projection, client=client)
+    finally:
+        client.close()
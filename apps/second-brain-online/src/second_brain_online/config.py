@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Literal
+
 from loguru import logger
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -38,6 +41,44 @@ class Settings(BaseSettings):
         "with /v1 after the endpoint URL.",
     )
 
+    # --- Local Summarizer Configuration ---
+    USE_LOCAL_SUMMARIZER: bool = Field(
+        default=False,
+        description="Whether to run the fine-tuned summarization model locally on CPU. "
+        "If True, it's used instead of the dedicated endpoint and OpenAI.",
+    )
+    LOCAL_SUMMARIZER_MODEL_ID: str = Field(
+        default="pauliusztin/Meta-Llama-3.1-8B-Instruct-Second-Brain-Summarization",
+        description="Hugging Face ID of the local summarization model.",
+    )
+    LOCAL_SUMMARIZER_BACKEND: Literal["onnxruntime", "transformers"] = Field(
+        default="transformers",
+        description="Inference backend of the local summarization model.",
+    )
+    LOCAL_SUMMARIZER_QUANTIZE: bool = Field(
+        default=True,
+        description="Whether to quantize the local summarization model to int8. Only used by the transformers backend.",
+    )
+    LOCAL_SUMMARIZER_MAX_BATCH_SIZE: int = Field(
+        default=8,
+        description="Maximum number of summaries generated in one forward pass.",
+    )
+    LOCAL_SUMMARIZER_MAX_WAIT_MS: float = Field(
+        default=20,
+        description="Maximum time to wait for more summaries to batch after the first one.",
+    )
+    LOCAL_SUMMARIZER_MAX_INPUT_TOKENS: int = Field(
+        default=4096,
+        description="Prompts of the local summarization model are truncated to this many tokens.",
+    )
+    LOCAL_SUMMARIZER_MAX_NEW_TOKENS: int = Field(
+        default=256, description="Maximum number of tokens per local summary."
+    )
+    LOCAL_SUMMARIZER_NUM_THREADS: int | None = Field(
+        default=None,
+        description="Number of CPU threads of the local summarization model. If not set, the PyTorch default is used.",
+    )
+
     # --- MongoDB Atlas Configuration ---
     MONGODB_DATABASE_NAME: str = Field(
         default="second_brain_course",
@@ -48,6 +89,45 @@ class Settings(BaseSettings):
         description="Connection URI for the local MongoDB Atlas instance.",
     )
 
+    # --- Retrieval Cache Configuration ---
+    RETRIEVAL_CACHE_MAX_SIZE: int = Field(
+        default=256,
+        description="Maximum number of cached retrieval results. Set to 0 to disable the cache.",
+    )
+    RETRIEVAL_CACHE_TTL_SECONDS: float = Field(
+        default=3600, description="Time after which a cached retrieval result expires."
+    )
+    RETRIEVAL_CACHE_SIMILARITY_THRESHOLD: float | None = Field(
+        default=None,
+        description="Minimum cosine similarity between two query embeddings to reuse a cached result. "
+        "If not set, only queries equal after normalization hit the cache.",
+    )
+
+    # --- Retrieved Context Configuration ---
+    RETRIEVAL_CONTEXT_MAX_TOKENS: int = Field(
+        default=4000,
+        description="Token budget of the retrieved documents returned to the agent. Set to 0 to disable context packing.",
+    )
+    RETRIEVAL_CONTEXT_COMPRESSION: bool = Field(
+        default=False,
+        description="Whether to extractively compress the retrieved documents exceeding the token budget instead of truncating them.",
+    )
+
+    # --- Latency Tracing Configuration ---
+    LATENCY_TRACING_ENABLED: bool = Field(
+        default=True,
+        description="Whether to time the stages of every request (e.g., embedding, search, LLM steps and tools).",
+    )
+    LATENCY_OTLP_EXPORT_PATH: Path | None = Field(
+        default=None,
+        description="JSONL file where the latency spans are exported in the OpenTelemetry OTLP/JSON format. "
+        "If not set, the spans are only attached to the Opik traces.",
+    )
+    LATENCY_REPORT_WINDOW_SECONDS: float = Field(
+        default=900,
+        description="Window over which the p50/p95 latency of every stage is reported.",
+    )
+
     # --- OpenAI API Configuration ---
     OPENAI_API_KEY: str = Field(
         description="API key for OpenAI service authentication.",
@@ -0,0 +1,426 @@
+import contextvars
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+import numpy as np
+from loguru import logger
+from opik import opik_context
+
+from second_brain_online.config import settings
+
+
+@dataclass
+class LatencySpan:
+    """A timed stage of a request.
+
+    Durations are measured with a monotonic clock, while the wall-clock start
+    time is only used to place the span on a timeline when exporting it.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_time_unix_nano: int
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_span_id is None
+
+    @property
+    def duration_ns(self) -> int:
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+
+        return end_ns - self.start_ns
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    @property
+    def end_time_unix_nano(self) -> int:
+        return self.start_time_unix_nano + self.duration_ns
+
+
+class SpanExporter(Protocol):
+    def export(self, span: LatencySpan) -> None: ...
+
+
+class LatencyAggregator:
+    """Aggregates the durations of the spans of every stage over a sliding window.
+
+    Args:
+        window_seconds: Only the spans finished in the last `window_seconds` are
+            aggregated.
+        max_samples: Maximum number of durations kept per stage.
+    """
+
+    def __init__(self, window_seconds: float = 900, max_samples: int = 10_000) -> None:
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+
+        self.__samples: dict[str, deque[tuple[float, float]]] = defaultdict(
+            lambda: deque(maxlen=self.max_samples)
+        )
+        self.__lock = threading.Lock()
+
+    def export(self, span: LatencySpan) -> None:
+        with self.__lock:
+            self.__samples[span.name].append((time.monotonic(), span.duration_ms))
+
+    def report(self) -> dict[str, dict]:
+        """Compute the latency percentiles of every stage over the window.
+
+        Returns:
+            dict[str, dict]: The count, p50, p95 and max durations, in
+                milliseconds, of every stage.
+        """
+
+        min_time = time.monotonic() - self.window_seconds
+        with self.__lock:
+            durations_by_stage = {
+                name: [
+                    duration for end_time, duration in samples if end_time >= min_time
+                ]
+                for name, samples in self.__samples.items()
+            }
+
+        report = {}
+        for name, durations in sorted(durations_by_stage.items()):
+            if not durations:
+                continue
+
+            p50, p95 = np.percentile(durations, [50, 95])
+            report[name] = {
+                "count": len(durations),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "max_ms": float(np.max(durations)),
+            }
+
+        return report
+
+    def format_report(self) -> str:
+        lines = [
+            f"Latency per stage over the last {self.window_seconds:.0f} seconds:",
+            f"{'count':>7} {'p50 [ms]':>10} {'p95 [ms]':>10} {'max [ms]':>10}  stage",
+        ]
+        for name, stats in self.report().items():
+            lines.append(
+                f"{stats['count']:>7} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}  {name}"
+            )
+
+        return "\n".join(lines)
+
+
+class TraceExporter(ABC):
+    """Base exporter buffering the spans of a trace until its root span ends.
+
+    Args:
+        max_pending_traces: Maximum number of unfinished traces kept in memory.
+            The oldest ones are dropped first.
+    """
+
+    def __init__(self, max_pending_traces: int = 1000) -> None:
+        self.max_pending_traces = max_pending_traces
+
+        self.__pending: OrderedDict[str, list[LatencySpan]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def export(self, span: LatencySpan) -> None:
+        with self.__lock:
+            spans = self.__pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.is_root:
+                del self.__pending[span.trace_id]
+            else:
+                while len(self.__pending) > self.max_pending_traces:
+                    self.__pending.popitem(last=False)
+
+                return
+
+        self.export_trace(sorted(spans, key=lambda span: span.start_ns))
+
+    @abstractmethod
+    def export_trace(self, spans: list[LatencySpan]) -> None:
+        """Export the spans of a finished trace, sorted by start time."""
+
+
+class OpikLatencyExporter(TraceExporter):
+    """Attaches the stage timings of a request to its Opik trace.
+
+    The root span must end inside the function tracked by Opik (e.g.,
+    `AgentWrapper.run`), so the current Opik trace is the request's trace.
+    """
+
+    def export_trace(self, spans: list[LatencySpan]) -> None:
+        root_span = next(span for span in spans if span.is_root)
+        names = {span.span_id: span.name for span in spans}
+
+        stage_ms: dict[str, float] = defaultdict(float)
+        for span in spans:
+            stage_ms[span.name] += span.duration_ms
+
+        try:
+            opik_context.update_current_trace(
+                metadata={
+                    "latency": {
+                        "total_ms": root_span.duration_ms,
+                        "stage_ms": dict(stage_ms),
+                        "spans": [
+                            {
+                                "name": span.name,
+                                "parent": names.get(span.parent_span_id),
+                                "start_offset_ms": (span.start_ns - root_span.start_ns)
+                                / 1e6,
+                                "duration_ms": span.duration_ms,
+                                "attributes": span.attributes,
+                                "error": span.error,
+                            }
+                            for span in spans
+                        ],
+                    }
+                }
+            )
+        except Exception:
+            logger.opt(exception=True).debug(
+                "Could not attach the latency spans to the Opik trace."
+            )
+
+
+class OTLPJsonFileExporter(TraceExporter):
+    """Appends every trace to a file in the OTLP/JSON format, one line per trace.
+
+    The file can be ingested by any OpenTelemetry collector (e.g., with the
+    `otlpjsonfile` receiver) and forwarded to Jaeger, Tempo, etc.
+
+    Args:
+        path: Path to the JSONL file.
+        service_name: Value of the `service.name` resource attribute.
+        max_pending_traces: Maximum number of unfinished traces kept in memory.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        service_name: str = "second-brain-online",
+        max_pending_traces: int = 1000,
+    ) -> None:
+        super().__init__(max_pending_traces=max_pending_traces)
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.service_name = service_name
+
+        self.__lock = threading.Lock()
+
+    def export_trace(self, spans: list[LatencySpan]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self.__to_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "second_brain_online.latency"},
+                            "spans": [self.__to_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+        with self.__lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(payload) + "\n")
+
+    def __to_otlp_span(self, span: LatencySpan) -> dict:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_time_unix_nano),
+            "endTimeUnixNano": str(span.end_time_unix_nano),
+            "attributes": self.__to_attributes(span.attributes),
+            # STATUS_CODE_ERROR or STATUS_CODE_UNSET.
+            "status": {"code": 2, "message": span.error} if span.error else {},
+        }
+        if span.parent_span_id is not None:
+            otlp_span["parentSpanId"] = span.parent_span_id
+
+        return otlp_span
+
+    @staticmethod
+    def __to_attributes(attributes: dict[str, Any]) -> list[dict]:
+        otlp_attributes = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                otlp_value = {"boolValue": value}
+            elif isinstance(value, int):
+                otlp_value = {"intValue": str(value)}
+            elif isinstance(value, float):
+                otlp_value = {"doubleValue": value}
+            else:
+                otlp_value = {"stringValue": str(value)}
+            otlp_attributes.append({"key": key, "value": otlp_value})
+
+        return otlp_attributes
+
+
+_current_span: contextvars.ContextVar[LatencySpan | None] = contextvars.ContextVar(
+    "latency_span", default=None
+)
+
+
+def get_current_span() -> LatencySpan | None:
+    """Get the innermost open span of the current context, if any."""
+
+    return _current_span.get()
+
+
+class LatencyTracer:
+    """Times the stages of a request as nested spans.
+
+    The current span is tracked with a context variable, so spans opened in
+    worker threads or event loops running a copy of the caller's context (e.g.,
+    the agent's stream thread or the background event loop) are nested under
+    the caller's span. Every finished span is aggregated and sent to the
+    exporters.
+
+    Args:
+        exporters: Exporters receiving every finished span.
+        window_seconds: Window of the latency report.
+        enabled: Whether spans are recorded.
+    """
+
+    def __init__(
+        self,
+        exporters: list[SpanExporter] | None = None,
+        window_seconds: float = 900,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.aggregator = LatencyAggregator(window_seconds=window_seconds)
+        self.exporters = [self.aggregator, *(exporters or [])]
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[LatencySpan | None]:
+        """Time a stage, nested under the current span if any.
+
+        Args:
+            name: Name of the stage.
+            **attributes: Attributes of the span. More can be added to the
+                yielded span's `attributes` while it's open.
+
+        Yields:
+            LatencySpan | None: The open span, or None if tracing is disabled.
+        """
+
+        if not self.enabled:
+            yield None
+
+            return
+
+        parent_span = _current_span.get()
+        span = LatencySpan(
+            name=name,
+            trace_id=parent_span.trace_id if parent_span else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent_span.span_id if parent_span else None,
+            start_time_unix_nano=time.time_ns(),
+            start_ns=time.perf_counter_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+
+            raise
+        finally:
+            span.end_ns = time.perf_counter_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # A generator closed from another context (e.g., by the garbage
+                # collector) can't restore the parent span there.
+                pass
+
+            self.__export(span)
+
+    def record(
+        self, name: str, duration_ns: int, error: str | None = None, **attributes: Any
+    ) -> None:
+        """Record a stage ending now, timed by someone else (e.g., a driver event).
+
+        Args:
+            name: Name of the stage.
+            duration_ns: Duration of the stage, in nanoseconds.
+            error: The error of the stage, if it failed.
+            **attributes: Attributes of the span.
+        """
+
+        if not self.enabled:
+            return
+
+        parent_span = _current_span.get()
+        end_ns = time.perf_counter_ns()
+        self.__export(
+            LatencySpan(
+                name=name,
+                trace_id=parent_span.trace_id if parent_span else secrets.token_hex(16),
+                span_id=secrets.token_hex(8),
+                parent_span_id=parent_span.span_id if parent_span else None,
+                start_time_unix_nano=time.time_ns() - duration_ns,
+                start_ns=end_ns - duration_ns,
+                end_ns=end_ns,
+                attributes=attributes,
+                error=error,
+            )
+        )
+
+    def __export(self, span: LatencySpan) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                logger.opt(exception=True).warning(
+                    f"Failed to export the latency span '{span.name}' with {exporter.__class__.__name__}."
+                )
+
+
+@lru_cache(maxsize=1)
+def get_latency_tracer() -> LatencyTracer:
+    exporters: list[SpanExporter] = [OpikLatencyExporter()]
+    if settings.LATENCY_OTLP_EXPORT_PATH is not None:
+        exporters.append(OTLPJsonFileExporter(settings.LATENCY_OTLP_EXPORT_PATH))
+
+    return LatencyTracer(
+        exporters=exporters,
+        window_seconds=settings.LATENCY_REPORT_WINDOW_SECONDS,
+        enabled=settings.LATENCY_TRACING_ENABLED,
+    )
+
+
+def latency_span(name: str, **attributes: Any):
+    """Time a stage with the application's latency tracer. See `LatencyTracer.span`."""
+
+    return get_latency_tracer().span(name, **attributes)
@@ -0,0 +1,169 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from loguru import logger
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    start_seconds: float
+    duration_seconds: float
+    thread_name: str
+
+
+def profile_imports(modules: list[str]) -> list[ImportTiming]:
+    """Measure the cold import time of modules with `python -X importtime`.
+
+    The modules are imported in a fresh interpreter, as the current one has
+    already imported them.
+
+    Args:
+        modules: The modules to import.
+
+    Returns:
+        list[ImportTiming]: The timing of every imported module, in import order.
+            Empty if the import failed.
+    """
+
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if result.returncode != 0:
+        logger.warning(
+            f"Failed to profile the imports of {modules}: {result.stderr[-1000:]}"
+        )
+
+        return []
+
+    return parse_import_times(result.stderr)
+
+
+def parse_import_times(stderr: str) -> list[ImportTiming]:
+    """Parse the output of `python -X importtime`.
+
+    Args:
+        stderr: The standard error of the interpreter, where every import is
+            written as `import time: <self us> | <cumulative us> | <module>`,
+            with the module indented by two spaces per nesting level.
+
+    Returns:
+        list[ImportTiming]: The timing of every imported module, in import order.
+    """
+
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        module = name.strip()
+        timings.append(
+            ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name.rstrip()) - len(module) - 1) // 2,
+            )
+        )
+
+    return timings
+
+
+class StartupProfiler:
+    """Records the duration of the startup phases of an application.
+
+    Phases can be recorded from several threads, e.g., when the agent is built
+    in the background while the UI starts. The report combines them with the
+    import cost of every top-level package, measured with `python -X importtime`.
+    """
+
+    def __init__(self) -> None:
+        self.__start_time = time.perf_counter()
+        self.__phases: list[PhaseTiming] = []
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_seconds = time.perf_counter() - start_time
+            logger.debug(f"Startup phase '{name}' took {duration_seconds:.2f} seconds.")
+
+            with self.__lock:
+                self.__phases.append(
+                    PhaseTiming(
+                        name=name,
+                        start_seconds=start_time - self.__start_time,
+                        duration_seconds=duration_seconds,
+                        thread_name=threading.current_thread().name,
+                    )
+                )
+
+    def report(self, import_modules: list[str] | None = None, top_n: int = 15) -> str:
+        """Format the startup report.
+
+        Args:
+            import_modules: Modules whose imports are profiled. If None, imports
+                aren't profiled.
+            top_n: Number of packages listed by decreasing import time.
+
+        Returns:
+            str: The report.
+        """
+
+        with self.__lock:
+            phases = sorted(self.__phases, key=lambda phase: phase.start_seconds)
+
+        lines = ["Startup phases:", f"{'start [s]':>10} {'duration [s]':>13}  phase"]
+        for phase in phases:
+            lines.append(
+                f"{phase.start_seconds:>10.2f} {phase.duration_seconds:>13.2f}  {phase.name} ({phase.thread_name})"
+            )
+        lines.append(f"Total: {time.perf_counter() - self.__start_time:.2f} seconds")
+
+        if import_modules:
+            timings = profile_imports(import_modules)
+
+            # Attribute the import time of every module to its top-level package.
+            package_us: dict[str, int] = defaultdict(int)
+            for timing in timings:
+                package_us[timing.module.split(".")[0]] += timing.self_us
+            total_us = sum(package_us.values())
+
+            lines.extend(
+                [
+                    "",
+                    f"Cold import time of {', '.join(import_modules)}: {total_us / 1e6:.2f} seconds",
+                    f"{'self [s]':>10} {'share':>7}  package",
+                ]
+            )
+            for package, self_us in sorted(
+                package_us.items(), key=lambda item: item[1], reverse=True
+            )[:top_n]:
+                lines.append(
+                    f"{self_us / 1e6:>10.2f} {self_us / max(total_us, 1):>7.1%}  {package}"
+                )
+
+        return "\n".join(lines)
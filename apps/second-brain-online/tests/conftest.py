@@ -0,0 +1,4 @@
+import os
+
+# Keep the Opik decorators from sending the test traces to a backend.
+os.environ.setdefault("OPIK_TRACK_DISABLE", "true")
@@ -0,0 +1,97 @@
+import queue
+from contextlib import ExitStack
+from pathlib import Path
+
+import pytest
+from smolagents import Tool
+
+from second_brain_online.application.agents import agents
+from second_brain_online.application.agents.agents import AgentPool
+
+
+class StubRetrieverTool(Tool):
+    name = "mongodb_vector_search_retriever"
+    description = "Stub retriever."
+    inputs = {"query": {"type": "string", "description": "The query."}}
+    output_type = "string"
+
+    num_instances = 0
+
+    def __init__(self, config_path: Path) -> None:
+        super().__init__()
+
+        StubRetrieverTool.num_instances += 1
+
+    def forward(self, query: str) -> str:
+        return query
+
+
+class StubSummarizerTool(Tool):
+    name = "summarizer"
+    description = "Stub summarizer."
+    inputs = {"text": {"type": "string", "description": "The text."}}
+    output_type = "string"
+
+    def forward(self, text: str) -> str:
+        return text
+
+
+@pytest.fixture
+def build_pool(monkeypatch):
+    StubRetrieverTool.num_instances = 0
+    summarizer_tools = []
+
+    def get_summarizer_tool(stream: bool = False) -> Tool:
+        summarizer_tools.append(StubSummarizerTool())
+
+        return summarizer_tools[-1]
+
+    monkeypatch.setattr(agents, "MongoDBRetrieverTool", StubRetrieverTool)
+    monkeypatch.setattr(agents, "get_summarizer_tool", get_summarizer_tool)
+
+    def build(size: int) -> AgentPool:
+        pool = AgentPool(retriever_config_path=Path("retriever.yaml"), size=size)
+        assert StubRetrieverTool.num_instances == 1
+        assert len(summarizer_tools) == 1
+
+        return pool
+
+    return build
+
+
+def get_tools(agent: agents.AgentWrapper) -> dict[str, Tool]:
+    return agent._AgentWrapper__agent.tools
+
+
+def test_tools_are_built_once_and_shared_by_every_agent(build_pool) -> None:
+    pool = build_pool(size=3)
+
+    with ExitStack() as stack:
+        borrowed = [stack.enter_context(pool.acquire(timeout=1)) for _ in range(3)]
+
+    assert len({id(agent) for agent in borrowed}) == 3
+    for tool_name in ("mongodb_vector_search_retriever", "summarizer"):
+        assert len({id(get_tools(agent)[tool_name]) for agent in borrowed}) == 1
+
+
+def test_acquire_times_out_when_every_agent_is_borrowed(build_pool) -> None:
+    pool = build_pool(size=1)
+
+    with pool.acquire(timeout=1):
+        with pytest.raises(queue.Empty):
+            with pool.acquire(timeout=0.05):
+                pass
+
+    with pool.acquire(timeout=1):
+        pass
+
+
+def test_agents_are_returned_when_the_task_raises(build_pool) -> None:
+    pool = build_pool(size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire(timeout=1):
+            raise RuntimeError("task failure")
+
+    with pool.acquire(timeout=0.05) as agent:
+        assert agent is not None
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from opik import opik_context
+from smolagents.agents import ActionStep, ToolCall
+
+from second_brain_online.application.agents.agents import AgentWrapper
+from second_brain_online.application.agents.streaming import emit_token
+
+
+class StubAgent:
+    """Local stand-in for the subset of a smolagents agent used by `AgentWrapper`."""
+
+    def __init__(self) -> None:
+        self.step_number = 0
+        self.system_prompt = "system prompt"
+        self.system_prompt_template = "system prompt template"
+        self.tool_description_template = "tool description template"
+        self.tools = {}
+        self.model = SimpleNamespace(
+            model_id="stub",
+            api_base=None,
+            last_input_token_count=10,
+            last_output_token_count=5,
+        )
+        self.traces = []
+
+    def run(self, task: str, stream: bool = False):
+        self.traces.append(opik_context.get_current_trace_data())
+        for step_number in range(2):
+            self.step_number = step_number
+            emit_token(f"token-{step_number}", source="summarizer")
+            yield ActionStep(
+                step=step_number,
+                tool_calls=[
+                    ToolCall(name="retriever", arguments={"query": task}, id="call")
+                ],
+                observations=f"observation-{step_number}",
+                duration=0.1,
+            )
+
+        yield f"answer to {task}"
+
+
+def test_stream_yields_steps_tokens_and_final_answer() -> None:
+    agent = StubAgent()
+    events = list(AgentWrapper(agent).stream("question"))
+
+    assert [(event.type, event.step_number) for event in events] == [
+        ("token", 0),
+        ("step", 0),
+        ("token", 1),
+        ("step", 1),
+        ("final_answer", None),
+    ]
+    assert events[0].content == "token-0"
+    assert events[0].source == "summarizer"
+    assert "Called tool 'retriever'" in events[1].content
+    assert "observation-0" in events[1].content
+    assert events[1].duration_seconds == 0.1
+    assert events[-1].content == "answer to question"
+    # The agent runs inside the request's Opik trace, so the metadata update
+    # after the final answer and the tool traces have a trace to attach to.
+    assert agent.traces[0] is not None
+    assert agent.traces[0].name == "Agent.stream"
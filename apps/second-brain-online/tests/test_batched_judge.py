@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+from opik.evaluation.metrics import exceptions
+
+from second_brain_online.application.evaluation.batched_judge import (
+    BatchedLLMJudge,
+    JudgeVerdictCache,
+)
+
+
+def build_model_output(
+    hallucination: float = 0,
+    answer_relevance: float = 0.8,
+    moderation: float = 0.1,
+    summary_density: float = 3,
+) -> str:
+    return json.dumps(
+        {
+            "hallucination": {"reason": "grounded", "score": hallucination},
+            "answer_relevance": {"reason": "on topic", "score": answer_relevance},
+            "moderation": {"reason": "safe", "score": moderation},
+            "summary_density": {"reason": "concise", "score": summary_density},
+        }
+    )
+
+
+class RecordingLLMClient:
+    def __init__(self, model_output: str) -> None:
+        self.model_output = model_output
+        self.prompts: list[str] = []
+
+    async def agenerate_string(self, input: str, response_format) -> str:
+        self.prompts.append(input)
+
+        return self.model_output
+
+
+class FailingLLMClient:
+    async def agenerate_string(self, input: str, response_format) -> str:
+        raise AssertionError("The judge shouldn't be called.")
+
+
+def test_verdict_cache_gets_set_verdicts_and_ignores_corrupted_files(tmp_path) -> None:
+    cache = JudgeVerdictCache(tmp_path)
+    verdicts = [{"name": "moderation_metric", "value": 0.0, "reason": "safe"}]
+
+    assert cache.get("missing") is None
+
+    cache.set("key", verdicts)
+
+    assert cache.get("key") == verdicts
+    assert list(tmp_path.iterdir()) == [tmp_path / "key.json"]
+
+    (tmp_path / "corrupted.json").write_text("{not json", encoding="utf-8")
+
+    assert cache.get("corrupted") is None
+
+
+@pytest.mark.parametrize("field", ["model", "prompt", "context"])
+def test_verdict_cache_key_changes_with_every_field(field: str) -> None:
+    fields = {
+        "metric": "batched_llm_judge",
+        "model": "gpt-4o-mini",
+        "prompt": "prompt-hash",
+        "input": "question",
+        "output": "answer",
+        "context": "context",
+    }
+
+    key = JudgeVerdictCache.get_key(**fields)
+
+    assert key == JudgeVerdictCache.get_key(**dict(reversed(fields.items())))
+    assert key != JudgeVerdictCache.get_key(**{**fields, field: "changed"})
+
+
+def test_parse_model_output_normalizes_scores() -> None:
+    judge = BatchedLLMJudge(cache_dir=None)
+
+    results = judge._parse_model_output(
+        build_model_output(
+            hallucination=0.7, answer_relevance=1.3, moderation=-0.2, summary_density=2
+        )
+    )
+
+    assert {result.name: result.value for result in results} == {
+        "hallucination_metric": 1.0,
+        "answer_relevance_metric": 1.0,
+        "moderation_metric": 0.0,
+        "summary_density_judge": 0.5,
+    }
+    assert results[0].reason == "grounded"
+
+
+@pytest.mark.parametrize("model_output", [build_model_output(summary_density=4), "{"])
+def test_parse_model_output_rejects_invalid_outputs(model_output: str) -> None:
+    judge = BatchedLLMJudge(cache_dir=None)
+
+    with pytest.raises(exceptions.MetricComputationError):
+        judge._parse_model_output(model_output)
+
+
+def test_ascore_returns_cached_verdicts_without_calling_the_judge(tmp_path) -> None:
+    judge = BatchedLLMJudge(cache_dir=tmp_path)
+    llm_client = RecordingLLMClient(build_model_output())
+    judge.llm_client = llm_client
+
+    results = asyncio.run(
+        judge.ascore(input="question", output="answer", context=["a", "b"])
+    )
+
+    assert len(llm_client.prompts) == 1
+    assert "a\n\nb" in llm_client.prompts[0]
+
+    judge.llm_client = FailingLLMClient()
+    cached_results = asyncio.run(
+        judge.ascore(input="question", output="answer", context="a\n\nb")
+    )
+
+    assert [
+        (result.name, result.value, result.reason) for result in cached_results
+    ] == [(result.name, result.value, result.reason) for result in results]
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from second_brain_online.application.rag.retrievers import CommandLatencyListener
+from second_brain_online.latency import LatencySpan, LatencyTracer
+
+
+class RecordingExporter:
+    def __init__(self) -> None:
+        self.spans: list[LatencySpan] = []
+
+    def export(self, span: LatencySpan) -> None:
+        self.spans.append(span)
+
+
+def run_command(
+    listener: CommandLatencyListener, command: dict, failed: bool = False
+) -> None:
+    command_name = next(iter(command))
+    listener.started(
+        SimpleNamespace(command_name=command_name, command=command, request_id=7)
+    )
+    event = SimpleNamespace(
+        command_name=command_name,
+        database_name="second_brain",
+        request_id=7,
+        duration_micros=1500,
+        failure={"errmsg": "boom"},
+    )
+    if failed:
+        listener.failed(event)
+    else:
+        listener.succeeded(event)
+
+
+def test_aggregations_record_their_pipeline_stages() -> None:
+    exporter = RecordingExporter()
+    tracer = LatencyTracer(exporters=[exporter])
+    listener = CommandLatencyListener(tracer=tracer)
+
+    with tracer.span("retrieval"):
+        run_command(
+            listener,
+            {
+                "aggregate": "rag",
+                "pipeline": [
+                    {"$vectorSearch": {"index": "vector_index"}},
+                    {"$group": {"_id": None}},
+                    {
+                        "$unionWith": {
+                            "coll": "rag",
+                            "pipeline": [{"$search": {}}, {"$limit": 3}],
+                        }
+                    },
+                ],
+            },
+        )
+        run_command(listener, {"find": "index_metadata"}, failed=True)
+
+    aggregate, find = exporter.spans[:2]
+    assert aggregate.name == "mongodb.aggregate"
+    assert aggregate.duration_ns == 1_500_000
+    assert aggregate.attributes == {
+        "database": "second_brain",
+        "request_id": 7,
+        "pipeline": "$vectorSearch, $group, $unionWith($search, $limit)",
+    }
+    assert find.name == "mongodb.find"
+    assert find.error == "boom"
+    assert "pipeline" not in find.attributes
+
+
+def test_commands_outside_of_a_span_are_skipped() -> None:
+    exporter = RecordingExporter()
+    listener = CommandLatencyListener(tracer=LatencyTracer(exporters=[exporter]))
+
+    run_command(listener, {"aggregate": "rag", "pipeline": [{"$match": {}}]})
+    run_command(listener, {"ping": 1})
+
+    assert exporter.spans == []
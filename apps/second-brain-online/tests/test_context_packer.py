@@ -0,0 +1,81 @@
+import pytest
+from langchain_core.documents import Document
+
+from second_brain_online.application.rag import ContextPacker, context
+
+
+class CharacterEncoding:
+    """Tokenizer with one token per character, so budgets are easy to reason about."""
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        return [ord(character) for character in text]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(token) for token in tokens)
+
+
+@pytest.fixture(autouse=True)
+def character_encoding(monkeypatch) -> None:
+    monkeypatch.setattr(
+        context, "get_encoding", lambda model_id=None: CharacterEncoding()
+    )
+
+
+def make_document(content: str, url: str) -> Document:
+    return Document(page_content=content, metadata={"url": url, "title": url})
+
+
+def test_pack_drops_overlapping_documents_of_the_same_url() -> None:
+    text = "one two three four five six seven eight"
+    documents = [
+        make_document(text, "https://a"),
+        make_document(text + " nine", "https://a"),
+        make_document(text, "https://b"),
+    ]
+
+    packed_documents, stats = ContextPacker(max_tokens=1000).pack("query", documents)
+
+    assert [document.metadata["url"] for document in packed_documents] == [
+        "https://a",
+        "https://b",
+    ]
+    assert stats["overlapping_documents"] == 1
+    assert stats["output_tokens"] == 2 * len(text)
+
+
+def test_pack_truncates_the_document_that_does_not_fit() -> None:
+    documents = [
+        make_document("a" * 60, "https://a"),
+        make_document("b" * 60, "https://b"),
+        make_document("c" * 60, "https://c"),
+    ]
+
+    packed_documents, stats = ContextPacker(
+        max_tokens=100, min_document_tokens=10
+    ).pack("query", documents)
+
+    assert [document.page_content for document in packed_documents] == [
+        "a" * 60,
+        "b" * 40,
+    ]
+    assert packed_documents[1].metadata["url"] == "https://b"
+    assert stats["truncated_documents"] == 1
+    assert stats["output_tokens"] == 100
+
+
+def test_pack_compresses_to_the_sentences_matching_the_query() -> None:
+    documents = [
+        make_document("x" * 50, "https://a"),
+        make_document(
+            "Cats sleep a lot. Vector indices speed up search. Dogs bark loudly.",
+            "https://b",
+        ),
+    ]
+
+    packed_documents, stats = ContextPacker(
+        max_tokens=85, compress=True, min_document_tokens=10
+    ).pack("How do vector indices work?", documents)
+
+    assert packed_documents[1].page_content == "Vector indices speed up search."
+    assert stats["compressed_documents"] == 1
+    assert stats["output_tokens"] <= 85
@@ -0,0 +1,139 @@
+import contextvars
+import json
+import threading
+
+import pytest
+
+from second_brain_online.latency import (
+    LatencySpan,
+    LatencyTracer,
+    OTLPJsonFileExporter,
+    TraceExporter,
+)
+
+
+class RecordingTraceExporter(TraceExporter):
+    def __init__(self, max_pending_traces: int = 1000) -> None:
+        super().__init__(max_pending_traces=max_pending_traces)
+
+        self.traces: list[list[LatencySpan]] = []
+
+    def export_trace(self, spans: list[LatencySpan]) -> None:
+        self.traces.append(spans)
+
+
+def test_spans_are_nested_and_exported_per_trace() -> None:
+    exporter = RecordingTraceExporter()
+    tracer = LatencyTracer(exporters=[exporter])
+
+    with tracer.span("agent.run") as root:
+        with tracer.span("retrieval", cache_status="miss") as retrieval:
+            tracer.record("mongodb.aggregate", duration_ns=2_000_000)
+
+        # Work in another thread running a copy of the context is nested too.
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(lambda: tracer.record("summary", 1_000_000),)
+        )
+        thread.start()
+        thread.join()
+
+        assert exporter.traces == []
+
+    (trace,) = exporter.traces
+    spans = {span.name: span for span in trace}
+    assert spans["agent.run"] is root
+    assert {span.trace_id for span in trace} == {root.trace_id}
+    assert spans["retrieval"].parent_span_id == root.span_id
+    assert spans["retrieval"].attributes == {"cache_status": "miss"}
+    assert spans["mongodb.aggregate"].parent_span_id == retrieval.span_id
+    assert spans["mongodb.aggregate"].duration_ns == 2_000_000
+    assert spans["summary"].parent_span_id == root.span_id
+    assert root.duration_ns >= retrieval.duration_ns
+
+
+def test_failed_spans_record_their_error() -> None:
+    exporter = RecordingTraceExporter()
+    tracer = LatencyTracer(exporters=[exporter])
+
+    with pytest.raises(ValueError):
+        with tracer.span("agent.run"):
+            raise ValueError("boom")
+
+    assert exporter.traces[0][0].error == "ValueError: boom"
+
+
+def test_aggregator_reports_percentiles_per_stage() -> None:
+    tracer = LatencyTracer()
+    for duration_ms in range(1, 101):
+        tracer.record("retrieval", duration_ns=duration_ms * 1_000_000)
+
+    report = tracer.aggregator.report()
+
+    assert report["retrieval"]["count"] == 100
+    assert report["retrieval"]["p50_ms"] == pytest.approx(50.5)
+    assert report["retrieval"]["max_ms"] == pytest.approx(100)
+    assert "retrieval" in tracer.aggregator.format_report()
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    exporter = RecordingTraceExporter()
+    tracer = LatencyTracer(exporters=[exporter], enabled=False)
+
+    with tracer.span("agent.run") as span:
+        tracer.record("retrieval", duration_ns=1)
+
+    assert span is None
+    assert exporter.traces == []
+    assert tracer.aggregator.report() == {}
+
+
+def test_pending_traces_are_capped() -> None:
+    exporter = RecordingTraceExporter(max_pending_traces=1)
+    tracer = LatencyTracer(exporters=[exporter])
+
+    def run_other_trace() -> None:
+        with tracer.span("second"):
+            tracer.record("second.child", duration_ns=1)
+
+    with tracer.span("first"):
+        tracer.record("first.child", duration_ns=1)
+        # A trace running concurrently pushes the spans of the first one out.
+        contextvars.Context().run(run_other_trace)
+
+    assert [[span.name for span in trace] for trace in exporter.traces] == [
+        ["second", "second.child"],
+        ["first"],
+    ]
+
+
+def test_otlp_json_file_exporter(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    tracer = LatencyTracer(exporters=[OTLPJsonFileExporter(path)])
+
+    with tracer.span("agent.run", num_docs=3, cached=True):
+        tracer.record("mongodb.find", duration_ns=1_000, error="timeout")
+
+    (line,) = path.read_text().splitlines()
+    resource_spans = json.loads(line)["resourceSpans"][0]
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "second-brain-online"}}
+    ]
+    assert "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"]
+    assert root["attributes"] == [
+        {"key": "num_docs", "value": {"intValue": "3"}},
+        {"key": "cached", "value": {"boolValue": True}},
+    ]
+    assert child["status"] == {"code": 2, "message": "timeout"}
+    assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+
+
+def test_trace_exporters_must_implement_export_trace() -> None:
+    class IncompleteTraceExporter(TraceExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteTraceExporter()
@@ -0,0 +1,119 @@
+import pytest
+import torch
+import transformers
+
+from second_brain_online.application.agents.tools.local_summarizer import (
+    LocalSummarizationModel,
+    LocalSummarizerTool,
+)
+
+BOS_TOKEN_ID = 1
+PAD_TOKEN_ID = 0
+
+
+class CharacterTokenizer:
+    """Tokenizer with one token per character, following the Hugging Face API."""
+
+    pad_token = "<pad>"
+    eos_token = "<eos>"
+    pad_token_id = PAD_TOKEN_ID
+
+    def __init__(self) -> None:
+        self.padding_side = "right"
+        self.truncation_side = "right"
+
+    def __call__(
+        self,
+        texts,
+        add_special_tokens: bool = True,
+        return_tensors: str | None = None,
+        padding: bool = False,
+        truncation: bool = False,
+        max_length: int | None = None,
+    ) -> dict:
+        if isinstance(texts, str):
+            return {"input_ids": self.__encode(texts, add_special_tokens)}
+
+        batch = [self.__encode(text, add_special_tokens) for text in texts]
+        if truncation:
+            batch = [
+                ids[-max_length:]
+                if self.truncation_side == "left"
+                else ids[:max_length]
+                for ids in batch
+            ]
+        length = max(len(ids) for ids in batch)
+        input_ids = [[PAD_TOKEN_ID] * (length - len(ids)) + ids for ids in batch]
+
+        return {
+            "input_ids": torch.tensor(input_ids),
+            "attention_mask": (torch.tensor(input_ids) != PAD_TOKEN_ID).long(),
+        }
+
+    def decode(self, ids, skip_special_tokens: bool = False) -> str:
+        return "".join(chr(i) for i in ids if i not in (BOS_TOKEN_ID, PAD_TOKEN_ID))
+
+    def batch_decode(self, batch, skip_special_tokens: bool = False) -> list[str]:
+        return [self.decode(ids.tolist()) for ids in batch]
+
+    @staticmethod
+    def __encode(text: str, add_special_tokens: bool) -> list[int]:
+        return [BOS_TOKEN_ID] * add_special_tokens + [ord(c) for c in text]
+
+
+class EchoModel:
+    """Records its prompts and completes each of them with "summary"."""
+
+    def __init__(self) -> None:
+        self.input_ids: list[torch.Tensor] = []
+
+    def eval(self) -> None:
+        pass
+
+    def generate(self, input_ids, attention_mask, max_new_tokens, **kwargs):
+        self.input_ids.append(input_ids)
+        completion = torch.tensor([[ord(c) for c in "summary"]] * len(input_ids))
+
+        return torch.cat([input_ids, completion], dim=1)
+
+
+@pytest.fixture
+def model(monkeypatch) -> EchoModel:
+    echo_model = EchoModel()
+    monkeypatch.setattr(
+        transformers.AutoTokenizer,
+        "from_pretrained",
+        lambda model_id: CharacterTokenizer(),
+    )
+    monkeypatch.setattr(
+        transformers.AutoModelForCausalLM,
+        "from_pretrained",
+        lambda model_id, **kwargs: echo_model,
+    )
+
+    return echo_model
+
+
+def test_long_contents_are_truncated_before_formatting_the_prompt(
+    model: EchoModel,
+) -> None:
+    template = LocalSummarizerTool.SYSTEM_PROMPT
+    num_template_tokens = len(template.format(content="")) + 1
+    summarization_model = LocalSummarizationModel(
+        model_id="model",
+        quantize=False,
+        max_input_tokens=num_template_tokens + 50,
+    )
+
+    summaries = summarization_model.generate_from_template(
+        template, ["x" * 1000, "short content"]
+    )
+
+    (input_ids,) = model.input_ids
+    tokenizer = CharacterTokenizer()
+    long_prompt, short_prompt = [tokenizer.decode(ids.tolist()) for ids in input_ids]
+    assert summaries == ["summary", "summary"]
+    assert input_ids.shape[1] == num_template_tokens + 50
+    assert long_prompt == template.format(content="x" * 50)
+    assert long_prompt.endswith("### Response:\n")
+    assert short_prompt == template.format(content="short content")
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from second_brain_online.application.agents.tools.local_summarizer import MicroBatcher
+
+
+def test_concurrent_items_are_processed_in_batches() -> None:
+    batches = []
+    first_batch_started = threading.Event()
+    release_first_batch = threading.Event()
+
+    def process_batch(items: list[int]) -> list[int]:
+        batches.append(items)
+        if len(batches) == 1:
+            # Hold the worker, so the next items queue up into one batch.
+            first_batch_started.set()
+            release_first_batch.wait(timeout=5)
+
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(process_batch, max_batch_size=4, max_wait_seconds=0.05)
+    first_future = batcher.submit(0)
+    assert first_batch_started.wait(timeout=5)
+    futures = [batcher.submit(item) for item in range(1, 7)]
+    release_first_batch.set()
+
+    assert first_future.result(timeout=5) == 0
+    assert [future.result(timeout=5) for future in futures] == [10, 20, 30, 40, 50, 60]
+    assert batches == [[0], [1, 2, 3, 4], [5, 6]]
+
+
+def test_submissions_from_many_threads_share_batches() -> None:
+    batch_sizes = []
+
+    def process_batch(items: list[str]) -> list[str]:
+        batch_sizes.append(len(items))
+
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(process_batch, max_batch_size=8, max_wait_seconds=0.2)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda item: batcher.submit(item).result(timeout=5), "abcdefgh"
+            )
+        )
+
+    assert results == list("ABCDEFGH")
+    assert sum(batch_sizes) == 8
+    assert len(batch_sizes) < 8
+
+
+def test_batch_errors_are_raised_to_every_caller() -> None:
+    def process_batch(items: list[int]) -> list[int]:
+        raise RuntimeError("model failure")
+
+    batcher = MicroBatcher(process_batch, max_batch_size=2, max_wait_seconds=0.05)
+    futures = [batcher.submit(item) for item in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failure"):
+            future.result(timeout=5)
+
+
+def test_missing_results_fail_every_caller() -> None:
+    def process_batch(items: list[int]) -> list[int]:
+        return []
+
+    batcher = MicroBatcher(process_batch, max_batch_size=2, max_wait_seconds=0.2)
+    futures = [batcher.submit(item) for item in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="Got 0 results"):
+            future.result(timeout=5)
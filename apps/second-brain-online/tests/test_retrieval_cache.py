@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from second_brain_online.application.rag import RetrievalCache, reuse_query_embedding
+from second_brain_online.application.rag.embeddings import TimedEmbeddings
+
+EMBEDDINGS = {
+    "what is rag": [1.0, 0.0],
+    "what is retrieval augmented generation": [0.99, 0.1],
+    "how to cook pasta": [0.0, 1.0],
+}
+
+
+class CountingEmbeddings:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries.append(text)
+
+        return EMBEDDINGS[RetrievalCache.normalize_query(text)]
+
+
+class Search:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, list[float] | None]] = []
+
+    def __call__(self, query: str, query_embedding: list[float] | None) -> str:
+        self.calls.append((query, query_embedding))
+
+        return f"results of {query}"
+
+
+def test_exact_and_similar_hits_reuse_the_query_embedding() -> None:
+    embeddings = CountingEmbeddings()
+    search = Search()
+    cache = RetrievalCache(max_size=8, similarity_threshold=0.95)
+
+    first = cache.get_or_compute(
+        "What is RAG?", "config", search, embed_query=embeddings.embed_query
+    )
+    exact = cache.get_or_compute(
+        "what   is rag", "config", search, embed_query=embeddings.embed_query
+    )
+    similar = cache.get_or_compute(
+        "What is retrieval augmented generation?",
+        "config",
+        search,
+        embed_query=embeddings.embed_query,
+    )
+    other_config = cache.get_or_compute(
+        "What is RAG?", "other", search, embed_query=embeddings.embed_query
+    )
+
+    assert first == ("results of What is RAG?", "miss")
+    assert exact == ("results of What is RAG?", "exact_hit")
+    assert similar == ("results of What is RAG?", "similar_hit")
+    assert other_config == ("results of What is RAG?", "miss")
+    # The search gets the embedding computed by the cache on every miss.
+    assert search.calls == [("What is RAG?", [1.0, 0.0]), ("What is RAG?", [1.0, 0.0])]
+    assert cache.stats["exact_hits"] == 1
+    assert cache.stats["similar_hits"] == 1
+    assert cache.stats["misses"] == 2
+
+
+def test_reused_query_embedding_is_not_computed_again() -> None:
+    embedding_model = CountingEmbeddings()
+    embeddings = TimedEmbeddings(embedding_model)
+
+    with reuse_query_embedding("what is rag", [1.0, 0.0]):
+        assert embeddings.embed_query("what is rag") == [1.0, 0.0]
+        assert embeddings.embed_query("how to cook pasta") == [0.0, 1.0]
+    with reuse_query_embedding("what is rag", None):
+        embeddings.embed_query("what is rag")
+
+    assert embedding_model.queries == ["how to cook pasta", "what is rag"]
+
+
+def test_cache_expires_evicts_and_clears_on_version_change(monkeypatch) -> None:
+    version = "v1"
+    search = Search()
+    cache = RetrievalCache(
+        max_size=2,
+        ttl_seconds=10,
+        get_version=lambda: version,
+        version_check_interval_seconds=0,
+    )
+
+    cache.get_or_compute("a", "config", search)
+    cache.get_or_compute("b", "config", search)
+    cache.get_or_compute("c", "config", search)
+    assert cache.get_or_compute("a", "config", search)[1] == "miss"
+    assert cache.get_or_compute("c", "config", search)[1] == "exact_hit"
+
+    version = "v2"
+    assert cache.get_or_compute("c", "config", search)[1] == "miss"
+    assert cache.stats["version"] == "v2"
+
+    now = cache_time = 1000.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+    cache.clear()
+    cache.get_or_compute("d", "config", search)
+    now = cache_time + 11
+    assert cache.get_or_compute("d", "config", search)[1] == "miss"
+
+
+def test_disabled_cache_always_computes() -> None:
+    search = Search()
+    cache = RetrievalCache(max_size=0)
+
+    assert cache.get_or_compute("a", "config", search)[1] == "disabled"
+    assert cache.get_or_compute("a", "config", search)[1] == "disabled"
+    assert len(search.calls) == 2
+
+
+def test_async_cache_passes_the_query_embedding() -> None:
+    embeddings = CountingEmbeddings()
+    calls = []
+
+    async def search(query: str, query_embedding: list[float] | None) -> str:
+        calls.append(query_embedding)
+
+        return f"results of {query}"
+
+    cache = RetrievalCache(max_size=8, similarity_threshold=0.95)
+
+    async def run() -> list:
+        return [
+            await cache.aget_or_compute(
+                query, "config", search, embed_query=embeddings.embed_query
+            )
+            for query in ("what is rag", "what is retrieval augmented generation")
+        ]
+
+    results = asyncio.run(run())
+
+    assert [status for _, status in results] == ["miss", "similar_hit"]
+    assert calls == [[1.0, 0.0]]
+    assert embeddings.queries == [
+        "what is rag",
+        "what is retrieval augmented generation",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("query", "normalized_query"),
+    [("  What is\nRAG?? ", "what is rag"), ("RAG.", "rag")],
+)
+def test_normalize_query(query: str, normalized_query: str) -> None:
+    assert RetrievalCache.normalize_query(query) == normalized_query
@@ -0,0 +1,66 @@
+from second_brain_online import startup
+from second_brain_online.startup import (
+    ImportTiming,
+    StartupProfiler,
+    parse_import_times,
+)
+
+IMPORTTIME_STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        40 |         40 |     marshal
+import time:       300 |        460 | encodings
+import time:        50 |         50 |     numpy._utils
+import time:       900 |        950 |   numpy.core
+import time:      1000 |       1950 | numpy
+Traceback lines and warnings are ignored
+"""
+
+
+def test_parse_import_times_reads_every_import_with_its_depth() -> None:
+    timings = parse_import_times(IMPORTTIME_STDERR)
+
+    assert timings == [
+        ImportTiming(module="_io", self_us=120, cumulative_us=120, depth=1),
+        ImportTiming(module="marshal", self_us=40, cumulative_us=40, depth=2),
+        ImportTiming(module="encodings", self_us=300, cumulative_us=460, depth=0),
+        ImportTiming(module="numpy._utils", self_us=50, cumulative_us=50, depth=2),
+        ImportTiming(module="numpy.core", self_us=900, cumulative_us=950, depth=1),
+        ImportTiming(module="numpy", self_us=1000, cumulative_us=1950, depth=0),
+    ]
+
+
+def test_report_orders_phases_by_start_time() -> None:
+    profiler = StartupProfiler()
+
+    # The inner phase ends, and is recorded, before the outer one.
+    with profiler.phase("build agent"):
+        with profiler.phase("load embedding model"):
+            pass
+    with profiler.phase("launch UI"):
+        pass
+
+    lines = profiler.report().splitlines()
+    phase_lines = [line for line in lines[2:] if not line.startswith("Total")]
+
+    assert [line.split(maxsplit=2)[2] for line in phase_lines] == [
+        "build agent (MainThread)",
+        "load embedding model (MainThread)",
+        "launch UI (MainThread)",
+    ]
+
+
+def test_report_attributes_import_time_to_top_level_packages(monkeypatch) -> None:
+    monkeypatch.setattr(
+        startup,
+        "profile_imports",
+        lambda modules: parse_import_times(IMPORTTIME_STDERR),
+    )
+
+    report = StartupProfiler().report(import_modules=["numpy"], top_n=2)
+    import_lines = report.split("Cold import time of numpy: 0.00 seconds\n")[1]
+
+    assert import_lines.splitlines()[1:] == [
+        "      0.00   80.9%  numpy",
+        "      0.00   12.4%  encodings",
+    ]
@@ -0,0 +1,24 @@
+import numpy as np
+
+from second_brain_online.application.evaluation.summary_density_heuristic import (
+    SummaryDensityHeuristic,
+)
+
+
+def test_score_lengths_matches_the_scalar_score() -> None:
+    metric = SummaryDensityHeuristic(min_length=128, max_length=1024)
+    lengths = np.array([0, 1, 64, 127, 128, 500, 1024, 1025, 1536, 2048, 5000])
+
+    expected_scores = [metric._compute_length_score("x" * length) for length in lengths]
+
+    np.testing.assert_allclose(metric.score_lengths(lengths), expected_scores)
+
+
+def test_score_batch_scores_missing_outputs_as_empty() -> None:
+    metric = SummaryDensityHeuristic()
+    outputs = ["x" * 256, None, "x" * 64]
+
+    np.testing.assert_allclose(
+        metric.score_batch(outputs),
+        [metric.score(input="", output=output or "").value for output in outputs],
+    )
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+from smolagents import Tool
+from smolagents.agents import ActionStep
+from smolagents.utils import AgentExecutionError
+
+from second_brain_online.application.agents.tool_calling import (
+    ParallelToolCallingAgent,
+)
+
+
+class EchoTool(Tool):
+    name = "echo"
+    description = "Echoes a text."
+    inputs = {"text": {"type": "string", "description": "The text to echo."}}
+    output_type = "string"
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.calls: list[str] = []
+
+    def forward(self, text: str) -> str:
+        raise AssertionError("The async tools must be awaited through `ainvoke`.")
+
+    async def ainvoke(self, text: str) -> str:
+        self.calls.append(text)
+        await asyncio.sleep(0)
+        if text == "fail":
+            raise ValueError("can't echo that")
+
+        return f"echo: {text}"
+
+
+class UpperTool(Tool):
+    name = "upper"
+    description = "Uppercases a text."
+    inputs = {"text": {"type": "string", "description": "The text to uppercase."}}
+    output_type = "string"
+
+    def forward(self, text: str) -> str:
+        return text.upper()
+
+
+class FakeModel:
+    """Returns the scripted tool calls of every step, like an OpenAI model would."""
+
+    def __init__(self, steps: list[list[tuple[str, dict]]]) -> None:
+        self.steps = steps
+        self.last_input_token_count = 0
+        self.last_output_token_count = 0
+
+    def __call__(self, messages, tools_to_call_from=None, stop_sequences=None):
+        tool_calls = self.steps.pop(0)
+
+        return SimpleNamespace(
+            tool_calls=[
+                SimpleNamespace(
+                    id=f"call_{i}",
+                    function=SimpleNamespace(name=name, arguments=arguments),
+                )
+                for i, (name, arguments) in enumerate(tool_calls)
+            ]
+        )
+
+
+def get_action_steps(agent: ParallelToolCallingAgent) -> list[ActionStep]:
+    return [log for log in agent.logs if isinstance(log, ActionStep)]
+
+
+def build_agent(steps: list[list[tuple[str, dict]]]) -> ParallelToolCallingAgent:
+    return ParallelToolCallingAgent(
+        tools=[EchoTool(), UpperTool()],
+        model=FakeModel(steps),
+        max_steps=3,
+        verbosity_level=0,
+    )
+
+
+def test_tool_calls_run_concurrently_with_state_substitution() -> None:
+    agent = build_agent(
+        [
+            [("echo", {"text": "stored_text"}), ("upper", {"text": "stored_text"})],
+            [("final_answer", {"answer": "done"})],
+        ]
+    )
+    agent.state["stored_text"] = "value from state"
+
+    answer = agent.run("task")
+    first_step = get_action_steps(agent)[0]
+
+    assert answer == "done"
+    assert agent.tools["echo"].calls == ["value from state"]
+    assert first_step.error is None
+    assert first_step.observations == (
+        "echo: value from state\n\nCall id: call_1\nObservation: VALUE FROM STATE"
+    )
+
+
+def test_failing_async_tool_fails_the_step_with_an_execution_error() -> None:
+    agent = build_agent(
+        [
+            [("echo", {"text": "fail"}), ("upper", {"text": "ok"})],
+            [("unknown", {"text": "ok"})],
+            [("final_answer", {"answer": "done"})],
+        ]
+    )
+
+    answer = agent.run("task")
+    failed_step, unknown_tool_step, _ = get_action_steps(agent)
+
+    assert answer == "done"
+    assert isinstance(failed_step.error, AgentExecutionError)
+    assert "Call id: call_0" in str(failed_step.error)
+    assert "can't echo that" in str(failed_step.error)
+    assert "Observations of the other calls:\nOK" in str(failed_step.error)
+    assert failed_step.observations == "OK"
+    assert isinstance(unknown_tool_step.error, AgentExecutionError)
+    assert "Unknown tool unknown" in str(unknown_tool_step.error)
@@ -1,9 +1,165 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
 import click
-from smolagents import GradioUI
 
-from second_brain_online.application.agents import get_agent
+from second_brain_online.startup import StartupProfiler
+
+# The agent and UI dependencies are imported in `main`, so their import time is
+# profiled and Gradio is only loaded with `--ui`.
+if TYPE_CHECKING:
+    import gradio as gr
+
+    from second_brain_online.application.agents.agents import AgentWrapper
+
+PROFILED_IMPORTS = ["second_brain_online.application.agents", "gradio"]
+
+
+def start_agent(
+    retriever_config_path: Path,
+    stream: bool,
+    prewarm: bool,
+    profiler: StartupProfiler,
+) -> Future["AgentWrapper"]:
+    """Build the agent and configure Opik concurrently in background threads.
+
+    Args:
+        retriever_config_path: Path to the retriever config file.
+        stream: Whether the agent streams its tools' tokens.
+        prewarm: Whether to warm up the agent's tools (e.g., the embedding model
+            and the MongoDB connection) before resolving the future.
+        profiler: Profiler recording the startup phases.
+
+    Returns:
+        Future[AgentWrapper]: Resolved with the agent once it's ready and Opik is
+            configured.
+    """
+
+    from second_brain_online import opik_utils
+    from second_brain_online.application.agents import get_agent
+
+    def configure_opik() -> None:
+        with profiler.phase("configure opik"):
+            opik_utils.configure()
+
+    def build_agent() -> "AgentWrapper":
+        with profiler.phase("build agent"):
+            agent = get_agent(
+                retriever_config_path=retriever_config_path, stream=stream
+            )
+        if prewarm:
+            with profiler.phase("prewarm agent"):
+                agent.prewarm()
+
+        # Wait for Opik, so the traces of the first query are exported.
+        opik_future.result()
+
+        return agent
+
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warm-start")
+    opik_future = executor.submit(configure_opik)
+    agent_future = executor.submit(build_agent)
+    executor.shutdown(wait=False)
+
+    return agent_future
+
+
+def stream_to_chat_messages(
+    agent: "AgentWrapper", prompt: str, messages: list["gr.ChatMessage"]
+) -> Iterator[list["gr.ChatMessage"]]:
+    """Stream the agent's events as Gradio chat messages.
+
+    Steps are displayed as collapsible "thoughts", while the tokens of streaming
+    tools are appended to their message as they are generated.
+    """
+
+    import gradio as gr
+
+    messages.append(gr.ChatMessage(role="user", content=prompt))
+    yield messages
+
+    token_message = None
+    for event in agent.stream(prompt, reset=False):
+        if event.type == "token":
+            if token_message is None:
+                token_message = gr.ChatMessage(
+                    role="assistant",
+                    content="",
+                    metadata={"title": f"🛠️ Streaming from {event.source}"},
+                )
+                messages.append(token_message)
+            token_message.content += event.content
+        elif event.type == "step":
+            token_message = None
+            messages.append(
+                gr.ChatMessage(
+                    role="assistant",
+                    content=event.content,
+                    metadata={
+                        "title": f"Step {event.step_number} ({event.duration_seconds or 0:.1f}s)"
+                    },
+                )
+            )
+        elif event.type == "final_answer":
+            messages.append(gr.ChatMessage(role="assistant", content=event.content))
+
+        yield messages
+
+
+def launch_gradio_ui(agent_future: Future["AgentWrapper"]) -> None:
+    """Launch the chat UI while the agent is still being built.
+
+    Args:
+        agent_future: Resolved with the agent. The first message waits for it.
+    """
+
+    import gradio as gr
+
+    with gr.Blocks(fill_height=True) as demo:
+        chatbot = gr.Chatbot(label="Second Brain Agent", type="messages", scale=1)
+        text_input = gr.Textbox(lines=1, label="Chat Message")
+
+        def interact_with_agent(prompt: str, messages: list[gr.ChatMessage]):
+            yield from stream_to_chat_messages(agent_future.result(), prompt, messages)
+
+        text_input.submit(interact_with_agent, [text_input, chatbot], [chatbot]).then(
+            lambda: "", None, [text_input]
+        )
+
+    demo.launch()
+
+
+def run_query(agent: "AgentWrapper", query: str, stream: bool) -> None:
+    if not stream:
+        result = agent.run(query)
+
+        print(result)
+
+        return
+
+    is_streaming_tokens = False
+    for event in agent.stream(query):
+        if event.type == "token":
+            if not is_streaming_tokens:
+                click.secho(f"\n[{event.source}] ", fg="cyan", nl=False)
+                is_streaming_tokens = True
+            click.echo(event.content, nl=False)
+            continue
+
+        if is_streaming_tokens:
+            click.echo()
+            is_streaming_tokens = False
+
+        if event.type == "step":
+            click.secho(
+                f"\n[Step {event.step_number}] ({event.duration_seconds or 0:.1f}s)",
+                fg="yellow",
+            )
+            click.echo(event.content)
+        elif event.type == "final_answer":
+            click.secho("\n[Final answer]", fg="green")
+            click.echo(event.content)
 
 
 @click.command()
@@ -26,22 +182,86 @@ from second_brain_online.application.agents import get_agent
     default="What is the feature/training/inference (FTI) pipelines architecture?",
     help="Query to run in CLI mode",
 )
-def main(retriever_config_path: Path, ui: bool, query: str) -> None:
+@click.option(
+    "--stream/--no-stream",
+    default=True,
+    help="Stream the agent steps and generated tokens as they happen",
+)
+@click.option(
+    "--prewarm/--no-prewarm",
+    default=True,
+    help="Load the embedding model and open the MongoDB connection before the first query",
+)
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    default=False,
+    help="Print the duration of the startup phases and the import time of every package",
+)
+@click.option(
+    "--latency-report",
+    is_flag=True,
+    default=False,
+    help="Print the p50/p95 latency of every stage of the query in CLI mode",
+)
+def main(
+    retriever_config_path: Path,
+    ui: bool,
+    query: str,
+    stream: bool,
+    prewarm: bool,
+    profile_startup: bool,
+    latency_report: bool,
+) -> None:
     """Run the agent either in Gradio UI or CLI mode.
 
     Args:
         ui: If True, launches Gradio UI. If False, runs in CLI mode
         query: Query string to run in CLI mode
+        stream: If True, streams the agent steps and tokens as they happen
+        prewarm: If True, warms up the agent's tools before the first query
+        profile_startup: If True, prints a startup profile report
+        latency_report: If True, prints the latency of every stage of the query
     """
-    agent = get_agent(retriever_config_path=Path(retriever_config_path))
+    profiler = StartupProfiler()
+
+    def print_startup_report(*args) -> None:
+        if profile_startup:
+            click.echo(profiler.report(import_modules=PROFILED_IMPORTS), err=True)
+
+    with profiler.phase("import agent"):
+        agent_future = start_agent(
+            Path(retriever_config_path),
+            stream=stream,
+            prewarm=prewarm,
+            profiler=profiler,
+        )
+
     if ui:
-        GradioUI(agent).launch()
-    else:
-        assert query, "Query is required in CLI mode"
+        # The UI comes up while the agent is built and prewarmed.
+        with profiler.phase("import gradio"):
+            import gradio  # noqa: F401
 
-        result = agent.run(query)
+        agent_future.add_done_callback(print_startup_report)
+        launch_gradio_ui(agent_future)
 
-        print(result)
+        return
+
+    assert query, "Query is required in CLI mode"
+
+    with profiler.phase("wait for agent"):
+        agent = agent_future.result()
+
+    try:
+        with profiler.phase("first query"):
+            run_query(agent, query, stream=stream)
+    finally:
+        print_startup_report()
+
+        if latency_report:
+            from second_brain_online.latency import get_latency_tracer
+
+            click.echo(get_latency_tracer().aggregator.format_report(), err=True)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ from typing import List
 
 import click
 
-from second_brain_online.application.evaluation import evaluate_agent
+from second_brain_online.application.evaluation import evaluate_agent, score_experiment
 
 EVALUATION_PROMPTS: List[str] = [
     """
@@ -54,12 +54,53 @@ Explain to me:
 @click.option(
     "--retriever-config-path",
     type=click.Path(exists=True, path_type=Path),
-    required=True,
     help="Path to the retriever configuration file",
 )
-def main(retriever_config_path: Path) -> None:
+@click.option(
+    "--task-threads",
+    type=int,
+    default=2,
+    help="Number of threads evaluating the prompts, each using its own agent",
+)
+@click.option(
+    "--batch-judges/--no-batch-judges",
+    default=True,
+    help="Score the LLM judge metrics with a single cached call per item",
+)
+@click.option(
+    "--judge-concurrency",
+    type=int,
+    default=16,
+    help="Maximum number of concurrent LLM judge calls",
+)
+@click.option(
+    "--rescore-experiment",
+    type=str,
+    default=None,
+    help="Only score the given existing experiment with the batched LLM judges",
+)
+def main(
+    retriever_config_path: Path | None,
+    task_threads: int,
+    batch_judges: bool,
+    judge_concurrency: int,
+    rescore_experiment: str | None,
+) -> None:
     """Evaluate agent with custom retriever configuration."""
-    evaluate_agent(EVALUATION_PROMPTS, retriever_config_path=retriever_config_path)
+    if rescore_experiment:
+        score_experiment(rescore_experiment, judge_concurrency=judge_concurrency)
+
+        return
+
+    assert retriever_config_path, "--retriever-config-path is required."
+
+    evaluate_agent(
+        EVALUATION_PROMPTS,
+        retriever_config_path=retriever_config_path,
+        task_threads=task_threads,
+        batch_judges=batch_judges,
+        judge_concurrency=judge_concurrency,
+    )
 
 
 if __name__ == "__main__":
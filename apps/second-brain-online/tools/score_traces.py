@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+import click
+import numpy as np
+
+from second_brain_online.application.evaluation import score_traces, summarize_scores
+
+
+@click.command()
+@click.option(
+    "--traces-path",
+    type=click.Path(exists=True, path_type=Path),
+    required=True,
+    help="Path to the exported traces, as a JSONL or Parquet file",
+)
+@click.option(
+    "--output-field",
+    type=str,
+    default="output",
+    help="Field of the answers in the traces, with dots separating nested fields (e.g., output.output)",
+)
+@click.option(
+    "--scores-path",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Optional .npz file where the per-trace lengths and scores are saved",
+)
+def main(traces_path: Path, output_field: str, scores_path: Path | None) -> None:
+    """Score exported production traces with the heuristic metrics, without Opik."""
+    results = score_traces(traces_path, output_field=output_field)
+
+    if scores_path:
+        scores_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(scores_path, **results)
+
+    click.echo(json.dumps(summarize_scores(results), indent=2))
+
+
+if __name__ == "__main__":
+    main()